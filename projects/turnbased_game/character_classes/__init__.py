@@ -1,11 +1,35 @@
 # This file makes the character_classes directory a Python package
 
 # Import all classes for easy access
+from .class_tables import CLASS_TABLES, ClassTable, AbilityTable, load_class_tables
+from .action_registry import ActionSpec, ActionRegistry
 from .base_character import Character
 from .warrior import Warrior
 from .rogue import Rogue
 from .wizard import Wizard
 from .enemy_ai import EnemyAI
+from .ai_policy import CompiledEnemyAI, PolicyTable, compile_policy
+from .combat_events import (CombatEventBus, combat_events, EventRecorder, log_event,
+                            DamageDealt, Dodged, Crit, ResourceChanged, EffectApplied,
+                            EffectExpired, ItemUsed)
+from .output_sink import (OutputSink, ConsoleSink, NullSink, BufferedSink, CaptureSink,
+                          get_output_sink, set_output_sink, output_to, narrate, narration_enabled)
+from .game_clock import (GameClock, RealClock, ScaledClock, InstantClock, VirtualClock,
+                         get_game_clock, set_game_clock, use_clock, pause)
+from .rng_streams import BattleRNG, BlockStream, RollBank, stream_seed
+from .action_results import action_result
 
 # Make classes available when importing the package
-__all__ = ['Character', 'Warrior', 'Rogue', 'Wizard', 'EnemyAI']
\ No newline at end of file
+__all__ = ['Character', 'Warrior', 'Rogue', 'Wizard', 'EnemyAI',
+           'CombatEventBus', 'combat_events', 'EventRecorder', 'log_event',
+           'DamageDealt', 'Dodged', 'Crit', 'ResourceChanged', 'EffectApplied',
+           'EffectExpired', 'ItemUsed',
+           'OutputSink', 'ConsoleSink', 'NullSink', 'BufferedSink', 'CaptureSink',
+           'get_output_sink', 'set_output_sink', 'output_to', 'narrate', 'narration_enabled',
+           'GameClock', 'RealClock', 'ScaledClock', 'InstantClock', 'VirtualClock',
+           'get_game_clock', 'set_game_clock', 'use_clock', 'pause',
+           'CLASS_TABLES', 'ClassTable', 'AbilityTable', 'load_class_tables',
+           'ActionSpec', 'ActionRegistry',
+           'CompiledEnemyAI', 'PolicyTable', 'compile_policy',
+           'BattleRNG', 'BlockStream', 'RollBank', 'stream_seed',
+           'action_result']
\ No newline at end of file
@@ -0,0 +1,105 @@
+"""
+Action Registry
+Each character class declares its menu actions as ActionSpec rows (menu key,
+action id, handler and validator method names, narration). When the class
+is created the rows are resolved into an ActionRegistry of plain functions
+indexed by menu key, player action id and EnemyAI action id, so the turn
+loop and EnemyAI dispatch with one dict lookup instead of isinstance checks
+and if/elif chains. A new class plugs in by declaring its own ACTIONS.
+"""
+from typing import Callable, Dict, Iterator, NamedTuple, Optional, Tuple
+
+from .output_sink import narrate
+
+
+class ActionSpec(NamedTuple):
+    """One menu action as a class declares it"""
+    key: str                  # letter the player types
+    action: str               # action id for validate_action/execute_action
+    handler: str              # Character method that performs it
+    validator: str            # Character method saying whether it's allowed right now
+    table: str                # class table entry holding its cost (attack/special/item/heal/effect)
+    enemy_action: Optional[str] = None   # EnemyAI action id, defaults to `action`
+    targets_enemy: bool = False          # handler takes the opponent
+    status: bool = False                 # handler returns a result dict instead of narrating
+    # Narration for status abilities; the player failure message gets the reason
+    success: str = ""
+    failure: str = ""
+    enemy_success: str = ""
+    enemy_failure: str = ""
+
+
+class RegisteredAction(NamedTuple):
+    """An ActionSpec resolved against one class"""
+    spec: ActionSpec
+    handler: Callable
+    validator: Callable
+
+    @property
+    def action(self) -> str:
+        return self.spec.action
+
+    @property
+    def enemy_action(self) -> str:
+        return self.spec.enemy_action or self.spec.action
+
+    def cost(self, character) -> int:
+        """Resource cost from the character's class table (items cost an item instead)"""
+        return getattr(getattr(character.stats, self.spec.table), "cost", 0)
+
+    def allowed(self, character) -> bool:
+        return self.validator(character)
+
+    def perform(self, character, opponent, is_enemy: bool = False) -> None:
+        """Runs the handler; a failed enemy status ability falls back to an attack"""
+        spec = self.spec
+        if spec.status:
+            result = self.handler(character)
+            if result['success']:
+                narrate(spec.enemy_success if is_enemy else spec.success)
+            elif is_enemy:
+                narrate(spec.enemy_failure)
+                character.attack(opponent, is_enemy=True)  # Fallback
+            else:
+                narrate(spec.failure, result.get('reason', 'Unknown error'))
+            return
+        args = (opponent,) if spec.targets_enemy else ()
+        if is_enemy:
+            self.handler(character, *args, is_enemy=True)
+        else:
+            self.handler(character, *args)
+
+
+class ActionRegistry:
+    """A class's actions indexed by menu key, action id and EnemyAI action id"""
+
+    def __init__(self, cls, specs: Tuple[ActionSpec, ...]):
+        self.entries: Tuple[RegisteredAction, ...] = tuple(
+            RegisteredAction(spec, getattr(cls, spec.handler), getattr(cls, spec.validator)) for spec in specs)
+        self.by_key: Dict[str, RegisteredAction] = {}
+        self.by_action: Dict[str, RegisteredAction] = {}
+        self.by_enemy_action: Dict[str, RegisteredAction] = {}
+        self.status: Optional[RegisteredAction] = None   # the class's own status ability
+        for entry in self.entries:
+            for index, name in ((self.by_key, entry.spec.key), (self.by_action, entry.action),
+                                (self.by_enemy_action, entry.enemy_action)):
+                if name in index:
+                    raise ValueError(f"{cls.__name__} declares {name!r} twice")
+                index[name] = entry
+            if entry.spec.status:
+                self.status = entry
+
+    def __iter__(self) -> Iterator[RegisteredAction]:
+        return iter(self.entries)
+
+    def __contains__(self, action: str) -> bool:
+        return action in self.by_action
+
+    def get(self, action: str) -> Optional[RegisteredAction]:
+        return self.by_action.get(action)
+
+    def for_key(self, key: str) -> Optional[RegisteredAction]:
+        return self.by_key.get(key)
+
+    def for_enemy(self, enemy_action: str) -> Optional[RegisteredAction]:
+        return self.by_enemy_action.get(enemy_action)
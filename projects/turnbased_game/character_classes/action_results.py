@@ -0,0 +1,127 @@
+"""
+Action Results
+Result dicts for front-ends that animate a turn instead of printing it:
+what one action did, the numbers on both sides before and after, and the
+animation and sound cues to play. Warrior.attack_get_result was the first;
+action_result() gives every action of every class the same shape.
+
+The action runs through its registry entry exactly as it does in battle
+(dodges, the target's effects, an enemy's fallback attack), with both
+characters' combat events recorded for the call and still forwarded to the
+bus they were on. The result is folded from those events. It holds plain
+numbers and strings only, so it can be handed to another thread.
+
+    action_type        action id ("attack", "heal", "magic_bubble", ...)
+    attacker           side acting, "player" or "enemy"
+    success            False when nothing happened (e.g. not enough mana)
+    damage, rolled     damage dealt after and before the target's effects
+    critical_hit, super_critical, dodged
+    effect_applied, duration    status effect the action started
+    items_left         after an item
+    attacker_health_before/_after, target_health_before/_after
+    attacker_resource, attacker_resource_before/_after (and the same for target_)
+    attacker_<resource>_before/_after, <resource>_gain   e.g. attacker_rage_before, rage_gain
+    animation_triggers, sound_effects
+"""
+import contextlib
+from typing import Any, Dict, Iterator, List, Tuple
+
+from .combat_events import CombatEventBus, EventRecorder, DamageDealt, Dodged, Crit, EffectApplied, ItemUsed
+
+# Cues added on top of the class's own (Character.CUES) depending on the outcome
+CRIT_CUES = (("critical_flash",), ("critical_sound",))
+DODGE_CUES = (("dodge_blur",), ("whoosh",))
+FAILED_CUES = ((), ("action_failed",))
+
+
+@contextlib.contextmanager
+def recording(*characters) -> Iterator[EventRecorder]:
+    """Records the characters' combat events for the block, still forwarding them to their own buses"""
+    recorder = EventRecorder()
+    saved = []
+    for character in characters:
+        previous = character.events
+        bus = CombatEventBus()
+        bus.subscribe(recorder)
+        if previous.active:
+            bus.subscribe(previous.emit)
+        saved.append((character, character.__dict__.get("events")))
+        character.events = bus
+    try:
+        yield recorder
+    finally:
+        for character, own in saved:
+            if own is None:
+                del character.events   # back to the class's shared bus
+            else:
+                character.events = own
+
+
+def _numbers(character) -> Tuple[int, str, int]:
+    resource = character.stats.resource
+    return character.health, resource, getattr(character, resource)
+
+
+def action_result(character, enemy, entry, is_enemy: bool = False) -> Dict[str, Any]:
+    """Performs a RegisteredAction for `character` against `enemy` and describes what happened"""
+    health, resource, amount = _numbers(character)
+    target_health, target_resource, target_amount = _numbers(enemy)
+    with recording(character, enemy) as recorder:
+        entry.perform(character, enemy, is_enemy)
+    events = recorder.events
+
+    action = entry.action
+    damage = sum(event.amount for event in events if type(event) is DamageDealt and event.attacker is character)
+    rolled = sum(event.rolled for event in events if type(event) is DamageDealt and event.attacker is character)
+    crits = [event for event in events if type(event) is Crit]
+    dodged = any(type(event) is Dodged for event in events)
+    applied = next((event for event in events if type(event) is EffectApplied), None)
+    item = next((event for event in events if type(event) is ItemUsed), None)
+    if entry.spec.status and applied is None and (damage or dodged):
+        action = "attack"   # an enemy's failed status ability falls back to an attack
+
+    animations: List[str] = []
+    sounds: List[str] = []
+    class_animations, class_sounds = character.CUES.get(action, ((action,), ()))
+    if not events:
+        animations, sounds = map(list, FAILED_CUES)
+    else:
+        animations.extend(class_animations)
+        if dodged:
+            animations.extend(DODGE_CUES[0])
+            sounds.extend(DODGE_CUES[1])
+        else:
+            sounds.extend(class_sounds)
+        if crits:
+            animations.extend(CRIT_CUES[0])
+            sounds.extend(CRIT_CUES[1])
+
+    after = getattr(character, resource)
+    return {
+        'action_type': action,
+        'attacker': 'enemy' if is_enemy else 'player',
+        'success': bool(events),
+        'damage': damage,
+        'rolled': rolled,
+        'critical_hit': bool(crits),
+        'super_critical': any(event.super_crit for event in crits),
+        'dodged': dodged,
+        'effect_applied': applied.effect_type.value if applied else None,
+        'duration': applied.duration if applied else 0,
+        'items_left': item.items_left if item else character.item_count,
+        'attacker_health_before': health,
+        'attacker_health_after': character.health,
+        'target_health_before': target_health,
+        'target_health_after': enemy.health,
+        'attacker_resource': resource,
+        'attacker_resource_before': amount,
+        'attacker_resource_after': after,
+        'target_resource': target_resource,
+        'target_resource_before': target_amount,
+        'target_resource_after': getattr(enemy, target_resource),
+        f'attacker_{resource}_before': amount,
+        f'attacker_{resource}_after': after,
+        f'{resource}_gain': after - amount,
+        'animation_triggers': animations,
+        'sound_effects': sounds,
+    }
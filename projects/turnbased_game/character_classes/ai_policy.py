@@ -0,0 +1,214 @@
+"""
+AI Policy
+Compiles the EnemyAI rule cascade into a per-class decision table.
+
+choose_action only ever looks at a handful of facts: the health bracket,
+which resource thresholds are met, whether items are left, whether the
+class's own effect is active, whether health is above STURDY_HEALTH and
+whether the player is in KILL_RANGE. compile_policy evaluates the cascade
+once for a representative of every combination, recording its random
+50/50 splits as probabilities, so CompiledEnemyAI decides with one index
+computation and one tuple lookup.
+
+The cascade is probed through _rule_action, so subclasses that change
+thresholds or override the _*_action methods compile their own table, as
+long as they only read the facts above.
+"""
+import random
+import time
+from bisect import bisect_right
+from functools import lru_cache
+from typing import List, NamedTuple, Optional, Tuple, Type
+
+from .enemy_ai import EnemyAI
+
+
+class Decision(NamedTuple):
+    """The cascade's answer for one table cell"""
+    actions: Tuple[str, ...]
+    probabilities: Tuple[float, ...]
+
+    def sample(self, rng=random) -> str:
+        if len(self.actions) == 1:
+            return self.actions[0]
+        if len(set(self.probabilities)) == 1:
+            # even split: the same draw the cascade's rng.choice makes
+            return rng.choice(self.actions)
+        return rng.choices(self.actions, self.probabilities)[0]
+
+
+class _RecordingChoice:
+    """Stands in for EnemyAI.rng while probing; remembers the options offered"""
+
+    def __init__(self):
+        self.options: Optional[Tuple[str, ...]] = None
+
+    def choice(self, options):
+        self.options = tuple(options)
+        return self.options[0]
+
+
+class _Player:
+    # choose_action only reads the player's health
+    def __init__(self, health):
+        self.health = health
+
+
+class PolicyTable:
+    """Decision table for one (EnemyAI class, character class) pair"""
+
+    def __init__(self, ai_class: Type[EnemyAI], character_class: Type):
+        stats = character_class.stats
+        self.max_health = stats.max_health
+        self.resource = stats.resource
+        self.effect_type = stats.effect.effect_type
+        self.desperate = ai_class.DESPERATE_HEALTH
+        self.defensive = ai_class.DEFENSIVE_HEALTH
+        self.sturdy = ai_class.STURDY_HEALTH
+        self.kill_range = ai_class.KILL_RANGE
+        # every resource amount the cascade compares against
+        costs = {stats.special.cost, *ai_class.resource_thresholds(stats)}
+        if stats.heal:
+            costs.add(stats.heal.cost)
+        self.thresholds: Tuple[int, ...] = tuple(sorted(costs))
+        self.tiers = len(self.thresholds) + 1
+        self.decisions: Tuple[Optional[Decision], ...] = self._compile(ai_class, character_class)
+        # Hot-path helpers: the health part of the index for every health 0..max_health, and each
+        # cell as a bare action (certain) or the tuple handed to rng.choice (even split)
+        self.health_offsets: Tuple[int, ...] = tuple(self.health_offset(health)
+                                                     for health in range(self.max_health + 1))
+        self.cells = tuple(self._cell(decision) for decision in self.decisions)
+
+    def bracket(self, health: int) -> int:
+        """0 desperate, 1 defensive, 2 offensive, exactly as the cascade compares"""
+        fraction = health / self.max_health
+        return 0 if fraction < self.desperate else 1 if fraction < self.defensive else 2
+
+    def health_offset(self, health: int) -> int:
+        return (self.bracket(health) * 2 + (health > self.sturdy)) * self.tiers * 8
+
+    def index(self, bracket: int, tier: int, has_items: bool, effect_active: bool,
+              sturdy: bool, player_in_range: bool) -> int:
+        return (bracket * 2 + sturdy) * self.tiers * 8 + tier * 8 + has_items * 4 + effect_active * 2 \
+            + player_in_range
+
+    def cell_index(self, character, player) -> int:
+        health = character.health
+        offsets = self.health_offsets
+        offset = offsets[health] if 0 <= health < len(offsets) else self.health_offset(health)
+        effects = character.status_effects
+        return (offset + bisect_right(self.thresholds, getattr(character, self.resource)) * 8
+                + (character.item_count > 0) * 4
+                + effects.has_effect(self.effect_type) * 2
+                + (player.health <= self.kill_range))
+
+    def lookup(self, character, player) -> Decision:
+        return self.decisions[self.cell_index(character, player)]
+
+    def choose(self, character, player, rng=random) -> str:
+        cell = self.cells[self.cell_index(character, player)]
+        if cell.__class__ is str:
+            return cell
+        if cell.__class__ is tuple:
+            return rng.choice(cell)
+        return cell.sample(rng)
+
+    @staticmethod
+    def _cell(decision: Optional[Decision]):
+        if decision is None or len(decision.actions) == 1:
+            return decision and decision.actions[0]
+        if len(set(decision.probabilities)) == 1:
+            return decision.actions
+        return decision
+
+    def _representative_health(self, bracket: int, sturdy: bool) -> Optional[int]:
+        # lowest health that lands in the bracket on the right side of STURDY_HEALTH
+        for health in range(1, self.max_health + 1):
+            if self.bracket(health) == bracket and (health > self.sturdy) == sturdy:
+                return health
+        return None   # combination can't happen for this class
+
+    def _compile(self, ai_class, character_class) -> Tuple[Optional[Decision], ...]:
+        decisions: List[Optional[Decision]] = [None] * (6 * self.tiers * 8)
+        resources = (0,) + self.thresholds
+        players = {False: _Player(self.kill_range + 1), True: _Player(self.kill_range)}
+        # base initializer only: a CompiledEnemyAI's own __init__ would compile again
+        probe = ai_class.__new__(ai_class)
+        EnemyAI.__init__(probe, character_class)
+        recorder = probe.rng = _RecordingChoice()
+        character = probe.character
+        for bracket in range(3):
+            for sturdy in (False, True):
+                health = self._representative_health(bracket, sturdy)
+                if health is None:
+                    continue
+                for tier, resource in enumerate(resources):
+                    for has_items in (False, True):
+                        for effect_active in (False, True):
+                            character.health = health
+                            setattr(character, self.resource, resource)
+                            character.item_count = int(has_items)
+                            character.status_effects.remove_effect_by_type(self.effect_type)
+                            if effect_active:
+                                character.status_effects.add_effect(character.stats.effect.make(self.resource))
+                            for in_range, player in players.items():
+                                recorder.options = None
+                                action = probe._rule_action(player)
+                                if recorder.options is not None and action == recorder.options[0]:
+                                    options = recorder.options
+                                    decision = Decision(options, (1.0 / len(options),) * len(options))
+                                else:
+                                    decision = Decision((action,), (1.0,))
+                                decisions[self.index(bracket, tier, has_items, effect_active, sturdy,
+                                                     in_range)] = decision
+        return tuple(decisions)
+
+
+@lru_cache(maxsize=128)   # bounded: every tuned optimizer candidate is a class of its own
+def _compiled(ai_class, character_class, stats) -> PolicyTable:
+    return PolicyTable(ai_class, character_class)
+
+
+def compile_policy(ai_class: Type[EnemyAI], character_class: Type) -> PolicyTable:
+    """Decision table for `ai_class` playing `character_class`; compiled once and cached"""
+    return _compiled(ai_class, character_class, character_class.stats)
+
+
+class CompiledEnemyAI(EnemyAI):
+    """EnemyAI that looks its decisions up in the compiled table instead of running the cascade"""
+
+    def __init__(self, character_class):
+        super().__init__(character_class)
+        self.policy = compile_policy(type(self), character_class)
+
+    def choose_action(self, player):
+        return self.policy.choose(self.character, player, self.rng)
+
+
+def decisions_per_second(ai_class: Type[EnemyAI], character_class: Type, decisions: int = 100_000,
+                         seed: int = 0, states: int = 1024) -> float:
+    """
+    choose_action throughput over `states` random battle situations
+    (health, resource, items, active effect, player health), drawn from `seed`.
+    """
+    rng = random.Random(seed)
+    dice = random.Random(seed)   # the AIs' own rolls, leaving the global random alone
+    stats = character_class.stats
+    cases = []
+    for _ in range(states):
+        ai = ai_class(character_class)
+        ai.rng = dice
+        character = ai.character
+        character.health = rng.randint(1, stats.max_health)
+        setattr(character, stats.resource, rng.randint(0, stats.max_resource or 150))
+        character.item_count = rng.randint(0, stats.items)
+        if rng.random() < 0.3:
+            character.status_effects.add_effect(stats.effect.make(stats.resource))
+        cases.append((ai.choose_action, _Player(rng.randint(1, 200))))
+    start = time.perf_counter()
+    done = 0
+    while done < decisions:
+        for choose, player in cases[:decisions - done]:
+            choose(player)
+        done += min(len(cases), decisions - done)
+    return decisions / (time.perf_counter() - start)
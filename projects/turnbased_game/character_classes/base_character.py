@@ -5,10 +5,33 @@ Subclasses inherit the "bones" of the base character and
 fill in the functions with their respective subclass attributes.
 """
 import random
-import time
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 from .status_effects import StatusEffect, EffectType, EffectCategory
+from .combat_events import combat_events
+from .output_sink import narrate, narration_enabled
+from .game_clock import pause
+from .action_registry import ActionSpec, ActionRegistry
+from .action_results import action_result
 class Character:
+    # Combat event bus; assign a CombatEventBus per instance to isolate a battle
+    events = combat_events
+    # Source of damage rolls; BattleRNG assigns a per-battle stream per instance
+    rng = random
+
+    # Menu actions every class shares; subclasses extend the tuple with their own
+    ACTIONS = (
+        ActionSpec("a", "attack", "attack", "can_use_attack", "attack", targets_enemy=True),
+        ActionSpec("b", "special", "special", "can_use_special", "special", targets_enemy=True),
+        ActionSpec("c", "item", "item", "can_use_item", "item"),
+    )
+    actions: ActionRegistry   # resolved from ACTIONS when each subclass is created
+    # Front-end cues per action id: (animation triggers, sound effects); see action_results
+    CUES: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.actions = ActionRegistry(cls, cls.ACTIONS)
+
     def __init__(self, health, resource):
         self.health = health
         self.resource = resource
@@ -46,7 +69,7 @@ class Character:
             return f"{min_damage} - {max_damage}"
         else:
             # Damage calc
-            roll = random.random()
+            roll = self.rng.random()
             if super_crit and roll < super_crit_chance:
                 return super_crit
             elif roll < crit_chance:
@@ -55,107 +78,86 @@ class Character:
                 return base
             
     def map_input_to_action(self, action_name):
-        if action_name == "a":
-            return "attack"
-        elif action_name == "b":
-            return "special"
-        elif action_name == "c":
-            return "item"
-        elif action_name == "d":
-            # Import here to avoid circular imports
-            from .wizard import Wizard
-            if isinstance(self, Wizard):
-                return "heal"
-        elif action_name == "e":
-            # Status effect abilities
-            from .wizard import Wizard
-            from .warrior import Warrior
-            from .rogue import Rogue
-            if isinstance(self, Wizard):
-                return "magic_bubble"
-            elif isinstance(self, Warrior):
-                return "berserker_rage"
-            elif isinstance(self, Rogue):
-                return "shadow_step"
-        else:
-            return None
-        
+        entry = self.actions.for_key(action_name)
+        return entry.action if entry else None
+
+    def can_use_attack(self):
+        return True
+
+    def can_use_special(self):
+        raise NotImplementedError
+
+    def can_use_item(self):
+        raise NotImplementedError
+
+    def get_available_actions(self):
+        """Actions the player can perform right now, in menu order"""
+        return [entry.action for entry in self.actions if entry.allowed(self)]
+
+    def validate_action(self, action):
+        entry = self.actions.get(action)
+        return entry is not None and entry.allowed(self)
+
     def execute_action(self, action_name, enemy):
-        if action_name == "attack":
+        entry = self.actions.get(action_name)
+        if entry is None:
             self.attack(enemy)
-        elif action_name == "special":
-            self.special(enemy)
-        elif action_name == "item":
-            self.item()
-        elif action_name == "heal":
-            self.spell_heal()
-        elif action_name == "magic_bubble":
-            result = self.cast_magic_bubble()
-            if result['success']:
-                print("You weave a protective barrier around yourself!")
-            else:
-                print(f"Failed to cast Magic Bubble: {result.get('reason', 'Unknown error')}")
-        elif action_name == "berserker_rage":
-            result = self.enter_berserker_rage()
-            if result['success']:
-                print("You unleash your inner fury and enter a berserker rage!")
-            else:
-                print(f"Failed to enter Berserker Rage: {result.get('reason', 'Unknown error')}")
-        elif action_name == "shadow_step":
-            result = self.activate_shadow_step()
-            if result['success']:
-                print("You meld with the shadows, becoming harder to hit!")
-            else:
-                print(f"Failed to activate Shadow Step: {result.get('reason', 'Unknown error')}")
         else:
-            self.attack(enemy)
+            entry.perform(self, enemy)
+
+    def perform_get_result(self, action_name, enemy, is_enemy=False) -> Dict[str, Any]:
+        """execute_action that also returns the action's result dict for pygame"""
+        entry = self.actions.get(action_name) or self.actions.get("attack")
+        return action_result(self, enemy, entry, is_enemy)
+
+    def ran_dry(self):
+        """True when the character can no longer act at all (a wizard without mana or potions)"""
+        return False
 
     def take_turn(self, enemy):
-        print("\n" + "="*50)
-        print("🎯 YOUR TURN!")
-        print("="*50)
-        time.sleep(1)
+        narrate("\n" + "="*50)
+        narrate("🎯 YOUR TURN!")
+        narrate("="*50)
+        pause(1)
         
-        print("\n📊 CURRENT STATUS:")
+        narrate("\n📊 CURRENT STATUS:")
         self.print_status()
         self.print_active_status_effects()
         
-        print("\n🏹 ENEMY STATUS:")
+        narrate("\n🏹 ENEMY STATUS:")
         enemy.print_status(is_enemy=True)
         enemy.print_active_status_effects(is_enemy=True)
         
-        # Import here to avoid circular imports
-        from .wizard import Wizard
-        if isinstance(self, Wizard):
-            if self.mana < 10 and self.item_count == 0:
-                self.health = 0
-                print("\n💀 The wizard drops their staff and falls to the ground.")
-                print("   They have ran out of mana, and died.")
-                return
+        if self.ran_dry():
+            self.health = 0
+            narrate("\n💀 The wizard drops their staff and falls to the ground.")
+            narrate("   They have ran out of mana, and died.")
+            return
                 
-        print("\n" + "-"*30)
+        narrate("\n" + "-"*30)
         while True:
             action_choice = self.action_prompt()
-            time.sleep(1)
+            pause(1)
             mapped_action = self.map_input_to_action(action_choice)
             if mapped_action and self.validate_action(mapped_action):
                 self.execute_action(mapped_action, enemy)
                 break
             else:
-                print("\n❌ Invalid choice. Please try again.")
-                print("\n" + "="*40)
-                print("📋 STATUS REFRESH")
-                print("="*40)
+                narrate("\n❌ Invalid choice. Please try again.")
+                narrate("\n" + "="*40)
+                narrate("📋 STATUS REFRESH")
+                narrate("="*40)
                 
-                print("\n📊 YOUR STATUS:")
+                narrate("\n📊 YOUR STATUS:")
                 self.print_status()
                 self.print_active_status_effects()
                 
-                print("\n🏹 ENEMY STATUS:")
+                narrate("\n🏹 ENEMY STATUS:")
                 enemy.print_status(is_enemy=True)
                 enemy.print_active_status_effects(is_enemy=True)
-                print("\n" + "-"*30)
-        time.sleep(1)
+                narrate("\n" + "-"*30)
+        pause(1)
+        return mapped_action
 
     def process_turn_start(self) -> Dict[str, Any]:
         """Process status effects at turn start"""
@@ -177,6 +179,8 @@ class Character:
         """Display active status effects"""
         if not hasattr(self, 'status_effects') or not self.status_effects.active_effects:
             return  # No status effects to display
+        if not narration_enabled():
+            return  # Nobody is reading, skip building the descriptions
         
         prefix = "   🌟 Enemy" if is_enemy else "   🌟 You"
         effects_info = []
@@ -187,17 +191,17 @@ class Character:
             
             # Add specific effect descriptions
             if effect.effect_type.value == "magic_bubble":
-                effects_info.append(f"🔮 {effect_name} ({duration} turns) - 35% damage reduction")
+                effects_info.append(f"🔮 {effect_name} ({duration} turns) - {effect.magnitude:.0%} damage reduction")
             elif effect.effect_type.value == "berserker_rage":
-                effects_info.append(f"⚔️ {effect_name} ({duration} turns) - +25% damage taken → rage")
+                effects_info.append(f"⚔️ {effect_name} ({duration} turns) - +{effect.magnitude:.0%} damage taken → rage")
             elif effect.effect_type.value == "shadow_step":
-                effects_info.append(f"🌫️ {effect_name} ({duration} turns) - 30% dodge chance")
+                effects_info.append(f"🌫️ {effect_name} ({duration} turns) - {effect.magnitude:.0%} dodge chance")
             else:
                 effects_info.append(f"✨ {effect_name} ({duration} turns)")
         
         if effects_info:
             effect_text = "has" if is_enemy else "have"
-            print(f"{prefix} {effect_text} active effects: {' | '.join(effects_info)}")
+            narrate("{} {} active effects: {}", prefix, effect_text, ' | '.join(effects_info))
         
 
 # Character stat templates
@@ -0,0 +1,172 @@
+"""
+Class Tables
+Class stats, ability costs, damage tiers and status effect parameters live
+in class_data.json. They are compiled once at import into flat, immutable
+tables that the characters, EnemyAI, the simulation engines and the menus
+all read, so a balance change is a data edit and every consumer agrees.
+
+A damage roll is one random() draw checked against a precomputed tier list
+(super crit first, then crit), exactly like Character.get_attack_dmg.
+"""
+import json
+import os
+import random
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from .status_effects import StatusEffect, EffectDefinition, EffectType, EffectCategory, StackRule, define_effect
+
+CLASS_DATA_PATH = os.path.join(os.path.dirname(__file__), "class_data.json")
+
+
+class AbilityTable(NamedTuple):
+    name: str
+    cost: int
+    base: int
+    crit: int
+    super_crit: int
+    crit_chance: float
+    super_crit_chance: float
+    tiers: Tuple[Tuple[float, int], ...]   # (roll below, damage), checked in order
+    gain: int                              # resource gained on a hit...
+    gain_on_damage: Tuple[Tuple[int, int], ...]   # ...unless the final damage has its own (damage, gain)
+
+    def roll(self, rng=random) -> int:
+        """One damage roll"""
+        roll = rng.random()
+        for chance, damage in self.tiers:
+            if roll < chance:
+                return damage
+        return self.base
+
+    def gain_for(self, final_damage: int) -> int:
+        """Resource gained for a hit, keyed on the damage after the defender's effects"""
+        for damage, gain in self.gain_on_damage:
+            if damage == final_damage:
+                return gain
+        return self.gain
+
+    def is_crit(self, damage: int) -> bool:
+        return damage != self.base
+
+    @property
+    def damages(self) -> Tuple[int, ...]:
+        """Damage values that can actually roll"""
+        return tuple(damage for _, damage in self.tiers) + (self.base,)
+
+    @property
+    def damage_range(self) -> str:
+        return f"{min(self.damages)} - {max(self.damages)}"
+
+    @property
+    def gain_range(self) -> Tuple[int, int]:
+        """Smallest and largest resource gain over every roll (unmodified by effects)"""
+        gains = [self.gain_for(damage) for damage in self.damages]
+        return min(gains), max(gains)
+
+    @property
+    def crit_gain_range(self) -> Tuple[int, int]:
+        gains = [self.gain_for(damage) for _, damage in self.tiers] or [self.gain]
+        return min(gains), max(gains)
+
+
+class ItemTable(NamedTuple):
+    name: str
+    health: int
+    resource: int
+
+
+class HealTable(NamedTuple):
+    name: str
+    cost: int
+    health: int
+
+
+class EffectTable(NamedTuple):
+    name: str
+    effect_type: EffectType
+    cost: int
+    duration: int
+    magnitude: float
+    upkeep: int
+    categories: EffectCategory
+    stack_rule: StackRule = StackRule.REPLACE
+    max_stacks: int = 1
+    definition: Optional[EffectDefinition] = None  # interned when the class is compiled
+
+    def make(self, resource_type: str) -> StatusEffect:
+        """Fresh StatusEffect instance for a character to add"""
+        definition = self.definition
+        if definition is None or definition.resource_type != resource_type:
+            definition = define_effect(self.effect_type, self.magnitude, self.upkeep, resource_type,
+                                       self.categories, self.stack_rule, self.max_stacks)
+        return StatusEffect.of(definition, self.duration)
+
+
+class ClassTable(NamedTuple):
+    name: str
+    max_health: int
+    resource: str
+    start_resource: int
+    max_resource: Optional[int]   # None = uncapped
+    items: int
+    attack: AbilityTable
+    special: AbilityTable
+    item: ItemTable
+    heal: Optional[HealTable]
+    effect: EffectTable
+    status_threshold: int         # EnemyAI._can_use_status_abilities
+    excess_resource: int          # EnemyAI._has_excess_resources
+
+
+def _ability(data: dict) -> AbilityTable:
+    crit_chance = data.get("crit_chance", 0.0)
+    super_crit = data.get("super_crit", 0)
+    super_crit_chance = data.get("super_crit_chance", 0.0)
+    tiers = []
+    if super_crit and super_crit_chance > 0:
+        tiers.append((super_crit_chance, super_crit))
+    if crit_chance > 0:
+        tiers.append((crit_chance, data["crit"]))
+    return AbilityTable(
+        name=data["name"], cost=data.get("cost", 0), base=data["base"], crit=data.get("crit", data["base"]),
+        super_crit=super_crit, crit_chance=crit_chance, super_crit_chance=super_crit_chance,
+        tiers=tuple(tiers), gain=data.get("gain", 0),
+        gain_on_damage=tuple((int(damage), gain) for damage, gain in data.get("gain_on_damage", {}).items()))
+
+
+def _effect(data: dict, resource: str) -> EffectTable:
+    categories = EffectCategory.NONE
+    for name in data["categories"]:
+        categories |= EffectCategory[name]
+    effect_type, upkeep = EffectType(data["type"]), data.get("upkeep", 0)
+    stack_rule, max_stacks = StackRule(data.get("stack", "replace")), data.get("max_stacks", 1)
+    return EffectTable(data["name"], effect_type, data["cost"], data["duration"], data["magnitude"], upkeep,
+                       categories, stack_rule, max_stacks,
+                       define_effect(effect_type, data["magnitude"], upkeep, resource, categories,
+                                     stack_rule, max_stacks))
+
+
+def compile_class(name: str, data: dict) -> ClassTable:
+    """Builds one class's table from its JSON object"""
+    try:
+        heal = data.get("heal")
+        return ClassTable(
+            name=name, max_health=data["health"], resource=data["resource"],
+            start_resource=data["start_resource"], max_resource=data.get("max_resource"),
+            items=data["items"], attack=_ability(data["attack"]), special=_ability(data["special"]),
+            item=ItemTable(data["item"]["name"], data["item"].get("health", 0), data["item"].get("resource", 0)),
+            heal=HealTable(heal["name"], heal["cost"], heal["health"]) if heal else None,
+            effect=_effect(data["effect"], data["resource"]),
+            status_threshold=data["ai"]["status_threshold"], excess_resource=data["ai"]["excess_resource"])
+    except (KeyError, ValueError) as error:
+        raise ValueError(f"Invalid class data for {name!r}: {error!r}") from error
+
+
+def load_class_tables(path: str = CLASS_DATA_PATH) -> Dict[str, ClassTable]:
+    """Reads and compiles every class in a class data file"""
+    with open(path, encoding="utf-8") as handle:
+        data = json.load(handle)
+    return {name: compile_class(name, entry) for name, entry in data.items()}
+
+
+CLASS_TABLES = load_class_tables()
@@ -0,0 +1,124 @@
+"""
+Combat Events
+Typed records of what happened during a turn, emitted by the abilities and
+the StatusEffectManager. Front-ends (CLI text, pygame, logs, replays)
+subscribe to an event bus instead of parsing printed narration.
+
+Emitters check `bus.active` before building a record, so a battle nobody
+is listening to allocates no events at all.
+"""
+import logging
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Type
+
+from .status_effects import EffectType
+
+
+class DamageDealt(NamedTuple):
+    attacker: Any
+    target: Any
+    ability: str          # "attack" or "special"
+    amount: int           # after the target's effects
+    rolled: int           # before the target's effects
+
+
+class Dodged(NamedTuple):
+    attacker: Any
+    target: Any
+    ability: str
+
+
+class Crit(NamedTuple):
+    attacker: Any
+    target: Any
+    ability: str
+    rolled: int
+    super_crit: bool
+
+
+class ResourceChanged(NamedTuple):
+    character: Any
+    resource: str         # "health", "rage", "stamina" or "mana"
+    amount: int           # signed change actually applied
+    reason: str           # ability or effect that caused it
+
+
+class EffectApplied(NamedTuple):
+    character: Any
+    effect_type: EffectType
+    duration: int
+
+
+class EffectExpired(NamedTuple):
+    character: Any
+    effect_type: EffectType
+    reason: str           # "expired" or "maintenance"
+
+
+class ItemUsed(NamedTuple):
+    character: Any
+    items_left: int
+
+
+EVENT_TYPES = (DamageDealt, Dodged, Crit, ResourceChanged, EffectApplied, EffectExpired, ItemUsed)
+
+Subscriber = Callable[[Any], None]
+
+
+class CombatEventBus:
+    """
+    Fan-out of combat events to subscribers. A subscriber is any callable
+    taking one event, registered for every event type or just one.
+    """
+    def __init__(self):
+        self._subscribers: Dict[Optional[Type], List[Subscriber]] = {}
+        self.active = False   # emitters skip building events while False
+
+    def subscribe(self, callback: Subscriber, event_type: Optional[Type] = None) -> Subscriber:
+        self._subscribers.setdefault(event_type, []).append(callback)
+        self.active = True
+        return callback
+
+    def unsubscribe(self, callback: Subscriber, event_type: Optional[Type] = None) -> None:
+        callbacks = self._subscribers.get(event_type, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+            if not callbacks:
+                del self._subscribers[event_type]
+        self.active = bool(self._subscribers)
+
+    def emit(self, event) -> None:
+        for callback in self._subscribers.get(type(event), ()):
+            callback(event)
+        for callback in self._subscribers.get(None, ()):
+            callback(event)
+
+
+# Shared bus every character emits to unless given its own
+combat_events = CombatEventBus()
+
+
+class EventRecorder:
+    """Subscriber that keeps every event in order (tests, replays, UI queues)"""
+    def __init__(self):
+        self.events: List[Any] = []
+
+    def __call__(self, event) -> None:
+        self.events.append(event)
+
+    def of_type(self, event_type: Type) -> List[Any]:
+        return [event for event in self.events if isinstance(event, event_type)]
+
+
+def log_event(event, logger: logging.Logger = logging.getLogger("turnbased_game.combat")) -> None:
+    """Subscriber that writes events to the standard logging module at DEBUG level"""
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s %s", type(event).__name__,
+                     ", ".join(f"{name}={_describe(value)}" for name, value in zip(event._fields, event)))
+
+
+def _describe(value) -> str:
+    if isinstance(value, EffectType):
+        return value.value
+    if hasattr(value, "health") and hasattr(value, "status_effects"):
+        return type(value).__name__
+    return repr(value)
@@ -4,34 +4,47 @@ Intelligent enemy behavior system that adapts strategy based on health status
 and available resources.
 """
 import random
-import time
 from .warrior import Warrior
-from .rogue import Rogue
-from .wizard import Wizard
-from .status_effects import  EffectType
+from .output_sink import narrate
+from .game_clock import pause
+from .action_results import action_result
 
 class EnemyAI:
+    # Policy thresholds (ai_policy.compile_policy discretizes on exactly these)
+    DESPERATE_HEALTH = 0.25   # below this fraction of max health: _desperate_action
+    DEFENSIVE_HEALTH = 0.5    # below this: _defensive_action
+    KILL_RANGE = 50           # player health at or below which a special goes for the kill
+    STURDY_HEALTH = 100       # warrior health above which berserker rage is safe
+    # Resource thresholds; None reads the class table's "ai" numbers
+    STATUS_THRESHOLD = None   # resource needed before considering the status ability
+    EXCESS_RESOURCE = None    # resource at which specials are spent freely
+    # Source of the random splits between two actions
+    rng = random
+
     def __init__(self, character_class):
         self.character = character_class()
     
     # main logic used during enemy turn in order
     # to decide best action
     def choose_action(self, player):
+        return self._rule_action(player)
+
+    def _rule_action(self, player):
+        # the rule cascade itself; CompiledEnemyAI tabulates it once per class
         health_percentage = self.character.health / self._get_max_health()
-        if health_percentage < 0.25:
+        if health_percentage < self.DESPERATE_HEALTH:
             return self._desperate_action(player)  # prioritizes survival
-        elif health_percentage < 0.5:
+        elif health_percentage < self.DEFENSIVE_HEALTH:
             return self._defensive_action(player)  # prioritizes health while still chance for attack
         else: 
             return self._offensive_action(player)  # prioritizes attack methods
 
     def _get_max_health(self):
         """
-        creates a new instance of the same class
-        consistently gets original health
+        original health, from the class table compiled once at import
+        (no throwaway instance per decision)
         """
-        fresh_instance = self.character.__class__()
-        return fresh_instance.health
+        return self.character.stats.max_health
 
     def _desperate_action(self, player):
         """
@@ -39,15 +52,11 @@ class EnemyAI:
         prioritizes survival
         """
         if self._can_use_status_abilities() and self._should_use_status_effects(player):
-        # Wizard: Magic Bubble for damage reduction (defensive)
-            if isinstance(self.character, Wizard):
-                return "cast_magic_bubble"
-            # Rogue: Shadow Step for dodge chance (defensive)
-            elif isinstance(self.character, Rogue):
-                return "activate_shadow_step"
-            elif isinstance(self.character, Warrior) and self.character.item_count > 0: # Makes sure Warrior can heal after
-                return "enter_berserker_rage" 
-        if isinstance(self.character, Wizard) and self.character.mana >= 25:
+            # Wizard: Magic Bubble for damage reduction, Rogue: Shadow Step for dodge chance (defensive)
+            # Warrior only rages if it can still heal after
+            if not isinstance(self.character, Warrior) or self.character.item_count > 0:
+                return self._status_action()
+        if self._can_heal():
             return "heal"
         if self.character.item_count > 0:
             return "item"
@@ -62,14 +71,12 @@ class EnemyAI:
         mixes healing and offense
         """
         if self._can_use_status_abilities() and self._should_use_status_effects(player):
-            if isinstance(self.character, Wizard):
-                return "cast_magic_bubble"
-            elif isinstance(self.character, Rogue):
-                return "activate_shadow_step"
-        if isinstance(self.character, Wizard) and self.character.mana >= 25:
-            return random.choice(("heal", "attack")) 
+            if not isinstance(self.character, Warrior):
+                return self._status_action()
+        if self._can_heal():
+            return self.rng.choice(("heal", "attack")) 
         if self.character.item_count > 0:
-            return random.choice(("item", "attack"))
+            return self.rng.choice(("item", "attack"))
         if self._can_use_special():
             return "special"
         return "attack"
@@ -81,10 +88,10 @@ class EnemyAI:
         # AGGRESSIVE STATUS EFFECTS - When Safe to Risk
         if self._can_use_status_abilities() and self._should_use_status_effects(player):
             # Warrior: Berserker Rage when healthy (aggressive)
-            if isinstance(self.character, Warrior) and self.character.health > 100:
-                return "enter_berserker_rage"
+            if isinstance(self.character, Warrior) and self.character.health > self.STURDY_HEALTH:
+                return self._status_action()
         # Always go for killing blow
-        if self._can_use_special() and player.health <= 50:
+        if self._can_use_special() and player.health <= self.KILL_RANGE:
             return "special"
         
         # Use special when available
@@ -100,7 +107,7 @@ class EnemyAI:
         if not self._can_use_special():
             return False  # aligns with optimal resource management
         # always go for killing blow 
-        if player.health <= 50:
+        if player.health <= self.KILL_RANGE:
             return True
         # use when available
         if self._has_excess_resources():
@@ -110,98 +117,72 @@ class EnemyAI:
             return False
         return True
     
+    @classmethod
+    def resource_thresholds(cls, stats):
+        """(status threshold, excess resource) this policy uses for a class table"""
+        return (stats.status_threshold if cls.STATUS_THRESHOLD is None else cls.STATUS_THRESHOLD,
+                stats.excess_resource if cls.EXCESS_RESOURCE is None else cls.EXCESS_RESOURCE)
+
+    def _resource(self):
+        # current rage/stamina/mana, named by the class table
+        return getattr(self.character, self.character.stats.resource)
+
+    def _status_action(self):
+        # EnemyAI name of the class's own status ability, e.g. "cast_magic_bubble"
+        return self.character.actions.status.enemy_action
+
+    def _can_heal(self):
+        heal = self.character.stats.heal
+        return heal is not None and self._resource() >= heal.cost
+
     def _can_use_special(self):
         # method to determine if class is able to use special
         # important for preventing the ai from trying impossible actions
-        if isinstance(self.character, Warrior):
-            return self.character.rage >= 30
-        elif isinstance(self.character, Rogue):
-            return self.character.stamina >= 50
-        if isinstance(self.character, Wizard):
-            return self.character.mana >= 75
-        return False 
-    
+        return self._resource() >= self.character.stats.special.cost
+
     def _can_use_status_abilities(self): # Checks if there are enough resources for status effect
-        if isinstance(self.character, Wizard):
-            return self.character.mana >= 50  
-        elif isinstance(self.character, Warrior):
-            return self.character.rage >= 75 
-        elif isinstance(self.character, Rogue):
-            return self.character.stamina >= 60  
-        return False
+        return self._resource() >= self.resource_thresholds(self.character.stats)[0]
 
     def _should_use_status_effects(self, player):
         """Determine if now is a good time to use status abilities"""
         # Don't use if already active
         if hasattr(self.character, 'status_effects'):
-            if isinstance(self.character, Wizard) and self.character.status_effects.has_effect(EffectType.MAGIC_BUBBLE):
-                return False
-            if isinstance(self.character, Warrior) and self.character.status_effects.has_effect(EffectType.BERSERKER_RAGE):
-                return False
-            if isinstance(self.character, Rogue) and self.character.status_effects.has_effect(EffectType.SHADOW_STEP):
-                return False
-        
+            return not self.character.status_effects.has_effect(self.character.stats.effect.effect_type)
         return True
     
     def _has_excess_resources(self):
         # method to determine if class has healthy amount of resources
         # encourages special ability use
-        if isinstance(self.character, Warrior):
-            return self.character.rage >= 45  # double the resource requirements 
-                                             # are considered abundant/excess
-        elif isinstance(self.character, Rogue):
-            return self.character.stamina >= 75
-        elif isinstance(self.character, Wizard):
-            return self.character.mana >= 100
-        return False
+        # roughly double the resource requirements are considered abundant/excess
+        return self._resource() >= self.resource_thresholds(self.character.stats)[1]
     
     def execute_action(self, action, player):
         # enemy action method during turn
         # separates decision making from action execution for code hygiene
-        if action == "attack":
+        entry = self.character.actions.for_enemy(action)
+        if entry is None:
             self.character.attack(player, is_enemy=True)
-        elif action == "special":
-            self.character.special(player, is_enemy=True)
-        elif action == "item":
-            self.character.item(is_enemy=True)
-        elif action == "heal":
-            self.character.spell_heal(is_enemy=True)
-        elif action == "cast_magic_bubble":
-            result = self.character.cast_magic_bubble()
-            if result['success']:
-                print("Enemy wizard casts a protective magic bubble!")
-            else:
-                print("Enemy wizard failed to cast magic bubble.")
-                self.character.attack(player, is_enemy=True)  # Fallback
-        elif action == "activate_shadow_step":
-            result = self.character.activate_shadow_step()
-            if result['success']:
-                print("Enemy rogue melts into the shadows!")
-            else:
-                print("Enemy rogue failed to activate shadow step.")
-                self.character.attack(player, is_enemy=True)  # Fallback
-        elif action == "enter_berserker_rage":
-            result = self.character.enter_berserker_rage()
-            if result['success']:
-                print("Enemy warrior enters a berserker rage!")
-            else:
-                print("Enemy warrior failed to enter berserker rage.")
-                self.character.attack(player, is_enemy=True)  # Fallback
         else:
-            self.character.attack(player, is_enemy=True)
+            entry.perform(self.character, player, is_enemy=True)
+
+    def execute_action_get_result(self, action, player):
+        # execute_action plus the result dict for pygame
+        entry = self.character.actions.for_enemy(action) or self.character.actions.get("attack")
+        return action_result(self.character, player, entry, is_enemy=True)
             
     def take_turn(self, player):
         # main method called from the game loop
-        print("\n --- Enemy Turn ---")
-        time.sleep(1)  # display status
+        narrate("\n --- Enemy Turn ---")
+        pause(1)  # display status
         self.character.print_status(is_enemy=True)
-        if isinstance(self.character, Wizard) and self.character.mana < 10 and self.character.item_count <= 0:
+        if self.character.ran_dry():
             self.character.health = 0
-            print("""
+            narrate("""
                 The enemy wizard drops their staff and falls to the ground.
                 They have run out of mana and died.
                 """)
-        time.sleep(1)  # shows enemy health
+        pause(1)  # shows enemy health
         action = self.choose_action(player) 
         self.execute_action(action, player)
-        time.sleep(1)  # pause for dramatic effect
+        pause(1)  # pause for dramatic effect
+        return action
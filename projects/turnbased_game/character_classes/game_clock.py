@@ -0,0 +1,118 @@
+"""
+Game Clock
+The pauses between turns and status screens go through pause() to the
+current clock instead of calling time.sleep directly, so each game picks
+its own pacing.
+
+    RealClock     sleeps for real (the default)
+    ScaledClock   sleeps a fraction of each pause, e.g. 0.25 for fast play
+    InstantClock  never sleeps
+    VirtualClock  never sleeps but keeps a deterministic time that pauses
+                  and advance() move forward, for tests and servers
+
+Like the output sink, the current clock is context-local: use_clock() only
+paces its own thread or asyncio task.
+"""
+import contextlib
+import contextvars
+import time
+from typing import Iterator, List
+
+
+class GameClock:
+    """Source of time and pauses for the game loop"""
+
+    def sleep(self, seconds: float) -> None:
+        raise NotImplementedError
+
+    def now(self) -> float:
+        raise NotImplementedError
+
+
+class RealClock(GameClock):
+    """Wall-clock pacing"""
+
+    scale = 1.0   # fraction of each pause actually slept
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def now(self):
+        return time.monotonic()
+
+
+class ScaledClock(RealClock):
+    """Real pauses shortened (or stretched) by `scale`"""
+
+    def __init__(self, scale: float):
+        if scale < 0:
+            raise ValueError(f"Clock scale must be >= 0, got {scale}")
+        self.scale = scale
+
+    def sleep(self, seconds):
+        super().sleep(seconds * self.scale)
+
+
+class InstantClock(RealClock):
+    """Real time, but pauses return immediately"""
+
+    scale = 0.0
+
+    def sleep(self, seconds):
+        pass
+
+
+class VirtualClock(GameClock):
+    """Deterministic time that only moves when something pauses or calls advance()"""
+
+    def __init__(self, start: float = 0.0):
+        self.time = start
+        self.pauses: List[float] = []
+
+    def sleep(self, seconds):
+        self.pauses.append(seconds)
+        self.advance(seconds)
+
+    def advance(self, seconds: float) -> None:
+        if seconds > 0:
+            self.time += seconds
+
+    def now(self):
+        return self.time
+
+
+# Pacing names for the CLI
+CLOCKS = {
+    "real": RealClock,
+    "fast": lambda: ScaledClock(0.25),
+    "instant": InstantClock,
+}
+
+_clock: contextvars.ContextVar = contextvars.ContextVar("game_clock", default=RealClock())
+
+
+def get_game_clock() -> GameClock:
+    return _clock.get()
+
+
+def set_game_clock(clock: GameClock) -> GameClock:
+    """Paces this context's game with `clock` and returns the previous clock"""
+    previous = _clock.get()
+    _clock.set(clock)
+    return previous
+
+
+@contextlib.contextmanager
+def use_clock(clock: GameClock) -> Iterator[GameClock]:
+    """Paces the game with `clock` for the duration of the block"""
+    token = _clock.set(clock)
+    try:
+        yield clock
+    finally:
+        _clock.reset(token)
+
+
+def pause(seconds: float = 1.0) -> None:
+    """Dramatic pause between game steps, as long as the current clock says"""
+    _clock.get().sleep(seconds)
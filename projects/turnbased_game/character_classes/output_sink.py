@@ -0,0 +1,138 @@
+"""
+Output Sinks
+Everything the characters and the CLI say goes through narrate() to the
+current sink as a str.format template plus its arguments. The text is only
+built when a sink actually consumes the message, so with a NullSink the
+narration costs one function call and nothing else.
+
+    ConsoleSink   writes each line to stdout (the default)
+    NullSink      discards everything; headless runs use it
+    BufferedSink  keeps messages and writes them in one go on flush()
+    CaptureSink   keeps messages for tests and tools to inspect
+
+The current sink is context-local (a ContextVar): output_to() in one thread
+or asyncio task never redirects another's narration, and every new thread
+starts on the default ConsoleSink.
+"""
+import contextlib
+import contextvars
+import sys
+from typing import Any, Iterator, List, Optional, TextIO, Tuple
+
+Message = Tuple[str, Tuple[Any, ...]]
+
+
+def render(template: str, args: Tuple[Any, ...]) -> str:
+    """Formats one message; templates without arguments are used verbatim"""
+    return template.format(*args) if args else template
+
+
+class OutputSink:
+    """Receives unformatted messages; subclasses decide what to do with them"""
+    enabled = True   # producers may skip building expensive arguments while False
+
+    def emit(self, template: str, args: Tuple[Any, ...]) -> None:
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        pass
+
+
+class ConsoleSink(OutputSink):
+    """Writes each message as a line, like print()"""
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        self.stream = stream
+
+    def emit(self, template, args):
+        # sys.stdout is looked up per message so redirect_stdout and capsys still see the text
+        stream = self.stream or sys.stdout
+        stream.write(render(template, args) + "\n")
+
+    def flush(self):
+        (self.stream or sys.stdout).flush()
+
+
+class NullSink(OutputSink):
+    """Discards every message without formatting it"""
+    enabled = False
+
+    def emit(self, template, args):
+        pass
+
+
+class BufferedSink(OutputSink):
+    """Holds messages unformatted and writes them as one block on flush() or when `capacity` fills"""
+
+    def __init__(self, stream: Optional[TextIO] = None, capacity: int = 256):
+        self.stream = stream
+        self.capacity = capacity
+        self.pending: List[Message] = []
+
+    def emit(self, template, args):
+        self.pending.append((template, args))
+        if len(self.pending) >= self.capacity:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            stream = self.stream or sys.stdout
+            stream.write("".join(render(template, args) + "\n" for template, args in self.pending))
+            self.pending.clear()
+        (self.stream or sys.stdout).flush()
+
+
+class CaptureSink(OutputSink):
+    """Keeps every message; lines are formatted when read"""
+
+    def __init__(self):
+        self.messages: List[Message] = []
+
+    def emit(self, template, args):
+        self.messages.append((template, args))
+
+    @property
+    def lines(self) -> List[str]:
+        return [render(template, args) for template, args in self.messages]
+
+    @property
+    def text(self) -> str:
+        return "".join(line + "\n" for line in self.lines)
+
+    def clear(self) -> None:
+        self.messages.clear()
+
+
+_sink: contextvars.ContextVar = contextvars.ContextVar("output_sink", default=ConsoleSink())
+
+
+def get_output_sink() -> OutputSink:
+    return _sink.get()
+
+
+def set_output_sink(sink: OutputSink) -> OutputSink:
+    """Routes this context's narration to `sink` and returns the previous sink"""
+    previous = _sink.get()
+    _sink.set(sink)
+    return previous
+
+
+@contextlib.contextmanager
+def output_to(sink: OutputSink) -> Iterator[OutputSink]:
+    """Routes narration to `sink` for the duration of the block, flushing it on the way out"""
+    token = _sink.set(sink)
+    try:
+        yield sink
+    finally:
+        _sink.reset(token)
+        sink.flush()
+
+
+def narrate(template: str, *args: Any) -> None:
+    """Hands one line to the current sink; `args` fill the template's {} fields when it is consumed"""
+    _sink.get().emit(template, args)
+
+
+def narration_enabled() -> bool:
+    """False while the current sink discards everything, so callers can skip building messages"""
+    return _sink.get().enabled
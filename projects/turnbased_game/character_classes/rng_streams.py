@@ -0,0 +1,166 @@
+"""
+RNG Streams
+Every random draw in a battle (damage tiers, dodge checks, the AI's even
+splits) goes through an `rng` object with the random.Random interface.
+Characters, their StatusEffectManager and EnemyAI default to the global
+random module, so the interactive game and code that seeds `random` behave
+as before.
+
+BattleRNG gives one battle its own independent streams instead: one per
+character (its damage rolls and its own dodge checks), one per controller
+and one for setup such as picking classes. Each stream's seed is derived
+from the battle seed and the stream's name, so the same seed plays the same
+battle in any process or thread, two battles running side by side never
+share state, and one side healing instead of attacking doesn't shift the
+other side's dice. Streams nobody draws from are never seeded.
+
+Block mode trades the per-battle Mersenne Twister setup for NumPy: a
+RollBank draws the first ROLLS uniforms of every stream for BANK_BATTLES
+battles in one array, and each battle's BlockStreams hand out their row.
+A stream that runs past its row continues from a generator of its own. A row
+depends only on the run seed and the battle index, so any split of a run
+still plays the same battles, but block mode rolls different numbers from
+the default mode for the same seed.
+"""
+import bisect
+import hashlib
+import itertools
+import random
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+STREAMS = ("player", "enemy", "player_ai", "enemy_ai", "setup")   # row order in a RollBank
+ROLLS = 32            # uniforms pre-drawn per stream per battle; busy streams use about 20
+BANK_BATTLES = 512    # battles per RollBank draw
+OVERFLOW_BLOCK = 1024
+
+
+def stream_seed(seed: int, name: str) -> int:
+    """64-bit seed for one named stream; stable across processes and Python runs"""
+    digest = hashlib.sha256(f"{seed}/{name}".encode()).digest()
+    return int.from_bytes(digest[:8], "little")
+
+
+class BlockStream:
+    """
+    The part of random.Random the game draws from (random, choice,
+    choices), served from pre-drawn uniforms. Past its row the stream
+    continues from a NumPy generator of its own, seeded only then.
+    """
+    __slots__ = ("random",)
+
+    def __init__(self, rolls: Sequence[float], seed: int, name: str):
+        overflow = itertools.chain.from_iterable(self._overflow(seed, name))
+        # an instance attribute, so a roll is one C-level iterator step
+        self.random = itertools.chain(rolls, overflow).__next__
+
+    @staticmethod
+    def _overflow(seed: int, name: str):
+        # NumPy is an optional extra, so only import it when a row runs out
+        import numpy as np
+        generator = np.random.default_rng(stream_seed(seed, name))
+        while True:
+            yield generator.random(OVERFLOW_BLOCK).tolist()
+
+    def choice(self, seq):
+        return seq[int(self.random() * len(seq))]
+
+    def choices(self, population, weights=None, *, k=1):
+        if weights is None:
+            return [self.choice(population) for _ in range(k)]
+        cumulative = list(itertools.accumulate(weights))
+        total = cumulative[-1]
+        last = len(cumulative) - 1
+        return [population[bisect.bisect(cumulative, self.random() * total, 0, last)] for _ in range(k)]
+
+
+class _Deferred:
+    """Stands in for a stream until something draws from it"""
+    __slots__ = ("_battle", "_name")
+
+    def __init__(self, battle: "BattleRNG", name: str):
+        self._battle = battle
+        self._name = name
+
+    def __getattr__(self, attribute):
+        return getattr(self._battle.stream(self._name), attribute)
+
+
+class BattleRNG:
+    """
+    Independent named streams for one battle, created on first use. With
+    `rolls` (one row per STREAMS entry, from a RollBank) the streams are
+    BlockStreams starting with those rows.
+    """
+
+    def __init__(self, seed: Optional[int] = None, rolls=None):
+        # an unseeded battle still gets private streams, from a fresh seed
+        self.seed = random.SystemRandom().getrandbits(63) if seed is None else seed
+        self.rolls = rolls
+        self._streams: Dict[str, Union[random.Random, BlockStream]] = {}
+
+    def stream(self, name: str) -> Union[random.Random, BlockStream]:
+        if name not in self._streams:
+            if self.rolls is None:
+                self._streams[name] = random.Random(stream_seed(self.seed, name))
+            else:
+                self._streams[name] = BlockStream(self.rolls[STREAMS.index(name)].tolist(), self.seed, name)
+        return self._streams[name]
+
+    def getstate(self) -> Tuple[Optional[tuple], ...]:
+        """random.Random state of each STREAMS entry, None for streams not created yet"""
+        if self.rolls is not None:
+            raise ValueError("block-mode streams can't be saved")
+        return tuple(self._streams[name].getstate() if name in self._streams else None for name in STREAMS)
+
+    def setstate(self, states: Sequence[Optional[tuple]]) -> None:
+        """Puts streams back to a getstate(); streams already handed out keep their identity"""
+        if self.rolls is not None:
+            raise ValueError("block-mode streams can't be restored")
+        for name, state in zip(STREAMS, states):
+            if state is not None:
+                stream = self._streams.get(name)
+                if stream is None:
+                    stream = self._streams[name] = random.Random()
+                stream.setstate(state)
+
+    def equip(self, character, side: str):
+        """Points a character and its status effect manager at the `side` stream"""
+        stream = self.stream(side)
+        character.rng = stream
+        manager = getattr(character, "status_effects", None)
+        if manager is not None:
+            manager.rng = stream
+        return character
+
+    def equip_controller(self, controller, side: str):
+        """Equips an EnemyAI-style controller and the character it drives"""
+        name = f"{side}_ai"
+        # the AI only draws on even splits, so a Mersenne Twister waits until one comes up
+        controller.rng = self.stream(name) if self.rolls is not None else _Deferred(self, name)
+        self.equip(controller.character, side)
+        return controller
+
+
+class RollBank:
+    """
+    Block mode for a run of battles: uniforms for BANK_BATTLES battles at a
+    time, drawn in one NumPy call. battle() hands out a BattleRNG per index.
+    """
+
+    def __init__(self, seed: int, battles: int = BANK_BATTLES, rolls: int = ROLLS):
+        self.seed = seed
+        self.battles = battles
+        self.rolls = rolls
+        self._block = None
+        self._rows = None
+
+    def battle(self, index: int, seed: int) -> BattleRNG:
+        """Streams for battle `index` of the run; `seed` seeds the streams' overflow"""
+        block, offset = divmod(index, self.battles)
+        if block != self._block:
+            # NumPy is an optional extra, so only import it when block mode is asked for
+            import numpy as np
+            generator = np.random.default_rng(stream_seed(self.seed, f"block{block}"))
+            self._rows = generator.random((self.battles, len(STREAMS), self.rolls))
+            self._block = block
+        return BattleRNG(seed, self._rows[offset])
@@ -3,19 +3,39 @@ Rogue Character Class
 Dexterity-focused character that prioritizes critical chance and stamina recovery.
 """
 from .base_character import Character
-from .status_effects import StatusEffect, EffectType, EffectCategory
+from .status_effects import EffectType
+from .output_sink import narrate
+from .class_tables import CLASS_TABLES
+from .action_registry import ActionSpec
+from .combat_events import DamageDealt, Dodged, Crit, ResourceChanged, EffectApplied, ItemUsed
 from typing import Dict, Any
 class Rogue(Character):
     """
     Dexterity-focused character
     prioritizes critical chance and stamina recovery
     """
+    stats = CLASS_TABLES["rogue"]  # numbers from class_data.json
+    ACTIONS = Character.ACTIONS + (
+        ActionSpec("e", "shadow_step", "activate_shadow_step", "can_use_shadow_step", "effect",
+                   enemy_action="activate_shadow_step", status=True,
+                   success="You meld with the shadows, becoming harder to hit!",
+                   failure="Failed to activate Shadow Step: {}",
+                   enemy_success="Enemy rogue melts into the shadows!",
+                   enemy_failure="Enemy rogue failed to activate shadow step."),
+    )
+    CUES = {
+        "attack": (("dagger_lunge",), ("dagger_hit",)),
+        "special": (("shadow_strike",), ("backstab_hit",)),
+        "item": (("drink_flask",), ("flask_gulp",)),
+        "shadow_step": (("shadow_fade",), ("shadow_whisper",)),
+    }
+
     def __init__(self):
-        self.health = 160
-        self.max_health = 160  # Maximum health limit
-        self.stamina = 100
-        self.max_stamina = 100  # Maximum stamina limit
-        self.item_count = 3
+        self.health = self.stats.max_health
+        self.max_health = self.stats.max_health  # Maximum health limit
+        self.stamina = self.stats.start_resource
+        self.max_stamina = self.stats.max_resource  # Maximum stamina limit
+        self.item_count = self.stats.items
         super().__init__(self.health, self.stamina)
         from .status_effect_manager import StatusEffectManager
         self.status_effects = StatusEffectManager()
@@ -23,100 +43,121 @@ class Rogue(Character):
     def attack(self, enemy, is_enemy=False):
         attacker = "You swiftly lunge" if not is_enemy else "Your opponent swiftly lunges"
         target = "your opponent" if not is_enemy else "you"
-        print(f"{attacker} towards {target} for a strike...")
+        narrate("{} towards {} for a strike...", attacker, target)
         
         # Check for dodge first
         if hasattr(enemy, 'status_effects') and enemy.status_effects.apply_dodge_check(enemy):
-            print("💨 Attack dodged!")
+            narrate("💨 Attack dodged!")
+            if self.events.active:
+                self.events.emit(Dodged(self, enemy, "attack"))
             return
         
-        dmg = self.get_attack_dmg(base=20, crit=25, super_crit=40, crit_chance=0.4, super_crit_chance=0.33)
+        ability = self.stats.attack
+        dmg = ability.roll(self.rng)
+        if self.events.active and ability.is_crit(dmg):
+            self.events.emit(Crit(self, enemy, "attack", dmg, dmg == ability.super_crit))
         
         # Apply status effect damage modifications
         if hasattr(enemy, 'status_effects'):
             final_damage, narrative_effects = enemy.status_effects.apply_damage_modification(enemy, dmg, is_enemy)
             # Show narrative effects before damage
             for effect_message in narrative_effects:
-                print(effect_message)
+                narrate(effect_message)
         else:
             final_damage = dmg
             
         enemy.health -= final_damage
+        if self.events.active:
+            self.events.emit(DamageDealt(self, enemy, "attack", final_damage, dmg))
         attacker = "You've done" if not is_enemy else "enemy does"
         target = "enemy" if not is_enemy else "your"
-        if final_damage == 25:
-            stamina_recovery = 25
+        if final_damage == ability.crit:
+            stamina_recovery = ability.gain_for(final_damage)
             self.stamina += stamina_recovery
-            print(f"""CRITICAL HIT. {attacker} {final_damage} to {target} health. 
-                    Recovered {stamina_recovery}!""")
-        elif final_damage == 40:
-            stamina_recovery = 40
+            if self.events.active:
+                self.events.emit(ResourceChanged(self, "stamina", stamina_recovery, "attack"))
+            narrate("""CRITICAL HIT. {} {} to {} health. 
+                    Recovered {}!""", attacker, final_damage, target, stamina_recovery)
+        elif final_damage == ability.super_crit:
+            stamina_recovery = ability.gain_for(final_damage)
             self.stamina += stamina_recovery
-            print(f"""SUPER CRITICAL  {attacker} {final_damage} to {target} health. 
-                    Recovered {stamina_recovery} stamina""")
+            if self.events.active:
+                self.events.emit(ResourceChanged(self, "stamina", stamina_recovery, "attack"))
+            narrate("""SUPER CRITICAL  {} {} to {} health. 
+                    Recovered {} stamina""", attacker, final_damage, target, stamina_recovery)
         else:
-            print(f"{attacker} {final_damage} damage to {target} health.")
+            narrate("{} {} damage to {} health.", attacker, final_damage, target)
         return
     
     def special(self, enemy, is_enemy=False):
-        if self.stamina >= 50:
-            self.stamina -= 50
+        if self.can_use_special():
+            ability = self.stats.special
+            self.stamina -= ability.cost
+            if self.events.active:
+                self.events.emit(ResourceChanged(self, "stamina", -ability.cost, "special"))
             attacker = "You step" if not is_enemy else "Your opponent steps"
             target = "attack from behind your opponent" if not is_enemy else "attacks from from behind you"
-            print(f"{attacker} into the shadows... and {target}...")
+            narrate("{} into the shadows... and {}...", attacker, target)
             
             # Check for dodge first
             if hasattr(enemy, 'status_effects') and enemy.status_effects.apply_dodge_check(enemy):
-                print("💨 Attack dodged!")
+                narrate("💨 Attack dodged!")
+                if self.events.active:
+                    self.events.emit(Dodged(self, enemy, "special"))
                 return
             
-            dmg = self.get_attack_dmg(base=45, crit=60, super_crit=70, crit_chance=0.4, super_crit_chance=0.31)
+            dmg = ability.roll(self.rng)
+            if self.events.active and ability.is_crit(dmg):
+                self.events.emit(Crit(self, enemy, "special", dmg, dmg == ability.super_crit))
             
             # Apply status effect damage modifications
             if hasattr(enemy, 'status_effects'):
                 final_damage, narrative_effects = enemy.status_effects.apply_damage_modification(enemy, dmg, is_enemy)
                 # Show narrative effects before damage
                 for effect_message in narrative_effects:
-                    print(effect_message)
+                    narrate(effect_message)
             else:
                 final_damage = dmg
                 
             enemy.health -= final_damage
+            if self.events.active:
+                self.events.emit(DamageDealt(self, enemy, "special", final_damage, dmg))
             target = "Enemy takes" if not is_enemy else "You take"
-            if final_damage == 60:
-                stamina_recovery = 20
+            if final_damage == ability.crit:
+                stamina_recovery = ability.gain_for(final_damage)
                 self.stamina += stamina_recovery
-                print(f"CRITICAL HIT. {target} {final_damage} damage. Recovered {stamina_recovery} stamina.")
-            elif final_damage == 70:
-                stamina_recovery = 40
+                if self.events.active:
+                    self.events.emit(ResourceChanged(self, "stamina", stamina_recovery, "special"))
+                narrate("CRITICAL HIT. {} {} damage. Recovered {} stamina.", target, final_damage, stamina_recovery)
+            elif final_damage == ability.super_crit:
+                stamina_recovery = ability.gain_for(final_damage)
                 self.stamina += stamina_recovery
-                print(f"SUPER CRITICAL HIT. {target} {final_damage} damage. Recovered {stamina_recovery} stamina.")
+                if self.events.active:
+                    self.events.emit(ResourceChanged(self, "stamina", stamina_recovery, "special"))
+                narrate("SUPER CRITICAL HIT. {} {} damage. Recovered {} stamina.", target, final_damage, stamina_recovery)
             else:
-                print(f"{target} {final_damage} damage.")
+                narrate("{} {} damage.", target, final_damage)
         else:        
-            print("Not enough Stamina.")
+            narrate("Not enough Stamina.")
         return
     
     def activate_shadow_step(self) -> Dict[str, Any]:
         """"Turns on dodge chance for Rogue"""
-        stamina_cost = 60
+        effect = self.stats.effect
+        stamina_cost = effect.cost
         if self.stamina < stamina_cost:
             return {'success': False, 'reason': 'insufficient_stamina'}
         self.stamina -= stamina_cost
-        shadow_effect = StatusEffect(
-            effect_type=EffectType.SHADOW_STEP,
-            duration=4,
-            magnitude=0.35,
-            maintenance_cost=0,
-            resource_type = "stamina",
-            categories=EffectCategory.DODGE
-        )
+        shadow_effect = effect.make("stamina")
         self.status_effects.add_effect(shadow_effect)
+        if self.events.active:
+            self.events.emit(ResourceChanged(self, "stamina", -stamina_cost, "shadow_step"))
+            self.events.emit(EffectApplied(self, EffectType.SHADOW_STEP, effect.duration))
 
         return {
             'success': True,
             'effect_applied': 'shadow_step',
-            'duration': 4,
+            'duration': effect.duration,
             'stamina_used': stamina_cost
         }
         
@@ -125,12 +166,12 @@ class Rogue(Character):
             # Check if both resources are already at max
             if self.health >= self.max_health and self.stamina >= self.max_stamina:
                 target = "You" if not is_enemy else "Enemy"
-                print(f"{target} already have full health and stamina. The flask would be wasted.")
+                narrate("{} already have full health and stamina. The flask would be wasted.", target)
                 return
                 
             self.item_count -= 1
-            health_recovery = 45
-            stamina_recovery = 20
+            health_recovery = self.stats.item.health
+            stamina_recovery = self.stats.item.resource
             
             # Cap both resources at maximum
             actual_health_recovery = min(health_recovery, self.max_health - self.health)
@@ -138,82 +179,68 @@ class Rogue(Character):
             
             self.health = min(self.health + health_recovery, self.max_health)
             self.stamina = min(self.stamina + stamina_recovery, self.max_stamina)
+            if self.events.active:
+                self.events.emit(ItemUsed(self, self.item_count))
+                self.events.emit(ResourceChanged(self, "health", actual_health_recovery, "item"))
+                self.events.emit(ResourceChanged(self, "stamina", actual_stamina_recovery, "item"))
             
             target = "You" if not is_enemy else "Enemy"
-            print(f"""{target} takes a drink from a flask...
-                  Recovers {actual_health_recovery} health and 
-                  {actual_stamina_recovery} stamina.""")
+            narrate("""{} takes a drink from a flask...
+                  Recovers {} health and 
+                  {} stamina.""", target, actual_health_recovery, actual_stamina_recovery)
         else:
-            print("No items left.")
+            narrate("No items left.")
         return
     
 # Helper/Gameloop Methods ----------------------------------------------------------------------------------    
 
     def can_use_special(self):
-        return self.stamina >= 50
+        return self.stamina >= self.stats.special.cost
 
-    def get_available_actions(self):
-        actions = ["attack"]
-        if self.can_use_special():
-            actions.append("special")
-        if self.item_count > 0 and (self.health < self.max_health or self.stamina < self.max_stamina):
-            actions.append("item")
-        if self.stamina >= 60 and not self.has_status_effect(EffectType.SHADOW_STEP):
-            actions.append("shadow_step")
-        return actions
+    def can_use_item(self):
+        return self.item_count > 0 and (self.health < self.max_health or self.stamina < self.max_stamina)
+
+    def can_use_shadow_step(self):
+        return self.stamina >= self.stats.effect.cost and not self.has_status_effect(EffectType.SHADOW_STEP)
 
-    def validate_action(self, action):
-        if action == "attack":
-            return True
-        elif action == "special":
-            return self.can_use_special()
-        elif action == "item":
-            return self.item_count > 0 and (self.health < self.max_health or self.stamina < self.max_stamina)
-        elif action == "shadow_step":
-            return self.stamina >= 60 and not self.has_status_effect(EffectType.SHADOW_STEP)
-        return False
-    
     def get_action_info(self):
+        stats = self.stats
         return {
             "attack": {
                 "letter": "A",
-                "name": "Swift Strike", 
-                "damage": self.get_attack_dmg(base=20, crit=25, super_crit=40, 
-                                            crit_chance=0.4, super_crit_chance=0.33, 
-                                            return_range=True),
-                "cost": "0 stamina",
-                "effect": "Recover 20-40 stamina | High crit chance",
+                "name": stats.attack.name, 
+                "damage": stats.attack.damage_range,
+                "cost": f"{stats.attack.cost} stamina",
+                "effect": "Recover {}-{} stamina on crits | High crit chance".format(*stats.attack.crit_gain_range),
                 "available": True,
                 "requirement": None
             },
             "special": {
                 "letter": "B",
-                "name": "Shadow Strike",
-                "damage": self.get_attack_dmg(base=45, crit=60, super_crit=70,
-                                            crit_chance=0.37, super_crit_chance=0.35,
-                                            return_range=True),
-                "cost": "50 stamina",
+                "name": stats.special.name,
+                "damage": stats.special.damage_range,
+                "cost": f"{stats.special.cost} stamina",
                 "effect": "Crits restore stamina | From shadows",
-                "available": self.stamina >= 50,
-                "requirement": "Requires 50 stamina"
+                "available": self.can_use_special(),
+                "requirement": f"Requires {stats.special.cost} stamina"
             },
             "item": {
                 "letter": "C",
-                "name": "Flask",
-                "damage": "Heals 45 HP + 20 stamina",
+                "name": stats.item.name,
+                "damage": f"Heals {stats.item.health} HP + {stats.item.resource} stamina",
                 "cost": "1 flask",
                 "effect": f"({self.item_count} remaining)",
-                "available": self.item_count > 0 and (self.health < self.max_health or self.stamina < self.max_stamina),
+                "available": self.can_use_item(),
                 "requirement": "Requires flask & missing health/stamina"
             },
             "shadow_step": {
                 "letter": "E",
-                "name": "Shadow Step",
-                "damage": "35% dodge chance",
-                "cost": "60 stamina",
-                "effect": "Enhanced evasion for 4 turns",
-                "available": self.stamina >= 60 and not self.has_status_effect(EffectType.SHADOW_STEP),
-                "requirement": "Requires 60 stamina & not in shadows"
+                "name": stats.effect.name,
+                "damage": f"{stats.effect.magnitude:.0%} dodge chance",
+                "cost": f"{stats.effect.cost} stamina",
+                "effect": f"Enhanced evasion for {stats.effect.duration} turns",
+                "available": self.can_use_shadow_step(),
+                "requirement": f"Requires {stats.effect.cost} stamina & not in shadows"
             }
         }
     
@@ -246,7 +273,7 @@ class Rogue(Character):
     
     def print_status(self, is_enemy=False):
         if is_enemy:
-            print(f"   🩸 Enemy Health: {self.health}/{self.max_health} | 💨 Enemy Stamina: {self.stamina}/{self.max_stamina}")
+            narrate("   🩸 Enemy Health: {}/{} | 💨 Enemy Stamina: {}/{}", self.health, self.max_health, self.stamina, self.max_stamina)
         else:
-            print(f"   🩸 Current Health: {self.health}/{self.max_health} | 💨 Current Stamina: {self.stamina}/{self.max_stamina}")
+            narrate("   🩸 Current Health: {}/{} | 💨 Current Stamina: {}/{}", self.health, self.max_health, self.stamina, self.max_stamina)
         self.print_active_status_effects(is_enemy)
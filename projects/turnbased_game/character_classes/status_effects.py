@@ -1,12 +1,14 @@
 # character_classes/status_effects.py
-from dataclasses import dataclass
-from typing import Dict, Any
+from operator import attrgetter
+from typing import Dict, Any, NamedTuple
 from enum import Enum, Flag
 
 class EffectType(Enum): # Enum created simple named constants
     MAGIC_BUBBLE = "magic_bubble"
     BERSERKER_RAGE = "berserker_rage" 
     SHADOW_STEP = "shadow_step"
+    POISON = "poison"
+    REGENERATION = "regeneration"
 
 class EffectCategory(Flag): # Flag creates constants that can be combined using "|" operator
     """What capabilities this effect provides"""
@@ -16,22 +18,96 @@ class EffectCategory(Flag): # Flag creates constants that can be combined using
     DAMAGE_AMPLIFICATION = 4     # Increases incoming damage
     RAGE_CONVERSION = 8          # Converts damage to rage
     MANA_DRAIN = 16             # Costs mana per turn
+    DAMAGE_OVER_TIME = 32        # Deals magnitude damage every turn
+    REGENERATION = 64            # Heals magnitude health every turn
 
-@dataclass # Auto-generates boilerplate methods for clean data-holding classes
-class StatusEffect:
+class StackRule(Enum):
+    """What adding an effect does when one of its type is already active"""
+    REPLACE = "replace"          # New effect replaces the old one (no stacking)
+    REFRESH = "refresh"          # Old effect stays, its duration restarts
+    ADD = "add"                  # Every application is a stack with its own duration
+    CAP = "cap"                  # Like ADD up to max_stacks, then the oldest stack makes room
+
+class EffectDefinition(NamedTuple):
+    """What an effect does; one shared, immutable object per set of numbers"""
     effect_type: EffectType
-    duration: int
     magnitude: float
     maintenance_cost: int
     resource_type: str
     categories: EffectCategory   # What this effect can do
+    stack_rule: StackRule = StackRule.REPLACE
+    max_stacks: int = 1          # Only read by StackRule.CAP
+
+
+# Interned definitions: equal numbers always resolve to the same object
+_DEFINITIONS: Dict[EffectDefinition, EffectDefinition] = {}
+
+
+def define_effect(effect_type: EffectType, magnitude: float, maintenance_cost: int, resource_type: str,
+                  categories: EffectCategory, stack_rule: StackRule = StackRule.REPLACE,
+                  max_stacks: int = 1) -> EffectDefinition:
+    """The shared definition for these numbers"""
+    definition = EffectDefinition(effect_type, magnitude, maintenance_cost, resource_type, categories,
+                                  stack_rule, max_stacks)
+    return _DEFINITIONS.setdefault(definition, definition)
+
+
+def _restore_effect(fields: tuple, duration: int) -> "StatusEffect":
+    return StatusEffect.of(define_effect(*fields), duration)
+
+
+class StatusEffect:
+    """
+    One running effect: its shared EffectDefinition and the turns it has
+    left. Everything else reads through the definition, so an effect costs
+    two slots however many characters hold one.
+    """
+    __slots__ = ("definition", "duration")
+
+    def __init__(self, effect_type: EffectType, duration: int, magnitude: float, maintenance_cost: int,
+                 resource_type: str, categories: EffectCategory, stack_rule: StackRule = StackRule.REPLACE,
+                 max_stacks: int = 1):
+        self.definition = define_effect(effect_type, magnitude, maintenance_cost, resource_type, categories,
+                                        stack_rule, max_stacks)
+        self.duration = duration
+
+    @classmethod
+    def of(cls, definition: EffectDefinition, duration: int) -> "StatusEffect":
+        """New instance of an already interned definition"""
+        effect = cls.__new__(cls)
+        effect.definition = definition
+        effect.duration = duration
+        return effect
+
+    def __reduce__(self):
+        # Copies and unpickled effects resolve to the interned definition again
+        return _restore_effect, (tuple(self.definition), self.duration)
+
+    effect_type = property(attrgetter("definition.effect_type"))
+    magnitude = property(attrgetter("definition.magnitude"))
+    maintenance_cost = property(attrgetter("definition.maintenance_cost"))
+    resource_type = property(attrgetter("definition.resource_type"))
+    categories = property(attrgetter("definition.categories"))
+    stack_rule = property(attrgetter("definition.stack_rule"))
+    max_stacks = property(attrgetter("definition.max_stacks"))
+
+    def __eq__(self, other):
+        if not isinstance(other, StatusEffect):
+            return NotImplemented
+        return self.definition == other.definition and self.duration == other.duration
+
+    __hash__ = None  # mutable duration, like the dataclass it replaced
+
+    def __repr__(self):
+        return f"StatusEffect({self.effect_type}, duration={self.duration}, magnitude={self.magnitude})"
 
     def to_dict(self) -> Dict[str, Any]: 
+        definition = self.definition
         return {
-            'effect_type': self.effect_type.value,    # Extracts string from EffectTypr enum (e.g. "magic_buibble")
-            'duration': self.duration,                # Copies the distinct attributes
-            'magnitude': self.magnitude,              # Attribute cont.
-            'maintenance_cost': self.maintenance_cost,# Attribute cont.
-            'resource_type': self.resource_type,      # Attribute cont.
-            'categories': self.categories.value       # Extract int value from Flag enum
+            'effect_type': definition.effect_type.value, # Extracts string from EffectTypr enum (e.g. "magic_buibble")
+            'duration': self.duration,                  # The only per-instance attribute
+            'magnitude': definition.magnitude,          # The rest come from the shared definition
+            'maintenance_cost': definition.maintenance_cost,
+            'resource_type': definition.resource_type,
+            'categories': definition.categories.value   # Extract int value from Flag enum
         }
\ No newline at end of file
@@ -3,7 +3,11 @@ Warrior Character Class
 Heavy tank character with largest health pool and rage-based abilities.
 """
 from .base_character import Character
-from .status_effects import StatusEffect, EffectType, EffectCategory
+from .status_effects import EffectType
+from .output_sink import narrate
+from .class_tables import CLASS_TABLES
+from .action_registry import ActionSpec
+from .combat_events import DamageDealt, Dodged, Crit, ResourceChanged, EffectApplied, ItemUsed
 from typing import Dict, Any
 class Warrior(Character):
     """
@@ -11,11 +15,27 @@ class Warrior(Character):
     Largest health pool
     Runs on rage
     """
+    stats = CLASS_TABLES["warrior"]  # numbers from class_data.json
+    ACTIONS = Character.ACTIONS + (
+        ActionSpec("e", "berserker_rage", "enter_berserker_rage", "can_enter_berserker_rage", "effect",
+                   enemy_action="enter_berserker_rage", status=True,
+                   success="You unleash your inner fury and enter a berserker rage!",
+                   failure="Failed to enter Berserker Rage: {}",
+                   enemy_success="Enemy warrior enters a berserker rage!",
+                   enemy_failure="Enemy warrior failed to enter berserker rage."),
+    )
+    CUES = {
+        "attack": (("sword_swing",), ("sword_hit",)),
+        "special": (("fury_unleash",), ("heavy_hit",)),
+        "item": (("drink_potion",), ("potion_gulp",)),
+        "berserker_rage": (("rage_aura",), ("war_cry",)),
+    }
+
     def __init__(self):
-        self.health = 200
-        self.max_health = 200  # Maximum health limit
-        self.rage = 0
-        self.item_count = 2
+        self.health = self.stats.max_health
+        self.max_health = self.stats.max_health  # Maximum health limit
+        self.rage = self.stats.start_resource
+        self.item_count = self.stats.items
         super().__init__(self.health, self.rage)  # inherits from class Character
         from .status_effect_manager import StatusEffectManager
         self.status_effects = StatusEffectManager()
@@ -24,204 +44,172 @@ class Warrior(Character):
         attacker = "Your enemy" if is_enemy else "You"
         wielder = "their" if is_enemy else "your"
         target = "you" if is_enemy else "your opponent"
-        print(f"{attacker} swings {wielder} blade at {target}...")
+        narrate("{} swings {} blade at {}...", attacker, wielder, target)
         # Check for dodge first
         if hasattr(enemy, 'status_effects') and enemy.status_effects.apply_dodge_check(enemy):
-            print("💨 Attack dodged!")
+            narrate("💨 Attack dodged!")
+            if self.events.active:
+                self.events.emit(Dodged(self, enemy, "attack"))
             return
       
-        dmg = self.get_attack_dmg(base=25, crit=40, crit_chance=0.33)
+        ability = self.stats.attack
+        dmg = ability.roll(self.rng)
+        if self.events.active and ability.is_crit(dmg):
+            self.events.emit(Crit(self, enemy, "attack", dmg, dmg == ability.super_crit))
         
         # Apply status effect damage modifications
         if hasattr(enemy, 'status_effects'):
             final_damage, narrative_effects = enemy.status_effects.apply_damage_modification(enemy, dmg, is_enemy)
             # Show narrative effects before damage
             for effect_message in narrative_effects:
-                print(effect_message)
+                narrate(effect_message)
         else:
             final_damage = dmg
             
         enemy.health -= final_damage
-        if final_damage == 40:
-            print("CRITICAL HIT")
-            rage_gain = 25
-        else:
-            rage_gain = 15
+        if final_damage == ability.crit:
+            narrate("CRITICAL HIT")
+        rage_gain = ability.gain_for(final_damage)
         self.rage += rage_gain
+        if self.events.active:
+            self.events.emit(DamageDealt(self, enemy, "attack", final_damage, dmg))
+            self.events.emit(ResourceChanged(self, "rage", rage_gain, "attack"))
         damage_target = "You take" if is_enemy else "Enemy takes"
         resource_text = "Enemy recovers" if is_enemy else "You recover"
-        print(f"{damage_target} {final_damage} damage! {resource_text} {rage_gain} rage.")
+        narrate("{} {} damage! {} {} rage.", damage_target, final_damage, resource_text, rage_gain)
         return
     
     def attack_get_result(self, enemy, is_enemy=False):
-        # 'before' values for pygame animations
-        enemy_health_before = enemy.health
-        rage_before = self.rage
-        # value change
-        dmg = self.get_attack_dmg(base=25, crit=40, crit_chance=0.33)
-        enemy.health -= dmg
-        if dmg == 40:
-            rage_gain = 25
-            is_critical = True
-        else:
-            rage_gain = 15
-            is_critical = False
-        self.rage += rage_gain
-        # return rich data for pygame
-        return {
-            'action_type': 'attack',
-            'damage': dmg,
-            'critical_hit': is_critical,
-            'rage_gain': rage_gain,
-            'attacker': 'enemy' if is_enemy else 'player',
-            'target_health_before': enemy_health_before,
-            'target_health_after': enemy.health,
-            'attacker_rage_before': rage_before,
-            'attacker_rage_after': self.rage,
-            'animation_triggers': ['sword_swing', 'critical_flash'] if is_critical else ['sword_swing'],
-            'sound_effects': ['sword_hit', 'critical_sound'] if is_critical else ['sword_hit']
-        }
+        # attack() plus rich data for pygame animations (every action has one, see perform_get_result)
+        return self.perform_get_result("attack", enemy, is_enemy)
     
     def special(self, enemy, is_enemy=False):
         if self.can_use_special():
-            self.rage -= 30
+            ability = self.stats.special
+            self.rage -= ability.cost
+            if self.events.active:
+                self.events.emit(ResourceChanged(self, "rage", -ability.cost, "special"))
             attacker = "You unleash your" if not is_enemy else "Your enemy unleashes their"
             target = "your opponent" if not is_enemy else "you"
-            print(f"{attacker} inner fury opon {target}...")
+            narrate("{} inner fury opon {}...", attacker, target)
             
             # Check for dodge first
             if hasattr(enemy, 'status_effects') and enemy.status_effects.apply_dodge_check(enemy):
-                print("💨 Attack dodged!")
+                narrate("💨 Attack dodged!")
+                if self.events.active:
+                    self.events.emit(Dodged(self, enemy, "special"))
                 return
             
-            dmg = self.get_attack_dmg(base=50, crit=75, crit_chance=0.33)
+            dmg = ability.roll(self.rng)
+            if self.events.active and ability.is_crit(dmg):
+                self.events.emit(Crit(self, enemy, "special", dmg, dmg == ability.super_crit))
             
             # Apply status effect damage modifications
             if hasattr(enemy, 'status_effects'):
                 final_damage, narrative_effects = enemy.status_effects.apply_damage_modification(enemy, dmg, is_enemy)
                 # Show narrative effects before damage
                 for effect_message in narrative_effects:
-                    print(effect_message)
+                    narrate(effect_message)
             else:
                 final_damage = dmg
                 
             enemy.health -= final_damage
-            if final_damage == 75:
-                print("CRITICAL HIT")
-            print(f"Does {final_damage} damage.")
+            if self.events.active:
+                self.events.emit(DamageDealt(self, enemy, "special", final_damage, dmg))
+            if final_damage == ability.crit:
+                narrate("CRITICAL HIT")
+            narrate("Does {} damage.", final_damage)
         else:
-            print("Not enough Rage.")
+            narrate("Not enough Rage.")
         return
     
     def can_use_special(self):
-        if self.rage >= 30:
-            return True
-        return False
+        return self.rage >= self.stats.special.cost
+
+    def can_use_item(self):
+        return self.item_count > 0 and self.health < self.max_health
+
+    def can_enter_berserker_rage(self):
+        return not self.has_status_effect(EffectType.BERSERKER_RAGE)
     
     def enter_berserker_rage(self) -> Dict[str, Any]:
         """Enter berserker rage mode - take more damage but gain rage"""
         # No cost - this is a desperate fighting stance, not a resource expenditure
-        
-        berserker_effect = StatusEffect(
-            effect_type=EffectType.BERSERKER_RAGE,
-            duration=5,
-            magnitude=0.25,  # 25% extra damage taken
-            maintenance_cost=0,
-            resource_type="rage",
-            categories=EffectCategory.DAMAGE_AMPLIFICATION | EffectCategory.RAGE_CONVERSION
-        )
+        effect = self.stats.effect
+        berserker_effect = effect.make("rage")  # extra damage taken converts to rage
         self.status_effects.add_effect(berserker_effect)
+        if self.events.active:
+            self.events.emit(EffectApplied(self, EffectType.BERSERKER_RAGE, effect.duration))
     
         return {
             'success': True,
             'effect_applied': 'berserker_rage',
-            'duration': 5,
-            'rage_used': 0
+            'duration': effect.duration,
+            'rage_used': effect.cost
         }
     
     def item(self, is_enemy=False):
         if self.item_count > 0:
             if self.health >= self.max_health:
                 target = "You" if not is_enemy else "Enemy"
-                print(f"{target} already have full health. The potion would be wasted.")
+                narrate("{} already have full health. The potion would be wasted.", target)
                 return
                 
             target = "You drink" if not is_enemy else "Enemy drinks"
             effect = "You recover" if not is_enemy else "Enemy recovers"
             self.item_count -= 1
-            health_recovery = 60
+            health_recovery = self.stats.item.health
             # Cap health at maximum
             actual_recovery = min(health_recovery, self.max_health - self.health)
             self.health = min(self.health + health_recovery, self.max_health)
-            print(f"{target} a potion. {effect} {actual_recovery} health.")
+            if self.events.active:
+                self.events.emit(ItemUsed(self, self.item_count))
+                self.events.emit(ResourceChanged(self, "health", actual_recovery, "item"))
+            narrate("{} a potion. {} {} health.", target, effect, actual_recovery)
             return
         else:
-            print("No items left.")
+            narrate("No items left.")
             return
         
 # Helper/Gameloop Methods ----------------------------------------------------------------------------------       
 
-    def get_available_actions(self):
-        """
-        Returns list of actions player can perform based on 
-        available resources.
-        """
-        actions = ["attack"]
-        if self.can_use_special():
-            actions.append("special")
-        if self.item_count > 0 and self.health < self.max_health:
-            actions.append("item")
-        if not self.has_status_effect(EffectType.BERSERKER_RAGE):
-            actions.append("berserker_rage")
-        return actions
-    
-    def validate_action(self, action):
-        if action == "attack":
-            return True
-        elif action == "special":
-            return self.can_use_special()
-        elif action == "item":
-            return self.item_count > 0 and self.health < self.max_health
-        elif action == "berserker_rage":
-            return not self.has_status_effect(EffectType.BERSERKER_RAGE)
-        return False
-    
     def get_action_info(self):
+        stats = self.stats
         return {
             "attack": {
                 "letter": "A",
-                "name": "Blade Strike",
-                "damage": self.get_attack_dmg(base=25, crit=40, crit_chance=0.2, return_range=True),
-                "cost": "0 rage",
-                "effect": "Recover 15-25 rage when used. Rage required to perform spew",
+                "name": stats.attack.name,
+                "damage": stats.attack.damage_range,
+                "cost": f"{stats.attack.cost} rage",
+                "effect": "Recover {}-{} rage when used. Rage required to perform spew".format(*stats.attack.gain_range),
                 "available": True,
                 "requirement": None
             },
             "special": {
                 "letter": "B",
-                "name": "Fury Strike",
-                "damage": self.get_attack_dmg(base=50, crit=75, crit_chance=0.33, return_range=True),
-                "cost": "30 rage",
+                "name": stats.special.name,
+                "damage": stats.special.damage_range,
+                "cost": f"{stats.special.cost} rage",
                 "effect": "High damage attack",
                 "available": self.can_use_special(),
-                "requirement": "Requires 30 rage."
+                "requirement": f"Requires {stats.special.cost} rage."
             },
             "item": {
                 "letter": "C",
-                "name": "Health Potion",
-                "damage": "Heals 60 Health",
+                "name": stats.item.name,
+                "damage": f"Heals {stats.item.health} Health",
                 "cost": "1 potion",
                 "effect": f"({self.item_count} remaining)",
-                "available": self.item_count > 0 and self.health < self.max_health,
+                "available": self.can_use_item(),
                 "requirement": "Requires potion & missing health"
             },
             "berserker_rage": {
                 "letter": "E",
-                "name": "Berserker Rage",
-                "damage": "+25% incoming damage",
-                "cost": "0 rage",
+                "name": stats.effect.name,
+                "damage": f"+{stats.effect.magnitude:.0%} incoming damage",
+                "cost": f"{stats.effect.cost} rage",
                 "effect": "Convert extra damage to rage",
-                "available": not self.has_status_effect(EffectType.BERSERKER_RAGE),
+                "available": self.can_enter_berserker_rage(),
                 "requirement": "No active berserker rage"
             }
         }
@@ -255,7 +243,7 @@ class Warrior(Character):
     
     def print_status(self, is_enemy=False):
         if is_enemy:
-            print(f"   🩸 Enemy Health: {self.health}/{self.max_health} | ⚡ Enemy Rage: {self.rage}")
+            narrate("   🩸 Enemy Health: {}/{} | ⚡ Enemy Rage: {}", self.health, self.max_health, self.rage)
         else:  
-            print(f"   🩸 Current Health: {self.health}/{self.max_health} | ⚡ Current Rage: {self.rage}")
+            narrate("   🩸 Current Health: {}/{} | ⚡ Current Rage: {}", self.health, self.max_health, self.rage)
         self.print_active_status_effects(is_enemy)
@@ -5,7 +5,11 @@ All abilities cost resource (mana). Item (mana potion) used to recover mana.
 """
 from .base_character import Character
 from typing import Dict, Any
-from .status_effects import StatusEffect, EffectType, EffectCategory
+from .status_effects import EffectType
+from .output_sink import narrate
+from .class_tables import CLASS_TABLES
+from .action_registry import ActionSpec
+from .combat_events import DamageDealt, Dodged, Crit, ResourceChanged, EffectApplied, ItemUsed
 class Wizard(Character):
     """
     Glass cannon character
@@ -13,136 +17,173 @@ class Wizard(Character):
     all abilities cost resource(mana)
     item(mana potion) used to recover mana
     """
+    stats = CLASS_TABLES["wizard"]  # numbers from class_data.json
+    ACTIONS = Character.ACTIONS + (
+        ActionSpec("d", "heal", "spell_heal", "can_use_heal", "heal"),
+        ActionSpec("e", "magic_bubble", "cast_magic_bubble", "can_use_magic_bubble", "effect",
+                   enemy_action="cast_magic_bubble", status=True,
+                   success="You weave a protective barrier around yourself!",
+                   failure="Failed to cast Magic Bubble: {}",
+                   enemy_success="Enemy wizard casts a protective magic bubble!",
+                   enemy_failure="Enemy wizard failed to cast magic bubble."),
+    )
+    CUES = {
+        "attack": (("lightning_bolt",), ("thunder_crack",)),
+        "special": (("fireball",), ("fire_explosion",)),
+        "item": (("drink_potion",), ("potion_gulp",)),
+        "heal": (("healing_light",), ("heal_chime",)),
+        "magic_bubble": (("bubble_shield",), ("shield_hum",)),
+    }
+
     def __init__(self):
-        self.health = 120
-        self.max_health = 120  # Maximum health limit
-        self.mana = 180
-        self.max_mana = 180    # Maximum mana limit
-        self.item_count = 3
+        self.health = self.stats.max_health
+        self.max_health = self.stats.max_health  # Maximum health limit
+        self.mana = self.stats.start_resource
+        self.max_mana = self.stats.max_resource    # Maximum mana limit
+        self.item_count = self.stats.items
         super().__init__(self.health, self.mana)
         
         from .status_effect_manager import StatusEffectManager
         self.status_effects = StatusEffectManager()
     
     def attack(self, enemy, is_enemy=False):
-        if self.mana >= 10:
-            self.mana -= 10
+        if self.can_use_attack():
+            ability = self.stats.attack
+            self.mana -= ability.cost
+            if self.events.active:
+                self.events.emit(ResourceChanged(self, "mana", -ability.cost, "attack"))
             attacker = "You raise your staff" if not is_enemy else "The enemy raises their staff"
             target = "Enemy receives" if not is_enemy else "You receive"
-            print(f"{attacker} raises their staff and summons a bolt of lightning...")
+            narrate("{} raises their staff and summons a bolt of lightning...", attacker)
             
             # Check for dodge first
             if hasattr(enemy, 'status_effects') and enemy.status_effects.apply_dodge_check(enemy):
-                print("💨 Attack dodged!")
+                narrate("💨 Attack dodged!")
+                if self.events.active:
+                    self.events.emit(Dodged(self, enemy, "attack"))
                 return
             
-            dmg = self.get_attack_dmg(base=10, crit=35, crit_chance=0.40)
+            dmg = ability.roll(self.rng)
+            if self.events.active and ability.is_crit(dmg):
+                self.events.emit(Crit(self, enemy, "attack", dmg, dmg == ability.super_crit))
             target = "You" if not is_enemy else "Enemy"
             # Apply status effect damage modifications
             if hasattr(enemy, 'status_effects'):
                 final_damage, narrative_effects = enemy.status_effects.apply_damage_modification(enemy, dmg, is_enemy)
                 # Show narrative effects before damage
                 for effect_message in narrative_effects:
-                    print(effect_message)
+                    narrate(effect_message)
             
             else:
                 final_damage = dmg
                 
             enemy.health -= final_damage
-            if final_damage == 35:
-                mana_recovery = 50
+            if self.events.active:
+                self.events.emit(DamageDealt(self, enemy, "attack", final_damage, dmg))
+            mana_recovery = ability.gain_for(final_damage)
+            if final_damage == ability.crit:
                 self.mana += mana_recovery
-                
-                print(f"CRITICAL HIT. {target} takes {final_damage} damage. Recover {mana_recovery} mana.")
+                if self.events.active:
+                    self.events.emit(ResourceChanged(self, "mana", mana_recovery, "attack"))
+                narrate("CRITICAL HIT. {} takes {} damage. Recover {} mana.", target, final_damage, mana_recovery)
             else:
-                mana_recovery = 25
                 self.mana += mana_recovery
-                print(f"{target} takes {final_damage} damage.")
+                if self.events.active:
+                    self.events.emit(ResourceChanged(self, "mana", mana_recovery, "attack"))
+                narrate("{} takes {} damage.", target, final_damage)
         else:
-            print("Not enough mana.")
+            narrate("Not enough mana.")
         return
 
     def special(self, enemy, is_enemy=False):
         # high damage/cost heavy attack
-        if self.mana >= 75:
+        if self.can_use_special():
+            ability = self.stats.special
             attacker = "You raise your" if not is_enemy else "Your enemy raises their"
             target = "Enemy receives" if not is_enemy else "You receive"
-            print(f"""
-            {attacker} staff and summons a giant fireball...
-            """)
-            self.mana -= 75
+            narrate("""
+            {} staff and summons a giant fireball...
+            """, attacker)
+            self.mana -= ability.cost
+            if self.events.active:
+                self.events.emit(ResourceChanged(self, "mana", -ability.cost, "special"))
             
             # Check for dodge first
             if hasattr(enemy, 'status_effects') and enemy.status_effects.apply_dodge_check(enemy):
-                print("💨 Attack dodged!")
+                narrate("💨 Attack dodged!")
+                if self.events.active:
+                    self.events.emit(Dodged(self, enemy, "special"))
                 return
             
-            dmg = self.get_attack_dmg(base=60, crit=75, super_crit=0, crit_chance=0.30, super_crit_chance=0)
+            dmg = ability.roll(self.rng)
+            if self.events.active and ability.is_crit(dmg):
+                self.events.emit(Crit(self, enemy, "special", dmg, dmg == ability.super_crit))
             
             # Apply status effect damage modifications
             if hasattr(enemy, 'status_effects'):
                 final_damage, narrative_effects = enemy.status_effects.apply_damage_modification(enemy, dmg, is_enemy)
                 # Show narrative effects before damage
                 for effect_message in narrative_effects:
-                    print(effect_message)
+                    narrate(effect_message)
             else:
                 final_damage = dmg
                 
             enemy.health -= final_damage
-            if final_damage == 75:
+            if self.events.active:
+                self.events.emit(DamageDealt(self, enemy, "special", final_damage, dmg))
+            if final_damage == ability.crit:
                 attacker = "Enemy takes" if not is_enemy else "You take"
-                print("CRITICAL HIT.")
-            print(f"{target} {final_damage} damage.")
+                narrate("CRITICAL HIT.")
+            narrate("{} {} damage.", target, final_damage)
         else:
-            print("Not enough mana.")
+            narrate("Not enough mana.")
         return
     
     def spell_heal(self, is_enemy=False):
         # main way for wizard to heal
         # still costs mana
-        if self.mana >= 25:
+        heal = self.stats.heal
+        if self.mana >= heal.cost:
             if self.health >= self.max_health:
                 target = "You" if not is_enemy else "Your enemy"
-                print(f"{target} already have full health. The spell would be wasted.")
+                narrate("{} already have full health. The spell would be wasted.", target)
                 return
                 
-            self.mana -= 25
+            self.mana -= heal.cost
             target = "you" if not is_enemy else "your enemy"
-            health_recovery = 45
+            health_recovery = heal.health
             # Cap health at maximum
             actual_recovery = min(health_recovery, self.max_health - self.health)
             self.health = min(self.health + health_recovery, self.max_health)
-            print(f"""A beam of light falls upon
-                  {target}...
-                  Recover {actual_recovery} health."""
-                  )
+            if self.events.active:
+                self.events.emit(ResourceChanged(self, "mana", -heal.cost, "heal"))
+                self.events.emit(ResourceChanged(self, "health", actual_recovery, "heal"))
+            narrate("""A beam of light falls upon
+                  {}...
+                  Recover {} health.""", target, actual_recovery)
         else:
-            print("Not enough mana.")
+            narrate("Not enough mana.")
         return        
     # STATUS EFFECT
     def cast_magic_bubble(self) -> Dict[str, Any]: 
         """Cast protective magic bubble"""
-        mana_cost = 35
+        effect = self.stats.effect
+        mana_cost = effect.cost
         if self.mana < mana_cost:
             return {'success': False, 'reason': 'insufficient_mana'}
         
         self.mana -= mana_cost
         
-        bubble_effect = StatusEffect(
-            effect_type=EffectType.MAGIC_BUBBLE,
-            duration=3,
-            magnitude=0.40,  # 35% damage reduction
-            maintenance_cost=15,
-            resource_type="mana",
-            categories=EffectCategory.DAMAGE_REDUCTION | EffectCategory.MANA_DRAIN # "|" operator to 
-                                                                                   # combine two enum members into a bitwise 
-                                                                                   # OR value that represents both categories at once
-        )                                                                          # effect can be checked for both categories
+        # Damage reduction plus a per-turn mana upkeep (categories combined with "|" in class_tables)
+        bubble_effect = effect.make("mana")
         self.status_effects.add_effect(bubble_effect) # Adds effect to status_effect_manager
+        if self.events.active:
+            self.events.emit(ResourceChanged(self, "mana", -mana_cost, "magic_bubble"))
+            self.events.emit(EffectApplied(self, EffectType.MAGIC_BUBBLE, effect.duration))
         return { # Returns success dictionary with display updates
             'success': True,
             'effect_applied': 'magic_bubble',
-            'duration': 3,
+            'duration': effect.duration,
             'mana_used': mana_cost
         } 
                 
@@ -151,104 +192,90 @@ class Wizard(Character):
         if self.item_count > 0:
             if self.mana >= self.max_mana:
                 target = "You" if not is_enemy else "Your enemy"
-                print(f"{target} already have full mana. The potion would be wasted.")
+                narrate("{} already have full mana. The potion would be wasted.", target)
                 return
             
             self.item_count -= 1
             target = "You uncork" if not is_enemy else "Your enemy uncorks"
-            mana_recovery = 50
+            mana_recovery = self.stats.item.resource
             # Cap mana at maximum
             actual_recovery = min(mana_recovery, self.max_mana - self.mana)
             self.mana = min(self.mana + mana_recovery, self.max_mana)
-            print(f"""{target} a vial and take a sip...
-                  Recover {actual_recovery} mana. """)
+            if self.events.active:
+                self.events.emit(ItemUsed(self, self.item_count))
+                self.events.emit(ResourceChanged(self, "mana", actual_recovery, "item"))
+            narrate("""{} a vial and take a sip...
+                  Recover {} mana. """, target, actual_recovery)
         else:
-            print("Out of potions.")       
+            narrate("Out of potions.")       
         return 
     
 # Helper/Gameloop methods --------------------------------------------------------------------------
     def can_use_special(self):
-        return self.mana >= 75
+        return self.mana >= self.stats.special.cost
 
     def can_use_attack(self):
-        return self.mana >= 10
+        return self.mana >= self.stats.attack.cost
+
+    def can_use_item(self):
+        return self.item_count > 0 and self.mana < self.max_mana
 
     def can_use_heal(self):
-        return self.mana >= 25 and self.health < self.max_health
+        return self.mana >= self.stats.heal.cost and self.health < self.max_health
 
-    def get_available_actions(self):
-        actions = []
-        if self.can_use_attack():
-            actions.append("attack")
-        if self.can_use_special():
-            actions.append("special")
-        if self.item_count > 0 and self.mana < self.max_mana:
-            actions.append("item")
-        if self.can_use_heal():
-            actions.append("heal")
-        if self.mana >= 35 and not self.has_status_effect(EffectType.MAGIC_BUBBLE):
-            actions.append("magic_bubble")
-        return actions
+    def can_use_magic_bubble(self):
+        return self.mana >= self.stats.effect.cost and not self.has_status_effect(EffectType.MAGIC_BUBBLE)
+
+    def ran_dry(self):
+        return self.mana < self.stats.attack.cost and self.item_count <= 0
 
-    def validate_action(self, action):
-        if action == "attack":
-            return self.can_use_attack()
-        elif action == "special": 
-            return self.can_use_special()
-        elif action == "item":
-            return self.item_count > 0 and self.mana < self.max_mana
-        elif action == "heal":
-            return self.can_use_heal()
-        elif action == "magic_bubble":
-            return self.mana >= 35 and not self.has_status_effect(EffectType.MAGIC_BUBBLE)
-        return False
-    
     def get_action_info(self):
+        stats = self.stats
         return {
             "attack": {
                 "letter": "A",
-                "name": "Lightning Bolt",
-                "damage": self.get_attack_dmg(base=10, crit=30, crit_chance=0.2, return_range=True),
-                "cost": "10 mana", 
-                "effect": "Recover 25-50 mana on crit",
-                "available": self.mana >= 10,
-                "requirement": "Requires 10 mana"
+                "name": stats.attack.name,
+                "damage": stats.attack.damage_range,
+                "cost": f"{stats.attack.cost} mana", 
+                "effect": "Recover {}-{} mana, more on crit".format(*stats.attack.gain_range),
+                "available": self.can_use_attack(),
+                "requirement": f"Requires {stats.attack.cost} mana"
             },
             "special": {
                 "letter": "B",
-                "name": "Fireball",
-                "damage": self.get_attack_dmg(base=60, crit=75, crit_chance=0.25, return_range=True),
-                "cost": "75 mana",
+                "name": stats.special.name,
+                "damage": stats.special.damage_range,
+                "cost": f"{stats.special.cost} mana",
                 "effect": "Devastating magical attack",
-                "available": self.mana >= 75,
-                "requirement": "Requires 75 mana"
+                "available": self.can_use_special(),
+                "requirement": f"Requires {stats.special.cost} mana"
             },
             "item": {
                 "letter": "C", 
-                "name": "Mana Potion",
-                "damage": "Restores 50 mana",
+                "name": stats.item.name,
+                "damage": f"Restores {stats.item.resource} mana",
                 "cost": "1 potion",
                 "effect": f"({self.item_count} remaining)",
-                "available": self.item_count > 0 and self.mana < self.max_mana,
+                "available": self.can_use_item(),
                 "requirement": "Requires potion & missing mana"
             },
             "heal": {
                 "letter": "D",
-                "name": "Healing Light", 
-                "damage": "Restores 45 health",
-                "cost": "25 mana",
+                "name": stats.heal.name, 
+                "damage": f"Restores {stats.heal.health} health",
+                "cost": f"{stats.heal.cost} mana",
                 "effect": "Divine healing magic",
-                "available": self.mana >= 25 and self.health < self.max_health,
-                "requirement": "Requires 25 mana & missing health"
+                "available": self.can_use_heal(),
+                "requirement": f"Requires {stats.heal.cost} mana & missing health"
             },
             "magic_bubble": {
                 "letter": "E",
-                "name": "Magic Bubble",
-                "damage": "40% damage reduction",
-                "cost": "35 mana + 15/turn",
-                "effect": "Protective barrier for 3 turns",
-                "available": self.mana >= 35 and not self.has_status_effect(EffectType.MAGIC_BUBBLE),
-                "requirement": "Requires 35 mana & no active bubble"
+                "name": stats.effect.name,
+                "damage": f"{stats.effect.magnitude:.0%} damage reduction",
+                "cost": f"{stats.effect.cost} mana + {stats.effect.upkeep}/turn",
+                "effect": f"Protective barrier for {stats.effect.duration} turns",
+                "available": self.can_use_magic_bubble(),
+                "requirement": f"Requires {stats.effect.cost} mana & no active bubble"
             }
         }
 
@@ -281,7 +308,7 @@ class Wizard(Character):
 
     def print_status(self, is_enemy=False):
         if is_enemy:
-            print(f"   🩸 Enemy Health: {self.health}/{self.max_health} | 🔮 Enemy Mana: {self.mana}/{self.max_mana}")
+            narrate("   🩸 Enemy Health: {}/{} | 🔮 Enemy Mana: {}/{}", self.health, self.max_health, self.mana, self.max_mana)
         else:
-            print(f"   🩸 Current Health: {self.health}/{self.max_health} | 🔮 Current Mana: {self.mana}/{self.max_mana}")
+            narrate("   🩸 Current Health: {}/{} | 🔮 Current Mana: {}/{}", self.health, self.max_health, self.mana, self.max_mana)
         self.print_active_status_effects(is_enemy)
@@ -0,0 +1,148 @@
+"""
+Battle Loop
+Round structure shared by the interactive game and the headless engine.
+Each round ticks status effects for both sides, lets the player act, then
+the enemy. The first side to drop to zero health loses.
+"""
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Generator, Optional
+
+PLAYER = "player"
+ENEMY = "enemy"
+DRAW = "draw"
+
+
+@dataclass
+class BattleResult:
+    winner: str          # PLAYER, ENEMY or DRAW
+    rounds: int
+    player_health: int
+    enemy_health: int
+
+
+class BattleHooks:
+    """
+    Observer for the battle loop. Every method is a no-op so subclasses
+    only override the moments they care about (banners, pacing, recording).
+    """
+    def round_started(self, round_number: int, player, enemy) -> None:
+        pass
+
+    def effects_processed(self, side: str, character, results: Dict[str, Any]) -> None:
+        pass
+
+    def turn_started(self, side: str, player, enemy) -> None:
+        pass
+
+    def turn_finished(self, side: str, action: Optional[str], player, enemy) -> None:
+        pass
+
+    def battle_finished(self, result: BattleResult) -> None:
+        pass
+
+
+class MultiHooks(BattleHooks):
+    """Forwards every callback to several hooks in order (e.g. console output plus a replay recorder)"""
+    def __init__(self, *hooks: BattleHooks):
+        self.hooks = [hook for hook in hooks if hook is not None]
+
+    def round_started(self, round_number, player, enemy):
+        for hook in self.hooks:
+            hook.round_started(round_number, player, enemy)
+
+    def effects_processed(self, side, character, results):
+        for hook in self.hooks:
+            hook.effects_processed(side, character, results)
+
+    def turn_started(self, side, player, enemy):
+        for hook in self.hooks:
+            hook.turn_started(side, player, enemy)
+
+    def turn_finished(self, side, action, player, enemy):
+        for hook in self.hooks:
+            hook.turn_finished(side, action, player, enemy)
+
+    def battle_finished(self, result):
+        for hook in self.hooks:
+            hook.battle_finished(result)
+
+
+# a turn callable receives (acting character, opponent) and returns the action taken
+TurnFunction = Callable[[Any, Any], Optional[str]]
+
+# battle_steps yields the side that must act next and is sent back the action it took
+BattleSteps = Generator[str, Optional[str], BattleResult]
+
+
+def battle_steps(player, enemy, hooks: Optional[BattleHooks] = None,
+                 max_rounds: Optional[int] = None, round_number: int = 0,
+                 to_move: Optional[str] = None) -> BattleSteps:
+    """
+    The round structure as a generator, for callers that can't block inside
+    a turn (e.g. the asyncio server waiting on a socket). Yields PLAYER or
+    ENEMY whenever that side must take its turn; the caller performs it and
+    send()s back the action name. Returns the BattleResult via StopIteration.
+
+    With `to_move` the battle picks up inside round `round_number` at that
+    side's turn, its status effects already processed (e.g. a restored
+    snapshot); otherwise round `round_number` + 1 starts from the top.
+    """
+    hooks = hooks or BattleHooks()
+    rounds = round_number
+    winner = DRAW
+    resume = to_move
+
+    while player.health > 0 and enemy.health > 0:
+        if resume is None:
+            if max_rounds is not None and rounds >= max_rounds:
+                break
+            rounds += 1
+            hooks.round_started(rounds, player, enemy)
+
+            # Status effects tick at the start of the round for both sides
+            hooks.effects_processed(PLAYER, player, player.process_turn_start())
+            hooks.effects_processed(ENEMY, enemy, enemy.process_turn_start())
+
+        if resume != ENEMY:
+            hooks.turn_started(PLAYER, player, enemy)
+            action = yield PLAYER
+            hooks.turn_finished(PLAYER, action, player, enemy)
+            if enemy.health <= 0:
+                winner = PLAYER
+                break
+        resume = None
+
+        hooks.turn_started(ENEMY, player, enemy)
+        action = yield ENEMY
+        hooks.turn_finished(ENEMY, action, player, enemy)
+        if player.health <= 0:
+            winner = ENEMY
+            break
+    else:
+        # Loop condition failed without a break: the enemy fell on its own
+        # turn (e.g. a wizard running out of mana)
+        winner = PLAYER if enemy.health <= 0 else ENEMY
+
+    result = BattleResult(winner=winner, rounds=rounds,
+                          player_health=player.health, enemy_health=enemy.health)
+    hooks.battle_finished(result)
+    return result
+
+
+def run_battle(player, enemy, player_turn: TurnFunction, enemy_turn: TurnFunction,
+               hooks: Optional[BattleHooks] = None, max_rounds: Optional[int] = None) -> BattleResult:
+    """
+    Runs rounds until one side falls (or max_rounds is reached, which is a draw).
+    `player` and `enemy` are the Character objects; the turn callables decide
+    how each side picks and executes its action.
+    """
+    steps = battle_steps(player, enemy, hooks, max_rounds)
+    try:
+        side = next(steps)
+        while True:
+            if side == PLAYER:
+                side = steps.send(player_turn(player, enemy))
+            else:
+                side = steps.send(enemy_turn(enemy, player))
+    except StopIteration as finished:
+        return finished.value
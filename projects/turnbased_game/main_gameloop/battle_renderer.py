@@ -0,0 +1,371 @@
+"""
+Battle Renderer
+The pygame battle screen: player and enemy zones, health and resource bars,
+the action buttons, animation cues and a message line, filled from the game
+server's prompt and result dicts (see game_server.character_status).
+
+Everything that never changes (background, zone outlines, captions) is drawn
+once into a cached background surface. Each widget remembers what it shows
+and only marks itself dirty when a new value would look different; drawing
+it blits its patch of the background and then the widget. draw() pushes just
+those rects with pygame.display.update(rects), and nothing at all when
+nothing changed.
+
+run_window() is event driven: with no animation pending it blocks in
+pygame.event.wait(), so an idle battle screen costs no frames and no CPU.
+While on_frame() reports something moving it ticks at `fps` instead. Pass a
+FrameStats to measure frame times and the process's CPU share; naive=True
+swaps in the old clear-everything, flip-every-frame loop for comparison.
+"""
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import pygame
+
+from .battle_loop import PLAYER, ENEMY
+
+WINDOW_SIZE = (1200, 800)
+FPS = 60
+
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+RED = (255, 0, 0)
+GREEN = (0, 255, 0)
+BLUE = (0, 0, 255)
+GRAY = (128, 128, 128)
+DARK_GRAY = (40, 40, 40)
+GOLD = (255, 200, 0)
+
+# Layout, from the original window test
+PLAYER_ZONE = (50, 100, 200, 300)
+ENEMY_ZONE = (950, 100, 200, 300)
+ACTION_AREA = (400, 650, 400, 100)
+HEALTH_AREA = (100, 50, 1000, 30)
+MESSAGE_AREA = (300, 430, 600, 190)
+ROUND_AREA = (500, 100, 200, 40)
+MESSAGE_LINES = 6
+
+ZONES = {PLAYER: (PLAYER_ZONE, RED), ENEMY: (ENEMY_ZONE, BLUE)}
+RESOURCE_COLORS = {"rage": RED, "stamina": GREEN, "mana": BLUE}
+
+
+class Widget:
+    """A screen rectangle that redraws only when what it shows changes"""
+
+    def __init__(self, rect, font):
+        self.rect = pygame.Rect(rect)
+        self.font = font
+        self.value = None
+        self.dirty = True
+
+    def set(self, value) -> None:
+        if value != self.value:
+            self.value = value
+            self.dirty = True
+
+    def draw(self, surface) -> None:
+        raise NotImplementedError
+
+    def _text(self, surface, text: str, color, center) -> None:
+        image = self.font.render(text, True, color)
+        surface.blit(image, image.get_rect(center=center))
+
+
+class Bar(Widget):
+    """A filled bar with a "Caption: current/maximum" line"""
+
+    def __init__(self, rect, font, color=GREEN):
+        super().__init__(rect, font)
+        self.color = color
+
+    def set_level(self, current: float, maximum: float, caption: str, color=None) -> None:
+        # the value is what ends up on screen, so sub-pixel changes don't redraw
+        share = min(max(current / maximum, 0.0), 1.0) if maximum else 0.0
+        self.set((round(share * self.rect.width), f"{caption}: {round(current)}/{maximum}", color or self.color))
+
+    def draw(self, surface) -> None:
+        if self.value is None:
+            return
+        width, text, color = self.value
+        pygame.draw.rect(surface, DARK_GRAY, self.rect)
+        if width:
+            pygame.draw.rect(surface, color, (self.rect.x, self.rect.y, width, self.rect.height))
+        self._text(surface, text, WHITE, self.rect.center)
+
+
+class Label(Widget):
+    """Lines of text, top to bottom from the top-left corner (or centred)"""
+
+    def __init__(self, rect, font, color=WHITE, centered=False):
+        super().__init__(rect, font)
+        self.color = color
+        self.centered = centered
+
+    def draw(self, surface) -> None:
+        height = self.font.get_linesize()
+        for row, line in enumerate(self.value or ()):
+            image = self.font.render(line, True, self.color)
+            if self.centered:
+                place = image.get_rect(midtop=(self.rect.centerx, self.rect.y + row * height))
+            else:
+                place = (self.rect.x, self.rect.y + row * height)
+            surface.blit(image, place)
+
+
+class Button(Widget):
+    """One action button; the value is (name, available, hovered)"""
+
+    def __init__(self, rect, font, key: str, action: str):
+        super().__init__(rect, font)
+        self.key = key
+        self.action = action
+
+    def draw(self, surface) -> None:
+        name, available, hovered = self.value
+        if hovered and available:
+            pygame.draw.rect(surface, DARK_GRAY, self.rect)
+        pygame.draw.rect(surface, GREEN if available else GRAY, self.rect, 2)
+        color = WHITE if available else GRAY
+        self._text(surface, self.key.upper(), GOLD if available else GRAY, (self.rect.centerx, self.rect.y + 25))
+        self._text(surface, name, color, (self.rect.centerx, self.rect.y + 60))
+
+
+class BattleRenderer:
+    """
+    The battle screen on `screen` (a new display window by default). show()
+    takes a game server prompt or result; the setters below let a front-end
+    move single widgets between replies, e.g. to animate a health bar.
+    """
+
+    def __init__(self, screen: Optional[pygame.Surface] = None, size: Tuple[int, int] = WINDOW_SIZE):
+        pygame.display.init()
+        pygame.font.init()
+        if screen is None:
+            screen = pygame.display.set_mode(size)
+            pygame.display.set_caption("Turn-based RPG")
+        self.screen = screen
+        self.font = pygame.font.Font(None, 26)
+        self.large_font = pygame.font.Font(None, 36)
+        self.background = self._draw_background(screen.get_size())
+        self.names: Dict[str, Label] = {}
+        self.health: Dict[str, Bar] = {}
+        self.resources: Dict[str, Bar] = {}
+        self.effects: Dict[str, Label] = {}
+        self.cues: Dict[str, Label] = {}
+        half = HEALTH_AREA[2] // 2 - 20
+        for side, ((x, y, width, height), color) in ZONES.items():
+            health_x = HEALTH_AREA[0] if side == PLAYER else HEALTH_AREA[0] + HEALTH_AREA[2] - half
+            self.health[side] = Bar((health_x, HEALTH_AREA[1], half, HEALTH_AREA[3]), self.font)
+            self.names[side] = Label((x + 10, y + 40, width - 20, 36), self.large_font, color, centered=True)
+            self.effects[side] = Label((x + 10, y + 90, width - 20, height - 140), self.font)
+            self.cues[side] = Label((x + 10, y + height - 45, width - 20, 36), self.font, GOLD, centered=True)
+            self.resources[side] = Bar((x, y + height + 10, width, 22), self.font)
+        self.round = Label(ROUND_AREA, self.large_font, centered=True)
+        self.message = Label(MESSAGE_AREA, self.font, centered=True)
+        self.buttons: List[Button] = []
+        self._erase: List[pygame.Rect] = []   # rects of widgets that went away
+        self._full = True                      # the next draw repaints the whole window
+
+    def _draw_background(self, size) -> pygame.Surface:
+        background = pygame.Surface(size).convert()
+        background.fill(BLACK)
+        for side, (zone, color) in ZONES.items():
+            pygame.draw.rect(background, color, zone, 2)
+            caption = self.font.render("Player" if side == PLAYER else "Enemy", True, color)
+            background.blit(caption, (zone[0] + 10, zone[1] + 10))
+        pygame.draw.rect(background, GRAY, HEALTH_AREA, 2)
+        pygame.draw.rect(background, GREEN, ACTION_AREA, 2)
+        return background
+
+    def widgets(self) -> Iterator[Widget]:
+        for group in (self.names, self.health, self.resources, self.effects, self.cues):
+            yield from group.values()
+        yield self.round
+        yield self.message
+        yield from self.buttons
+
+    def show(self, reply: Dict[str, Any], bars: bool = True) -> None:
+        """Fills every widget from a prompt or result reply (bars=False leaves the bars to an animation)"""
+        self.show_side(PLAYER, reply["you"], bars)
+        self.show_side(ENEMY, reply["enemy"], bars)
+        if reply["type"] == "prompt":
+            self.round.set((f"Round {reply['round']}",))
+            self.set_actions(reply["actions"])
+        else:
+            outcome = {PLAYER: "Victory!", ENEMY: "Defeat"}.get(reply["winner"], "Draw")
+            self.round.set((f"{outcome} ({reply['rounds']} rounds)",))
+            self.set_actions(())
+        if reply.get("log"):
+            self.set_message(reply["log"])
+
+    def show_side(self, side: str, status: Dict[str, Any], bars: bool = True) -> None:
+        """One combatant, from a character_status() dict"""
+        self.names[side].set((status["class"].title(),))
+        if bars:
+            self.set_health(side, status["health"], status["max_health"])
+            self.set_resource(side, status["amount"], status["max_amount"], status["resource"])
+        lines = [f"{effect['effect'].replace('_', ' ')} ({effect['turns']})" for effect in status["effects"]]
+        self.effects[side].set((f"Items: {status['items']}", *lines))
+
+    def set_health(self, side: str, current: float, maximum: float) -> None:
+        share = current / maximum if maximum else 0.0
+        self.health[side].set_level(current, maximum, "Health", GREEN if share > 0.5 else GOLD if share > 0.25 else RED)
+
+    def set_resource(self, side: str, current: float, maximum: float, resource: str) -> None:
+        self.resources[side].set_level(current, maximum, resource.title(), RESOURCE_COLORS.get(resource, GRAY))
+
+    def set_cue(self, side: str, triggers: Sequence[str]) -> None:
+        """Animation triggers playing on a side, e.g. ("sword_swing", "critical_flash")"""
+        self.cues[side].set((" + ".join(trigger.replace("_", " ") for trigger in triggers),) if triggers else ())
+
+    def set_message(self, lines: Sequence[str]) -> None:
+        self.message.set(tuple(lines[-MESSAGE_LINES:]))
+
+    def set_actions(self, actions: Sequence[Dict[str, Any]]) -> None:
+        """Buttons for prompt actions ({"key", "action", "name", "available"})"""
+        layout = tuple((entry["key"], entry["action"]) for entry in actions)
+        if layout != tuple((button.key, button.action) for button in self.buttons):
+            self._erase.extend(button.rect for button in self.buttons)
+            x, y, width, height = ACTION_AREA
+            step = width // max(len(layout), 1)
+            self.buttons = [Button((x + index * step + 4, y + 4, step - 8, height - 8), self.font, key, action)
+                            for index, (key, action) in enumerate(layout)]
+        for button, entry in zip(self.buttons, actions):
+            hovered = bool(button.value and button.value[2])
+            button.set((entry["name"], entry["available"], hovered))
+
+    def disable_actions(self) -> None:
+        """Greys out every button, e.g. while a turn is being played"""
+        for button in self.buttons:
+            name, _, hovered = button.value
+            button.set((name, False, hovered))
+
+    def hover(self, position) -> None:
+        for button in self.buttons:
+            name, available, _ = button.value
+            button.set((name, available, button.rect.collidepoint(position)))
+
+    def button_at(self, position) -> Optional[str]:
+        """Action of the available button under `position`"""
+        for button in self.buttons:
+            if button.value[1] and button.rect.collidepoint(position):
+                return button.action
+        return None
+
+    def action_for_key(self, key: str) -> Optional[str]:
+        """Action of the available button whose menu key was typed"""
+        for button in self.buttons:
+            if button.value[1] and button.key == key.lower():
+                return button.action
+        return None
+
+    def invalidate(self) -> None:
+        """Repaints the whole window on the next draw (e.g. after an expose)"""
+        self._full = True
+
+    def draw(self) -> List[pygame.Rect]:
+        """Redraws what changed and pushes only those rects; returns them"""
+        screen = self.screen
+        full = self._full
+        if full:
+            screen.blit(self.background, (0, 0))
+        rects, self._erase = self._erase, []
+        for rect in rects:
+            screen.blit(self.background, rect, rect)
+        for widget in self.widgets():
+            if widget.dirty or full:
+                if not full:
+                    screen.blit(self.background, widget.rect, widget.rect)
+                # clipped, so nothing is left outside the rect the next redraw restores
+                screen.set_clip(widget.rect)
+                widget.draw(screen)
+                screen.set_clip(None)
+                widget.dirty = False
+                rects.append(widget.rect)
+        if full:
+            self._full = False
+            pygame.display.flip()
+            return [screen.get_rect()]
+        if rects:
+            pygame.display.update(rects)
+        return rects
+
+
+class FrameStats:
+    """Frame times, rects pushed per frame and the process's CPU share over a run"""
+
+    def __init__(self):
+        self.frame_times: List[float] = []
+        self.rects = 0
+        self.started = time.perf_counter()
+        self.cpu_started = time.process_time()
+
+    def frame(self, seconds: float, rects: int) -> None:
+        self.frame_times.append(seconds)
+        self.rects += rects
+
+    def report(self) -> Dict[str, float]:
+        wall = time.perf_counter() - self.started
+        cpu = time.process_time() - self.cpu_started   # every thread of the process
+        times = sorted(self.frame_times)
+        frames = len(times)
+        return {
+            "seconds": wall,
+            "frames": frames,
+            "fps": frames / wall if wall else 0.0,
+            "mean_ms": 1000 * sum(times) / frames if frames else 0.0,
+            "p95_ms": 1000 * times[min(frames - 1, int(frames * 0.95))] if frames else 0.0,
+            "max_ms": 1000 * times[-1] if frames else 0.0,
+            "rects_per_frame": self.rects / frames if frames else 0.0,
+            "cpu_percent": 100 * cpu / wall if wall else 0.0,
+        }
+
+
+def run_window(renderer: BattleRenderer, on_action: Optional[Callable[[str], None]] = None,
+               on_event: Optional[Callable[[pygame.event.Event], None]] = None,
+               on_frame: Optional[Callable[[], bool]] = None, fps: int = FPS,
+               seconds: Optional[float] = None, naive: bool = False,
+               stats: Optional[FrameStats] = None) -> None:
+    """
+    Runs the window until it's closed, Escape is pressed or `seconds` pass.
+    Clicking an available button or typing its key calls on_action(action);
+    on_event sees every other event. on_frame() runs before each draw and
+    returns True while it's animating, which keeps frames coming at `fps`.
+    """
+    clock = pygame.time.Clock()
+    deadline = None if seconds is None else time.perf_counter() + seconds
+    animating = False
+    while True:
+        started = time.perf_counter()
+        if on_frame is not None:
+            animating = on_frame()
+        if naive:
+            renderer.invalidate()
+        rects = renderer.draw()
+        if stats is not None and rects:
+            stats.frame(time.perf_counter() - started, len(rects))
+        if naive or animating:
+            clock.tick(fps)
+            events = pygame.event.get()
+        else:
+            # idle: sleep in SDL until something happens (or the measurement ends)
+            timeout = 0 if deadline is None else max(1, int((deadline - time.perf_counter()) * 1000))
+            events = [pygame.event.wait(timeout), *pygame.event.get()]
+        if deadline is not None and time.perf_counter() >= deadline:
+            return
+        for event in events:
+            action = None
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                return
+            elif event.type == pygame.MOUSEMOTION:
+                renderer.hover(event.pos)
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                action = renderer.button_at(event.pos)
+            elif event.type == pygame.KEYDOWN and event.unicode:
+                action = renderer.action_for_key(event.unicode)
+            elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                renderer.invalidate()
+            elif event.type != pygame.NOEVENT and on_event is not None:
+                on_event(event)
+            if action is not None and on_action is not None:
+                on_action(action)
@@ -0,0 +1,355 @@
+"""
+Game Server
+asyncio server hosting many independent battles over line-delimited JSON,
+on TCP or a Unix socket. One session per connection: the client picks a
+class, the server answers with a prompt listing the legal actions, and each
+action message plays the player's turn and the EnemyAI's reply.
+
+Battles advance through battle_loop.battle_steps, so the round structure is
+the one the CLI uses. Instead of input() the session awaits the client's next
+line, and instead of sleeping, pauses are measured on a per-session
+VirtualClock and turned into a non-blocking asyncio.sleep (pacing=0 skips
+them). Narration goes to a per-session CaptureSink that is emptied into each
+reply. Both are swapped in only around synchronous game code, never across an
+await, so sessions sharing the event loop never see each other's output.
+Each battle also rolls on its own BattleRNG streams, so sessions don't share
+dice either, and a client that sends a seed gets the same battle every time.
+BattleSession.snapshot() captures a battle between replies and resume()
+continues it, e.g. from a SnapshotLog after a restart.
+
+Client -> server, one JSON object per line:
+    {"type": "start", "class": "rogue", "enemy": "wizard", "seed": 7}   enemy (random) and seed optional
+    {"type": "action", "action": "special"}                 or {"type": "action", "key": "b"}
+    {"type": "quit"}
+Server -> client:
+    {"type": "hello", "classes": [...]}
+    {"type": "prompt", "round": 3, "you": {...}, "enemy": {...}, "actions": [...], "log": [...]}
+    {"type": "result", "winner": "player", "rounds": 7, "you": {...}, "enemy": {...}, "log": [...]}
+    {"type": "error", "message": "..."}
+"""
+import asyncio
+import contextlib
+import json
+from typing import Any, Dict, List, Optional, Type
+
+from ..character_classes import EnemyAI, CompiledEnemyAI
+from ..character_classes.output_sink import CaptureSink, output_to, narrate
+from ..character_classes.game_clock import VirtualClock, use_clock
+from ..character_classes.rng_streams import BattleRNG
+from ..simulation.headless_engine import CHARACTER_CLASSES
+from ..simulation.snapshot import BattleSnapshot, capture, restore
+from .battle_loop import BattleHooks, BattleResult, battle_steps, PLAYER, ENEMY
+
+MAX_LINE = 4096          # longest client message accepted (bytes)
+MAX_LOG_LINES = 200      # narration lines kept per reply; older lines are dropped
+DEFAULT_IDLE_TIMEOUT = 600.0
+BACKLOG = 1024           # pending connections; asyncio's default of 100 stalls bursts of clients
+
+
+class ProtocolError(Exception):
+    """A client message the session can't act on; reported back as an error reply"""
+
+
+def character_status(character) -> Dict[str, Any]:
+    """JSON-ready view of one combatant"""
+    stats = character.stats
+    return {
+        "class": stats.name,
+        "health": character.health,
+        "max_health": character.max_health,
+        "resource": stats.resource,
+        "amount": getattr(character, stats.resource),
+        "max_amount": stats.max_resource,
+        "items": character.item_count,
+        "effects": [{"effect": effect.effect_type.value, "turns": effect.duration}
+                    for effect in character.status_effects.active_effects],
+    }
+
+
+def action_menu(character) -> List[Dict[str, Any]]:
+    """The character's actions in menu order, as listed in a prompt"""
+    info = character.get_action_info()
+    return [{"key": entry.spec.key, "action": entry.action,
+             "name": info.get(entry.action, {}).get("name", entry.action),
+             "available": entry.allowed(character)}
+            for entry in character.actions]
+
+
+class BattleSession:
+    """
+    One connection's game: the player's character, its EnemyAI opponent and
+    the paused battle_steps generator. Holds nothing that grows with the
+    length of a battle.
+    """
+
+    def __init__(self, ai_class: Type[EnemyAI] = CompiledEnemyAI, pacing: float = 0.0,
+                 max_rounds: Optional[int] = None):
+        self.ai_class = ai_class
+        self.pacing = pacing
+        self.max_rounds = max_rounds
+        self.sink = CaptureSink()
+        self.player = None
+        self.enemy: Optional[EnemyAI] = None
+        self.rng: Optional[BattleRNG] = None
+        self.steps = None
+        self.round = 0
+        self.paused = 0.0   # game-time pauses owed since the last reply
+
+    @property
+    def in_battle(self) -> bool:
+        return self.steps is not None
+
+    @contextlib.contextmanager
+    def _game_code(self):
+        # Route narration and pauses to this session; callers never await inside
+        clock = VirtualClock()
+        with output_to(self.sink), use_clock(clock):
+            yield
+        self.paused += clock.now()
+
+    def start(self, class_name: str, enemy_name: Optional[str] = None,
+              seed: Optional[int] = None) -> Dict[str, Any]:
+        if self.in_battle:
+            raise ProtocolError("battle already in progress")
+        player_class = CHARACTER_CLASSES.get(class_name) if isinstance(class_name, str) else None
+        if player_class is None:
+            raise ProtocolError(f"unknown class {class_name!r}")
+        if seed is not None and (not isinstance(seed, int) or isinstance(seed, bool) or not 0 <= seed < 2 ** 63):
+            raise ProtocolError("seed must be a non-negative 64-bit integer")
+        rng = BattleRNG(seed)
+        if enemy_name in (None, "random"):
+            enemy_class = rng.stream("setup").choice(list(CHARACTER_CLASSES.values()))
+        else:
+            enemy_class = CHARACTER_CLASSES.get(enemy_name) if isinstance(enemy_name, str) else None
+            if enemy_class is None:
+                raise ProtocolError(f"unknown class {enemy_name!r}")
+        self.rng = rng
+        self.player = rng.equip(player_class(), PLAYER)
+        self.enemy = rng.equip_controller(self.ai_class(enemy_class), ENEMY)
+        self.round = 0
+        self.steps = battle_steps(self.player, self.enemy.character, _RoundCounter(self), self.max_rounds)
+        with self._game_code():
+            narrate("A wild {} appears!", enemy_class.stats.name.title())
+            return self._advance(next(self.steps))
+
+    def act(self, action: Optional[str] = None, key: Optional[str] = None) -> Dict[str, Any]:
+        if not self.in_battle:
+            raise ProtocolError("no battle in progress, send a start message")
+        player = self.player
+        if action is None and key is not None:
+            action = player.map_input_to_action(str(key).lower())
+        if not isinstance(action, str) or not player.validate_action(action):
+            raise ProtocolError(f"action {action if action is not None else key!r} is not available")
+        with self._game_code():
+            player.execute_action(action, self.enemy.character)
+            return self._send(action)
+
+    def snapshot(self) -> Optional[BattleSnapshot]:
+        """The battle as it stands between replies (player to move), None outside a battle"""
+        if not self.in_battle:
+            return None
+        return capture(self.player, self.enemy, self.rng, self.round, PLAYER, self.max_rounds)
+
+    def resume(self, snapshot: BattleSnapshot) -> Dict[str, Any]:
+        """Picks a snapshot()'s battle back up, e.g. after a restart, and returns the prompt"""
+        if self.in_battle:
+            raise ProtocolError("battle already in progress")
+        self.player, self.enemy, self.rng = restore(snapshot, self.ai_class)
+        self.max_rounds = snapshot.max_rounds
+        self.round = snapshot.round
+        self.steps = battle_steps(self.player, self.enemy.character, _RoundCounter(self), self.max_rounds,
+                                  snapshot.round, snapshot.to_move)
+        with self._game_code():
+            return self._advance(next(self.steps))
+
+    def _send(self, action: Optional[str]) -> Dict[str, Any]:
+        try:
+            side = self.steps.send(action)
+        except StopIteration as finished:
+            return self._finish(finished.value)
+        return self._advance(side)
+
+    def _advance(self, side: str) -> Dict[str, Any]:
+        """Plays enemy turns (and dry player turns) until the player must choose"""
+        try:
+            while True:
+                if side == PLAYER:
+                    if not self.player.ran_dry():
+                        return self._prompt()
+                    self.player.health = 0
+                    narrate("The wizard drops their staff and falls to the ground. They have ran out of mana, and died.")
+                    side = self.steps.send(None)
+                else:
+                    enemy = self.enemy
+                    if enemy.character.ran_dry():
+                        enemy.character.health = 0
+                    action = enemy.choose_action(self.player)
+                    enemy.execute_action(action, self.player)
+                    side = self.steps.send(action)
+        except StopIteration as finished:
+            return self._finish(finished.value)
+
+    def _prompt(self) -> Dict[str, Any]:
+        player = self.player
+        return {"type": "prompt", "round": self.round, "you": character_status(player),
+                "enemy": character_status(self.enemy.character), "actions": action_menu(player)}
+
+    def _finish(self, result: BattleResult) -> Dict[str, Any]:
+        self.steps = None
+        return {"type": "result", "winner": result.winner, "rounds": result.rounds,
+                "you": character_status(self.player), "enemy": character_status(self.enemy.character)}
+
+    def drain_log(self) -> List[str]:
+        """Narration since the last reply, capped at MAX_LOG_LINES"""
+        lines = self.sink.lines[-MAX_LOG_LINES:]
+        self.sink.clear()
+        return lines
+
+    def take_pause(self) -> float:
+        """Real seconds to wait before replying, then resets the owed pauses"""
+        seconds, self.paused = self.paused * self.pacing, 0.0
+        return seconds
+
+    def handle(self, message: Any) -> Optional[Dict[str, Any]]:
+        """Applies one client message; returns the reply, or None when the client quits"""
+        if not isinstance(message, dict):
+            raise ProtocolError("messages must be JSON objects")
+        kind = message.get("type")
+        if kind == "start":
+            return self.start(message.get("class"), message.get("enemy"), message.get("seed"))
+        if kind == "action":
+            return self.act(message.get("action"), message.get("key"))
+        if kind == "quit":
+            return None
+        raise ProtocolError(f"unknown message type {kind!r}")
+
+
+class _RoundCounter(BattleHooks):
+    """Tracks the round number for prompts"""
+
+    def __init__(self, session: BattleSession):
+        self.session = session
+
+    def round_started(self, round_number, player, enemy):
+        self.session.round = round_number
+
+
+class GameServer:
+    """
+    Accepts connections and runs one BattleSession per connection.
+    `max_sessions` caps concurrent connections; idle clients are dropped
+    after `idle_timeout` seconds without a message.
+    """
+
+    def __init__(self, ai_class: Type[EnemyAI] = CompiledEnemyAI, pacing: float = 0.0,
+                 max_sessions: int = 10000, idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+                 max_rounds: Optional[int] = None):
+        self.ai_class = ai_class
+        self.pacing = pacing
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.max_rounds = max_rounds
+        self.sessions = 0
+        self.battles_finished = 0
+        self.server: Optional[asyncio.AbstractServer] = None
+        self._clients: Dict[asyncio.StreamWriter, asyncio.Task] = {}
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0, path: Optional[str] = None):
+        """Listens on a Unix socket at `path`, or TCP host:port (port 0 picks a free one)"""
+        if path is not None:
+            self.server = await asyncio.start_unix_server(self.handle_client, path=path, limit=MAX_LINE,
+                                                            backlog=BACKLOG)
+        else:
+            self.server = await asyncio.start_server(self.handle_client, host, port, limit=MAX_LINE,
+                                                       backlog=BACKLOG)
+        return self.server
+
+    @property
+    def address(self):
+        return self.server.sockets[0].getsockname()
+
+    async def serve_forever(self) -> None:
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self) -> None:
+        """Stops listening and ends every open session"""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        # closing the transports makes each pending readline() see EOF, so handlers finish normally
+        clients = list(self._clients.items())
+        for writer, _ in clients:
+            writer.close()
+        await asyncio.gather(*(task for _, task in clients), return_exceptions=True)
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        if self.sessions >= self.max_sessions:
+            await self._reply(writer, {"type": "error", "message": "server full"})
+            writer.close()
+            return
+        self.sessions += 1
+        self._clients[writer] = asyncio.current_task()
+        session = BattleSession(self.ai_class, self.pacing, self.max_rounds)
+        try:
+            await self._reply(writer, {"type": "hello", "classes": sorted(CHARACTER_CLASSES)})
+            while True:
+                try:
+                    line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    await self._reply(writer, {"type": "error", "message": "idle timeout"})
+                    break
+                except ValueError:
+                    # longer than MAX_LINE: the stream can't be resynchronised
+                    await self._reply(writer, {"type": "error", "message": "message too long"})
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    reply = session.handle(json.loads(line))
+                except (ProtocolError, ValueError) as error:
+                    reply = {"type": "error", "message": str(error)}
+                if reply is None:
+                    break
+                if reply["type"] == "result":
+                    self.battles_finished += 1
+                pause = session.take_pause()
+                if pause > 0:
+                    await asyncio.sleep(pause)
+                if reply["type"] != "error":
+                    reply["log"] = session.drain_log()
+                await self._reply(writer, reply)
+        except ConnectionError:
+            pass
+        finally:
+            self.sessions -= 1
+            self._clients.pop(writer, None)
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    @staticmethod
+    async def _reply(writer: asyncio.StreamWriter, message: Dict[str, Any]) -> None:
+        writer.write(json.dumps(message).encode() + b"\n")
+        await writer.drain()
+
+
+def parse_address(address: str) -> Dict[str, Any]:
+    """'unix:/path', 'host:port' or 'port' -> GameServer.start keyword arguments"""
+    if address.startswith("unix:"):
+        return {"path": address[len("unix:"):]}
+    host, _, port = address.rpartition(":")
+    return {"host": host or "127.0.0.1", "port": int(port)}
+
+
+def serve(address: str, **options) -> None:
+    """Blocking entry point used by the CLI's --serve"""
+    async def main():
+        server = GameServer(**options)
+        await server.start(**parse_address(address))
+        narrate("Serving battles on {}", address)
+        await server.serve_forever()
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(main())
@@ -1,24 +1,38 @@
 
 "turnbased_game"
+import sys
 # Support both direct execution and module execution
 try:
     # When run as module: python -m projects.turnbased_game.main_gameloop.main_game_loop
     from projects.turnbased_game.character_classes import Warrior, Rogue, Wizard, EnemyAI
 except ImportError:
     # When run directly: python main_game_loop.py
-    import sys
     import os
     sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
     from projects.turnbased_game.character_classes import Warrior, Rogue, Wizard, EnemyAI
+from projects.turnbased_game.main_gameloop.battle_loop import BattleHooks, MultiHooks, run_battle, PLAYER, ENEMY
+from projects.turnbased_game.simulation import CHARACTER_CLASSES, simulate_batch, run_matchup_matrix
+from projects.turnbased_game.simulation.tournament import POLICIES, RATING_SYSTEMS, Tournament, entrants_for
+from projects.turnbased_game.simulation.ai_optimizer import ThresholdOptimizer
+from projects.turnbased_game.simulation.balance_tuner import KNOBS, BalanceTuner, format_cells
+from projects.turnbased_game.simulation.replay import ReplayHooks, ReplayWriter
+from projects.turnbased_game.character_classes.combat_events import combat_events, log_event
+from projects.turnbased_game.character_classes.output_sink import narrate
+from projects.turnbased_game.character_classes.game_clock import CLOCKS, GameClock, get_game_clock, pause, use_clock
+from projects.turnbased_game.character_classes.ai_policy import CompiledEnemyAI, decisions_per_second
+from projects.turnbased_game.character_classes.status_effect_manager import effect_turns_per_second
+import argparse
+import logging
+import os
 import random
-import pygame
 import time
+import pygame
 
 # Choosing player class -------------------------------------------------------------
 def choose_class():
-    print("\n" + "🗡️" + "="*50 + "🗡️")
-    print("           🎭 CHARACTER SELECTION 🎭")
-    print("🗡️" + "="*50 + "🗡️")
+    narrate("\n" + "🗡️" + "="*50 + "🗡️")
+    narrate("           🎭 CHARACTER SELECTION 🎭")
+    narrate("🗡️" + "="*50 + "🗡️")
     
     while True:
         char_choice = input("""\n🎯 Choose your class A/B/C: 
@@ -29,61 +43,64 @@ def choose_class():
 Enter your choice: """).lower()
         if char_choice == "a":
             player = Warrior()
-            print("\n✅ Class chosen: ⚔️ Warrior")
+            narrate("\n✅ Class chosen: ⚔️ Warrior")
             break
         elif char_choice == "b":
             player = Rogue()
-            print("\n✅ Class chosen: 🗡️ Rogue")
+            narrate("\n✅ Class chosen: 🗡️ Rogue")
             break
         elif char_choice == "c":
             player = Wizard()
-            print("\n✅ Class chosen: 🧙 Wizard")
+            narrate("\n✅ Class chosen: 🧙 Wizard")
             break
         else:
-            print("\n❌ Incorrect input. Please try again.")
+            narrate("\n❌ Incorrect input. Please try again.")
     return player
 
 # Creating enemy -------------------------------------------------------------------------
-def enemy_class():
+def enemy_class(ai_class=EnemyAI):
     enemy_choice = random.choice(["warrior", "rogue", "wizard"])
     if enemy_choice == "warrior":
-        enemy_ai = EnemyAI(Warrior)
+        enemy_ai = ai_class(Warrior)
         enemy_icon = "⚔️"
     elif enemy_choice == "rogue":
-        enemy_ai = EnemyAI(Rogue)
+        enemy_ai = ai_class(Rogue)
         enemy_icon = "🗡️"
     elif enemy_choice == "wizard":
-        enemy_ai = EnemyAI(Wizard)
+        enemy_ai = ai_class(Wizard)
         enemy_icon = "🧙"
     
-    print(f"\n🎯 Enemy has chosen a class: {enemy_icon} {enemy_choice.upper()}")
+    narrate("\n🎯 Enemy has chosen a class: {} {}", enemy_icon, enemy_choice.upper())
     return enemy_ai
 # Status Check
 def gl_print_status(player, enemy):
     player.print_status()
-    time.sleep(1)
+    pause(1)
     enemy.character.print_status(is_enemy=True)
 
 # In turnbased_game.py - add turn processing
 def process_turn_start(character):
     """Process status effects at turn start"""
     turn_results = character.process_turn_start()
-    
-    # Display results to player with better formatting
+    print_turn_effects(turn_results)
+    return turn_results
+
+def print_turn_effects(turn_results):
+    """Display status effect results to player with better formatting"""
     if turn_results.get('effects_processed'):
-        print(f"✨ Active effects: {', '.join(turn_results['effects_processed'])}")
+        narrate("✨ Active effects: {}", ', '.join(turn_results['effects_processed']))
     
     if turn_results.get('effects_expired'):
-        print(f"⏰ Effects expired: {', '.join(turn_results['effects_expired'])}")
+        narrate("⏰ Effects expired: {}", ', '.join(turn_results['effects_expired']))
     
     if turn_results.get('maintenance_failures'):
-        print(f"🔋 Effects lost due to insufficient resources!")
+        narrate("🔋 Effects lost due to insufficient resources!")
 
 # In attack processing - add dodge and damage modification
 def process_attack(self, attacker, target):
     # Check for dodge first
     if target.status_effects.apply_dodge_check(target):
-        print("Attack dodged!")
+        narrate("Attack dodged!")
         return
     
     # Calculate base damage
@@ -95,12 +112,12 @@ def process_attack(self, attacker, target):
     # Apply damage and show effects
     target.health -= final_damage
     if effect_details:
-        print(f"Status effects: {effect_details}")
+        narrate("Status effects: {}", effect_details)
 
 def attack_with_status_effects(self, enemy, is_enemy=False):
     # Check for dodge first
     if hasattr(enemy, 'status_effects') and enemy.status_effects.apply_dodge_check(enemy):
-        print("Attack dodged!")
+        narrate("Attack dodged!")
         return
     
     # Calculate base damage using existing method
@@ -110,49 +127,310 @@ def attack_with_status_effects(self, enemy, is_enemy=False):
     if hasattr(enemy, 'status_effects'):
         final_damage, effect_details = enemy.status_effects.apply_damage_modification(enemy, dmg)
         if effect_details:
-            print(f"Status effects: {effect_details}")
+            narrate("Status effects: {}", effect_details)
     else:
         final_damage = dmg
     
     # Apply final damage
     enemy.health -= final_damage
 
-# Game Loop
+# Game Loop -------------------------------------------------------------------------------
+class ConsoleBattleHooks(BattleHooks):
+    """Banners and pacing for the interactive CLI game"""
+    def round_started(self, round_number, player, enemy):
+        narrate("\n" + "🔄" + "="*48 + "🔄")
+        narrate("           🌟 NEW ROUND BEGINS 🌟")
+        narrate("🔄" + "="*48 + "🔄")
+
+    def effects_processed(self, side, character, results):
+        print_turn_effects(results)
+
+    def turn_started(self, side, player, enemy):
+        if side == ENEMY:
+            narrate("\n" + "⚔️" + "="*20 + " ENEMY TURN " + "="*20 + "⚔️")
+
+    def turn_finished(self, side, action, player, enemy):
+        if side == PLAYER:
+            pause(1)
+
+    def battle_finished(self, result):
+        if result.winner == PLAYER:
+            narrate("\n" + "🎉" + "="*40 + "🎉")
+            narrate("🏆 Your opponent has been slain. You are victorious! 🏆")
+            narrate("🎉" + "="*40 + "🎉")
+        elif result.winner == ENEMY:
+            narrate("\n" + "💀" + "="*30 + "💀")
+            narrate("☠️  You have been slain. ☠️")
+            narrate("💀" + "="*30 + "💀")
+        narrate("\n" + "🎮" + "="*20 + " GAME OVER " + "="*20 + "🎮")
+
+
+def enemy_ai_class(name):
+    """EnemyAI implementation for --enemy-ai"""
+    if name == "search":
+        from projects.turnbased_game.simulation.search_ai import SearchEnemyAI
+        return SearchEnemyAI
+    if name == "compiled":
+        return CompiledEnemyAI
+    return EnemyAI
+
+
+def play(ai_class=EnemyAI, replay=None, clock: GameClock = None):
+    """Interactive CLI game: choose a class and fight a random enemy, paced by `clock`"""
+    with use_clock(clock or get_game_clock()):
+        player = choose_class()
+        enemy = enemy_class(ai_class)
+        return run_battle(player, enemy.character,
+                          player_turn=lambda character, opponent: character.take_turn(opponent),
+                          enemy_turn=lambda character, opponent: enemy.take_turn(opponent),
+                          hooks=MultiHooks(ConsoleBattleHooks(), replay and ReplayHooks(replay)))
+
+
+def play_in_window(player_name, enemy_name, ai_class=EnemyAI):
+    """pygame battle: the game logic on its own thread, the window animating what it reports"""
+    from projects.turnbased_game.main_gameloop.pygame_frontend import play_window
+    classes = list(CHARACTER_CLASSES.values())
+    player_cls = CHARACTER_CLASSES.get(player_name) or random.choice(classes)
+    enemy_cls = CHARACTER_CLASSES.get(enemy_name) or random.choice(classes)
+    result = play_window(player_cls, enemy_cls, ai_class=ai_class)
+    if result is not None:
+        narrate("Winner: {} after {} rounds", result["winner"], result["rounds"])
+    return result
+
+
+def run_simulation(battles, player_name, enemy_name, seed, engine="object", ai_class=EnemyAI, replay=None,
+                   block_rng=False):
+    """Headless batch run; prints a one-line throughput report"""
+    player_cls = CHARACTER_CLASSES.get(player_name)
+    enemy_cls = CHARACTER_CLASSES.get(enemy_name)
+    if engine == "vector":
+        # NumPy is an optional extra, so only import the kernel when asked for
+        from projects.turnbased_game.simulation.vector_kernel import simulate_vectorized
+        summary = simulate_vectorized(battles, player_cls, enemy_cls, seed=seed)
+    else:
+        summary = simulate_batch(battles, player_cls, enemy_cls, seed=seed, enemy_ai=ai_class, replay=replay,
+                                 block_rng=block_rng)
+    narrate("Simulated {} battles ({} vs {}, seed {}) in {:.2f}s -> {:,.0f} battles/sec",
+            summary.battles, player_name, enemy_name, seed, summary.elapsed, summary.battles_per_second)
+    narrate("   Player wins: {} ({:.1%}) | Enemy wins: {} | Draws: {} | Avg rounds: {:.1f}",
+            summary.player_wins, summary.player_win_rate, summary.enemy_wins, summary.draws,
+            summary.average_rounds)
+    return summary
+
+
+# --pacing for --serve: seconds actually waited per second of game pause, taken from the CLI's clocks
+PACING_SCALES = {name: make_clock().scale for name, make_clock in CLOCKS.items()}
+
+
+def run_ai_benchmark(decisions, seed):
+    """choose_action throughput of the rule cascade against the compiled policy table"""
+    narrate("EnemyAI decisions/sec over {} decisions (seed {})", decisions, seed)
+    narrate("{:<10}{:>14}{:>14}{:>10}", "class", "rules", "compiled", "speedup")
+    for name, cls in sorted(CHARACTER_CLASSES.items()):
+        rules = decisions_per_second(EnemyAI, cls, decisions, seed)
+        compiled = decisions_per_second(CompiledEnemyAI, cls, decisions, seed)
+        narrate("{:<10}{:>14,.0f}{:>14,.0f}{:>9.1f}x", name, rules, compiled, compiled / rules)
+
+
+def run_effects_benchmark(effects, seed, turns=10_000):
+    """process_turn_effects throughput with passive and ticking effect stacks"""
+    narrate("Status effect turns/sec with {} stacked effects (seed {})", effects, seed)
+    narrate("{:<10}{:>14}{:>14}", "effects", "turns/sec", "us/turn")
+    for label, ticking in (("passive", False), ("ticking", True)):
+        rate = effect_turns_per_second(effects, turns, seed, ticking)
+        narrate("{:<10}{:>14,.0f}{:>14.2f}", label, rate, 1e6 / rate)
+
+
+def run_matrix(battles, seed, workers):
+    """Full class-vs-class win-rate matrix across a process pool"""
+    matrix = run_matchup_matrix(battles, seed=seed, workers=workers)
+    narrate("Simulated {} battles on {} worker(s) in {:.2f}s -> {:,.0f} battles/sec",
+            matrix.total_battles, matrix.workers, matrix.elapsed, matrix.total_battles / matrix.elapsed)
+    narrate("Player win rate [95% CI]")
+    narrate(matrix.format_table())
+    return matrix
+
+
+def run_tournament(format, policies, battles_per_match, rounds, rating, seed, workers, checkpoint=None):
+    """Policy-vs-policy tournament; picks up where a checkpoint file left off when it exists"""
+    if checkpoint and os.path.exists(checkpoint):
+        tournament = Tournament.resume(checkpoint)
+        narrate("Resuming from {}: {} of {} matches already played", checkpoint,
+                tournament.applied, len(tournament.matches))
+    else:
+        tournament = Tournament(entrants_for(policies), format=format, rounds=rounds,
+                                battles_per_match=battles_per_match, seed=seed, rating=rating,
+                                checkpoint=checkpoint)
+
+    def report(tournament, number):
+        _, first, second = tournament.matches[number]
+        if second is None:
+            narrate("[{}/{}] {} has a bye", number + 1, len(tournament.matches), first)
+        else:
+            result = tournament.results[number]
+            narrate("[{}/{}] {} {}-{}-{} {}", number + 1, len(tournament.matches), first,
+                    result.wins, result.draws, result.losses, second)
+    start_time = time.perf_counter()
+    tournament.run(workers=workers, on_result=report)
+    narrate("{} tournament finished in {:.2f}s", tournament.config["format"], time.perf_counter() - start_time)
+    narrate(tournament.format_table())
+    return tournament
+
+
+def run_optimizer(class_name, generations, population, battles, seed, workers):
+    """Evolves EnemyAI thresholds for one class and prints them next to the hand-picked ones"""
+    optimizer = ThresholdOptimizer(CHARACTER_CLASSES[class_name], population=population, battles=battles,
+                                   seed=seed, workers=workers)
+
+    def report(generation):
+        narrate("generation {:>3}: best {:.3f} | mean {:.3f} | hand-picked {:.3f}", generation.number,
+                generation.best_fitness, generation.mean_fitness, generation.baseline_fitness)
+    result = optimizer.run(generations, callback=report)
+    narrate("Scored {} candidates ({} cached) over {:,} battles in {:.2f}s", result.evaluations,
+            result.cache_hits, result.battles, result.elapsed)
+    narrate("Enemy {} score on held-out battles: tuned {:.3f} vs hand-picked {:.3f}", class_name,
+            result.best_fitness, result.baseline_fitness)
+    for name, tuned, default in zip(result.parameters, result.best, result.baseline):
+        narrate("   {:<18}{:>8} (was {})", name, tuned, default)
+    return result
+
+
+def run_balance(target, tolerance, knobs, engine, seed, workers, output=None):
+    """Tunes class stats until every class pair is even at `target` and prints the scale factors"""
+    tuner = BalanceTuner(target=target, tolerance=tolerance, knobs=knobs, seed=seed, engine=engine, workers=workers)
+
+    def report(step):
+        rates = "  ".join(f"{first} vs {second} {cell.win_rate:.1%}" for (first, second), cell in step.cells.items())
+        narrate("iteration {:>2} ({} battles per seat): {} -> {}", step.iteration, step.battles, rates, step.action)
+    result = tuner.run(callback=report)
+    narrate("{} after {} iterations in {:.2f}s", "Confirmed" if result.confirmed else "Not confirmed",
+            len(result.steps), result.elapsed)
+    narrate(format_cells(result.steps[-1].cells, tuner.targets))
+    for name, factor in result.factors().items():
+        narrate("   {:<8} x{:.3f} ({})", name, factor, ", ".join(knobs))
+    if output:
+        result.save(output)
+        narrate("Tuned class data written to {}", output)
+    return result
+
+
+def main(argv=None):
+    """Console entry point (`turnbased-game`). Plays interactively unless --simulate is given."""
+    class_choices = sorted(CHARACTER_CLASSES) + ["random"]
+    parser = argparse.ArgumentParser(prog="turnbased-game", description="Turn-based RPG")
+    parser.add_argument("--simulate", type=int, metavar="N",
+                        help="run N headless AI-vs-AI battles and report battles/sec")
+    parser.add_argument("--engine", choices=["object", "vector"], default="object",
+                        help="--simulate backend: character objects or the NumPy batch kernel")
+    parser.add_argument("--block-rng", action="store_true",
+                        help="--simulate with rolls pre-drawn by NumPy in blocks instead of seeding each battle's streams")
+    parser.add_argument("--matrix", type=int, metavar="N",
+                        help="run N battles for every class pairing and print the win-rate matrix")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes for --matrix/--tournament/--optimize-ai/--balance (default: all cores)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="base seed for --simulate/--matrix/--tournament/--optimize-ai/--balance")
+    parser.add_argument("--player", choices=class_choices, default="random",
+                        help="player class for --simulate/--window")
+    parser.add_argument("--enemy", choices=class_choices, default="random",
+                        help="enemy class for --simulate/--window")
+    parser.add_argument("--window", action="store_true",
+                        help="play in a pygame window instead of the console")
+    parser.add_argument("--enemy-ai", choices=["rules", "compiled", "search"], default="rules",
+                        help="enemy decision making: the rule cascade, the same rules as a precompiled "
+                             "decision table, or time-bounded expectimax search")
+    parser.add_argument("--benchmark-ai", type=int, metavar="N",
+                        help="time N EnemyAI decisions per class with the rule cascade and the compiled table")
+    parser.add_argument("--benchmark-effects", type=int, metavar="N",
+                        help="time status effect turns with N stacked effects on one character")
+    parser.add_argument("--log-events", action="store_true",
+                        help="log every combat event (damage, crits, dodges, resources, effects) to stderr")
+    parser.add_argument("--pacing", choices=sorted(CLOCKS), default="real",
+                        help="pauses between turns when playing: real seconds, a quarter of that, or none")
+    parser.add_argument("--serve", metavar="ADDRESS",
+                        help="host battles for network clients on HOST:PORT or unix:PATH "
+                             "(line-delimited JSON, paced by --pacing)")
+    parser.add_argument("--tournament", choices=["round-robin", "swiss"],
+                        help="rank AI policies playing every class against each other, with Elo/Glicko ratings")
+    parser.add_argument("--policies", default="random,rules,search",
+                        help=f"comma-separated --tournament policies from {', '.join(sorted(POLICIES))}")
+    parser.add_argument("--match-battles", type=int, default=20,
+                        help="battles per --tournament match, played in side-swapped pairs")
+    parser.add_argument("--rounds", type=int, default=None,
+                        help="Swiss rounds (default log2 of the field) or round-robin cycles (default 1)")
+    parser.add_argument("--rating", choices=sorted(RATING_SYSTEMS), default="elo",
+                        help="--tournament rating system")
+    parser.add_argument("--checkpoint", metavar="FILE",
+                        help="save --tournament progress to FILE, resuming from it if it already exists")
+    parser.add_argument("--optimize-ai", choices=sorted(CHARACTER_CLASSES), metavar="CLASS",
+                        help="evolve EnemyAI thresholds for CLASS with a genetic algorithm")
+    parser.add_argument("--generations", type=int, default=10, help="--optimize-ai generations")
+    parser.add_argument("--population", type=int, default=16, help="--optimize-ai candidates per generation")
+    parser.add_argument("--optimize-battles", type=int, default=200,
+                        help="--optimize-ai battles per candidate against each player class")
+    parser.add_argument("--balance", action="store_true",
+                        help="scale class stats until every class pair wins --target of its battles "
+                             "(uses --engine, --seed and --workers)")
+    parser.add_argument("--target", type=float, default=0.5, help="--balance win rate for each class pair")
+    parser.add_argument("--tolerance", type=float, default=0.03,
+                        help="--balance stops once every 95%% interval is within target +/- this")
+    parser.add_argument("--balance-knobs", default="health,damage",
+                        help=f"comma-separated stat groups --balance may scale, from {', '.join(KNOBS)}")
+    parser.add_argument("--balance-out", metavar="FILE", help="write the --balance class data to FILE")
+    parser.add_argument("--record", metavar="FILE",
+                        help="append played or --simulate battles to a binary replay file")
+    args = parser.parse_args(argv)
+    if args.engine == "vector" and "random" in (args.player, args.enemy) and not args.balance:
+        parser.error("--engine vector needs explicit --player and --enemy classes")
+    if args.record and (args.engine == "vector" or args.matrix is not None):
+        parser.error("--record is only available for play and --simulate with the object engine")
+    if args.enemy_ai != "rules" and (args.engine == "vector" or args.matrix is not None):
+        parser.error(f"--enemy-ai {args.enemy_ai} is only available for play and --simulate with the object engine")
+    unknown = set(args.policies.split(",")) - set(POLICIES)
+    if args.tournament and unknown:
+        parser.error(f"unknown --policies {', '.join(sorted(unknown))}")
+    unknown = set(args.balance_knobs.split(",")) - set(KNOBS)
+    if args.balance and unknown:
+        parser.error(f"unknown --balance-knobs {', '.join(sorted(unknown))}")
+    ai_class = enemy_ai_class(args.enemy_ai)
+    if args.log_events:
+        logging.basicConfig(level=logging.DEBUG, format="%(name)s: %(message)s")
+        combat_events.subscribe(log_event)
+
+    replay = ReplayWriter(args.record) if args.record else None
+    try:
+        if args.serve is not None:
+            from projects.turnbased_game.main_gameloop.game_server import serve
+            serve(args.serve, ai_class=ai_class, pacing=PACING_SCALES[args.pacing])
+        elif args.benchmark_ai is not None:
+            run_ai_benchmark(args.benchmark_ai, args.seed)
+        elif args.benchmark_effects is not None:
+            run_effects_benchmark(args.benchmark_effects, args.seed)
+        elif args.optimize_ai is not None:
+            run_optimizer(args.optimize_ai, args.generations, args.population, args.optimize_battles,
+                          args.seed, args.workers)
+        elif args.balance:
+            run_balance(args.target, args.tolerance, args.balance_knobs.split(","), args.engine, args.seed,
+                        args.workers, args.balance_out)
+        elif args.tournament is not None:
+            run_tournament(args.tournament, args.policies.split(","), args.match_battles, args.rounds,
+                           args.rating, args.seed, args.workers, args.checkpoint)
+        elif args.matrix is not None:
+            run_matrix(args.matrix, args.seed, args.workers)
+        elif args.simulate is not None:
+            run_simulation(args.simulate, args.player, args.enemy, args.seed, args.engine, ai_class, replay,
+                           args.block_rng)
+        elif args.window:
+            play_in_window(args.player, args.enemy, ai_class)
+        else:
+            play(ai_class, replay, CLOCKS[args.pacing]())
+    finally:
+        if replay:
+            replay.close()
+    return 0
+
+
 # The following block ensures that interactive code only runs when this file is executed directly,
 # not when imported (e.g., during testing with pytest).
 if __name__ == "__main__":
-    # Start the game by choosing player and enemy classes
-    player = choose_class()
-    enemy = enemy_class()
-
-    # Main game loop
-    while player.health > 0 and enemy.character.health > 0:
-        print("\n" + "🔄" + "="*48 + "🔄")
-        print("           🌟 NEW ROUND BEGINS 🌟")
-        print("🔄" + "="*48 + "🔄")
-        
-        # Process status effects at the start of the round
-        process_turn_start(player)
-        process_turn_start(enemy.character)
-        
-        # Player's turn
-        player.take_turn(enemy.character)
-        
-        time.sleep(1)
-        if enemy.character.health <= 0:
-            print("\n" + "🎉" + "="*40 + "🎉")
-            print("🏆 Your opponent has been slain. You are victorious! 🏆")
-            print("🎉" + "="*40 + "🎉")
-            break
-            
-        # Enemy's turn (random action)
-        print("\n" + "⚔️" + "="*20 + " ENEMY TURN " + "="*20 + "⚔️")
-        enemy.take_turn(player)
-        
-        if player.health <= 0:
-            print("\n" + "💀" + "="*30 + "💀")
-            print("☠️  You have been slain. ☠️")
-            print("💀" + "="*30 + "💀")
-            break
-            
-    print("\n" + "🎮" + "="*20 + " GAME OVER " + "="*20 + "🎮")
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,266 @@
+"""
+Pygame Front-End
+A battle against the EnemyAI in a pygame window, with the game logic on a
+thread of its own. BattleWorker plays battle_steps on that thread: it waits
+on `actions` for the player's choice, lets the EnemyAI think, performs every
+action through action_result() and puts plain records on `records` (status
+effect ticks, action results, prompts and the final result), each carrying
+both sides' character_status() afterwards and the narration it produced. It
+posts RECORD_READY so an idle window wakes up.
+
+The render thread never touches the characters. AnimationScheduler plays the
+records in order on a fixed timestep: a record starts its animation and
+sound cues, then the health and resource bars slide from what's on screen
+to the record's numbers over ANIMATION_SECONDS whatever the frame rate, and
+the next record starts when that finishes. A slow AI move or turn only
+delays the next record, so the window keeps drawing and the bars never jump.
+"""
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple, Type
+
+import pygame
+
+from ..character_classes import CompiledEnemyAI, EnemyAI
+from ..character_classes.output_sink import CaptureSink, narrate, output_to
+from ..character_classes.game_clock import VirtualClock, use_clock
+from ..character_classes.rng_streams import BattleRNG
+from .battle_loop import BattleHooks, battle_steps, PLAYER, ENEMY
+from .battle_renderer import FPS, BattleRenderer, FrameStats, run_window
+from .game_server import action_menu, character_status
+
+RECORD_READY = pygame.event.custom_type()   # posted by the logic thread for each record
+STEP = 1 / 120               # animation timestep in seconds
+ANIMATION_SECONDS = 0.6      # bar slide per record
+MAX_LAG = 0.25               # real time one frame may catch up on after a stall
+
+
+class _Quit(Exception):
+    """The window closed while the battle waited for the player"""
+
+
+class _RecordHooks(BattleHooks):
+    def __init__(self, worker: "BattleWorker"):
+        self.worker = worker
+
+    def round_started(self, round_number, player, enemy):
+        self.worker.round = round_number
+
+    def effects_processed(self, side, character, results):
+        if results.get("effects_processed") or results.get("health_change"):
+            self.worker.put("effects", side=side, health_change=results.get("health_change", 0),
+                            expired=results.get("effects_expired", []))
+
+
+class BattleWorker(threading.Thread):
+    """The battle, played on a daemon thread; choose() feeds it the player's actions"""
+
+    def __init__(self, player_class, enemy_class, seed: Optional[int] = None,
+                 ai_class: Type[EnemyAI] = CompiledEnemyAI, notify: Optional[Callable[[], None]] = None):
+        super().__init__(name="battle-logic", daemon=True)
+        rng = BattleRNG(seed)
+        self.player = rng.equip(player_class(), PLAYER)
+        self.enemy = rng.equip_controller(ai_class(enemy_class), ENEMY)
+        self.records: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self.actions: "queue.Queue[Optional[str]]" = queue.Queue()
+        self.notify = notify if notify is not None else _post_record_ready
+        self.sink = CaptureSink()
+        self.round = 0
+
+    def choose(self, action: str) -> None:
+        self.actions.put(action)
+
+    def stop(self) -> None:
+        self.actions.put(None)
+
+    def put(self, kind: str, **fields) -> None:
+        record = {"type": kind, **fields, "you": character_status(self.player),
+                  "enemy": character_status(self.enemy.character), "log": self.sink.lines}
+        self.sink.clear()
+        self.records.put(record)
+        self.notify()
+
+    def run(self) -> None:
+        # narration is captured into the records and pauses cost nothing: the animations pace the battle
+        with output_to(self.sink), use_clock(VirtualClock()):
+            player, enemy = self.player, self.enemy.character
+            narrate("A wild {} appears!", enemy.stats.name.title())
+            steps = battle_steps(player, enemy, _RecordHooks(self))
+            try:
+                side = next(steps)
+                while True:
+                    side = steps.send(self._player_turn() if side == PLAYER else self._enemy_turn())
+            except StopIteration as finished:
+                result = finished.value
+                self.put("result", winner=result.winner, rounds=result.rounds)
+            except _Quit:
+                pass
+
+    def _player_turn(self) -> Optional[str]:
+        player, enemy = self.player, self.enemy.character
+        if player.ran_dry():
+            player.health = 0
+            narrate("The wizard drops their staff and falls to the ground. They have ran out of mana, and died.")
+            return None
+        while True:
+            self.put("prompt", round=self.round, actions=action_menu(player))
+            action = self.actions.get()
+            if action is None:
+                raise _Quit
+            if player.validate_action(action):
+                break
+        self.put("action", result=player.perform_get_result(action, enemy))
+        return action
+
+    def _enemy_turn(self) -> str:
+        controller = self.enemy
+        if controller.character.ran_dry():
+            controller.character.health = 0
+        action = controller.choose_action(self.player)
+        self.put("action", result=controller.execute_action_get_result(action, self.player))
+        return action
+
+
+def _post_record_ready() -> None:
+    # pygame.event.post is safe from any thread; it wakes run_window's idle wait
+    if pygame.display.get_init():
+        pygame.event.post(pygame.event.Event(RECORD_READY))
+
+
+class AnimationScheduler:
+    """
+    Plays worker records on the renderer. advance() is run_window's on_frame:
+    it runs whole STEPs for the real time since the last frame and returns
+    True while a record is playing or waiting.
+    """
+
+    def __init__(self, renderer: BattleRenderer, records: "queue.Queue[Dict[str, Any]]",
+                 sounds: Optional[Mapping[str, Any]] = None, step: float = STEP,
+                 seconds: float = ANIMATION_SECONDS, clock: Callable[[], float] = time.perf_counter):
+        self.renderer = renderer
+        self.records = records
+        self.sounds = sounds or {}   # sound effect name -> anything with play(), e.g. pygame.mixer.Sound
+        self.step = step
+        self.seconds = seconds
+        self.clock = clock
+        self.prompt: Optional[Dict[str, Any]] = None     # the prompt on screen, until an action is chosen
+        self.finished: Optional[Dict[str, Any]] = None   # the result record, once the battle is over
+        self.shown: Dict[Tuple[str, str], float] = {}    # bar values on screen
+        self._from: Dict[Tuple[str, str], float] = {}
+        self._to: Dict[Tuple[str, str], Tuple[float, int, str]] = {}   # value, maximum, resource
+        self._cue_side: Optional[str] = None
+        self.progress = 1.0
+        self._last: Optional[float] = None
+        self._lag = 0.0
+
+    @property
+    def busy(self) -> bool:
+        return self.progress < 1.0 or not self.records.empty()
+
+    def advance(self) -> bool:
+        now = self.clock()
+        if self._last is not None:
+            self._lag = min(self._lag + now - self._last, MAX_LAG)
+        self._last = now
+        while True:
+            if self.progress >= 1.0:
+                self._finish_cue()
+                if not self._start_next():
+                    break
+            elif self._lag >= self.step:
+                self._lag -= self.step
+                self.progress = min(1.0, self.progress + self.step / self.seconds)
+            else:
+                break
+        self._show_bars()
+        if not self.busy:
+            # idle from here: the next record starts on its own clock
+            self._last = None
+            self._lag = 0.0
+        return self.busy
+
+    def _start_next(self) -> bool:
+        try:
+            record = self.records.get_nowait()
+        except queue.Empty:
+            return False
+        renderer = self.renderer
+        kind = record["type"]
+        if kind in ("prompt", "result"):
+            renderer.show(record, bars=False)
+            if kind == "prompt":
+                self.prompt = record
+            else:
+                self.finished = record
+        else:
+            renderer.show_side(PLAYER, record["you"], bars=False)
+            renderer.show_side(ENEMY, record["enemy"], bars=False)
+            renderer.disable_actions()
+            if record.get("log"):
+                renderer.set_message(record["log"])
+        if kind == "action":
+            result = record["result"]
+            self._cue_side = result["attacker"]
+            renderer.set_cue(self._cue_side, result["animation_triggers"])
+            for name in result["sound_effects"]:
+                sound = self.sounds.get(name)
+                if sound is not None:
+                    sound.play()
+        self._aim(record)
+        return True
+
+    def _aim(self, record: Dict[str, Any]) -> None:
+        """Bars slide from what's shown to the record's numbers"""
+        moving = False
+        for side, status in ((PLAYER, record["you"]), (ENEMY, record["enemy"])):
+            for bar, value, maximum in (("health", status["health"], status["max_health"]),
+                                        ("resource", status["amount"], status["max_amount"])):
+                key = (side, bar)
+                shown = self.shown.setdefault(key, value)
+                self._from[key] = shown
+                self._to[key] = (value, maximum, status["resource"])
+                moving = moving or shown != value
+        # a record with something to show holds the screen for one animation
+        self.progress = 0.0 if moving or record["type"] == "action" else 1.0
+
+    def _show_bars(self) -> None:
+        t = self.progress
+        eased = t * t * (3 - 2 * t)
+        for (side, bar), (value, maximum, resource) in self._to.items():
+            start = self._from[(side, bar)]
+            shown = self.shown[(side, bar)] = start + (value - start) * eased
+            if bar == "health":
+                self.renderer.set_health(side, shown, maximum)
+            else:
+                self.renderer.set_resource(side, shown, maximum, resource)
+
+    def _finish_cue(self) -> None:
+        if self._cue_side is not None:
+            self.renderer.set_cue(self._cue_side, ())
+            self._cue_side = None
+
+
+def play_window(player_class, enemy_class, seed: Optional[int] = None, ai_class: Type[EnemyAI] = CompiledEnemyAI,
+                fps: int = FPS, sounds: Optional[Mapping[str, Any]] = None,
+                stats: Optional[FrameStats] = None, seconds: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """Plays one battle in a window until it's closed; returns the result record if the battle finished"""
+    renderer = BattleRenderer()
+    worker = BattleWorker(player_class, enemy_class, seed, ai_class)
+    scheduler = AnimationScheduler(renderer, worker.records, sounds)
+
+    def on_action(action):
+        # only once the prompt is on screen, i.e. every earlier record has played
+        if scheduler.prompt is not None and not scheduler.busy:
+            scheduler.prompt = None
+            renderer.disable_actions()
+            worker.choose(action)
+
+    worker.start()
+    try:
+        run_window(renderer, on_action, on_frame=scheduler.advance, fps=fps, seconds=seconds, stats=stats)
+    finally:
+        worker.stop()
+        worker.join(timeout=1.0)
+        pygame.display.quit()
+    return scheduler.finished
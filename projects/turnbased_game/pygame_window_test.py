@@ -1,49 +1,84 @@
-import pygame
+"""
+Pygame battle window
+Plays a battle against the EnemyAI on the BattleRenderer screen: click an
+action button or type its letter. --measure runs for a number of seconds
+with a scripted turn every --turn-every seconds and prints frame times and
+CPU use; --naive measures the old redraw-everything, flip-at-60-FPS loop.
+"""
+import argparse
+import os
 import sys
-import time
+import pygame
+
+try:
+    # When run as module: python -m projects.turnbased_game.pygame_window_test
+    from projects.turnbased_game.main_gameloop.game_server import BattleSession
+except ImportError:
+    # When run directly: python pygame_window_test.py
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+    from projects.turnbased_game.main_gameloop.game_server import BattleSession
+from projects.turnbased_game.main_gameloop.battle_renderer import FPS, FrameStats, BattleRenderer, run_window
+from projects.turnbased_game.simulation import CHARACTER_CLASSES
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Turn-based RPG battle window")
+    parser.add_argument("--player", choices=sorted(CHARACTER_CLASSES), default="warrior")
+    parser.add_argument("--enemy", choices=["random", *sorted(CHARACTER_CLASSES)], default="random")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--fps", type=int, default=FPS, help="frame rate while something changes")
+    parser.add_argument("--measure", type=float, metavar="SECONDS",
+                        help="run for SECONDS with scripted turns and print frame time and CPU use")
+    parser.add_argument("--turn-every", type=float, default=1.0, metavar="SECONDS",
+                        help="--measure: seconds between scripted turns")
+    parser.add_argument("--naive", action="store_true", help="redraw everything and flip every frame")
+    parser.add_argument("--headless", action="store_true", help="use SDL's dummy video driver")
+    args = parser.parse_args(argv)
+
+    if args.headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+    scripted_turn = pygame.event.custom_type()
+    renderer = BattleRenderer()
+    session = BattleSession()
 
-def main():
+    def show(reply):
+        reply["log"] = session.drain_log()
+        renderer.show(reply)
+        return reply
+
+    state = {"reply": show(session.start(args.player, args.enemy, args.seed))}
+
+    def on_action(action):
+        if state["reply"]["type"] == "prompt":
+            state["reply"] = show(session.act(action))
+
+    def on_event(event):
+        # --measure: play the first available action, and start over when a battle ends
+        if event.type == scripted_turn:
+            reply = state["reply"]
+            if reply["type"] == "prompt":
+                on_action(next(entry["action"] for entry in reply["actions"] if entry["available"]))
+            else:
+                state["reply"] = show(session.start(args.player, args.enemy))
+
+    stats = None
+    if args.measure:
+        stats = FrameStats()
+        pygame.time.set_timer(scripted_turn, max(1, int(args.turn_every * 1000)))
     try:
-        pygame.init()
-        font = pygame.font.Font(None, 36)
-        WINDOW_WIDTH = 1200
-        WINDOW_HEIGHT = 800
-        screen1 = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-        BLACK = (0, 0, 0)
-        WHITE = (255, 255, 255)
-        RED = (255, 0, 0)
-        GREEN = (0, 255, 0)
-        BLUE = (0, 0, 255)
-        GRAY = (128, 128, 128)
-        player_text = "Player Zone"
-        enemy_text = "Enemy Zone"
-        health_text = "Health: 200/200"
-        action_text = "Attack"
-        font.render(player_text, False, WHITE)
-        pygame.display.set_caption("Turn-based RPG - Window Test")
-        time_clock1 = pygame.time.Clock()
-        running = True
-
-        while running:
-                for event in pygame.event.get():
-                        if event.type == pygame.QUIT:
-                                running = False
-                        elif event.type == pygame.KEYDOWN:
-                            if event.key == pygame.K_ESCAPE:
-                                    running = False
-                screen1.fill(BLACK) # draws screen with a full black screen
-                # visual layout planning
-                player_zone = pygame.draw.rect(screen1, RED, (50, 100, 200, 300), 2)
-                enemy_zone = pygame.draw.rect(screen1, BLUE, (950, 100, 200, 300), 2)
-                action_buttons = pygame.draw.rect(screen1, GREEN, (400, 650, 400, 100), 2)
-                health_bars = pygame.draw.rect(screen1, GRAY, (100, 50, 1000, 30), 2)
-                pygame.display.flip() # produces draw on screen
-                time_clock1.tick(60) # sets fps
-    except:
-           pygame.quit()
-           sys.exit()
-    pygame.quit()
-    sys.exit()
-          
-   
-if __name__ == "__main__": main()
+        run_window(renderer, on_action, on_event, fps=args.fps, seconds=args.measure, naive=args.naive, stats=stats)
+    finally:
+        pygame.quit()
+    if stats is not None:
+        report = stats.report()
+        print(f"{'naive' if args.naive else 'dirty-rect'} renderer, {report['seconds']:.1f} s:")
+        print(f"  frames drawn     {report['frames']} ({report['fps']:.1f}/s)")
+        print(f"  frame time       mean {report['mean_ms']:.2f} ms, p95 {report['p95_ms']:.2f} ms, "
+              f"max {report['max_ms']:.2f} ms")
+        print(f"  rects per frame  {report['rects_per_frame']:.1f}")
+        print(f"  CPU              {report['cpu_percent']:.1f}% of one core")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,28 @@
+# This file makes the simulation directory a Python package
+
+# Headless tooling built on top of the character classes
+from .headless_engine import (CHARACTER_CLASSES, BatchSummary, battle_seed, quiet,
+                              simulate_battle, simulate_batch, tally_battles)
+from .matchups import MatchupMatrix, MatchupStats, run_matchup_matrix
+from .damage_distribution import (DamageDistribution, TimeToKill, ability_distribution,
+                                  damage_pmf, defender_profile, time_to_kill)
+from .win_solver import WinProbabilitySolver, solver_for, win_probability
+from .battle_state import BattleState
+from .replay import ReplayHooks, ReplayReader, ReplayWriter
+from .snapshot import BattleSnapshot, SnapshotLog
+from .tournament import (POLICIES, EloRatings, GlickoRatings, MatchResult, RandomEnemyAI, Tournament,
+                         entrants_for, play_match)
+from .ai_optimizer import OptimizationResult, ThresholdOptimizer, parameters_for, tuned_ai
+from .balance_tuner import BalanceResult, BalanceTuner, balanced_classes, scale_class
+
+__all__ = ['CHARACTER_CLASSES', 'BatchSummary', 'battle_seed', 'quiet',
+           'simulate_battle', 'simulate_batch', 'tally_battles',
+           'MatchupMatrix', 'MatchupStats', 'run_matchup_matrix',
+           'DamageDistribution', 'TimeToKill', 'ability_distribution',
+           'damage_pmf', 'defender_profile', 'time_to_kill',
+           'WinProbabilitySolver', 'solver_for', 'win_probability',
+           'BattleState', 'ReplayHooks', 'ReplayReader', 'ReplayWriter', 'BattleSnapshot', 'SnapshotLog',
+           'POLICIES', 'EloRatings', 'GlickoRatings', 'MatchResult', 'RandomEnemyAI', 'Tournament',
+           'entrants_for', 'play_match',
+           'OptimizationResult', 'ThresholdOptimizer', 'parameters_for', 'tuned_ai',
+           'BalanceResult', 'BalanceTuner', 'balanced_classes', 'scale_class']
@@ -0,0 +1,239 @@
+"""
+AI Threshold Optimizer
+Genetic search over the hand-picked numbers in EnemyAI for one character
+class: the desperate/defensive health brackets, KILL_RANGE, the warrior's
+STURDY_HEALTH and the class's status/excess resource thresholds. A
+candidate is a parameter vector; tuned_ai() turns it into a CompiledEnemyAI
+subclass, so it plays with the same cascade, only with different numbers.
+
+Fitness is the tuned enemy's score (wins, draws counting half) against the
+rule-cascade player of every class. All candidates of a generation are
+scored on the same battle seeds (common random numbers), so their
+differences come from the parameters rather than the dice, and each
+generation draws fresh seeds so the winner isn't tuned to one set of
+battles. Battles are sharded over a process pool as in the matchup matrix,
+and a per-generation cache scores repeated vectors (elites, duplicate
+children) once.
+"""
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Type
+
+from ..character_classes import Warrior, CompiledEnemyAI
+from ..main_gameloop.battle_loop import ENEMY, DRAW
+from .headless_engine import CHARACTER_CLASSES, DEFAULT_MAX_ROUNDS, battle_seed, tally_battles
+
+
+class Parameter(NamedTuple):
+    name: str            # EnemyAI class attribute
+    low: float
+    high: float
+    integer: bool
+
+
+def parameters_for(character_class: Type) -> Tuple[Parameter, ...]:
+    """Search space for one class, bounded so every value is still a legal play"""
+    stats = character_class.stats
+    status, excess = CompiledEnemyAI.resource_thresholds(stats)
+    resource_cap = stats.max_resource or 2 * max(status, excess)
+    space = [Parameter("DESPERATE_HEALTH", 0.05, 0.6, False),
+             Parameter("DEFENSIVE_HEALTH", 0.1, 0.9, False),
+             Parameter("KILL_RANGE", 0, 150, True)]
+    if issubclass(character_class, Warrior):
+        # only the warrior's cascade reads STURDY_HEALTH
+        space.append(Parameter("STURDY_HEALTH", 0, stats.max_health, True))
+    space += [Parameter("STATUS_THRESHOLD", stats.effect.cost, resource_cap, True),
+              Parameter("EXCESS_RESOURCE", stats.special.cost, resource_cap, True)]
+    return tuple(space)
+
+
+def default_vector(space: Sequence[Parameter], character_class: Type) -> Tuple:
+    """The hand-picked EnemyAI numbers as a vector"""
+    status, excess = CompiledEnemyAI.resource_thresholds(character_class.stats)
+    defaults = {"STATUS_THRESHOLD": status, "EXCESS_RESOURCE": excess}
+    return tuple(defaults.get(parameter.name, getattr(CompiledEnemyAI, parameter.name)) for parameter in space)
+
+
+def repair(space: Sequence[Parameter], vector: Sequence[float]) -> Tuple:
+    """Clips to the bounds, rounds integers and keeps the defensive bracket above the desperate one"""
+    values = {}
+    for parameter, value in zip(space, vector):
+        value = min(max(value, parameter.low), parameter.high)
+        values[parameter.name] = int(round(value)) if parameter.integer else round(value, 3)
+    if values["DEFENSIVE_HEALTH"] < values["DESPERATE_HEALTH"]:
+        values["DEFENSIVE_HEALTH"] = values["DESPERATE_HEALTH"]
+    return tuple(values[parameter.name] for parameter in space)
+
+
+def tuned_ai(character_class: Type, vector: Sequence[float]) -> Type[CompiledEnemyAI]:
+    """CompiledEnemyAI subclass playing with `vector`'s thresholds; the same vector gets the same class"""
+    return _tuned_ai(character_class, tuple(vector))
+
+
+@lru_cache(maxsize=256)
+def _tuned_ai(character_class: Type, vector: Tuple) -> Type[CompiledEnemyAI]:
+    # one class per vector, so its compiled policy is reused by every shard that vector plays
+    space = parameters_for(character_class)
+    attributes = {parameter.name: value for parameter, value in zip(space, vector)}
+    return type(f"Tuned{character_class.__name__}AI", (CompiledEnemyAI,), attributes)
+
+
+def _score_shard(class_name: str, vector: Tuple, opponent: str, seed: int, start: int, stop: int,
+                 max_rounds: int) -> Tuple[Tuple, float]:
+    # Runs inside a worker process: tuned enemy against the rule-cascade player
+    character_class = CHARACTER_CLASSES[class_name]
+    counts = tally_battles(CHARACTER_CLASSES[opponent], character_class, seed, start, stop, max_rounds,
+                           enemy_ai=tuned_ai(character_class, vector))
+    return vector, counts[ENEMY] + 0.5 * counts[DRAW]
+
+
+@dataclass
+class Generation:
+    number: int
+    seed: int
+    best: Tuple
+    best_fitness: float
+    mean_fitness: float
+    baseline_fitness: float    # the hand-picked numbers on this generation's battles
+
+
+@dataclass
+class OptimizationResult:
+    character: str
+    parameters: Tuple[str, ...]
+    best: Tuple
+    best_fitness: float            # on held-out battles
+    baseline: Tuple
+    baseline_fitness: float        # the hand-picked numbers on the same held-out battles
+    generations: List[Generation] = field(default_factory=list)
+    evaluations: int = 0           # candidates scored by playing battles
+    cache_hits: int = 0            # candidates answered from the generation cache
+    battles: int = 0
+    elapsed: float = 0.0
+
+    def best_attributes(self) -> Dict[str, float]:
+        return dict(zip(self.parameters, self.best))
+
+
+class ThresholdOptimizer:
+    """
+    Genetic algorithm over parameters_for(character_class): tournament
+    selection, blend crossover, Gaussian mutation scaled to each parameter's
+    range, and `elite` survivors. The defaults start in the first
+    generation and are scored alongside every generation for reference.
+    The final elites are re-scored on battles no generation has seen, so
+    the reported best isn't just the luckiest candidate of the last round.
+    """
+
+    def __init__(self, character_class: Type, population: int = 16, battles: int = 200,
+                 opponents: Optional[Sequence[str]] = None, seed: int = 0, elite: int = 2,
+                 mutation: float = 0.15, workers: Optional[int] = None,
+                 max_rounds: int = DEFAULT_MAX_ROUNDS):
+        self.character_class = character_class
+        self.class_name = character_class.stats.name
+        self.space = parameters_for(character_class)
+        self.population = population
+        self.battles = battles            # per opponent class, per candidate
+        self.opponents = list(opponents or CHARACTER_CLASSES)
+        self.seed = seed
+        self.elite = elite
+        self.mutation = mutation
+        self.workers = workers or os.cpu_count() or 1
+        self.max_rounds = max_rounds
+        self.rng = random.Random(seed)
+        self.cache: Dict[Tuple, float] = {}   # this generation's fitness by vector
+        self.evaluations = 0
+        self.cache_hits = 0
+
+    def evaluate(self, vectors: Sequence[Tuple], seed: int, pool=None) -> List[float]:
+        """
+        Fitness of every vector on the battles of `seed`; all vectors play the
+        same battles. Already scored vectors come from the cache.
+        """
+        fresh = list(dict.fromkeys(vector for vector in vectors if vector not in self.cache))
+        self.cache_hits += len(vectors) - len(fresh)
+        # a few shards per worker keeps the pool evenly loaded
+        units = max(1, len(fresh) * len(self.opponents))
+        shard_size = math.ceil(self.battles / math.ceil(self.workers * 4 / units)) if pool else self.battles
+        tasks = [(self.class_name, vector, opponent, battle_seed(seed, index), start,
+                  min(start + shard_size, self.battles), self.max_rounds)
+                 for vector in fresh
+                 for index, opponent in enumerate(self.opponents)
+                 for start in range(0, self.battles, shard_size)]
+        points = {vector: 0.0 for vector in fresh}
+        if pool is None:
+            results = (_score_shard(*task) for task in tasks)
+        else:
+            results = pool.map(_score_shard, *zip(*tasks)) if tasks else ()
+        for vector, score in results:
+            points[vector] += score
+        total = self.battles * len(self.opponents)
+        for vector in fresh:
+            self.cache[vector] = points[vector] / total
+        self.evaluations += len(fresh)
+        return [self.cache[vector] for vector in vectors]
+
+    def _select(self, scored: List[Tuple[float, Tuple]]) -> Tuple:
+        # binary tournament
+        first, second = self.rng.sample(scored, 2)
+        return max(first, second)[1]
+
+    def _child(self, scored: List[Tuple[float, Tuple]]) -> Tuple:
+        mother, father = self._select(scored), self._select(scored)
+        genes = []
+        for parameter, a, b in zip(self.space, mother, father):
+            low, high = min(a, b), max(a, b)
+            spread = high - low
+            value = self.rng.uniform(low - 0.5 * spread, high + 0.5 * spread)   # BLX-0.5
+            if self.rng.random() < 0.5:
+                value += self.rng.gauss(0, self.mutation * (parameter.high - parameter.low))
+            genes.append(value)
+        return repair(self.space, genes)
+
+    def _random_vector(self) -> Tuple:
+        return repair(self.space, [self.rng.uniform(parameter.low, parameter.high) for parameter in self.space])
+
+    def run(self, generations: int = 10, callback=None) -> OptimizationResult:
+        """Evolves for `generations` generations; `callback(generation)` after each one"""
+        baseline = default_vector(self.space, self.character_class)
+        vectors = [baseline] + [self._random_vector() for _ in range(self.population - 1)]
+        result = OptimizationResult(self.class_name, tuple(parameter.name for parameter in self.space),
+                                    baseline, 0.0, baseline, 0.0)
+        start_time = time.perf_counter()
+        pool = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        try:
+            for number in range(generations):
+                seed = battle_seed(self.seed, number)
+                self.cache = {}
+                fitness = self.evaluate(vectors + [baseline], seed, pool)
+                baseline_fitness = fitness.pop()
+                scored = sorted(zip(fitness, vectors), reverse=True)
+                best_fitness, best = scored[0]
+                generation = Generation(number, seed, best, best_fitness, sum(fitness) / len(fitness),
+                                        baseline_fitness)
+                result.generations.append(generation)
+                result.best, result.best_fitness = best, best_fitness
+                result.baseline_fitness = baseline_fitness
+                if callback is not None:
+                    callback(generation)
+                survivors = [vector for _, vector in scored[:self.elite]]
+                if number < generations - 1:
+                    vectors = survivors + [self._child(scored) for _ in range(self.population - len(survivors))]
+            if generations:
+                self.cache = {}
+                finalists = list(dict.fromkeys(survivors + [baseline]))
+                holdout = self.evaluate(finalists, battle_seed(self.seed, generations), pool)
+                result.baseline_fitness = holdout[finalists.index(baseline)]
+                result.best_fitness, result.best = max(zip(holdout, finalists))
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        result.evaluations, result.cache_hits = self.evaluations, self.cache_hits
+        result.battles = self.evaluations * self.battles * len(self.opponents)
+        result.elapsed = time.perf_counter() - start_time
+        return result
@@ -0,0 +1,297 @@
+"""
+Balance Tuner
+Nudges class stats until every class matchup plays at its target win rate.
+
+Each class gets one strength knob, stored as a log-scale offset. Strength
+e^x scales the class's max health, healing (items and heal spells) and
+ability damage tiers by e^x, and its ability costs by e^-x. `knobs` picks
+which of those stat groups are moved. Every iteration the matchups are
+simulated with the current stats, each pair from both seats. A class that
+wins more than its targets say is weakened in proportion to the error and
+the others are strengthened. The step for a class is halved whenever it
+overshoots. Mirror matchups and the first-move edge can't be tuned this
+way, because both sides change together.
+
+Every iteration replays the same battle seeds (common random numbers), so
+the change between two iterations comes from the stats, not from resampled
+dice. The tuner stops as soon as every matchup's Wilson interval lies inside
+target ± tolerance. When an estimate is close but its interval is still too
+wide to tell, the battle count doubles instead of the stats moving.
+
+The result is a modified copy of class_data.json's contents. Characters
+read their numbers from `cls.stats`, so balanced_classes() plays the tuned
+data through subclasses without touching the shipped tables.
+"""
+import copy
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple, Type
+
+from ..character_classes.class_tables import CLASS_DATA_PATH, compile_class
+from ..main_gameloop.battle_loop import PLAYER, ENEMY, DRAW
+from .headless_engine import CHARACTER_CLASSES, DEFAULT_MAX_ROUNDS, tally_battles
+from .matchups import MatchupStats, _shards
+
+KNOBS = ("health", "healing", "damage", "cost")
+DEFAULT_KNOBS = ("health", "damage")
+
+Matchup = Tuple[str, str]   # (class, opponent class), seats alternated
+
+
+def load_class_data(path: str = CLASS_DATA_PATH) -> dict:
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def _scale(value: int, factor: float, minimum: int = 0) -> int:
+    return max(minimum, int(round(value * factor)))
+
+
+def _scale_ability(ability: dict, damage: float, cost: float, knobs: Sequence[str]) -> None:
+    if "damage" in knobs:
+        scaled = {}
+        for tier in ("base", "crit", "super_crit"):
+            if tier in ability:
+                scaled[ability[tier]] = _scale(ability[tier], damage, 1)
+                ability[tier] = scaled[ability[tier]]
+        if "gain_on_damage" in ability:
+            # gains are keyed on the damage dealt, so the keys follow the tiers
+            ability["gain_on_damage"] = {str(scaled.get(int(hit), int(hit))): gain
+                                         for hit, gain in ability["gain_on_damage"].items()}
+    if "cost" in knobs and ability.get("cost"):
+        ability["cost"] = _scale(ability["cost"], cost, 1)
+
+
+def _checked_knobs(knobs: Sequence[str]) -> Tuple[str, ...]:
+    unknown = set(knobs) - set(KNOBS)
+    if unknown:
+        raise ValueError(f"Unknown balance knobs {sorted(unknown)}, expected some of {list(KNOBS)}")
+    return tuple(knobs)
+
+
+def scale_class(data: dict, strength: float, knobs: Sequence[str] = DEFAULT_KNOBS) -> dict:
+    """One class's JSON object with `knobs` scaled by e^strength (costs by e^-strength)"""
+    knobs = _checked_knobs(knobs)
+    data = copy.deepcopy(data)
+    factor = math.exp(strength)
+    if "health" in knobs:
+        data["health"] = _scale(data["health"], factor, 1)
+    if "healing" in knobs:
+        data["item"]["health"] = _scale(data["item"].get("health", 0), factor)
+        if "heal" in data:
+            data["heal"]["health"] = _scale(data["heal"]["health"], factor)
+    for ability in ("attack", "special"):
+        _scale_ability(data[ability], factor, 1 / factor, knobs)
+    if "cost" in knobs:
+        for name in ("heal", "effect"):
+            if name in data and data[name]["cost"]:
+                data[name]["cost"] = _scale(data[name]["cost"], 1 / factor, 1)
+    return data
+
+
+def balanced_data(data: dict, strengths: Dict[str, float], knobs: Sequence[str] = DEFAULT_KNOBS) -> dict:
+    """Every class of a class data file scaled by its strength"""
+    return {name: scale_class(entry, strengths.get(name, 0.0), knobs) for name, entry in data.items()}
+
+
+def balanced_classes(data: dict) -> Dict[str, Type]:
+    """Character subclasses that play with `data` instead of the shipped class tables"""
+    return {name: type(cls.__name__, (cls,), {"stats": compile_class(name, data[name])})
+            for name, cls in CHARACTER_CLASSES.items()}
+
+
+def _run_shard(data: dict, player: str, enemy: str, seed: int, start: int, stop: int, max_rounds: int):
+    # Runs inside a worker process; the tuned data travels instead of classes
+    classes = balanced_classes(data)
+    return player, enemy, tally_battles(classes[player], classes[enemy], seed, start, stop, max_rounds)
+
+
+@dataclass
+class BalanceStep:
+    iteration: int
+    battles: int                          # per matchup
+    strengths: Dict[str, float]
+    cells: Dict[Matchup, MatchupStats]
+    action: str                           # "confirmed", "adjusted" or "more battles"
+
+
+@dataclass
+class BalanceResult:
+    data: dict                            # tuned class data, same layout as class_data.json
+    strengths: Dict[str, float]           # the confirmed iteration, or the closest one seen
+    confirmed: bool
+    steps: List[BalanceStep] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    def factors(self) -> Dict[str, float]:
+        return {name: math.exp(strength) for name, strength in self.strengths.items()}
+
+    def save(self, path: str) -> None:
+        """Writes the tuned data as a drop-in class_data.json"""
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(self.data, handle, indent=2)
+            handle.write("\n")
+
+
+class BalanceTuner:
+    """
+    Adjusts class strengths until `targets` are confirmed within
+    `tolerance` at 95% confidence. A target is the first class's win rate
+    against the second with seats alternated, since whoever moves first has
+    an edge that class stats can't remove. Without `targets`, every pair aims
+    for `target`.
+    """
+
+    def __init__(self, targets: Optional[Dict[Matchup, float]] = None, target: float = 0.5,
+                 tolerance: float = 0.03, knobs: Sequence[str] = DEFAULT_KNOBS, battles: int = 500,
+                 max_battles: int = 8000, seed: int = 0, engine: str = "object", workers: Optional[int] = None,
+                 learning_rate: float = 0.5, data: Optional[dict] = None,
+                 max_rounds: int = DEFAULT_MAX_ROUNDS):
+        classes = list(CHARACTER_CLASSES)
+        if targets is None:
+            targets = {(first, second): target for i, first in enumerate(classes) for second in classes[i + 1:]}
+        for first, second in targets:
+            if first == second:
+                raise ValueError(f"Mirror matchup {first} vs {second} can't be balanced by class stats")
+            if first not in CHARACTER_CLASSES or second not in CHARACTER_CLASSES:
+                raise ValueError(f"Unknown matchup {first} vs {second}")
+            if (second, first) in targets:
+                raise ValueError(f"{first} vs {second} is targeted twice; seats are already alternated")
+        if engine not in ("object", "vector"):
+            raise ValueError(f"Unknown engine {engine!r}, expected 'object' or 'vector'")
+        self.targets = dict(targets)
+        self.tolerance = tolerance
+        self.knobs = _checked_knobs(knobs)
+        self.battles = battles
+        self.max_battles = max_battles
+        self.seed = seed
+        self.engine = engine
+        self.workers = workers or os.cpu_count() or 1
+        self.learning_rate = learning_rate
+        self.base_data = data or load_class_data()
+        self.max_rounds = max_rounds
+        self.classes = sorted({name for pair in self.targets for name in pair})
+
+    def simulate(self, data: dict, battles: int, pool=None) -> Dict[Matchup, MatchupStats]:
+        """
+        Each target pair's record over `battles` battles per seating, always
+        on the same battle seeds. In a cell, "player" is the pair's first
+        class whichever side it played.
+        """
+        cells = {pair: MatchupStats(*pair) for pair in self.targets}
+        seatings = [seating for first, second in self.targets for seating in ((first, second), (second, first))]
+        if self.engine == "vector":
+            # NumPy is an optional extra, so only import the kernel when asked for
+            from .vector_kernel import simulate_vectorized
+            classes = balanced_classes(data)
+            summaries = (simulate_vectorized(battles, classes[player], classes[enemy], self.seed, self.max_rounds)
+                         for player, enemy in seatings)
+            results = ((player, enemy, {PLAYER: summary.player_wins, ENEMY: summary.enemy_wins,
+                                        DRAW: summary.draws, "rounds": summary.total_rounds})
+                       for (player, enemy), summary in zip(seatings, summaries))
+        else:
+            shard_size = math.ceil(battles / math.ceil(self.workers * 4 / len(seatings))) if pool else battles
+            tasks = [(data, player, enemy, self.seed, start, stop, self.max_rounds)
+                     for player, enemy in seatings for start, stop in _shards(battles, shard_size)]
+            results = pool.map(_run_shard, *zip(*tasks)) if pool else (_run_shard(*task) for task in tasks)
+        for player, enemy, counts in results:
+            if (player, enemy) in cells:
+                cells[(player, enemy)].merge(counts)
+            else:
+                cells[(enemy, player)].merge({PLAYER: counts[ENEMY], ENEMY: counts[PLAYER], DRAW: counts[DRAW],
+                                              "rounds": counts["rounds"]})
+        return cells
+
+    def confirmed(self, cells: Dict[Matchup, MatchupStats]) -> bool:
+        """Every interval inside target ± tolerance"""
+        return all(self.targets[pair] - self.tolerance <= cell.confidence_interval()[0]
+                   and cell.confidence_interval()[1] <= self.targets[pair] + self.tolerance
+                   for pair, cell in cells.items())
+
+    def clearly_off(self, cells: Dict[Matchup, MatchupStats]) -> bool:
+        """Some interval entirely outside target ± tolerance"""
+        for pair, cell in cells.items():
+            low, high = cell.confidence_interval()
+            if high < self.targets[pair] - self.tolerance or low > self.targets[pair] + self.tolerance:
+                return True
+        return False
+
+    def miss(self, cells: Dict[Matchup, MatchupStats]) -> float:
+        """Largest distance between a win rate and its target"""
+        return max(abs(cell.win_rate - self.targets[pair]) for pair, cell in cells.items())
+
+    def errors(self, cells: Dict[Matchup, MatchupStats]) -> Dict[str, float]:
+        """How far each class wins above its targets, on average over its pairs"""
+        totals = {name: 0.0 for name in self.classes}
+        counts = {name: 0 for name in self.classes}
+        for (first, second), cell in cells.items():
+            excess = cell.win_rate - self.targets[(first, second)]
+            totals[first] += excess
+            totals[second] -= excess
+            counts[first] += 1
+            counts[second] += 1
+        return {name: totals[name] / counts[name] for name in self.classes}
+
+    def run(self, max_iterations: int = 30, callback=None) -> BalanceResult:
+        """Iterates until the targets are confirmed or `max_iterations` runs out"""
+        strengths = {name: 0.0 for name in self.base_data}
+        rates = {name: self.learning_rate for name in self.classes}
+        previous: Dict[str, float] = {}
+        battles = self.battles
+        result = BalanceResult(self.base_data, dict(strengths), False)
+        best_miss = math.inf
+        start_time = time.perf_counter()
+        pool = ProcessPoolExecutor(max_workers=self.workers) \
+            if self.workers > 1 and self.engine == "object" else None
+        try:
+            for iteration in range(max_iterations):
+                data = balanced_data(self.base_data, strengths, self.knobs)
+                cells = self.simulate(data, battles, pool)
+                miss = self.miss(cells)
+                if miss <= best_miss:
+                    best_miss = miss
+                    result.data, result.strengths = data, dict(strengths)
+                if self.confirmed(cells):
+                    action = "confirmed"
+                elif battles < self.max_battles and not self.clearly_off(cells):
+                    action = "more battles"
+                else:
+                    action = "adjusted"
+                step = BalanceStep(iteration, battles, dict(strengths), cells, action)
+                result.steps.append(step)
+                if callback is not None:
+                    callback(step)
+                if action == "confirmed":
+                    result.data, result.strengths, result.confirmed = data, dict(strengths), True
+                    break
+                if action == "more battles":
+                    battles = min(battles * 2, self.max_battles)
+                    continue
+                for name, error in self.errors(cells).items():
+                    # win rates swing steeply with strength: halve a class's step once it overshoots
+                    if previous.get(name, 0.0) * error < 0:
+                        rates[name] /= 2
+                    previous[name] = error
+                    strengths[name] -= rates[name] * error
+                # only relative strength matters; keep the average class where it was
+                mean = sum(strengths[name] for name in self.classes) / len(self.classes)
+                for name in self.classes:
+                    strengths[name] -= mean
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        result.elapsed = time.perf_counter() - start_time
+        return result
+
+
+def format_cells(cells: Dict[Matchup, MatchupStats], targets: Dict[Matchup, float]) -> str:
+    lines = []
+    for pair, cell in sorted(cells.items()):
+        low, high = cell.confidence_interval()
+        lines.append(f"{pair[0]:>8} vs {pair[1]:<8}{cell.win_rate:7.1%} [{low:5.1%}-{high:5.1%}]"
+                     f"  target {targets[pair]:.0%}")
+    return "\n".join(lines)
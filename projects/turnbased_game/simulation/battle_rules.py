@@ -0,0 +1,260 @@
+"""
+Battle Rules
+Pure-function model of the combat rules. A combatant is a plain tuple
+(health, resource, item_count, effect_turns) and every ability returns all
+of its possible outcomes with their probabilities, so solvers and search can
+explore battles without copying character objects.
+
+Mirrors the attack/special/item methods of warrior.py, rogue.py and
+wizard.py, StatusEffectManager.process_turn_effects/apply_damage_modification
+and the EnemyAI rule cascade.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional, Tuple, Type
+
+from ..character_classes import Warrior, Rogue, Wizard, EnemyAI
+from ..character_classes.status_effects import EffectCategory
+from .damage_distribution import DefenderProfile, ability_damage, damage_pmf, modified_damage
+
+# (health, resource, item_count, effect_turns)
+Combatant = Tuple[int, int, int, int]
+HEALTH, RESOURCE, ITEMS, EFFECT_TURNS = range(4)
+
+# Action names (EFFECT is the class's own status ability)
+ATTACK = "attack"
+SPECIAL = "special"
+ITEM = "item"
+HEAL = "heal"
+EFFECT = "effect"
+
+# What EnemyAI.execute_action calls the shipped classes' status abilities (subclasses keep their names)
+ENEMY_EFFECT_ACTIONS = {cls: cls.actions.status.enemy_action for cls in (Warrior, Rogue, Wizard)}
+
+
+@dataclass(frozen=True)
+class ClassRules:
+    """Per-class numbers the pure rules need"""
+    cls: Type
+    max_health: int
+    start_resource: int
+    max_resource: Optional[int]       # None = uncapped (rage)
+    start_items: int
+    attack_cost: int
+    special_cost: int
+    effect_cost: int
+    effect_duration: int
+    effect_upkeep: int
+    effect_profile: DefenderProfile   # how the effect changes incoming hits
+    status_threshold: int             # EnemyAI._can_use_status_abilities
+    excess_resource: int              # EnemyAI._has_excess_resources
+    # largest resource spend possible in one turn, used to bound search states
+    max_spend_per_turn: int
+
+    @property
+    def effect_action(self) -> str:
+        return self.cls.actions.status.enemy_action
+
+    def start(self) -> Combatant:
+        return (self.max_health, self.start_resource, self.start_items, 0)
+
+
+@lru_cache(maxsize=None)
+def rules_for(character_class: Type) -> ClassRules:
+    """Pure-rule numbers for a character class, read from its class table"""
+    stats = getattr(character_class, "stats", None)
+    if stats is None:
+        raise ValueError(f"No rules for {character_class.__name__}")
+    effect = stats.effect
+    heal_cost = stats.heal.cost if stats.heal else 0
+    return ClassRules(character_class, stats.max_health, stats.start_resource, stats.max_resource, stats.items,
+                      attack_cost=stats.attack.cost, special_cost=stats.special.cost,
+                      effect_cost=effect.cost, effect_duration=effect.duration, effect_upkeep=effect.upkeep,
+                      effect_profile=((effect.categories.value, effect.magnitude),),
+                      status_threshold=stats.status_threshold, excess_resource=stats.excess_resource,
+                      max_spend_per_turn=max(stats.attack.cost, stats.special.cost, effect.cost, heal_cost)
+                      + effect.upkeep)
+
+
+def combatant(character) -> Combatant:
+    """Reads a live Warrior/Rogue/Wizard (or subclass) into a combatant tuple"""
+    stats = character.stats
+    turns = 0
+    for effect in character.status_effects.active_effects:
+        if effect.effect_type == stats.effect.effect_type:
+            turns = effect.duration
+    return (character.health, getattr(character, stats.resource), character.item_count, turns)
+
+
+# Turn structure ---------------------------------------------------------------------------
+
+def process_effects(rules: ClassRules, c: Combatant) -> Combatant:
+    """StatusEffectManager.process_turn_effects: pay upkeep, tick, expire"""
+    health, resource, items, turns = c
+    if turns <= 0:
+        return c
+    if rules.effect_upkeep:
+        if resource < rules.effect_upkeep:
+            return (health, resource, items, 0)
+        resource -= rules.effect_upkeep
+    return (health, resource, items, turns - 1)
+
+
+def ran_dry(rules: ClassRules, c: Combatant) -> bool:
+    """A wizard without mana for a bolt and without potions dies"""
+    return issubclass(rules.cls, Wizard) and c[RESOURCE] < rules.attack_cost and c[ITEMS] <= 0
+
+
+def may_run_dry(rules: ClassRules, c: Combatant, turns: int) -> bool:
+    """
+    Whether ran_dry could become true within `turns` turns: one potion goes
+    per turn at most, and resource drops by at most max_spend_per_turn.
+    """
+    return (issubclass(rules.cls, Wizard) and c[ITEMS] < turns
+            and c[RESOURCE] < rules.attack_cost + rules.max_spend_per_turn * turns)
+
+
+def max_hit(actor_rules: ClassRules, target_rules: ClassRules) -> int:
+    """Most damage one turn of `actor` can deal to `target`, whatever effect the target has up"""
+    return max(damage for ability in (ATTACK, SPECIAL) for active in (False, True)
+               for _, damage, _, _ in strike_table(actor_rules, ability, target_rules, active))
+
+
+def legal_actions(rules: ClassRules, c: Combatant) -> Tuple[str, ...]:
+    """Actions a player's validate_action would accept"""
+    health, resource, items, turns = c
+    actions = []
+    if resource >= rules.attack_cost:
+        actions.append(ATTACK)
+    if resource >= rules.special_cost:
+        actions.append(SPECIAL)
+    if items > 0 and _item_usable(rules, health, resource):
+        actions.append(ITEM)
+    heal = rules.cls.stats.heal
+    if heal and resource >= heal.cost and health < rules.max_health:
+        actions.append(HEAL)
+    if turns == 0 and resource >= rules.effect_cost:
+        actions.append(EFFECT)
+    return tuple(actions)
+
+
+def ai_actions(rules: ClassRules, me: Combatant, opponent_health: int) -> Tuple[Tuple[float, str], ...]:
+    """EnemyAI.choose_action as a distribution over actions"""
+    health, resource, items, turns = me
+    status_ok = resource >= rules.status_threshold and turns == 0
+    can_special = resource >= rules.special_cost
+    health_percentage = health / rules.max_health
+    cls = rules.cls
+    heal = cls.stats.heal
+
+    if health_percentage < EnemyAI.DESPERATE_HEALTH:
+        if status_ok and (not issubclass(cls, Warrior) or items > 0):
+            return ((1.0, EFFECT),)
+        if heal and resource >= heal.cost:
+            return ((1.0, HEAL),)
+        if items > 0:
+            return ((1.0, ITEM),)
+        return ((1.0, SPECIAL if can_special else ATTACK),)
+    if health_percentage < EnemyAI.DEFENSIVE_HEALTH:
+        if status_ok and not issubclass(cls, Warrior):
+            return ((1.0, EFFECT),)
+        if heal and resource >= heal.cost:
+            return ((0.5, HEAL), (0.5, ATTACK))
+        if items > 0:
+            return ((0.5, ITEM), (0.5, ATTACK))
+        return ((1.0, SPECIAL if can_special else ATTACK),)
+    if status_ok and issubclass(cls, Warrior) and health > EnemyAI.STURDY_HEALTH:
+        return ((1.0, EFFECT),)
+    if can_special and opponent_health <= EnemyAI.KILL_RANGE:
+        return ((1.0, SPECIAL),)
+    if resource >= rules.excess_resource:
+        return ((1.0, SPECIAL),)
+    return ((1.0, ATTACK),)
+
+
+# Abilities --------------------------------------------------------------------------------
+
+def _item_usable(rules: ClassRules, health: int, resource: int) -> bool:
+    # use_item refuses when the potion would restore nothing
+    item = rules.cls.stats.item
+    return bool((item.health and health < rules.max_health)
+                or (item.resource and resource < rules.max_resource))
+
+
+def _resource_gain(rules: ClassRules, ability: str, final: int) -> int:
+    # Gains are keyed on the damage after the defender's modifiers, as in the class methods
+    return getattr(rules.cls.stats, ability).gain_for(final)
+
+
+@lru_cache(maxsize=None)
+def strike_table(actor_rules: ClassRules, ability: str, target_rules: ClassRules,
+                 target_effect_active: bool) -> Tuple[Tuple[float, int, int, int], ...]:
+    """
+    Every result of one damaging ability as (probability, damage taken,
+    actor resource gain, target resource gain); a dodge is a zero row.
+    """
+    profile = target_rules.effect_profile if target_effect_active else ()
+    dodge = 0.0
+    for categories, magnitude in profile:
+        if categories & EffectCategory.DODGE.value:
+            dodge = magnitude
+    amplifies = any(categories & EffectCategory.RAGE_CONVERSION.value for categories, _ in profile)
+    rows = [(dodge, 0, 0, 0)] if dodge else []
+    for damage, p in damage_pmf(**ability_damage(actor_rules.cls, ability)).items():
+        final = modified_damage(damage, profile)
+        rows.append((p * (1.0 - dodge), final, _resource_gain(actor_rules, ability, final),
+                     final - damage if amplifies else 0))
+    return tuple(rows)
+
+
+def _strike(actor_rules: ClassRules, actor: Combatant, target_rules: ClassRules, target: Combatant,
+            ability: str, results: Dict) -> None:
+    """Dodge check, damage roll and modifiers; adds (actor, target) outcomes in place"""
+    health, resource, items, turns = actor
+    t_health, t_resource, t_items, t_turns = target
+    for p, damage, gain, target_gain in strike_table(actor_rules, ability, target_rules, t_turns > 0):
+        key = ((health, resource + gain, items, turns), (t_health - damage, t_resource + target_gain, t_items, t_turns))
+        results[key] = results.get(key, 0.0) + p
+
+
+def outcomes(actor_rules: ClassRules, actor: Combatant, target_rules: ClassRules, target: Combatant,
+             action: str) -> Tuple[Tuple[float, Combatant, Combatant], ...]:
+    """
+    Every result of `actor` performing `action` on `target`, as
+    (probability, actor after, target after). Actions the character would
+    refuse (not enough resource, nothing to heal) leave both unchanged, and a
+    failed status ability falls back to an attack like EnemyAI.execute_action.
+    """
+    health, resource, items, turns = actor
+    results: Dict[Tuple[Combatant, Combatant], float] = {}
+
+    if action == ATTACK:
+        if resource >= actor_rules.attack_cost:
+            _strike(actor_rules, (health, resource - actor_rules.attack_cost, items, turns),
+                    target_rules, target, ATTACK, results)
+    elif action == SPECIAL:
+        if resource >= actor_rules.special_cost:
+            _strike(actor_rules, (health, resource - actor_rules.special_cost, items, turns),
+                    target_rules, target, SPECIAL, results)
+    elif action == ITEM:
+        if items > 0 and _item_usable(actor_rules, health, resource):
+            item = actor_rules.cls.stats.item
+            if item.resource:
+                resource = min(resource + item.resource, actor_rules.max_resource)
+            actor = (min(health + item.health, actor_rules.max_health), resource, items - 1, turns)
+    elif action == HEAL:
+        heal = actor_rules.cls.stats.heal
+        if heal and resource >= heal.cost and health < actor_rules.max_health:
+            actor = (min(health + heal.health, actor_rules.max_health), resource - heal.cost, items, turns)
+    elif action == EFFECT:
+        if resource >= actor_rules.effect_cost:
+            actor = (health, resource - actor_rules.effect_cost, items, actor_rules.effect_duration)
+        else:
+            return outcomes(actor_rules, actor, target_rules, target, ATTACK)
+    else:
+        raise ValueError(f"Unknown action {action!r}")
+
+    if not results:
+        results[(actor, target)] = 1.0
+    return tuple((p, a, t) for (a, t), p in results.items())
+
@@ -0,0 +1,137 @@
+"""
+Battle State
+Immutable snapshot of a battle between two characters: both combatants'
+(health, resource, item_count, effect_turns) tuples plus whose turn it is.
+Being a plain tuple it hashes and compares by value, so it can key
+transposition tables and memo dicts directly, and apply() returns a new
+state instead of deep-copying characters and their StatusEffectManager.
+
+A state sits at the start of a turn with the round's status effects
+already processed, which is where Character.take_turn and EnemyAI.choose_action
+make their decisions.
+"""
+import random
+from typing import NamedTuple, Optional, Tuple, Type
+
+from ..character_classes.status_effects import EffectCategory, StatusEffect
+from ..main_gameloop.battle_loop import PLAYER, ENEMY
+from .battle_rules import (Combatant, ClassRules, rules_for, combatant, process_effects, ran_dry,
+                           legal_actions, outcomes, EFFECT, ENEMY_EFFECT_ACTIONS,
+                           HEALTH, RESOURCE, ITEMS, EFFECT_TURNS)
+from .win_solver import encode_state
+
+# EnemyAI names for the status abilities map onto battle_rules' EFFECT
+_ACTION_ALIASES = {name: EFFECT for name in ENEMY_EFFECT_ACTIONS.values()}
+
+# Rolls for apply() callers that don't pass their own stream, kept off the
+# global random module so they never shift a seeded battle's numbers
+_ROLLS = random.Random()
+
+
+def _build_character(rules: ClassRules, state: Combatant):
+    character = rules.cls()
+    stats = character.stats
+    character.health = state[HEALTH]
+    setattr(character, stats.resource, state[RESOURCE])
+    character.item_count = state[ITEMS]
+    if state[EFFECT_TURNS] > 0:
+        (categories, magnitude), = rules.effect_profile
+        character.status_effects.add_effect(StatusEffect(
+            effect_type=stats.effect.effect_type,
+            duration=state[EFFECT_TURNS],
+            magnitude=magnitude,
+            maintenance_cost=rules.effect_upkeep,
+            resource_type=stats.resource,
+            categories=EffectCategory(categories),
+        ))
+    return character
+
+
+class BattleState(NamedTuple):
+    player_class: Type
+    enemy_class: Type
+    player: Combatant
+    enemy: Combatant
+    to_move: str = PLAYER
+
+    # Construction ------------------------------------------------------------------------
+
+    @classmethod
+    def start(cls, player_class: Type, enemy_class: Type) -> "BattleState":
+        """Fresh characters at the player's first turn"""
+        return cls(player_class, enemy_class, rules_for(player_class).start(), rules_for(enemy_class).start())
+
+    @classmethod
+    def from_characters(cls, player, enemy, to_move: str = PLAYER) -> "BattleState":
+        """Snapshot of live Warrior/Rogue/Wizard objects"""
+        return cls(type(player), type(enemy), combatant(player), combatant(enemy), to_move)
+
+    def to_characters(self):
+        """Fresh (player, enemy) objects carrying this state's stats and effects"""
+        return (_build_character(self.player_rules, self.player),
+                _build_character(self.enemy_rules, self.enemy))
+
+    # Queries -----------------------------------------------------------------------------
+
+    @property
+    def player_rules(self) -> ClassRules:
+        return rules_for(self.player_class)
+
+    @property
+    def enemy_rules(self) -> ClassRules:
+        return rules_for(self.enemy_class)
+
+    @property
+    def key(self) -> int:
+        """Packed int of both combatants and the side to move"""
+        return encode_state(self.player, self.enemy, 0) << 1 | (self.to_move == ENEMY)
+
+    @property
+    def winner(self) -> Optional[str]:
+        if self.enemy[HEALTH] <= 0:
+            return PLAYER
+        if self.player[HEALTH] <= 0:
+            return ENEMY
+        return None
+
+    def legal_actions(self) -> Tuple[str, ...]:
+        """Actions the side to move could take (battle_rules names)"""
+        if self.to_move == PLAYER:
+            return legal_actions(self.player_rules, self.player)
+        return legal_actions(self.enemy_rules, self.enemy)
+
+    # Transitions -------------------------------------------------------------------------
+
+    def transitions(self, action: str) -> Tuple[Tuple[float, "BattleState"], ...]:
+        """
+        Every state that can follow the side to move taking `action`, with its
+        probability. When the enemy's turn ends the next round starts and both
+        sides' effects are processed.
+        """
+        action = _ACTION_ALIASES.get(action, action)
+        player_rules, enemy_rules = self.player_rules, self.enemy_rules
+        if self.to_move == PLAYER:
+            if ran_dry(player_rules, self.player):
+                return ((1.0, self._replace(player=(0,) + self.player[1:])),)
+            return tuple((p, self._replace(player=player, enemy=enemy, to_move=ENEMY))
+                         for p, player, enemy in outcomes(player_rules, self.player, enemy_rules, self.enemy, action))
+
+        if ran_dry(enemy_rules, self.enemy):
+            return ((1.0, self._replace(enemy=(0,) + self.enemy[1:])),)
+        results = []
+        for p, enemy, player in outcomes(enemy_rules, self.enemy, player_rules, self.player, action):
+            if player[HEALTH] > 0:
+                player = process_effects(player_rules, player)
+                enemy = process_effects(enemy_rules, enemy)
+            results.append((p, self._replace(player=player, enemy=enemy, to_move=PLAYER)))
+        return tuple(results)
+
+    def apply(self, action: str, rng: Optional[random.Random] = None) -> "BattleState":
+        """One sampled successor state (rolls with `rng`, a private unseeded stream by default)"""
+        roll = (rng or _ROLLS).random()
+        successors = self.transitions(action)
+        for p, state in successors:
+            roll -= p
+            if roll < 0:
+                return state
+        return successors[-1][1]
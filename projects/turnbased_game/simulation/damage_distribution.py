@@ -0,0 +1,190 @@
+"""
+Damage Distribution
+Exact probability mass functions for every damage ability, with the
+defender's status effects (dodge, reduction, amplification) applied the
+same way StatusEffectManager applies them. PMFs are convolved into a
+time-to-kill distribution for any sequence of actions, so balance questions
+("how many turns does a Rogue need against a bubbled Wizard?") are answered
+exactly instead of by sampling. Results are cached, so repeat queries are
+dictionary lookups.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Sequence, Tuple, Type
+
+from ..character_classes import Warrior, Rogue, Wizard
+from ..character_classes.status_effects import EffectCategory
+
+
+def ability_damage(character_class: Type, ability: str) -> Dict[str, float]:
+    """get_attack_dmg keyword arguments used by `ability`, from the class's own table"""
+    table = getattr(character_class.stats, ability)
+    return dict(base=table.base, crit=table.crit, super_crit=table.super_crit,
+                crit_chance=table.crit_chance, super_crit_chance=table.super_crit_chance)
+
+
+# The same for every damage ability of the shipped classes
+ABILITY_DAMAGE = {(cls, ability): ability_damage(cls, ability)
+                  for cls in (Warrior, Rogue, Wizard) for ability in ("attack", "special")}
+
+# (categories flag value, magnitude) per defender effect, in effect order
+DefenderProfile = Tuple[Tuple[int, float], ...]
+NO_EFFECTS: DefenderProfile = ()
+
+
+@dataclass(frozen=True)
+class DamageDistribution:
+    """Immutable PMF over damage values, sorted by damage"""
+    outcomes: Tuple[Tuple[int, float], ...]
+
+    @classmethod
+    def from_dict(cls, pmf: Dict[int, float]) -> "DamageDistribution":
+        return cls(tuple(sorted((value, p) for value, p in pmf.items() if p > 0)))
+
+    def as_dict(self) -> Dict[int, float]:
+        return dict(self.outcomes)
+
+    def probability(self, damage: int) -> float:
+        return self.as_dict().get(damage, 0.0)
+
+    @property
+    def mean(self) -> float:
+        return sum(value * p for value, p in self.outcomes)
+
+    @property
+    def minimum(self) -> int:
+        return self.outcomes[0][0]
+
+    @property
+    def maximum(self) -> int:
+        return self.outcomes[-1][0]
+
+
+def damage_pmf(base=None, crit=None, super_crit=None, crit_chance=None, super_crit_chance=None) -> Dict[int, float]:
+    """
+    PMF of Character.get_attack_dmg for the same arguments: one roll,
+    super crit checked first, then crit, otherwise base.
+    """
+    pmf: Dict[int, float] = {}
+    lower = 0.0
+    if super_crit and super_crit_chance:
+        pmf[super_crit] = pmf.get(super_crit, 0.0) + super_crit_chance
+        lower = super_crit_chance
+    if crit_chance and crit_chance > lower:
+        pmf[crit] = pmf.get(crit, 0.0) + crit_chance - lower
+        lower = crit_chance
+    pmf[base] = pmf.get(base, 0.0) + 1.0 - lower
+    return pmf
+
+
+def defender_profile(effects: Iterable) -> DefenderProfile:
+    """
+    Hashable summary of a defender's effects. Accepts a character, a
+    StatusEffectManager or any iterable of StatusEffect.
+    """
+    if hasattr(effects, "status_effects"):
+        effects = effects.status_effects
+    if hasattr(effects, "active_effects"):
+        effects = effects.active_effects
+    return tuple((effect.categories.value, effect.magnitude) for effect in effects)
+
+
+def modified_damage(damage: int, profile: DefenderProfile) -> int:
+    # Same arithmetic as StatusEffectManager.apply_damage_modification
+    modified = damage
+    for categories, magnitude in profile:
+        if categories & EffectCategory.DAMAGE_REDUCTION.value:
+            modified = max(0, modified - int(damage * magnitude))
+        if categories & EffectCategory.DAMAGE_AMPLIFICATION.value:
+            modified += int(damage * magnitude)
+    return modified
+
+
+def dodge_chance(profile: DefenderProfile) -> float:
+    # apply_dodge_check rolls once against the combined chance of every dodge effect
+    hit_chance = 1.0
+    for categories, magnitude in profile:
+        if categories & EffectCategory.DODGE.value:
+            hit_chance *= 1.0 - magnitude
+    return 1.0 - hit_chance
+
+
+@lru_cache(maxsize=None)
+def ability_distribution(character_class: Type, ability: str,
+                         profile: DefenderProfile = NO_EFFECTS) -> DamageDistribution:
+    """Damage dealt by `ability` against a defender with `profile` (dodges count as 0)"""
+    raw = damage_pmf(**ability_damage(character_class, ability))
+    dodge = dodge_chance(profile)
+    pmf: Dict[int, float] = {}
+    if dodge > 0:
+        pmf[0] = dodge
+    for damage, p in raw.items():
+        final = modified_damage(damage, profile)
+        pmf[final] = pmf.get(final, 0.0) + p * (1.0 - dodge)
+    return DamageDistribution.from_dict(pmf)
+
+
+@dataclass(frozen=True)
+class TimeToKill:
+    """Distribution of the turn on which cumulative damage reaches the target's health"""
+    turns: Tuple[Tuple[int, float], ...]   # (turn number starting at 1, probability)
+    survival: float                        # probability the target is still standing after the sequence
+
+    def probability(self, turn: int) -> float:
+        return dict(self.turns).get(turn, 0.0)
+
+    def cdf(self, turn: int) -> float:
+        """Probability the target is dead by the end of `turn`"""
+        return sum(p for t, p in self.turns if t <= turn)
+
+    def quantile(self, q: float) -> Optional[int]:
+        """First turn by which the target is dead with probability >= q (None if never)"""
+        total = 0.0
+        for turn, p in self.turns:
+            total += p
+            if total >= q - 1e-12:
+                return turn
+        return None
+
+    @property
+    def expected_turns(self) -> Optional[float]:
+        """Mean kill turn, given the target dies within the sequence"""
+        if not self.turns:
+            return None
+        killed = sum(p for _, p in self.turns)
+        return sum(t * p for t, p in self.turns) / killed
+
+
+@lru_cache(maxsize=4096)
+def _time_to_kill(health: int, steps: Tuple[DamageDistribution, ...]) -> TimeToKill:
+    remaining = {health: 1.0}           # distribution of target health still standing
+    turns = []
+    for turn, step in enumerate(steps, start=1):
+        next_remaining: Dict[int, float] = {}
+        killed = 0.0
+        for hp, p_hp in remaining.items():
+            for damage, p_dmg in step.outcomes:
+                left = hp - damage
+                if left <= 0:
+                    killed += p_hp * p_dmg
+                else:
+                    next_remaining[left] = next_remaining.get(left, 0.0) + p_hp * p_dmg
+        if killed > 0:
+            turns.append((turn, killed))
+        remaining = next_remaining
+        if not remaining:
+            break
+    return TimeToKill(turns=tuple(turns), survival=sum(remaining.values(), 0.0))
+
+
+def time_to_kill(health: int, sequence: Sequence[DamageDistribution], repeat_until: Optional[int] = None) -> TimeToKill:
+    """
+    Exact time-to-kill for a target with `health` taking the damage steps in
+    `sequence` in order, one per attacker turn. With `repeat_until`, the
+    sequence is cycled up to that many turns, e.g. a lone attack repeated
+    for up to 20 turns.
+    """
+    steps = tuple(sequence)
+    if repeat_until is not None and steps:
+        steps = tuple(steps[i % len(steps)] for i in range(repeat_until))
+    return _time_to_kill(health, steps)
@@ -0,0 +1,158 @@
+"""
+Headless Battle Engine
+Runs complete battles between two AI-driven characters with no printing,
+no input() and no sleeps. Used for server-side simulation and batch runs.
+Both sides are driven by EnemyAI, so the "player" plays with the same
+rule set the game uses for its enemies.
+"""
+import contextlib
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Type
+
+from ..character_classes import Warrior, Rogue, Wizard, EnemyAI
+from ..character_classes.output_sink import NullSink, OutputSink, output_to
+from ..character_classes.rng_streams import BattleRNG, RollBank
+from ..main_gameloop.battle_loop import BattleResult, run_battle, PLAYER, ENEMY, DRAW
+from .replay import ReplayHooks, ReplayWriter
+
+CHARACTER_CLASSES: Dict[str, Type] = {
+    "warrior": Warrior,
+    "rogue": Rogue,
+    "wizard": Wizard,
+}
+
+DEFAULT_MAX_ROUNDS = 200
+
+_SILENT = NullSink()
+
+
+def battle_seed(seed: int, index: int) -> int:
+    """
+    Seed for the index-th battle of a run. Depends only on (seed, index) so a
+    battle replays identically no matter which batch or process runs it.
+    """
+    return (seed << 32) + index
+
+
+def _player_turn(controller: EnemyAI):
+    def turn(player, enemy):
+        if player.ran_dry():
+            player.health = 0
+            return None
+        action = controller.choose_action(enemy)
+        controller.execute_action(action, enemy)
+        return action
+    return turn
+
+
+def _enemy_turn(controller: EnemyAI):
+    def turn(enemy, player):
+        # The enemy still acts on the turn it runs dry, as in EnemyAI.take_turn
+        if enemy.ran_dry():
+            enemy.health = 0
+        action = controller.choose_action(player)
+        controller.execute_action(action, player)
+        return action
+    return turn
+
+
+def simulate_battle(player_class: Type, enemy_class: Type, seed: Optional[int] = None,
+                    max_rounds: int = DEFAULT_MAX_ROUNDS, hooks=None,
+                    enemy_ai: Callable[[Type], EnemyAI] = EnemyAI,
+                    player_ai: Callable[[Type], EnemyAI] = EnemyAI,
+                    rng: Optional[BattleRNG] = None, sink: Optional[OutputSink] = None) -> BattleResult:
+    """
+    Plays one battle to completion. When `seed` (or a BattleRNG) is given,
+    both characters and controllers roll on the battle's own streams, so the
+    battle is reproducible and leaves the global random module alone.
+    `enemy_ai` and `player_ai` build each side's controller, e.g. SearchEnemyAI.
+    The battle is silent: narration goes to `sink`, a NullSink unless the
+    caller opts in (e.g. sink=get_output_sink() to narrate as the game does).
+    """
+    if rng is None and seed is not None:
+        rng = BattleRNG(seed)
+    player_ai = player_ai(player_class)
+    enemy_ai = enemy_ai(enemy_class)
+    if rng is not None:
+        rng.equip_controller(player_ai, PLAYER)
+        rng.equip_controller(enemy_ai, ENEMY)
+    with output_to(sink if sink is not None else _SILENT):
+        return run_battle(player_ai.character, enemy_ai.character,
+                          _player_turn(player_ai), _enemy_turn(enemy_ai),
+                          hooks=hooks, max_rounds=max_rounds)
+
+
+@contextlib.contextmanager
+def quiet():
+    """
+    Silences ability narration for the duration of the block. The NullSink
+    tells the characters nobody is listening, so no message text is built.
+    """
+    with output_to(NullSink()):
+        yield
+
+
+@dataclass
+class BatchSummary:
+    battles: int
+    player_wins: int
+    enemy_wins: int
+    draws: int
+    total_rounds: int
+    elapsed: float
+
+    @property
+    def battles_per_second(self) -> float:
+        return self.battles / self.elapsed if self.elapsed > 0 else float("inf")
+
+    @property
+    def player_win_rate(self) -> float:
+        return self.player_wins / self.battles if self.battles else 0.0
+
+    @property
+    def average_rounds(self) -> float:
+        return self.total_rounds / self.battles if self.battles else 0.0
+
+
+def tally_battles(player_class: Optional[Type], enemy_class: Optional[Type], seed: int,
+                  start: int, stop: int, max_rounds: int = DEFAULT_MAX_ROUNDS,
+                  enemy_ai: Callable[[Type], EnemyAI] = EnemyAI,
+                  replay: Optional[ReplayWriter] = None, block_rng: bool = False) -> Dict[str, int]:
+    """
+    Plays battles start..stop-1 of the run identified by `seed` and returns
+    outcome counts plus total rounds. Each battle rolls on its own
+    BattleRNG(battle_seed()), so any split of the index range adds up to the
+    same totals and the caller's random state is never touched. With
+    `block_rng` the rolls come pre-drawn from a NumPy RollBank instead.
+    A class left as None is picked at random per battle (from the battle's
+    setup stream), mirroring enemy_class() in the interactive game.
+    With `replay`, every battle is appended to that replay file.
+    """
+    classes = list(CHARACTER_CLASSES.values())
+    counts = {PLAYER: 0, ENEMY: 0, DRAW: 0, "rounds": 0}
+    bank = RollBank(seed) if block_rng else None
+    with quiet():
+        for index in range(start, stop):
+            rng = bank.battle(index, battle_seed(seed, index)) if bank else BattleRNG(battle_seed(seed, index))
+            setup = rng.stream("setup")
+            p_cls = player_class or setup.choice(classes)
+            e_cls = enemy_class or setup.choice(classes)
+            hooks = ReplayHooks(replay, rng.seed, max_rounds) if replay else None
+            result = simulate_battle(p_cls, e_cls, max_rounds=max_rounds, hooks=hooks, enemy_ai=enemy_ai, rng=rng)
+            counts[result.winner] += 1
+            counts["rounds"] += result.rounds
+    return counts
+
+
+def simulate_batch(battles: int, player_class: Optional[Type] = None, enemy_class: Optional[Type] = None,
+                   seed: int = 0, max_rounds: int = DEFAULT_MAX_ROUNDS,
+                   enemy_ai: Callable[[Type], EnemyAI] = EnemyAI,
+                   replay: Optional[ReplayWriter] = None, block_rng: bool = False) -> BatchSummary:
+    """Runs `battles` seeded battles in this process and tallies the outcomes"""
+    start = time.perf_counter()
+    counts = tally_battles(player_class, enemy_class, seed, 0, battles, max_rounds, enemy_ai, replay, block_rng)
+    elapsed = time.perf_counter() - start
+
+    return BatchSummary(battles=battles, player_wins=counts[PLAYER], enemy_wins=counts[ENEMY],
+                        draws=counts[DRAW], total_rounds=counts["rounds"], elapsed=elapsed)
@@ -0,0 +1,132 @@
+"""
+Matchup Matrix
+Monte Carlo win rates for every player class against every EnemyAI class.
+Battles are split into shards and farmed out to a process pool. Every
+battle seeds its own RNG from (seed, battle index), so the merged totals
+are identical for a given seed no matter how many workers run them.
+"""
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .headless_engine import CHARACTER_CLASSES, DEFAULT_MAX_ROUNDS, tally_battles
+from ..main_gameloop.battle_loop import PLAYER, ENEMY, DRAW
+
+# 95% two-sided normal quantile
+Z_95 = 1.959964
+
+
+@dataclass
+class MatchupStats:
+    player: str
+    enemy: str
+    battles: int = 0
+    player_wins: int = 0
+    enemy_wins: int = 0
+    draws: int = 0
+    total_rounds: int = 0
+
+    @property
+    def win_rate(self) -> float:
+        return self.player_wins / self.battles if self.battles else 0.0
+
+    def confidence_interval(self, z: float = Z_95) -> Tuple[float, float]:
+        """Wilson score interval for the player win rate"""
+        n = self.battles
+        if n == 0:
+            return (0.0, 1.0)
+        p = self.player_wins / n
+        denominator = 1 + z * z / n
+        centre = (p + z * z / (2 * n)) / denominator
+        half_width = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+        return (max(0.0, centre - half_width), min(1.0, centre + half_width))
+
+    def merge(self, counts: Dict[str, int]) -> None:
+        """Adds one shard's tallies"""
+        self.player_wins += counts[PLAYER]
+        self.enemy_wins += counts[ENEMY]
+        self.draws += counts[DRAW]
+        self.total_rounds += counts["rounds"]
+        self.battles += counts[PLAYER] + counts[ENEMY] + counts[DRAW]
+
+
+@dataclass
+class MatchupMatrix:
+    classes: List[str]
+    cells: Dict[Tuple[str, str], MatchupStats] = field(default_factory=dict)
+    elapsed: float = 0.0
+    workers: int = 1
+
+    def __getitem__(self, key: Tuple[str, str]) -> MatchupStats:
+        return self.cells[key]
+
+    @property
+    def total_battles(self) -> int:
+        return sum(cell.battles for cell in self.cells.values())
+
+    def format_table(self) -> str:
+        """Player classes as rows, enemy classes as columns: win% [95% CI]"""
+        width = 24
+        lines = ["player \\ enemy".ljust(14) + "".join(name.center(width) for name in self.classes)]
+        for player in self.classes:
+            row = player.ljust(14)
+            for enemy in self.classes:
+                cell = self.cells[(player, enemy)]
+                low, high = cell.confidence_interval()
+                row += f"{cell.win_rate:6.1%} [{low:5.1%}-{high:5.1%}]".center(width)
+            lines.append(row)
+        return "\n".join(lines)
+
+
+def _run_shard(player: str, enemy: str, seed: int, start: int, stop: int, max_rounds: int):
+    # Runs inside a worker process; class names travel instead of classes
+    counts = tally_battles(CHARACTER_CLASSES[player], CHARACTER_CLASSES[enemy],
+                           seed, start, stop, max_rounds)
+    return player, enemy, counts
+
+
+def _shards(battles: int, shard_size: int):
+    for start in range(0, battles, shard_size):
+        yield start, min(start + shard_size, battles)
+
+
+def run_matchup_matrix(battles_per_matchup: int, seed: int = 0, workers: Optional[int] = None,
+                       shard_size: Optional[int] = None, classes: Optional[List[str]] = None,
+                       max_rounds: int = DEFAULT_MAX_ROUNDS) -> MatchupMatrix:
+    """
+    Plays `battles_per_matchup` battles for each (player, enemy) class pair.
+    workers=None uses every core; workers=1 runs in this process.
+    Each cell uses the same battle seeds as simulate_batch(n, player, enemy, seed),
+    so the cells share common random numbers and can be compared directly.
+    """
+    classes = classes or list(CHARACTER_CLASSES)
+    workers = workers or os.cpu_count() or 1
+    pairs = [(player, enemy) for player in classes for enemy in classes]
+    if shard_size is None:
+        # a few shards per worker for every matchup keeps the pool evenly loaded
+        shard_size = max(1, math.ceil(battles_per_matchup / (workers * 4)))
+
+    matrix = MatchupMatrix(classes=classes, workers=workers)
+    for player, enemy in pairs:
+        matrix.cells[(player, enemy)] = MatchupStats(player, enemy)
+
+    tasks = [(player, enemy, seed, start, stop, max_rounds)
+             for player, enemy in pairs
+             for start, stop in _shards(battles_per_matchup, shard_size)]
+
+    start_time = time.perf_counter()
+    if workers == 1:
+        for task in tasks:
+            player, enemy, counts = _run_shard(*task)
+            matrix.cells[(player, enemy)].merge(counts)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_run_shard, *task) for task in tasks]
+            for future in futures:
+                player, enemy, counts = future.result()
+                matrix.cells[(player, enemy)].merge(counts)
+    matrix.elapsed = time.perf_counter() - start_time
+    return matrix
@@ -0,0 +1,321 @@
+"""
+Battle Replays
+Fixed-width binary replay files. After a 16-byte file header every record
+is RECORD_SIZE bytes, so record i sits at a known offset and a reader can
+jump straight to it through mmap without parsing anything before it.
+
+Three record kinds share the width:
+    BATTLE  classes, seed, max rounds and rules hash at the start of a battle
+    TURN    one side's action, its dice (rolled/final damage, crit, dodge)
+            and both combatants' stats after the turn
+    END     winner, rounds and final health
+
+ReplayWriter appends records; ReplayHooks plugs it into run_battle, so the
+interactive game and the headless engine record through the same loop.
+
+Classes are recorded by their table's name, so subclasses with tuned
+numbers (balance_tuner.balanced_classes()) record as the class they tune.
+Each BATTLE carries rules_hash() of the two classes actually played, which
+tells tuned battles apart from ones played with the shipped tables.
+"""
+import contextlib
+import mmap
+import os
+import struct
+import zlib
+from dataclasses import astuple
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Type, Union
+
+from ..character_classes import Warrior, Rogue, Wizard
+from ..character_classes.action_results import recording
+from ..character_classes.combat_events import Crit, DamageDealt, Dodged
+from ..main_gameloop.battle_loop import BattleHooks, BattleResult, PLAYER, ENEMY, DRAW
+from .battle_rules import combatant, rules_for, ATTACK, SPECIAL, ITEM, HEAL, EFFECT, ENEMY_EFFECT_ACTIONS
+from .damage_distribution import ability_damage
+
+MAGIC = b"TBREPLAY"
+VERSION = 1
+FILE_HEADER = struct.Struct("<8sHHI")          # magic, version, record size, rules hash
+RECORD_SIZE = 24
+
+BATTLE, TURN, END = 1, 2, 3
+_BATTLE = struct.Struct("<BBBxqIi4x")          # kind, player class, enemy class, seed, rules hash, max rounds
+_TURN = struct.Struct("<BBHBBhhhhBBhhBBxx")    # kind, side, round, action, flags, rolled, damage, player, enemy
+_END = struct.Struct("<BBHhh16x")              # kind, winner, rounds, player health, enemy health
+
+CLASS_CODES: List[Type] = [Warrior, Rogue, Wizard]
+CLASS_NAMES = [cls.stats.name for cls in CLASS_CODES]
+SIDE_CODES = [PLAYER, ENEMY]
+WINNER_CODES = [DRAW, PLAYER, ENEMY]
+ACTION_CODES = [None, ATTACK, SPECIAL, ITEM, HEAL, EFFECT]
+NO_SEED = -1
+NO_LIMIT = -1
+
+# TURN flags
+DODGED, CRIT, SUPER_CRIT = 1, 2, 4
+
+# Player menu names and EnemyAI names for the status abilities
+_STATUS_ACTIONS = set(ENEMY_EFFECT_ACTIONS.values()) | {cls.actions.status.action for cls in ENEMY_EFFECT_ACTIONS}
+
+
+class BattleRecord(NamedTuple):
+    player_class: Type
+    enemy_class: Type
+    seed: Optional[int]
+    rules_hash: int
+    max_rounds: Optional[int]
+
+
+class TurnRecord(NamedTuple):
+    side: str
+    round: int
+    action: Optional[str]         # battle_rules action name
+    flags: int
+    rolled: int                   # damage before the target's effects (0 if no hit)
+    damage: int                   # damage dealt
+    player: Tuple[int, int, int, int]
+    enemy: Tuple[int, int, int, int]
+
+    @property
+    def dodged(self) -> bool:
+        return bool(self.flags & DODGED)
+
+    @property
+    def crit(self) -> bool:
+        return bool(self.flags & CRIT)
+
+
+class EndRecord(NamedTuple):
+    winner: str
+    rounds: int
+    player_health: int
+    enemy_health: int
+
+
+Record = Union[BattleRecord, TurnRecord, EndRecord]
+
+
+def rules_hash(classes: Sequence[Type] = CLASS_CODES) -> int:
+    """
+    CRC32 of the classes' numbers (the shipped classes by default), so
+    replays can be matched to the balance they were played under
+    """
+    parts = []
+    for cls in classes:
+        parts.append((cls.__name__,) + astuple(rules_for(cls))[1:])
+    for cls in sorted(classes, key=lambda cls: cls.__name__):
+        for ability in ("attack", "special"):
+            parts.append((cls.__name__, ability, sorted(ability_damage(cls, ability).items())))
+    return zlib.crc32(repr(parts).encode())
+
+
+def class_code(cls: Type) -> int:
+    """Recorded code of a character class, by its table's name so subclasses share their base's code"""
+    name = cls.stats.name
+    if name not in CLASS_NAMES:
+        raise ValueError(f"No class code for {cls.__name__} ({name!r})")
+    return CLASS_NAMES.index(name)
+
+
+def action_code(action: Optional[str]) -> int:
+    if action in _STATUS_ACTIONS:
+        action = EFFECT
+    return ACTION_CODES.index(action) if action in ACTION_CODES else 0
+
+
+class ReplayWriter:
+    """Append-only writer; opening an existing replay file adds to its end"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rules_hash = rules_hash()
+        self._battle_hashes: Dict[Tuple[Type, Type], int] = {}
+        self._file = open(path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(FILE_HEADER.pack(MAGIC, VERSION, RECORD_SIZE, self.rules_hash))
+
+    def begin_battle(self, player_class: Type, enemy_class: Type, seed: Optional[int] = None,
+                     max_rounds: Optional[int] = None) -> None:
+        classes = (player_class, enemy_class)
+        hash_value = self._battle_hashes.get(classes)
+        if hash_value is None:
+            hash_value = self._battle_hashes[classes] = rules_hash(classes)
+        self._file.write(_BATTLE.pack(BATTLE, class_code(player_class), class_code(enemy_class),
+                                      NO_SEED if seed is None else seed, hash_value,
+                                      NO_LIMIT if max_rounds is None else max_rounds))
+
+    def write_turn(self, side: str, round_number: int, action: Optional[str], flags: int, rolled: int,
+                   damage: int, player: Tuple[int, int, int, int], enemy: Tuple[int, int, int, int]) -> None:
+        self._file.write(_TURN.pack(TURN, SIDE_CODES.index(side), round_number, action_code(action), flags,
+                                    rolled, damage, *player, *enemy))
+
+    def end_battle(self, result: BattleResult) -> None:
+        self._file.write(_END.pack(END, WINNER_CODES.index(result.winner), result.rounds,
+                                   result.player_health, result.enemy_health))
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "ReplayWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class ReplayHooks(BattleHooks):
+    """
+    Records a battle as it is played by run_battle. Dice come from the
+    combat events the abilities emit, stats from the characters after each turn.
+
+    Events are recorded through action_results.recording(), which gives the
+    two characters their own bus for the battle, so a battle that raises
+    never leaves a subscriber on the shared one.
+    """
+
+    def __init__(self, writer: ReplayWriter, seed: Optional[int] = None, max_rounds: Optional[int] = None):
+        self.writer = writer
+        self.seed = seed
+        self.max_rounds = max_rounds
+        self._round = 0
+        self._recording: Optional[contextlib.ExitStack] = None
+        self._recorder = None
+        self._mover = None
+
+    def round_started(self, round_number, player, enemy):
+        if round_number == 1:
+            self.writer.begin_battle(type(player), type(enemy), self.seed, self.max_rounds)
+            self._recording = contextlib.ExitStack()
+            self._recorder = self._recording.enter_context(recording(player, enemy))
+        self._round = round_number
+
+    def turn_started(self, side, player, enemy):
+        self._mover = player if side == PLAYER else enemy
+        if self._recorder is not None:
+            self._recorder.events.clear()
+
+    def turn_finished(self, side, action, player, enemy):
+        flags = rolled = damage = 0
+        for event in self._recorder.events if self._recorder is not None else ():
+            if getattr(event, "attacker", None) is not self._mover:
+                continue
+            if isinstance(event, DamageDealt):
+                rolled, damage = event.rolled, event.amount
+            elif isinstance(event, Dodged):
+                flags |= DODGED
+            elif isinstance(event, Crit):
+                flags |= (SUPER_CRIT | CRIT) if event.super_crit else CRIT
+        self.writer.write_turn(side, self._round, action, flags, rolled, damage,
+                               combatant(player), combatant(enemy))
+        self._mover = None
+
+    def battle_finished(self, result):
+        if self._recording is None:
+            return   # no round was played, nothing was recorded
+        self._recording.close()
+        self._recording = self._recorder = None
+        self.writer.end_battle(result)
+
+
+class ReplayBattle(NamedTuple):
+    header: BattleRecord
+    first_turn: int       # record index of the first TURN
+    turn_count: int
+    end: Optional[EndRecord]
+
+
+class ReplayReader:
+    """Random access to replay records through a read-only memory map"""
+
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        if size < FILE_HEADER.size:
+            self._file.close()
+            raise ValueError(f"{path} is not a replay file")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, record_size, self.rules_hash = FILE_HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or record_size != RECORD_SIZE or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} replay file")
+        # a writer killed mid-record leaves a partial tail; ignore it
+        self._count = (size - FILE_HEADER.size) // RECORD_SIZE
+
+    def __len__(self) -> int:
+        return self._count
+
+    def kind(self, index: int) -> int:
+        return self._map[self._offset(index)]
+
+    def record(self, index: int) -> Record:
+        offset = self._offset(index)
+        kind = self._map[offset]
+        if kind == TURN:
+            (_, side, round_number, action, flags, rolled, damage,
+             p_health, p_resource, p_items, p_turns, e_health, e_resource, e_items, e_turns) = _TURN.unpack_from(self._map, offset)
+            return TurnRecord(SIDE_CODES[side], round_number, ACTION_CODES[action], flags, rolled, damage,
+                              (p_health, p_resource, p_items, p_turns), (e_health, e_resource, e_items, e_turns))
+        if kind == BATTLE:
+            _, player, enemy, seed, hash_value, max_rounds = _BATTLE.unpack_from(self._map, offset)
+            return BattleRecord(CLASS_CODES[player], CLASS_CODES[enemy], None if seed == NO_SEED else seed,
+                                hash_value, None if max_rounds == NO_LIMIT else max_rounds)
+        if kind == END:
+            _, winner, rounds, player_health, enemy_health = _END.unpack_from(self._map, offset)
+            return EndRecord(WINNER_CODES[winner], rounds, player_health, enemy_health)
+        raise ValueError(f"Corrupt replay record {index}")
+
+    def __getitem__(self, index: int) -> Record:
+        return self.record(index)
+
+    def __iter__(self) -> Iterator[Record]:
+        for index in range(self._count):
+            yield self.record(index)
+
+    def battles(self) -> Iterator[ReplayBattle]:
+        """Battle boundaries, found from the kind byte alone"""
+        index = 0
+        while index < self._count:
+            if self.kind(index) != BATTLE:
+                index += 1
+                continue
+            header = self.record(index)
+            first = index + 1
+            index = first
+            while index < self._count and self.kind(index) == TURN:
+                index += 1
+            end = self.record(index) if index < self._count and self.kind(index) == END else None
+            yield ReplayBattle(header, first, index - first, end)
+
+    def turns(self, battle: ReplayBattle) -> List[TurnRecord]:
+        return [self.record(index) for index in range(battle.first_turn, battle.first_turn + battle.turn_count)]
+
+    def as_array(self) -> Any:
+        """Zero-copy NumPy view of all records (TURN field layout; check the `kind` column)"""
+        import numpy as np
+        dtype = np.dtype([("kind", "u1"), ("side", "u1"), ("round", "<u2"), ("action", "u1"), ("flags", "u1"),
+                          ("rolled", "<i2"), ("damage", "<i2"),
+                          ("player_health", "<i2"), ("player_resource", "<i2"), ("player_items", "u1"), ("player_effect", "u1"),
+                          ("enemy_health", "<i2"), ("enemy_resource", "<i2"), ("enemy_items", "u1"), ("enemy_effect", "u1"),
+                          ("pad", "V2")])
+        return np.frombuffer(self._map, dtype=dtype, count=self._count, offset=FILE_HEADER.size)
+
+    def _offset(self, index: int) -> int:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        return FILE_HEADER.size + index * RECORD_SIZE
+
+    def close(self) -> None:
+        if not self._map.closed:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> "ReplayReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
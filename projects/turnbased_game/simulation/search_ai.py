@@ -0,0 +1,159 @@
+"""
+Search Enemy AI
+Drop-in replacement for EnemyAI that picks moves by depth-limited
+expectimax over battle_rules states instead of the fixed rule cascade.
+Damage rolls, crits and dodges are chance nodes; the opponent either plays
+its worst case for us ("optimal") or follows the EnemyAI cascade ("ai").
+
+Search deepens one ply at a time until the per-move wall-clock budget runs
+out and plays the best move of the deepest finished pass. Without a budget
+(time_budget=None) it always searches to max_depth, so its moves depend
+only on the battle and not on how fast the machine is. Values are kept
+in a transposition table keyed by the packed state, so later moves of the
+same battle reuse earlier work.
+"""
+import time
+from typing import Dict, Optional, Tuple
+
+from ..character_classes import EnemyAI
+from .battle_rules import (Combatant, ClassRules, rules_for, combatant, process_effects, ran_dry,
+                           legal_actions, ai_actions, outcomes, ATTACK, EFFECT, HEALTH)
+from .win_solver import AI, OPTIMAL, encode_state
+
+DEFAULT_TIME_BUDGET = 0.005   # seconds per move
+DEFAULT_MAX_DEPTH = 12        # plies
+DEFAULT_TABLE_SIZE = 200_000
+
+
+class _OutOfTime(Exception):
+    pass
+
+
+class SearchEnemyAI(EnemyAI):
+    """
+    EnemyAI with choose_action driven by time-bounded expectimax.
+    `moves_first` tells the search whether this character is the player
+    side, which decides when status effects tick between turns.
+    """
+
+    def __init__(self, character_class, time_budget: Optional[float] = DEFAULT_TIME_BUDGET,
+                 max_depth: int = DEFAULT_MAX_DEPTH, opponent_policy: str = OPTIMAL,
+                 moves_first: bool = False, table_size: int = DEFAULT_TABLE_SIZE):
+        super().__init__(character_class)
+        if opponent_policy not in (OPTIMAL, AI):
+            raise ValueError(f"Unknown policy {opponent_policy!r}, expected {OPTIMAL!r} or {AI!r}")
+        self.rules = rules_for(character_class)
+        self.time_budget = time_budget
+        self.max_depth = max_depth
+        self.opponent_policy = opponent_policy
+        self.moves_first = moves_first
+        self.table_size = table_size
+        # one transposition table per opponent class
+        self.tables: Dict[type, Dict[int, float]] = {}
+        self.last_depth = 0
+        self.nodes = 0
+        self._table: Dict[int, float] = {}
+        self._opponent_rules: Optional[ClassRules] = None
+        self._deadline: Optional[float] = None
+
+    def choose_action(self, player):
+        action = self.search(combatant(self.character), type(player), combatant(player))
+        return self.rules.effect_action if action == EFFECT else action
+
+    def search(self, me: Combatant, opponent_class: type, opponent: Combatant) -> str:
+        """Best battle_rules action for `me` to play now, effects for the round already processed"""
+        actions = legal_actions(self.rules, me)
+        if not actions:
+            return ATTACK
+        best = actions[0]
+        self.last_depth = 0
+        self.nodes = 0
+        if len(actions) == 1:
+            return best
+
+        self._opponent_rules = rules_for(opponent_class)
+        self._table = self.tables.setdefault(opponent_class, {})
+        if len(self._table) > self.table_size:
+            self._table.clear()
+        deadline = None if self.time_budget is None else time.perf_counter() + self.time_budget
+        for depth in range(1, self.max_depth + 1):
+            # the first pass always finishes so there is a move to play
+            self._deadline = deadline if depth > 1 else None
+            try:
+                values = {action: self._after_my_move(me, opponent, action, depth) for action in actions}
+            except _OutOfTime:
+                break
+            best = max(values, key=values.get)
+            self.last_depth = depth
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+        return best
+
+    # Expectimax --------------------------------------------------------------------------
+
+    def _evaluate(self, me: Combatant, opponent: Combatant) -> float:
+        # Leaf estimate of our win chance from the health race
+        mine = me[HEALTH] / self.rules.max_health
+        theirs = opponent[HEALTH] / self._opponent_rules.max_health
+        return 0.5 + 0.5 * (mine - theirs)
+
+    def _visit(self) -> None:
+        self.nodes += 1
+        if self._deadline is not None and time.perf_counter() > self._deadline:
+            raise _OutOfTime
+
+    def _new_round(self, me: Combatant, opponent: Combatant) -> Tuple[Combatant, Combatant]:
+        return process_effects(self.rules, me), process_effects(self._opponent_rules, opponent)
+
+    def _my_turn(self, me: Combatant, opponent: Combatant, depth: int) -> float:
+        if ran_dry(self.rules, me):
+            return 0.0
+        if depth == 0:
+            return self._evaluate(me, opponent)
+        key = encode_state(me, opponent, depth) << 1
+        value = self._table.get(key)
+        if value is None:
+            self._visit()
+            value = max(self._after_my_move(me, opponent, action, depth)
+                        for action in legal_actions(self.rules, me))
+            self._table[key] = value
+        return value
+
+    def _after_my_move(self, me: Combatant, opponent: Combatant, action: str, depth: int) -> float:
+        value = 0.0
+        for p, new_me, new_opponent in outcomes(self.rules, me, self._opponent_rules, opponent, action):
+            if new_opponent[HEALTH] <= 0:
+                value += p
+                continue
+            if not self.moves_first:
+                new_me, new_opponent = self._new_round(new_me, new_opponent)
+            value += p * self._opponent_turn(new_me, new_opponent, depth - 1)
+        return value
+
+    def _opponent_turn(self, me: Combatant, opponent: Combatant, depth: int) -> float:
+        if ran_dry(self._opponent_rules, opponent):
+            return 1.0
+        if depth == 0:
+            return self._evaluate(me, opponent)
+        key = encode_state(me, opponent, depth) << 1 | 1
+        value = self._table.get(key)
+        if value is None:
+            self._visit()
+            if self.opponent_policy == OPTIMAL:
+                value = min(self._after_opponent_move(me, opponent, action, depth)
+                            for action in legal_actions(self._opponent_rules, opponent))
+            else:
+                value = sum(p * self._after_opponent_move(me, opponent, action, depth)
+                            for p, action in ai_actions(self._opponent_rules, opponent, me[HEALTH]))
+            self._table[key] = value
+        return value
+
+    def _after_opponent_move(self, me: Combatant, opponent: Combatant, action: str, depth: int) -> float:
+        value = 0.0
+        for p, new_opponent, new_me in outcomes(self._opponent_rules, opponent, self.rules, me, action):
+            if new_me[HEALTH] <= 0:
+                continue
+            if self.moves_first:
+                new_me, new_opponent = self._new_round(new_me, new_opponent)
+            value += p * self._my_turn(new_me, new_opponent, depth - 1)
+        return value
@@ -0,0 +1,370 @@
+"""
+Battle Snapshots
+Save and restore an in-progress battle: both characters' stats, item
+counts and status effects (with the turns each has left), the BattleRNG
+streams, and the round and side to move. A snapshot sits at the start of a
+turn with the round's status effects already processed, like BattleState,
+so battle_steps can pick the battle up exactly where it stopped.
+
+Snapshots encode to compact struct-packed bytes. A full snapshot carries
+everything; a delta carries a bitmask of the scalar fields that changed
+since the previous snapshot, a side's effects only when they changed, and
+for each RNG stream only its position when the Mersenne Twister words are
+unchanged, which between twists (every 624 draws) they are. Checkpointing
+every turn therefore costs tens of bytes instead of a few kilobytes.
+
+SnapshotLog appends length-prefixed snapshots to a file, a full one first
+and every `full_every` records, deltas in between, and folds them back
+into the latest snapshot on load. A record cut short by a crash is ignored.
+
+Classes are stored by their table's name, like replays, and a full
+snapshot carries the rules hash of the two classes played. Snapshots of
+tuned subclasses (balanced_classes()) decode given those classes.
+"""
+import os
+import struct
+from array import array
+from functools import lru_cache
+from typing import Dict, Mapping, NamedTuple, Optional, Sequence, Tuple, Type
+
+from ..character_classes.rng_streams import STREAMS, BattleRNG
+from ..character_classes.status_effects import (EffectCategory, EffectDefinition, EffectType, StackRule,
+                                                StatusEffect, define_effect)
+from ..main_gameloop.battle_loop import PLAYER
+from .replay import CLASS_CODES, CLASS_NAMES, NO_LIMIT, NO_SEED, SIDE_CODES, class_code, rules_hash
+
+MAGIC = b"TBSNAP"
+VERSION = 1
+FULL, DELTA = 1, 2
+
+_HEADER = struct.Struct("<6sBB")               # magic, version, kind
+_RULES = struct.Struct("<I")                   # rules hash, full snapshots only
+# player class, enemy class, seed, max rounds, round, side to move, then per side:
+# health, resource, items, effect manager turn
+FIELD_FORMATS = "BBqiiB" + "iiBI" * 2
+_FIELDS = struct.Struct("<" + FIELD_FORMATS)
+_MASK = struct.Struct("<H")
+_COUNT = struct.Struct("<H")
+_EFFECT = struct.Struct("<BdiBHBHi")           # type, magnitude, upkeep, resource, categories, rule, max stacks, turns left
+_STREAM_WORDS = 624
+_POSITION = struct.Struct("<H")
+_GAUSS = struct.Struct("<Bd")
+
+EFFECT_CODES = list(EffectType)
+RULE_CODES = list(StackRule)
+RESOURCE_CODES = ["rage", "stamina", "mana"]
+
+# per stream in an encoded snapshot
+NO_STREAM, STREAM_STATE, STREAM_POSITION, STREAM_SAME = 0, 1, 2, 3
+
+
+class SideSnapshot(NamedTuple):
+    health: int
+    resource: int
+    items: int
+    turn: int                                              # the StatusEffectManager's turn counter
+    effects: Tuple[Tuple[EffectDefinition, int], ...]      # (definition, turns left) in application order
+
+
+class BattleSnapshot(NamedTuple):
+    player_class: Type
+    enemy_class: Type
+    seed: Optional[int]           # BattleRNG seed; None when the battle rolls on the global random module
+    max_rounds: Optional[int]
+    round: int
+    to_move: str
+    player: SideSnapshot
+    enemy: SideSnapshot
+    streams: Tuple[Optional[tuple], ...]   # random.Random state per STREAMS entry, None if never created
+
+
+@lru_cache(maxsize=64)
+def _rules_hash(player_class: Type, enemy_class: Type) -> int:
+    # A class's numbers don't change while a process runs, so hash each pairing once
+    return rules_hash((player_class, enemy_class))
+
+
+# Capture and restore -------------------------------------------------------------------
+
+def _side(character) -> SideSnapshot:
+    manager = character.status_effects
+    return SideSnapshot(character.health, getattr(character, character.stats.resource),
+                        character.item_count, manager.turn,
+                        tuple((effect.definition, effect.duration) for effect in manager.active_effects))
+
+
+def capture(player, enemy, rng: Optional[BattleRNG] = None, round_number: int = 0, to_move: str = PLAYER,
+            max_rounds: Optional[int] = None) -> BattleSnapshot:
+    """
+    Snapshot of two live characters (or EnemyAI controllers) and the
+    BattleRNG they roll on, at the start of `to_move`'s turn in round
+    `round_number`.
+    """
+    player = getattr(player, "character", player)
+    enemy = getattr(enemy, "character", enemy)
+    return BattleSnapshot(type(player), type(enemy), None if rng is None else rng.seed, max_rounds,
+                          round_number, to_move, _side(player), _side(enemy),
+                          (None,) * len(STREAMS) if rng is None else rng.getstate())
+
+
+def _apply_side(character, side: SideSnapshot) -> None:
+    character.health = side.health
+    setattr(character, character.stats.resource, side.resource)
+    character.item_count = side.items
+    character.status_effects.restore(side.turn, [StatusEffect.of(definition, turns)
+                                                 for definition, turns in side.effects])
+
+
+def restore(snapshot: BattleSnapshot, ai_class: Optional[Type] = None):
+    """
+    Fresh (player, enemy, rng) carrying the snapshot. With `ai_class` the
+    enemy is an EnemyAI-style controller driving the enemy character. rng is
+    the restored BattleRNG, or None for a battle on the global random module.
+    """
+    player = snapshot.player_class()
+    enemy = snapshot.enemy_class() if ai_class is None else ai_class(snapshot.enemy_class)
+    rng = None
+    if snapshot.seed is not None:
+        rng = BattleRNG(snapshot.seed)
+        rng.setstate(snapshot.streams)
+        rng.equip(player, "player")
+        if ai_class is None:
+            rng.equip(enemy, "enemy")
+        else:
+            rng.equip_controller(enemy, "enemy")
+    _apply_side(player, snapshot.player)
+    _apply_side(getattr(enemy, "character", enemy), snapshot.enemy)
+    return player, enemy, rng
+
+
+# Encoding ------------------------------------------------------------------------------
+
+def _fields(snapshot: BattleSnapshot) -> Tuple[int, ...]:
+    return (class_code(snapshot.player_class), class_code(snapshot.enemy_class),
+            NO_SEED if snapshot.seed is None else snapshot.seed,
+            NO_LIMIT if snapshot.max_rounds is None else snapshot.max_rounds,
+            snapshot.round, SIDE_CODES.index(snapshot.to_move)) + snapshot.player[:4] + snapshot.enemy[:4]
+
+
+def _snapshot(fields: Sequence[int], player_effects, enemy_effects, streams,
+              classes: Mapping[str, Type]) -> BattleSnapshot:
+    (player_class, enemy_class, seed, max_rounds, round_number, to_move,
+     p_health, p_resource, p_items, p_turn, e_health, e_resource, e_items, e_turn) = fields
+    return BattleSnapshot(classes[CLASS_NAMES[player_class]], classes[CLASS_NAMES[enemy_class]],
+                          None if seed == NO_SEED else seed,
+                          None if max_rounds == NO_LIMIT else max_rounds, round_number, SIDE_CODES[to_move],
+                          SideSnapshot(p_health, p_resource, p_items, p_turn, player_effects),
+                          SideSnapshot(e_health, e_resource, e_items, e_turn, enemy_effects),
+                          tuple(streams))
+
+
+def _encode_effects(effects) -> bytes:
+    parts = [_COUNT.pack(len(effects))]
+    for definition, turns in effects:
+        parts.append(_EFFECT.pack(EFFECT_CODES.index(definition.effect_type), definition.magnitude,
+                                  definition.maintenance_cost, RESOURCE_CODES.index(definition.resource_type),
+                                  definition.categories.value, RULE_CODES.index(definition.stack_rule),
+                                  definition.max_stacks, turns))
+    return b"".join(parts)
+
+
+def _decode_effects(data, offset: int):
+    count, = _COUNT.unpack_from(data, offset)
+    offset += _COUNT.size
+    effects = []
+    for _ in range(count):
+        effect_type, magnitude, upkeep, resource, categories, rule, max_stacks, turns = \
+            _EFFECT.unpack_from(data, offset)
+        offset += _EFFECT.size
+        effects.append((define_effect(EFFECT_CODES[effect_type], magnitude, upkeep, RESOURCE_CODES[resource],
+                                      EffectCategory(categories), RULE_CODES[rule], max_stacks), turns))
+    return tuple(effects), offset
+
+
+def _encode_stream(state: tuple, previous: Optional[tuple]) -> bytes:
+    version, internal, gauss = state
+    if previous is not None:
+        if previous == state:
+            return bytes((STREAM_SAME,))
+        if previous[1][:-1] == internal[:-1] and previous[2] == gauss:
+            return bytes((STREAM_POSITION,)) + _POSITION.pack(internal[-1])
+    return (bytes((STREAM_STATE,)) + array("I", internal[:-1]).tobytes() + _POSITION.pack(internal[-1])
+            + _GAUSS.pack(gauss is not None, gauss or 0.0))
+
+
+def _decode_stream(data, offset: int, previous: Optional[tuple]):
+    kind = data[offset]
+    offset += 1
+    if kind == NO_STREAM:
+        return None, offset
+    if kind == STREAM_SAME:
+        return previous, offset
+    if kind == STREAM_POSITION:
+        position, = _POSITION.unpack_from(data, offset)
+        return (previous[0], previous[1][:-1] + (position,), previous[2]), offset + _POSITION.size
+    end = offset + 4 * _STREAM_WORDS
+    words = array("I")
+    words.frombytes(data[offset:end])
+    position, = _POSITION.unpack_from(data, end)
+    has_gauss, gauss = _GAUSS.unpack_from(data, end + _POSITION.size)
+    return ((3, tuple(words) + (position,), gauss if has_gauss else None),
+            end + _POSITION.size + _GAUSS.size)
+
+
+def encode(snapshot: BattleSnapshot, previous: Optional[BattleSnapshot] = None) -> bytes:
+    """Full snapshot bytes, or a delta against `previous` when one is given"""
+    fields = _fields(snapshot)
+    if previous is None:
+        parts = [_HEADER.pack(MAGIC, VERSION, FULL),
+                 _RULES.pack(_rules_hash(snapshot.player_class, snapshot.enemy_class)), _FIELDS.pack(*fields),
+                 _encode_effects(snapshot.player.effects), _encode_effects(snapshot.enemy.effects)]
+        for state in snapshot.streams:
+            parts.append(bytes((NO_STREAM,)) if state is None else _encode_stream(state, None))
+        return b"".join(parts)
+
+    before = _fields(previous)
+    mask = 0
+    changed = []
+    formats = []
+    for index, value in enumerate(fields):
+        if value != before[index]:
+            mask |= 1 << index
+            changed.append(value)
+            formats.append(FIELD_FORMATS[index])
+    effects_changed = ((snapshot.player.effects != previous.player.effects)
+                       | (snapshot.enemy.effects != previous.enemy.effects) << 1)
+    parts = [_HEADER.pack(MAGIC, VERSION, DELTA), _MASK.pack(mask), struct.pack("<" + "".join(formats), *changed),
+             bytes((effects_changed,))]
+    if effects_changed & 1:
+        parts.append(_encode_effects(snapshot.player.effects))
+    if effects_changed & 2:
+        parts.append(_encode_effects(snapshot.enemy.effects))
+    for state, old in zip(snapshot.streams, previous.streams):
+        parts.append(bytes((NO_STREAM,)) if state is None else _encode_stream(state, old))
+    return b"".join(parts)
+
+
+def decode(data: bytes, previous: Optional[BattleSnapshot] = None,
+           classes: Optional[Mapping[str, Type]] = None) -> BattleSnapshot:
+    """
+    Snapshot from encode() bytes; a delta needs the snapshot it was taken
+    against. `classes` maps class names to the classes to restore, e.g.
+    balanced_classes(data) for a tuned battle (shipped classes by default);
+    a delta keeps its previous snapshot's classes.
+    """
+    data = memoryview(data)
+    table: Dict[str, Type] = dict(zip(CLASS_NAMES, CLASS_CODES))
+    magic, version, kind = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Not a version {VERSION} battle snapshot")
+    offset = _HEADER.size
+    if kind == FULL:
+        hash_value, = _RULES.unpack_from(data, offset)
+        offset += _RULES.size
+        fields = _FIELDS.unpack_from(data, offset)
+        offset += _FIELDS.size
+        table.update(classes or {})
+        if hash_value != _rules_hash(table[CLASS_NAMES[fields[0]]], table[CLASS_NAMES[fields[1]]]):
+            raise ValueError("Snapshot was taken under different class numbers")
+        player_effects, offset = _decode_effects(data, offset)
+        enemy_effects, offset = _decode_effects(data, offset)
+        old_streams = (None,) * len(STREAMS)
+    elif kind == DELTA:
+        if previous is None:
+            raise ValueError("A delta snapshot needs the snapshot it was taken against")
+        mask, = _MASK.unpack_from(data, offset)
+        offset += _MASK.size
+        indexes = [index for index in range(len(FIELD_FORMATS)) if mask >> index & 1]
+        delta = struct.Struct("<" + "".join(FIELD_FORMATS[index] for index in indexes))
+        fields = list(_fields(previous))
+        for index, value in zip(indexes, delta.unpack_from(data, offset)):
+            fields[index] = value
+        offset += delta.size
+        effects_changed = data[offset]
+        offset += 1
+        player_effects, enemy_effects = previous.player.effects, previous.enemy.effects
+        if effects_changed & 1:
+            player_effects, offset = _decode_effects(data, offset)
+        if effects_changed & 2:
+            enemy_effects, offset = _decode_effects(data, offset)
+        old_streams = previous.streams
+        table.update(classes or {})
+        table.update((cls.stats.name, cls) for cls in (previous.player_class, previous.enemy_class))
+    else:
+        raise ValueError(f"Unknown snapshot kind {kind}")
+    streams = []
+    for old in old_streams:
+        state, offset = _decode_stream(data, offset, old)
+        streams.append(state)
+    return _snapshot(fields, player_effects, enemy_effects, streams, table)
+
+
+# Checkpoint files ----------------------------------------------------------------------
+
+_LENGTH = struct.Struct("<I")
+
+
+class SnapshotLog:
+    """
+    Append-only checkpoint file for one battle or session. A full snapshot
+    starts the file and every `full_every` records; the rest are deltas
+    against the record before them, so a turn's checkpoint stays small and
+    load() only replays the deltas since the last full snapshot.
+    """
+
+    def __init__(self, path: str, full_every: int = 64):
+        self.path = path
+        self.full_every = full_every
+        self._file = open(path, "ab")
+        self._last: Optional[BattleSnapshot] = None
+        self._since_full = 0
+
+    def append(self, snapshot: BattleSnapshot) -> int:
+        """Writes one checkpoint and returns its size in bytes"""
+        last = self._last
+        if (last is None or self._since_full >= self.full_every
+                or (last.player_class, last.enemy_class, last.seed) !=
+                   (snapshot.player_class, snapshot.enemy_class, snapshot.seed)):
+            record = encode(snapshot)
+            self._since_full = 0
+        else:
+            record = encode(snapshot, last)
+        self._since_full += 1
+        self._file.write(_LENGTH.pack(len(record)) + record)
+        self._file.flush()
+        self._last = snapshot
+        return len(record) + _LENGTH.size
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "SnapshotLog":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @staticmethod
+    def load(path: str, classes: Optional[Mapping[str, Type]] = None) -> Optional[BattleSnapshot]:
+        """The latest complete snapshot in a checkpoint file, None if it holds none; `classes` as for decode()"""
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as handle:
+            data = handle.read()
+        records = []
+        offset = 0
+        while offset + _LENGTH.size <= len(data):
+            length, = _LENGTH.unpack_from(data, offset)
+            start = offset + _LENGTH.size
+            if start + length > len(data):
+                break   # a writer killed mid-record leaves a partial tail; ignore it
+            records.append(data[start:start + length])
+            offset = start + length
+        # deltas only make sense from the last full snapshot on
+        fulls = [index for index, record in enumerate(records) if record[_HEADER.size - 1] == FULL]
+        if not fulls:
+            return None
+        snapshot = None
+        for record in records[fulls[-1]:]:
+            snapshot = decode(record, snapshot, classes)
+        return snapshot
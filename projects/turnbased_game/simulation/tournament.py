@@ -0,0 +1,447 @@
+"""
+Tournament
+Ranks EnemyAI policies by playing them against each other. An entrant is a
+policy playing one character class, written "policy:class" (e.g.
+"search:rogue"). Matches are scheduled round robin (everyone meets everyone)
+or Swiss (entrants on equal match points meet, avoiding rematches), played
+on a process pool, and folded into Elo or Glicko ratings as they finish.
+
+Results are applied in schedule order, holding back any that finish early,
+so the ratings depend only on the seed and never on the number of workers.
+Search entrants play to a fixed depth with no wall-clock budget for the
+same reason.
+A match is a run of battles in side-swapped pairs that share a battle seed,
+which cancels the first-move advantage and much of the dice luck.
+
+The checkpoint file is the schedule plus every result so far, rewritten
+atomically as JSON. Resuming replays the logged results into fresh ratings
+and plays only what is missing.
+"""
+import json
+import math
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple, Type
+
+from ..character_classes import EnemyAI, CompiledEnemyAI
+from ..main_gameloop.battle_loop import PLAYER, ENEMY
+from .headless_engine import CHARACTER_CLASSES, DEFAULT_MAX_ROUNDS, battle_seed, quiet, simulate_battle
+from .search_ai import SearchEnemyAI
+
+# Search entrants' depth: about what the default 5ms budget reaches, without the clock
+SEARCH_DEPTH = 4
+
+ROUND_ROBIN = "round-robin"
+SWISS = "swiss"
+CHECKPOINT_VERSION = 1
+
+
+class RandomEnemyAI(EnemyAI):
+    """Baseline policy: any action the character can take right now, uniformly"""
+
+    def choose_action(self, player):
+        character = self.character
+        actions = [entry.enemy_action for entry in character.actions if entry.allowed(character)]
+        return self.rng.choice(actions) if actions else "attack"
+
+
+POLICIES: Dict[str, Type[EnemyAI]] = {
+    "random": RandomEnemyAI,
+    "rules": EnemyAI,
+    "compiled": CompiledEnemyAI,
+    "search": SearchEnemyAI,
+}
+
+
+def parse_entrant(name: str) -> Tuple[str, str]:
+    """'policy:class' -> (policy, class name)"""
+    policy, _, class_name = name.partition(":")
+    if policy not in POLICIES or class_name not in CHARACTER_CLASSES:
+        raise ValueError(f"Unknown entrant {name!r}, expected POLICY:CLASS with POLICY one of "
+                         f"{sorted(POLICIES)} and CLASS one of {sorted(CHARACTER_CLASSES)}")
+    return policy, class_name
+
+
+def entrants_for(policies: Sequence[str], classes: Optional[Sequence[str]] = None) -> List[str]:
+    """Every policy playing every class"""
+    return [f"{policy}:{class_name}" for policy in policies for class_name in (classes or CHARACTER_CLASSES)]
+
+
+def controller(policy: str, moves_first: bool) -> Callable[[Type], EnemyAI]:
+    """Builds `policy`'s EnemyAI for one side; search needs to know which side moves first"""
+    ai_class = POLICIES[policy]
+    if issubclass(ai_class, SearchEnemyAI):
+        return partial(ai_class, moves_first=moves_first, time_budget=None, max_depth=SEARCH_DEPTH)
+    return ai_class
+
+
+class MatchResult(NamedTuple):
+    """Battles of one match from the first entrant's point of view"""
+    wins: int
+    losses: int
+    draws: int
+    rounds: int
+
+    @property
+    def battles(self) -> int:
+        return self.wins + self.losses + self.draws
+
+    @property
+    def score(self) -> float:
+        """First entrant's share of the points, draws counting half"""
+        return (self.wins + 0.5 * self.draws) / self.battles if self.battles else 0.5
+
+
+def play_match(first: str, second: str, seed: int, battles: int,
+               max_rounds: int = DEFAULT_MAX_ROUNDS) -> MatchResult:
+    """
+    Plays `battles` battles between two entrants. Battles 2k and 2k+1 both
+    use battle_seed(seed, k), with the sides swapped for the second one.
+    """
+    sides = (parse_entrant(first), parse_entrant(second))
+    wins = losses = draws = rounds = 0
+    with quiet():
+        for index in range(battles):
+            swapped = index % 2
+            (player_policy, player_class), (enemy_policy, enemy_class) = \
+                (sides[1], sides[0]) if swapped else sides
+            result = simulate_battle(CHARACTER_CLASSES[player_class], CHARACTER_CLASSES[enemy_class],
+                                     seed=battle_seed(seed, index // 2), max_rounds=max_rounds,
+                                     player_ai=controller(player_policy, True),
+                                     enemy_ai=controller(enemy_policy, False))
+            rounds += result.rounds
+            if result.winner == (ENEMY if swapped else PLAYER):
+                wins += 1
+            elif result.winner == (PLAYER if swapped else ENEMY):
+                losses += 1
+            else:
+                draws += 1
+    return MatchResult(wins, losses, draws, rounds)
+
+
+class EloRatings:
+    """Elo, updated once per match on the match score"""
+
+    def __init__(self, initial: float = 1500.0, k: float = 32.0):
+        self.initial = initial
+        self.k = k
+        self.ratings: Dict[str, float] = {}
+
+    def rating(self, name: str) -> float:
+        return self.ratings.get(name, self.initial)
+
+    def expected(self, first: str, second: str) -> float:
+        """Expected score of `first` against `second`"""
+        return 1.0 / (1.0 + 10 ** ((self.rating(second) - self.rating(first)) / 400))
+
+    def update(self, first: str, second: str, result: MatchResult) -> None:
+        change = self.k * (result.score - self.expected(first, second))
+        self.ratings[first] = self.rating(first) + change
+        self.ratings[second] = self.rating(second) - change
+
+    def new_period(self) -> None:
+        pass
+
+    def describe(self, name: str) -> str:
+        return f"{self.rating(name):.0f}"
+
+
+_Q = math.log(10) / 400
+
+
+def _g(deviation: float) -> float:
+    return 1.0 / math.sqrt(1 + 3 * _Q * _Q * deviation * deviation / (math.pi * math.pi))
+
+
+class GlickoRatings:
+    """
+    Glicko-1: a rating plus a deviation that shrinks as battles come in and
+    widens by `drift` every tournament round. A match of n battles is one
+    rating-period update with n games against the same opponent.
+    """
+
+    def __init__(self, initial: float = 1500.0, deviation: float = 350.0, drift: float = 15.0):
+        self.initial = initial
+        self.initial_deviation = deviation
+        self.drift = drift
+        self.ratings: Dict[str, Tuple[float, float]] = {}
+
+    def _entry(self, name: str) -> Tuple[float, float]:
+        return self.ratings.get(name, (self.initial, self.initial_deviation))
+
+    def rating(self, name: str) -> float:
+        return self._entry(name)[0]
+
+    def deviation(self, name: str) -> float:
+        return self._entry(name)[1]
+
+    def expected(self, first: str, second: str) -> float:
+        (rating, deviation), (other, other_deviation) = self._entry(first), self._entry(second)
+        combined = math.sqrt(deviation * deviation + other_deviation * other_deviation)
+        return 1.0 / (1.0 + 10 ** (-_g(combined) * (rating - other) / 400))
+
+    def update(self, first: str, second: str, result: MatchResult) -> None:
+        one, two = self._entry(first), self._entry(second)
+        self.ratings[first] = self._updated(one, two, result.wins + 0.5 * result.draws, result.battles)
+        self.ratings[second] = self._updated(two, one, result.losses + 0.5 * result.draws, result.battles)
+
+    @staticmethod
+    def _updated(player: Tuple[float, float], opponent: Tuple[float, float],
+                 points: float, games: int) -> Tuple[float, float]:
+        (rating, deviation), (other, other_deviation) = player, opponent
+        g = _g(other_deviation)
+        expected = 1.0 / (1.0 + 10 ** (-g * (rating - other) / 400))
+        precision = 1 / (deviation * deviation) + _Q * _Q * games * g * g * expected * (1 - expected)
+        return rating + _Q / precision * g * (points - games * expected), math.sqrt(1 / precision)
+
+    def new_period(self) -> None:
+        for name, (rating, deviation) in self.ratings.items():
+            self.ratings[name] = (rating, min(math.hypot(deviation, self.drift), self.initial_deviation))
+
+    def describe(self, name: str) -> str:
+        # 95% interval
+        return f"{self.rating(name):.0f} ±{1.96 * self.deviation(name):.0f}"
+
+
+RATING_SYSTEMS = {"elo": EloRatings, "glicko": GlickoRatings}
+
+Pairing = Tuple[str, Optional[str]]   # second is None for a bye
+
+
+@dataclass
+class EntrantRecord:
+    name: str
+    match_points: float = 0.0   # 1 per match won (or bye), 0.5 per drawn match
+    matches: int = 0
+    byes: int = 0
+    wins: int = 0               # battles
+    losses: int = 0
+    draws: int = 0
+    opponents: List[str] = field(default_factory=list)
+
+
+def round_robin_rounds(entrants: Sequence[str], cycles: int = 1) -> List[List[Pairing]]:
+    """Circle method: everyone meets everyone once per cycle, sides alternating between cycles"""
+    players: List[Optional[str]] = list(entrants) + ([None] if len(entrants) % 2 else [])
+    size = len(players)
+    rounds = []
+    for cycle in range(cycles):
+        order = players[:]
+        for _ in range(size - 1):
+            pairs = []
+            for i in range(size // 2):
+                first, second = order[i], order[size - 1 - i]
+                if cycle % 2:
+                    first, second = second, first
+                pairs.append((second, None) if first is None else (first, second))
+            rounds.append(pairs)
+            order = [order[0], order[-1]] + order[1:-1]
+    return rounds
+
+
+def _pair_without_rematches(names: List[str], records: Dict[str, EntrantRecord]) -> Optional[List[Pairing]]:
+    if not names:
+        return []
+    first, rest = names[0], names[1:]
+    for i, opponent in enumerate(rest):
+        if opponent in records[first].opponents:
+            continue
+        tail = _pair_without_rematches(rest[:i] + rest[i + 1:], records)
+        if tail is not None:
+            return [(first, opponent)] + tail
+    return None
+
+
+def swiss_pairings(records: Dict[str, EntrantRecord], ratings) -> List[Pairing]:
+    """
+    Pairs neighbours in the standings (match points, then rating), avoiding
+    rematches while that's still possible. With an odd field the
+    lowest-placed entrant that hasn't had a bye sits this round out.
+    """
+    names = [record.name for record in sorted(
+        records.values(), key=lambda record: (-record.match_points, -ratings.rating(record.name), record.name))]
+    byes: List[Pairing] = []
+    if len(names) % 2:
+        bye = min(reversed(names), key=lambda name: records[name].byes)
+        names.remove(bye)
+        byes.append((bye, None))
+    pairs = _pair_without_rematches(names, records)
+    if pairs is None:
+        pairs = [(names[i], names[i + 1]) for i in range(0, len(names), 2)]
+    return pairs + byes
+
+
+class Tournament:
+    """
+    A tournament between `entrants` ("policy:class" names). `rounds` is the
+    number of Swiss rounds (default ceil(log2(entrants))) or of full
+    round-robin cycles (default 1). With `checkpoint`, progress is saved to
+    that file every `checkpoint_every` matches and whenever run() stops.
+    """
+
+    def __init__(self, entrants: Sequence[str], format: str = ROUND_ROBIN, rounds: Optional[int] = None,
+                 battles_per_match: int = 20, seed: int = 0, rating: str = "elo",
+                 max_rounds: int = DEFAULT_MAX_ROUNDS, checkpoint: Optional[str] = None,
+                 checkpoint_every: int = 10):
+        entrants = list(entrants)
+        for name in entrants:
+            parse_entrant(name)
+        if len(set(entrants)) != len(entrants) or len(entrants) < 2:
+            raise ValueError("A tournament needs at least two distinct entrants")
+        if format not in (ROUND_ROBIN, SWISS):
+            raise ValueError(f"Unknown format {format!r}, expected {ROUND_ROBIN!r} or {SWISS!r}")
+        if rating not in RATING_SYSTEMS:
+            raise ValueError(f"Unknown rating system {rating!r}, expected one of {sorted(RATING_SYSTEMS)}")
+        if rounds is None:
+            rounds = math.ceil(math.log2(len(entrants))) if format == SWISS else 1
+        self.config = {"entrants": entrants, "format": format, "rounds": rounds,
+                       "battles_per_match": battles_per_match, "seed": seed, "rating": rating,
+                       "max_rounds": max_rounds}
+        self.checkpoint = checkpoint
+        self.checkpoint_every = checkpoint_every
+        self.ratings = RATING_SYSTEMS[rating]()
+        self.records = {name: EntrantRecord(name) for name in entrants}
+        self.schedule: List[List[Pairing]] = []
+        self.matches: List[Tuple[int, str, Optional[str]]] = []   # (round, first, second), numbered in order
+        self.results: Dict[int, MatchResult] = {}                 # may run ahead of `applied`
+        self.applied = 0                                          # matches folded into the ratings
+        if format == ROUND_ROBIN:
+            for pairs in round_robin_rounds(entrants, rounds):
+                self._add_round(pairs)
+
+    @classmethod
+    def resume(cls, path: str) -> "Tournament":
+        """Rebuilds a tournament from its checkpoint file, ready to run() the rest"""
+        with open(path) as file:
+            data = json.load(file)
+        if data.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"{path} is not a version {CHECKPOINT_VERSION} tournament checkpoint")
+        tournament = cls(checkpoint=path, **data["config"])
+        tournament.schedule, tournament.matches = [], []
+        for pairs in data["schedule"]:
+            tournament._add_round([(first, second) for first, second in pairs])
+        tournament.results = {int(number): MatchResult(*result) for number, result in data["results"].items()}
+        tournament._apply_ready()
+        return tournament
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Writes the checkpoint; a crash mid-write leaves the previous one intact"""
+        path = path or self.checkpoint
+        data = {"version": CHECKPOINT_VERSION, "config": self.config, "schedule": self.schedule,
+                "results": {str(number): list(result) for number, result in sorted(self.results.items())}}
+        temporary = path + ".tmp"
+        with open(temporary, "w") as file:
+            json.dump(data, file)
+        os.replace(temporary, path)
+
+    @property
+    def finished(self) -> bool:
+        return self.applied == len(self.matches) and not self._more_rounds()
+
+    def _add_round(self, pairs: List[Pairing]) -> None:
+        round_index = len(self.schedule)
+        self.schedule.append(list(pairs))
+        self.matches.extend((round_index, first, second) for first, second in pairs)
+
+    def _schedule_next_round(self) -> None:
+        # Swiss pairs each round from the standings the previous round left behind
+        if (self.config["format"] == SWISS and self.applied == len(self.matches)
+                and len(self.schedule) < self.config["rounds"]):
+            self._add_round(swiss_pairings(self.records, self.ratings))
+
+    def _match_args(self, number: int):
+        _, first, second = self.matches[number]
+        config = self.config
+        return (first, second, battle_seed(config["seed"], number), config["battles_per_match"],
+                config["max_rounds"])
+
+    def _apply(self, number: int) -> None:
+        round_index, first, second = self.matches[number]
+        if number and self.matches[number - 1][0] != round_index:
+            self.ratings.new_period()
+        record = self.records[first]
+        if second is None:
+            record.byes += 1
+            record.match_points += 1
+            return
+        result = self.results[number]
+        self.ratings.update(first, second, result)
+        other = self.records[second]
+        for mine, theirs, wins, losses in ((record, other, result.wins, result.losses),
+                                           (other, record, result.losses, result.wins)):
+            mine.matches += 1
+            mine.wins += wins
+            mine.losses += losses
+            mine.draws += result.draws
+            mine.match_points += 1 if wins > losses else 0.5 if wins == losses else 0
+            mine.opponents.append(theirs.name)
+
+    def _apply_ready(self, on_result=None) -> None:
+        """Applies results in match order up to the first one still being played"""
+        while self.applied < len(self.matches):
+            number = self.applied
+            if self.matches[number][2] is not None and number not in self.results:
+                break
+            self._apply(number)
+            self.applied += 1
+            if on_result is not None:
+                on_result(self, number)
+            if self.checkpoint and self.applied % self.checkpoint_every == 0:
+                self.save()
+
+    def run(self, workers: Optional[int] = None,
+            on_result: Optional[Callable[["Tournament", int], None]] = None) -> List[EntrantRecord]:
+        """
+        Plays every remaining match and returns the standings.
+        workers=None uses every core; workers=1 plays in this process.
+        `on_result(tournament, match_number)` is called as each match is applied.
+        """
+        workers = workers or os.cpu_count() or 1
+        pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        futures = {}
+        try:
+            while True:
+                self._schedule_next_round()
+                pending = [number for number in range(self.applied, len(self.matches))
+                           if self.matches[number][2] is not None and number not in self.results]
+                if not pending:
+                    self._apply_ready(on_result)
+                    if self.finished:
+                        break
+                    continue
+                if pool is None:
+                    for number in pending:
+                        self.results[number] = play_match(*self._match_args(number))
+                        self._apply_ready(on_result)
+                    continue
+                futures = {pool.submit(play_match, *self._match_args(number)): number for number in pending}
+                while futures:
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self.results[futures.pop(future)] = future.result()
+                    self._apply_ready(on_result)
+        finally:
+            if pool is not None:
+                for future in futures:
+                    future.cancel()
+                pool.shutdown()
+            if self.checkpoint:
+                self.save()
+        return self.standings()
+
+    def _more_rounds(self) -> bool:
+        return self.config["format"] == SWISS and len(self.schedule) < self.config["rounds"]
+
+    def standings(self) -> List[EntrantRecord]:
+        """Match points first, rating breaking ties"""
+        return sorted(self.records.values(),
+                      key=lambda record: (-record.match_points, -self.ratings.rating(record.name), record.name))
+
+    def format_table(self) -> str:
+        lines = [f"{'#':>3}  {'entrant':<18}{'rating':>12}{'points':>8}{'battles W-D-L':>18}"]
+        for place, record in enumerate(self.standings(), 1):
+            lines.append(f"{place:>3}  {record.name:<18}{self.ratings.describe(record.name):>12}"
+                         f"{record.match_points:>8.1f}{f'{record.wins}-{record.draws}-{record.losses}':>18}")
+        return "\n".join(lines)
@@ -0,0 +1,281 @@
+"""
+Vectorized Battle Kernel
+Struct-of-arrays version of the combat rules that simulates a whole batch of
+battles at once with NumPy. Health, resource, item count and effect duration
+live in one array per combatant; each round advances every unfinished battle
+together using batched random draws and masks for finished battles.
+
+Mirrors warrior.py, rogue.py, wizard.py, status_effect_manager.py, the
+EnemyAI rule cascade and the round structure in battle_loop.py, so results
+are statistically equivalent to the object engine (not roll-for-roll identical:
+draws are batched per turn instead of consumed one call at a time).
+
+Requires numpy (pip install "turnbased-rpg[simulation]").
+"""
+import time
+from typing import Type
+
+import numpy as np
+
+from ..character_classes import Warrior, Wizard, EnemyAI
+from ..character_classes.status_effects import EffectCategory
+from .headless_engine import BatchSummary, DEFAULT_MAX_ROUNDS
+
+# Action codes
+ATTACK, SPECIAL, ITEM, HEAL, EFFECT = range(5)
+
+# Winner codes
+ONGOING, PLAYER_WON, ENEMY_WON, DRAWN = range(4)
+
+
+class SideArrays:
+    """One combatant's stats across every battle in the batch"""
+    __slots__ = ("cls", "stats", "max_health", "max_resource", "health", "resource",
+                 "item_count", "effect_turns")
+
+    def __init__(self, character_class: Type, battles: int):
+        stats = character_class.stats
+        self.cls = character_class
+        self.stats = stats
+        self.max_health = stats.max_health
+        self.max_resource = stats.max_resource
+        self.health = np.full(battles, stats.max_health, dtype=np.int64)
+        self.resource = np.full(battles, stats.start_resource, dtype=np.int64)
+        self.item_count = np.full(battles, stats.items, dtype=np.int64)
+        # remaining turns of the class's own status effect (0 = inactive)
+        self.effect_turns = np.zeros(battles, dtype=np.int64)
+
+
+# Status effects -------------------------------------------------------------------------
+
+def _process_effects(side: SideArrays, mask):
+    """process_turn_effects: pay upkeep, tick duration, expire"""
+    ticking = mask & (side.effect_turns > 0)
+    upkeep = side.stats.effect.upkeep
+    if upkeep:
+        # e.g. Magic Bubble drops when its mana upkeep can't be paid
+        failed = ticking & (side.resource < upkeep)
+        side.effect_turns[failed] = 0
+        ticking &= ~failed
+        side.resource[ticking] -= upkeep
+    side.effect_turns[ticking] -= 1
+
+
+def _strike(target: SideArrays, mask, damage, dodge_roll):
+    """
+    Dodge check then apply_damage_modification on the target's effects.
+    Returns (hit mask, final damage).
+    """
+    hit = mask.copy()
+    active_effect = target.effect_turns > 0
+    effect = target.stats.effect
+    final = damage
+    if effect.categories & EffectCategory.DODGE:
+        hit &= ~(active_effect & (dodge_roll < effect.magnitude))
+    if effect.categories & EffectCategory.DAMAGE_REDUCTION:
+        # truncated like int()
+        reduced = np.maximum(0, final - (final * effect.magnitude).astype(np.int64))
+        final = np.where(active_effect, reduced, final)
+    if effect.categories & EffectCategory.DAMAGE_AMPLIFICATION:
+        extra = np.where(active_effect, (final * effect.magnitude).astype(np.int64), 0)
+        final = final + extra
+        if effect.categories & EffectCategory.RAGE_CONVERSION:
+            target.resource += np.where(hit, extra, 0)
+    target.health -= np.where(hit, final, 0)
+    return hit, final
+
+
+# Abilities ------------------------------------------------------------------------------
+
+def _roll(ability, roll):
+    """AbilityTable.roll for a whole array of draws"""
+    damage = np.full(roll.shape, ability.base, dtype=np.int64)
+    # tiers are checked in order, so apply them last-to-first
+    for chance, tier_damage in reversed(ability.tiers):
+        damage = np.where(roll < chance, tier_damage, damage)
+    return damage
+
+
+def _gain(ability, final):
+    """AbilityTable.gain_for for a whole array of final damages"""
+    gain = np.full(np.shape(final), ability.gain, dtype=np.int64)
+    for damage, damage_gain in ability.gain_on_damage:
+        gain = np.where(final == damage, damage_gain, gain)
+    return gain
+
+
+def _use_ability(side: SideArrays, target: SideArrays, ability, mask, rolls):
+    roll, dodge = rolls
+    casting = mask & (side.resource >= ability.cost)
+    if ability.cost:
+        side.resource[casting] -= ability.cost
+    hit, final = _strike(target, casting, _roll(ability, roll), dodge)
+    side.resource += np.where(hit, _gain(ability, final), 0)
+
+
+def _attack(side: SideArrays, target: SideArrays, mask, rolls):
+    _use_ability(side, target, side.stats.attack, mask, rolls)
+
+
+def _special(side: SideArrays, target: SideArrays, mask, rolls):
+    _use_ability(side, target, side.stats.special, mask, rolls)
+
+
+def _item(side: SideArrays, mask):
+    item = side.stats.item
+    usable = np.zeros_like(mask)
+    if item.health:
+        usable |= side.health < side.max_health
+    if item.resource:
+        usable |= side.resource < side.max_resource
+    usable &= mask & (side.item_count > 0)
+    side.health[usable] = np.minimum(side.health[usable] + item.health, side.max_health)
+    if item.resource:
+        side.resource[usable] = np.minimum(side.resource[usable] + item.resource, side.max_resource)
+    side.item_count[usable] -= 1
+
+
+def _heal(side: SideArrays, mask):
+    # e.g. Wizard spell_heal
+    heal = side.stats.heal
+    casting = mask & (side.resource >= heal.cost) & (side.health < side.max_health)
+    side.resource[casting] -= heal.cost
+    side.health[casting] = np.minimum(side.health[casting] + heal.health, side.max_health)
+
+
+def _effect(side: SideArrays, target: SideArrays, mask, rolls):
+    """Activates the class status effect; EnemyAI falls back to attack on failure"""
+    effect = side.stats.effect
+    casting = mask & (side.resource >= effect.cost)
+    if effect.cost:
+        side.resource[casting] -= effect.cost
+    side.effect_turns[casting] = effect.duration
+    _attack(side, target, mask & ~casting, rolls)
+
+
+# Policy ---------------------------------------------------------------------------------
+
+def choose_actions(side: SideArrays, opponent: SideArrays, coin):
+    """EnemyAI.choose_action for every battle at once"""
+    cls = side.cls
+    stats = side.stats
+    health_percentage = side.health / side.max_health
+    status_ok = (side.resource >= stats.status_threshold) & (side.effect_turns == 0)
+    can_special = side.resource >= stats.special.cost
+    has_items = side.item_count > 0
+    attack = np.full(side.health.shape, ATTACK, dtype=np.int8)
+
+    # _desperate_action
+    if issubclass(cls, Warrior):
+        desperate_status = status_ok & has_items
+    else:
+        desperate_status = status_ok
+    can_heal = (side.resource >= stats.heal.cost) if stats.heal else np.zeros_like(has_items)
+    desperate = np.select([desperate_status, can_heal, has_items, can_special],
+                          [EFFECT, HEAL, ITEM, SPECIAL], attack)
+
+    # _defensive_action (random.choice between two options)
+    heads = coin < 0.5
+    defensive_status = status_ok if not issubclass(cls, Warrior) else np.zeros_like(status_ok)
+    defensive = np.select([defensive_status, can_heal, has_items, can_special],
+                          [EFFECT, np.where(heads, HEAL, ATTACK), np.where(heads, ITEM, ATTACK), SPECIAL],
+                          attack)
+
+    # _offensive_action
+    if issubclass(cls, Warrior):
+        offensive_status = status_ok & (side.health > EnemyAI.STURDY_HEALTH)
+    else:
+        offensive_status = np.zeros_like(status_ok)
+    offensive = np.select([offensive_status, can_special & (opponent.health <= EnemyAI.KILL_RANGE),
+                           side.resource >= stats.excess_resource],
+                          [EFFECT, SPECIAL, SPECIAL], attack)
+
+    return np.select([health_percentage < EnemyAI.DESPERATE_HEALTH,
+                      health_percentage < EnemyAI.DEFENSIVE_HEALTH],
+                     [desperate, defensive], offensive).astype(np.int8)
+
+
+def _take_turn(side: SideArrays, target: SideArrays, mask, draws):
+    coin, roll, dodge = draws
+    actions = choose_actions(side, target, coin)
+    rolls = (roll, dodge)
+    _attack(side, target, mask & (actions == ATTACK), rolls)
+    _special(side, target, mask & (actions == SPECIAL), rolls)
+    _item(side, mask & (actions == ITEM))
+    if side.stats.heal:
+        _heal(side, mask & (actions == HEAL))
+    _effect(side, target, mask & (actions == EFFECT), rolls)
+
+
+def _ran_dry(side: SideArrays, mask):
+    # Wizard with no mana for a bolt and no potions left dies
+    if not issubclass(side.cls, Wizard):
+        return np.zeros_like(mask)
+    return mask & (side.resource < side.stats.attack.cost) & (side.item_count <= 0)
+
+
+# Batch ----------------------------------------------------------------------------------
+
+class VectorBattleBatch:
+    """A batch of identical matchups advanced one round at a time"""
+
+    def __init__(self, player_class: Type, enemy_class: Type, battles: int, seed: int = 0):
+        self.battles = battles
+        self.player = SideArrays(player_class, battles)
+        self.enemy = SideArrays(enemy_class, battles)
+        self.winner = np.full(battles, ONGOING, dtype=np.int8)
+        self.rounds = np.zeros(battles, dtype=np.int64)
+        self.round_number = 0
+        self.rng = np.random.default_rng(seed)
+
+    @property
+    def active(self):
+        return self.winner == ONGOING
+
+    def step(self) -> None:
+        """Advances every unfinished battle by one round"""
+        player, enemy = self.player, self.enemy
+        active = self.active
+        self.round_number += 1
+        self.rounds[active] = self.round_number
+
+        _process_effects(player, active)
+        _process_effects(enemy, active)
+
+        # Player turn: a dry wizard dies instead of acting
+        dry = _ran_dry(player, active)
+        player.health[dry] = 0
+        _take_turn(player, enemy, active & ~dry, self.rng.random((3, self.battles)))
+        enemy_down = active & (enemy.health <= 0)
+        self.winner[enemy_down] = PLAYER_WON
+        active &= ~enemy_down
+
+        # Enemy turn: a dry wizard dies but still acts
+        dry = _ran_dry(enemy, active)
+        enemy.health[dry] = 0
+        _take_turn(enemy, player, active, self.rng.random((3, self.battles)))
+        player_down = active & (player.health <= 0)
+        self.winner[player_down] = ENEMY_WON
+        active &= ~player_down
+        self.winner[active & (enemy.health <= 0)] = PLAYER_WON
+
+    def run(self, max_rounds: int = DEFAULT_MAX_ROUNDS) -> None:
+        while self.round_number < max_rounds and self.active.any():
+            self.step()
+        self.winner[self.active] = DRAWN
+
+
+def simulate_vectorized(battles: int, player_class: Type, enemy_class: Type, seed: int = 0,
+                        max_rounds: int = DEFAULT_MAX_ROUNDS) -> BatchSummary:
+    """Vectorized counterpart of simulate_batch for one class pairing"""
+    start = time.perf_counter()
+    batch = VectorBattleBatch(player_class, enemy_class, battles, seed)
+    batch.run(max_rounds)
+    elapsed = time.perf_counter() - start
+
+    return BatchSummary(battles=battles,
+                        player_wins=int(np.count_nonzero(batch.winner == PLAYER_WON)),
+                        enemy_wins=int(np.count_nonzero(batch.winner == ENEMY_WON)),
+                        draws=int(np.count_nonzero(batch.winner == DRAWN)),
+                        total_rounds=int(batch.rounds.sum()),
+                        elapsed=elapsed)
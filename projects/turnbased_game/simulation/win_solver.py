@@ -0,0 +1,230 @@
+"""
+Win Probability Solver
+Exact win probabilities by memoized expectiminimax over battle states.
+A state is both combatants' (health, resource, item_count, effect_turns)
+plus the rounds left before the battle counts as a draw, packed into a
+single int for the memo table. Transitions come from battle_rules, which
+mirrors the class abilities and process_turn_effects.
+
+Each side plays either "optimal" (player maximises, enemy minimises the
+player's win probability) or "ai" (the EnemyAI rule cascade, random splits
+included). Solving "ai" against "ai" gives the exact win rate the headless
+engine converges to for the same max_rounds. The defaults answer the
+question the game actually poses: the best a player can do against EnemyAI.
+
+The state count grows exponentially with the horizon, so the search is
+bounded: resource above what the remaining rounds can use is clamped, an
+enemy with more health than the player can take before the horizon is
+scored 0 without being searched (unless it might run dry first), and an
+optimal side stops looking once it has found a certain result. Worst of
+the Warrior/Rogue/Wizard pairings, single core:
+
+    horizon     ai vs ai        optimal vs ai
+       6        0.06s           0.6s
+       8        0.25s           12s
+      10        1.9s            2 min (Warrior vs Rogue)
+      12        9.4s            -
+
+Longer horizons are better answered by simulate_batch, or solved once
+with cache_dir.
+"""
+import os
+import pickle
+import sys
+from functools import lru_cache
+from typing import Dict, Optional, Tuple, Type
+
+from .battle_rules import (Combatant, ClassRules, rules_for, process_effects, ran_dry, may_run_dry, max_hit,
+                           legal_actions, ai_actions, outcomes, HEALTH, RESOURCE)
+
+OPTIMAL = "optimal"
+AI = "ai"
+
+# Solves in about a second for any policy pairing; see the timings above
+DEFAULT_HORIZON = 6
+
+
+def encode_state(player: Combatant, enemy: Combatant, rounds_left: int) -> int:
+    """
+    Packs a battle state into one int (health 16 bits, resource 16, items 8,
+    effect turns 8). Health below zero packs as 0: all dead is equally dead.
+    Any other value that doesn't fit its field raises ValueError rather than
+    spilling into its neighbour and sharing a key with another state.
+    """
+    key = rounds_left
+    for health, resource, items, turns in (player, enemy):
+        if health < 0:
+            health = 0
+        # a negative number shifts to -1, so this catches those too
+        if health >> 16 or resource >> 16 or items >> 8 or turns >> 8:
+            raise ValueError(f"Combatant {(health, resource, items, turns)} doesn't fit the state key")
+        key = (((key << 16 | health) << 16 | resource) << 8 | items) << 8 | turns
+    return key
+
+
+def decode_state(key: int) -> Tuple[Combatant, Combatant, int]:
+    combatants = []
+    for _ in range(2):
+        turns = key & 0xFF
+        items = (key >> 8) & 0xFF
+        resource = (key >> 16) & 0xFFFF
+        health = (key >> 32) & 0xFFFF
+        combatants.append((health, resource, items, turns))
+        key >>= 48
+    enemy, player = combatants
+    return player, enemy, key
+
+
+def resource_ceiling(rules: ClassRules, policy: str, rounds_left: int) -> int:
+    """
+    Resource above every threshold the policy checks plus whatever could be
+    spent before the horizon behaves identically, so states are clamped to it.
+    """
+    thresholds = [rules.special_cost, rules.effect_cost, rules.max_resource or 0]
+    if policy == AI:
+        thresholds += [rules.status_threshold, rules.excess_resource]
+    return max(thresholds) + rules.max_spend_per_turn * (rounds_left - 1)
+
+
+class WinProbabilitySolver:
+    """Exact player win probability for one class pairing"""
+
+    def __init__(self, player_class: Type, enemy_class: Type, player_policy: str = OPTIMAL,
+                 enemy_policy: str = AI, cache_dir: Optional[str] = None):
+        for policy in (player_policy, enemy_policy):
+            if policy not in (OPTIMAL, AI):
+                raise ValueError(f"Unknown policy {policy!r}, expected {OPTIMAL!r} or {AI!r}")
+        self.player_rules = rules_for(player_class)
+        self.enemy_rules = rules_for(enemy_class)
+        self.player_policy = player_policy
+        self.enemy_policy = enemy_policy
+        self.player_reach = max_hit(self.player_rules, self.enemy_rules)   # enemy health one round can take
+        self.memo: Dict[int, float] = {}
+        self.cache_path = None
+        if cache_dir:
+            name = f"{player_class.__name__}-{enemy_class.__name__}-{player_policy}-{enemy_policy}.pkl"
+            self.cache_path = os.path.join(cache_dir, name.lower())
+            if os.path.exists(self.cache_path):
+                with open(self.cache_path, "rb") as handle:
+                    self.memo = pickle.load(handle)
+
+    def save(self) -> None:
+        """Writes the memo table to the disk cache (if one was given)"""
+        if self.cache_path:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            with open(self.cache_path, "wb") as handle:
+                pickle.dump(self.memo, handle, protocol=pickle.HIGHEST_PROTOCOL)
+
+    # Public queries ----------------------------------------------------------------------
+
+    def win_probability(self, player: Optional[Combatant] = None, enemy: Optional[Combatant] = None,
+                        max_rounds: int = DEFAULT_HORIZON) -> float:
+        """
+        Probability the player wins within `max_rounds`, starting from the top
+        of a round (fresh characters by default). Battles still going at the
+        horizon count as not won, like draws in simulate_battle.
+        """
+        player = player or self.player_rules.start()
+        enemy = enemy or self.enemy_rules.start()
+        self._ensure_recursion_depth(max_rounds)
+        return self._round(player, enemy, max_rounds)
+
+    def action_values(self, player: Combatant, enemy: Combatant, max_rounds: int) -> Dict[str, float]:
+        """Win probability of each legal player action, effects for the round already processed"""
+        self._ensure_recursion_depth(max_rounds)
+        return {action: self._after_player(player, enemy, action, max_rounds)
+                for action in legal_actions(self.player_rules, player)}
+
+    def best_action(self, player: Combatant, enemy: Combatant, max_rounds: int) -> Optional[str]:
+        values = self.action_values(player, enemy, max_rounds)
+        return max(values, key=values.get) if values else None
+
+    # Recursion ---------------------------------------------------------------------------
+
+    @staticmethod
+    def _ensure_recursion_depth(rounds: int) -> None:
+        # four frames per round plus headroom
+        needed = rounds * 4 + 200
+        if sys.getrecursionlimit() < needed:
+            sys.setrecursionlimit(needed)
+
+    def _round(self, player: Combatant, enemy: Combatant, rounds_left: int) -> float:
+        if rounds_left <= 0:
+            return 0.0   # draw
+        if enemy[HEALTH] > self.player_reach * rounds_left and not may_run_dry(self.enemy_rules, enemy, rounds_left):
+            return 0.0   # out of reach before the horizon
+        ceiling = resource_ceiling(self.player_rules, self.player_policy, rounds_left)
+        if player[RESOURCE] > ceiling:
+            player = (player[0], ceiling, player[2], player[3])
+        ceiling = resource_ceiling(self.enemy_rules, self.enemy_policy, rounds_left)
+        if enemy[RESOURCE] > ceiling:
+            enemy = (enemy[0], ceiling, enemy[2], enemy[3])
+        key = encode_state(player, enemy, rounds_left)
+        value = self.memo.get(key)
+        if value is None:
+            player = process_effects(self.player_rules, player)
+            enemy = process_effects(self.enemy_rules, enemy)
+            value = self._player_turn(player, enemy, rounds_left)
+            self.memo[key] = value
+        return value
+
+    def _player_turn(self, player: Combatant, enemy: Combatant, rounds_left: int) -> float:
+        if ran_dry(self.player_rules, player):
+            return 0.0
+        if self.player_policy == OPTIMAL:
+            best = 0.0
+            for action in legal_actions(self.player_rules, player):
+                best = max(best, self._after_player(player, enemy, action, rounds_left))
+                if best >= 1.0:
+                    break   # a certain win can't be beaten
+            return best
+        return sum(p * self._after_player(player, enemy, action, rounds_left)
+                   for p, action in ai_actions(self.player_rules, player, enemy[HEALTH]))
+
+    def _after_player(self, player: Combatant, enemy: Combatant, action: str, rounds_left: int) -> float:
+        value = 0.0
+        for p, new_player, new_enemy in outcomes(self.player_rules, player, self.enemy_rules, enemy, action):
+            if new_enemy[HEALTH] <= 0:
+                value += p
+            else:
+                value += p * self._enemy_turn(new_player, new_enemy, rounds_left)
+        return value
+
+    def _enemy_turn(self, player: Combatant, enemy: Combatant, rounds_left: int) -> float:
+        if ran_dry(self.enemy_rules, enemy):
+            return 1.0
+        if self.enemy_policy == OPTIMAL:
+            best = 1.0
+            for action in legal_actions(self.enemy_rules, enemy):
+                best = min(best, self._after_enemy(player, enemy, action, rounds_left))
+                if best <= 0.0:
+                    break
+            return best
+        return sum(p * self._after_enemy(player, enemy, action, rounds_left)
+                   for p, action in ai_actions(self.enemy_rules, enemy, player[HEALTH]))
+
+    def _after_enemy(self, player: Combatant, enemy: Combatant, action: str, rounds_left: int) -> float:
+        value = 0.0
+        for p, new_enemy, new_player in outcomes(self.enemy_rules, enemy, self.player_rules, player, action):
+            if new_player[HEALTH] > 0:
+                value += p * self._round(new_player, new_enemy, rounds_left - 1)
+        return value
+
+
+@lru_cache(maxsize=32)
+def solver_for(player_class: Type, enemy_class: Type, player_policy: str = OPTIMAL,
+               enemy_policy: str = AI, cache_dir: Optional[str] = None) -> WinProbabilitySolver:
+    """Shared solver per matchup so repeated queries reuse the memo table"""
+    return WinProbabilitySolver(player_class, enemy_class, player_policy, enemy_policy, cache_dir)
+
+
+def win_probability(player_class: Type, enemy_class: Type, player_policy: str = OPTIMAL,
+                    enemy_policy: str = AI, max_rounds: int = DEFAULT_HORIZON,
+                    cache_dir: Optional[str] = None) -> float:
+    """Exact player win probability for fresh characters; with `cache_dir` new solutions are saved there"""
+    solver = solver_for(player_class, enemy_class, player_policy, enemy_policy, cache_dir)
+    known = len(solver.memo)
+    value = solver.win_probability(max_rounds=max_rounds)
+    if len(solver.memo) > known:
+        solver.save()
+    return value
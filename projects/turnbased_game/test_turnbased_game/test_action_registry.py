@@ -0,0 +1,127 @@
+"""
+Test suite for the action registry
+Tests that menu keys, player actions and EnemyAI actions dispatch through
+each class's registry, and that new classes plug in without editing the base class
+"""
+import pytest
+from turnbased_game.character_classes import Warrior, Rogue, Wizard, EnemyAI, CaptureSink, output_to
+from turnbased_game.character_classes.action_registry import ActionSpec, ActionRegistry
+from turnbased_game.character_classes.status_effects import EffectType
+
+
+class TestKeys:
+    """Test menu key lookups"""
+
+    @pytest.mark.parametrize("character_class, status", [(Warrior, "berserker_rage"),
+                                                         (Rogue, "shadow_step"),
+                                                         (Wizard, "magic_bubble")])
+    def test_keys_map_to_actions(self, character_class, status):
+        character = character_class()
+        assert [character.map_input_to_action(key) for key in "abce"] == ["attack", "special", "item", status]
+        assert character.map_input_to_action("z") is None
+
+    def test_heal_key_is_wizard_only(self):
+        assert Wizard().map_input_to_action("d") == "heal"
+        assert Warrior().map_input_to_action("d") is None
+        assert Rogue().map_input_to_action("d") is None
+
+    def test_registry_resolved_per_class(self):
+        """Each class gets its own registry with its own handlers"""
+        assert Warrior.actions is not Rogue.actions
+        assert Wizard.actions.get("attack").handler is Wizard.attack
+        assert Rogue.actions.status.enemy_action == "activate_shadow_step"
+
+
+class TestValidation:
+    """Test validate_action and get_available_actions through the registry"""
+
+    def test_available_in_menu_order(self):
+        wizard = Wizard()
+        wizard.health -= 10
+        assert wizard.get_available_actions() == ["attack", "special", "heal", "magic_bubble"]
+        wizard.mana = 0
+        assert wizard.get_available_actions() == ["item"]
+
+    def test_unknown_action_invalid(self):
+        assert not Warrior().validate_action("heal")
+        assert not Warrior().validate_action("not_an_action")
+
+    def test_status_blocked_while_active(self):
+        warrior = Warrior()
+        assert warrior.validate_action("berserker_rage")
+        warrior.enter_berserker_rage()
+        assert not warrior.validate_action("berserker_rage")
+
+    def test_cost_metadata(self):
+        wizard = Wizard()
+        assert Wizard.actions.get("special").cost(wizard) == Wizard.stats.special.cost
+        assert Wizard.actions.get("heal").cost(wizard) == Wizard.stats.heal.cost
+        assert Wizard.actions.get("item").cost(wizard) == 0
+
+
+class TestExecution:
+    """Test player and enemy dispatch"""
+
+    def test_player_status_narration(self):
+        sink = CaptureSink()
+        rogue = Rogue()
+        with output_to(sink):
+            rogue.execute_action("shadow_step", Warrior())
+            rogue.stamina = 0
+            rogue.execute_action("shadow_step", Warrior())
+        assert rogue.has_status_effect(EffectType.SHADOW_STEP)
+        assert sink.lines == ["You meld with the shadows, becoming harder to hit!",
+                              "Failed to activate Shadow Step: insufficient_stamina"]
+
+    def test_enemy_status_falls_back_to_attack(self):
+        """A failed enemy status ability still attacks, like before"""
+        ai = EnemyAI(Wizard)
+        ai.character.mana = 10
+        player = Warrior()
+        with output_to(CaptureSink()) as sink:
+            ai.execute_action("cast_magic_bubble", player)
+        assert "Enemy wizard failed to cast magic bubble." in sink.lines
+        assert player.health < player.max_health
+
+    def test_unknown_enemy_action_attacks(self):
+        ai = EnemyAI(Rogue)
+        player = Wizard()
+        with output_to(CaptureSink()):
+            ai.execute_action("dance", player)
+        assert player.health < player.max_health
+
+
+class Paladin(Warrior):
+    """Test class adding an action without touching Character"""
+    ACTIONS = Warrior.ACTIONS + (
+        ActionSpec("f", "pray", "pray", "can_pray", "heal", enemy_action="pray"),
+    )
+
+    def pray(self, is_enemy=False):
+        self.health = self.max_health
+
+    def can_pray(self):
+        return self.health < self.max_health
+
+
+class TestNewClasses:
+    """Test plugging new classes into the registry"""
+
+    def test_subclass_action_dispatches(self):
+        paladin = Paladin()
+        paladin.health = 10
+        assert paladin.map_input_to_action("f") == "pray"
+        assert paladin.validate_action("pray")
+        paladin.execute_action("pray", Warrior())
+        assert paladin.health == paladin.max_health
+
+    def test_enemy_uses_subclass_action(self):
+        ai = EnemyAI(Paladin)
+        ai.character.health = 1
+        with output_to(CaptureSink()):
+            ai.execute_action("pray", Warrior())
+        assert ai.character.health == ai.character.max_health
+
+    def test_duplicate_key_rejected(self):
+        with pytest.raises(ValueError, match="'a'"):
+            ActionRegistry(Warrior, Warrior.ACTIONS + (ActionSpec("a", "x", "attack", "can_use_attack", "attack"),))
@@ -0,0 +1,136 @@
+"""
+Test suite for action result dicts
+Tests that every action of every class reports through perform_get_result
+with numbers matching the battle, crit/dodge/failure cues, the enemy's
+fallback attack and the combat event buses being left as they were
+"""
+import pytest
+from turnbased_game.character_classes import (Rogue, Warrior, Wizard, EnemyAI, CombatEventBus, EventRecorder,
+                                              DamageDealt, combat_events, NullSink, output_to)
+from turnbased_game.character_classes.status_effects import StatusEffect, EffectType, EffectCategory
+
+CLASSES = (Warrior, Rogue, Wizard)
+
+
+class _Rolls:
+    """Stands in for an rng that always rolls `value`"""
+
+    def __init__(self, value):
+        self.value = value
+
+    def random(self):
+        return self.value
+
+
+@pytest.fixture(autouse=True)
+def _quiet():
+    with output_to(NullSink()):
+        yield
+
+
+def _ready(character):
+    """Puts a character where every one of its actions is allowed"""
+    character.health -= 30
+    setattr(character, character.stats.resource, character.stats.max_resource or 100)   # rage has no cap
+    if isinstance(character, Rogue):
+        character.stamina -= 10
+    if isinstance(character, Wizard):
+        character.mana -= 10
+    return character
+
+
+@pytest.mark.parametrize("cls", CLASSES)
+def test_every_action_reports(cls):
+    for entry in cls.actions:
+        character, enemy = _ready(cls()), Warrior()
+        assert entry.allowed(character), entry.action
+        result = character.perform_get_result(entry.action, enemy)
+        resource = cls.stats.resource
+        assert result['action_type'] == entry.action
+        assert result['success']
+        assert result['attacker_health_after'] == character.health
+        assert result['target_health_after'] == enemy.health
+        assert result['target_health_before'] - result['target_health_after'] == result['damage']
+        assert result[f'attacker_{resource}_after'] == getattr(character, resource)
+        assert result[f'{resource}_gain'] == result['attacker_resource_after'] - result['attacker_resource_before']
+        assert result['animation_triggers'] and result['sound_effects']
+        assert result['effect_applied'] == (cls.stats.effect.effect_type.value if entry.spec.status else None)
+
+
+def test_attack_get_result_keeps_its_keys():
+    warrior = Warrior()
+    result = warrior.attack_get_result(Rogue())
+    for key in ('action_type', 'damage', 'critical_hit', 'rage_gain', 'attacker', 'target_health_before',
+                'target_health_after', 'attacker_rage_before', 'attacker_rage_after',
+                'animation_triggers', 'sound_effects'):
+        assert key in result
+    assert result['animation_triggers'][0] == 'sword_swing'
+    assert result['rage_gain'] == warrior.rage
+
+
+def test_results_roll_like_execute_action():
+    played, reported = Wizard(), Wizard()
+    played.rng, reported.rng = _Rolls(0.5), _Rolls(0.5)
+    first, second = Rogue(), Rogue()
+    played.execute_action("special", first)
+    reported.perform_get_result("special", second)
+    assert (first.health, played.mana) == (second.health, reported.mana)
+
+
+class TestOutcomes:
+    """Test crits, dodges and failures"""
+
+    def test_crit_adds_its_cues(self):
+        warrior = Warrior()
+        warrior.rng = _Rolls(0.0)
+        result = warrior.perform_get_result("attack", Wizard())
+        assert result['critical_hit']
+        assert result['animation_triggers'] == ['sword_swing', 'critical_flash']
+        assert result['sound_effects'] == ['sword_hit', 'critical_sound']
+
+    def test_dodge_swaps_the_hit_sound(self):
+        rogue = Rogue()
+        rogue.status_effects.add_effect(StatusEffect(EffectType.SHADOW_STEP, 3, 1.0, 0, "stamina",
+                                                     EffectCategory.DODGE))
+        result = Wizard().perform_get_result("attack", rogue)
+        assert result['dodged'] and result['damage'] == 0
+        assert result['sound_effects'] == ['whoosh']
+        assert 'dodge_blur' in result['animation_triggers']
+
+    def test_failed_ability_reports_nothing_happened(self):
+        wizard = Wizard()
+        wizard.mana = 0
+        result = wizard.perform_get_result("magic_bubble", Warrior())
+        assert not result['success']
+        assert result['effect_applied'] is None
+        assert result['sound_effects'] == ['action_failed']
+
+    def test_enemy_fallback_attack_is_reported_as_an_attack(self):
+        ai = EnemyAI(Rogue)
+        ai.character.stamina = 0
+        result = ai.execute_action_get_result("activate_shadow_step", Wizard())
+        assert result['attacker'] == 'enemy'
+        assert result['action_type'] == 'attack'
+        assert result['animation_triggers'][0] == 'dagger_lunge'
+
+
+class TestEventBuses:
+    """Test that recording leaves the buses as they were"""
+
+    def test_subscribers_still_see_the_events(self):
+        recorder = EventRecorder()
+        combat_events.subscribe(recorder, DamageDealt)
+        try:
+            warrior = Warrior()
+            result = warrior.perform_get_result("attack", Rogue())
+        finally:
+            combat_events.unsubscribe(recorder, DamageDealt)
+        assert [event.amount for event in recorder.events] == [result['damage']]
+        assert "events" not in warrior.__dict__
+
+    def test_own_bus_is_put_back(self):
+        warrior, rogue = Warrior(), Rogue()
+        bus = rogue.events = CombatEventBus()
+        warrior.perform_get_result("attack", rogue)
+        assert rogue.events is bus
+        assert warrior.events is combat_events
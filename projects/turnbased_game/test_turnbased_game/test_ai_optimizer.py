@@ -0,0 +1,79 @@
+"""
+Test suite for the EnemyAI threshold optimizer
+Tests the search space, tuned AI classes, common random numbers and caching,
+and worker-count independence of a whole run
+"""
+import pytest
+from turnbased_game.character_classes import Warrior, Rogue, Wizard, EnemyAI, CompiledEnemyAI
+from turnbased_game.simulation.ai_optimizer import (ThresholdOptimizer, default_vector, parameters_for,
+                                                    repair, tuned_ai)
+from turnbased_game.simulation import simulate_batch
+
+
+class TestSearchSpace:
+    """Test parameter vectors and the classes built from them"""
+
+    def test_sturdy_health_is_warrior_only(self):
+        assert "STURDY_HEALTH" in [parameter.name for parameter in parameters_for(Warrior)]
+        assert "STURDY_HEALTH" not in [parameter.name for parameter in parameters_for(Wizard)]
+
+    def test_defaults_are_the_hand_picked_numbers(self):
+        space = parameters_for(Rogue)
+        assert default_vector(space, Rogue) == (0.25, 0.5, 50, Rogue.stats.status_threshold,
+                                                Rogue.stats.excess_resource)
+
+    def test_repair_clips_and_orders_brackets(self):
+        space = parameters_for(Wizard)
+        vector = repair(space, (0.5, 0.2, 999.4, -5, 120.6))
+        assert vector == (0.5, 0.5, 150, Wizard.stats.effect.cost, 121)
+
+    def test_default_vector_plays_like_enemy_ai(self):
+        """The untuned vector reproduces the rule cascade battle for battle"""
+        tuned = tuned_ai(Wizard, default_vector(parameters_for(Wizard), Wizard))
+        assert issubclass(tuned, CompiledEnemyAI)
+        rules = simulate_batch(100, Rogue, Wizard, seed=4)
+        same = simulate_batch(100, Rogue, Wizard, seed=4, enemy_ai=tuned)
+        assert (same.player_wins, same.total_rounds) == (rules.player_wins, rules.total_rounds)
+
+    def test_same_vector_same_class(self):
+        """Every shard of a vector plays the one class, so its policy is compiled once"""
+        vector = default_vector(parameters_for(Rogue), Rogue)
+        tuned = tuned_ai(Rogue, vector)
+        assert tuned_ai(Rogue, list(vector)) is tuned
+        assert tuned(Rogue).policy is tuned(Rogue).policy
+
+    def test_resource_thresholds_tunable(self):
+        class Hoarder(EnemyAI):
+            EXCESS_RESOURCE = 1000
+        assert Hoarder.resource_thresholds(Warrior.stats) == (Warrior.stats.status_threshold, 1000)
+        ai = Hoarder(Warrior)
+        ai.character.rage = 200
+        assert not ai._has_excess_resources()
+
+
+class TestEvaluation:
+    """Test fitness evaluation"""
+
+    def test_common_random_numbers(self):
+        """The same vector scores the same on the same seed, and the cache answers repeats"""
+        optimizer = ThresholdOptimizer(Rogue, battles=20, workers=1)
+        vector = default_vector(optimizer.space, Rogue)
+        first = optimizer.evaluate([vector, vector], seed=9)
+        assert first[0] == first[1]
+        assert optimizer.evaluations == 1 and optimizer.cache_hits == 1
+        optimizer.cache = {}
+        assert optimizer.evaluate([vector], seed=9) == first[:1]
+
+    def test_run_reports_generations(self):
+        optimizer = ThresholdOptimizer(Warrior, population=6, battles=10, seed=2, workers=1)
+        result = optimizer.run(3)
+        assert [generation.number for generation in result.generations] == [0, 1, 2]
+        assert len(result.best) == len(result.parameters)
+        assert 0.0 <= result.best_fitness <= 1.0
+        assert result.battles == result.evaluations * 10 * 3
+
+    def test_results_do_not_depend_on_worker_count(self):
+        serial = ThresholdOptimizer(Wizard, population=6, battles=12, seed=3, workers=1).run(2)
+        pooled = ThresholdOptimizer(Wizard, population=6, battles=12, seed=3, workers=2).run(2)
+        assert serial.best == pooled.best
+        assert serial.best_fitness == pytest.approx(pooled.best_fitness)
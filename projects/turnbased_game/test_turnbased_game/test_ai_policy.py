@@ -0,0 +1,102 @@
+"""
+Test suite for the compiled EnemyAI policy
+Tests that the decision table reproduces the rule cascade, including its
+random splits, and that deciding no longer builds throwaway characters
+"""
+import random
+import pytest
+from turnbased_game.character_classes import Warrior, Rogue, Wizard, EnemyAI, CompiledEnemyAI, compile_policy
+from turnbased_game.character_classes.ai_policy import decisions_per_second, _RecordingChoice, _Player
+from turnbased_game.simulation import simulate_batch
+
+
+CLASSES = [Warrior, Rogue, Wizard]
+
+
+def cascade_options(ai, player):
+    """Every action the rule cascade could pick for the current state"""
+    recorder = _RecordingChoice()
+    previous, ai.rng = ai.rng, recorder
+    try:
+        action = ai._rule_action(player)
+    finally:
+        ai.rng = previous
+    return recorder.options or (action,)
+
+
+class TestCompiledTable:
+    """Test the table against the cascade it was compiled from"""
+
+    @pytest.mark.parametrize("character_class", CLASSES)
+    def test_matches_cascade(self, character_class):
+        """Random states decide the same actions, with the same splits"""
+        rng = random.Random(4)
+        ai = CompiledEnemyAI(character_class)
+        character = ai.character
+        stats = character_class.stats
+        for _ in range(3000):
+            character.health = rng.randint(-10, stats.max_health)
+            setattr(character, stats.resource, rng.randint(0, 200))
+            character.item_count = rng.randint(0, stats.items)
+            character.status_effects.remove_effect_by_type(stats.effect.effect_type)
+            if rng.random() < 0.5:
+                character.status_effects.add_effect(stats.effect.make(stats.resource))
+            player = _Player(rng.randint(1, 200))
+            assert ai.policy.lookup(character, player).actions == cascade_options(ai, player)
+
+    def test_splits_stored_as_probabilities(self):
+        """The defensive 50/50 heal-or-attack survives as probabilities"""
+        ai = CompiledEnemyAI(Wizard)
+        ai.character.health = 50
+        ai.character.mana = 30
+        decision = ai.policy.lookup(ai.character, _Player(200))
+        assert decision.actions == ("heal", "attack")
+        assert decision.probabilities == (0.5, 0.5)
+
+    def test_impossible_cells_empty(self):
+        """A desperate warrior can't have more than STURDY_HEALTH health"""
+        table = compile_policy(CompiledEnemyAI, Warrior)
+        assert table.decisions[table.index(0, 0, True, False, True, False)] is None
+
+    def test_cached(self):
+        assert compile_policy(CompiledEnemyAI, Rogue) is compile_policy(CompiledEnemyAI, Rogue)
+
+    def test_subclass_thresholds(self):
+        """Tuned thresholds compile into their own table"""
+        class Bloodthirsty(CompiledEnemyAI):
+            KILL_RANGE = 80
+        ai = Bloodthirsty(Warrior)
+        ai.character.rage = 30
+        assert ai.choose_action(_Player(80)) == "special"
+        assert CompiledEnemyAI(Warrior).policy.lookup(ai.character, _Player(80)).actions == ("attack",)
+
+
+class TestDecisions:
+    """Test deciding and battling with the compiled policy"""
+
+    def test_no_fresh_instances(self, monkeypatch):
+        """Neither policy builds a character to read max health"""
+        rules, compiled = EnemyAI(Rogue), CompiledEnemyAI(Rogue)
+        def fail(self):
+            raise AssertionError("built a throwaway character")
+        monkeypatch.setattr(Rogue, "__init__", fail)
+        rules.choose_action(_Player(100))
+        compiled.choose_action(_Player(100))
+
+    @pytest.mark.parametrize("player_class, enemy_class", [(Rogue, Wizard), (Wizard, Warrior), (Warrior, Rogue)])
+    def test_same_battles_as_rules(self, player_class, enemy_class):
+        """Even splits draw exactly like the cascade, so seeded batches match roll for roll"""
+        rules = simulate_batch(200, player_class, enemy_class, seed=3)
+        compiled = simulate_batch(200, player_class, enemy_class, seed=3, enemy_ai=CompiledEnemyAI)
+        assert (compiled.player_wins, compiled.enemy_wins, compiled.draws, compiled.total_rounds) == \
+               (rules.player_wins, rules.enemy_wins, rules.draws, rules.total_rounds)
+
+    def test_benchmark_reports_rate(self):
+        assert decisions_per_second(CompiledEnemyAI, Wizard, decisions=2000, states=64) > 0
+
+    def test_benchmark_leaves_global_random_alone(self):
+        random.seed(42)
+        expected = random.random()
+        random.seed(42)
+        decisions_per_second(EnemyAI, Rogue, decisions=500, states=16)
+        assert random.random() == expected
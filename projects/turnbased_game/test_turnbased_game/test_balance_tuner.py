@@ -0,0 +1,99 @@
+"""
+Test suite for the class balance tuner
+Tests stat scaling, tuned classes in battle, seat-averaged pair targets and
+a whole tuning run
+"""
+import json
+import math
+import pytest
+from turnbased_game.character_classes import Warrior
+from turnbased_game.character_classes.class_tables import compile_class
+from turnbased_game.simulation import MatchupStats, simulate_batch
+from turnbased_game.simulation.balance_tuner import (BalanceTuner, balanced_classes, balanced_data,
+                                                     load_class_data, scale_class)
+
+DATA = load_class_data()
+
+
+class TestScaling:
+    """Test scaling class data"""
+
+    def test_strength_scales_health_and_damage(self):
+        scaled = scale_class(DATA["warrior"], math.log(1.5))
+        assert scaled["health"] == 300
+        assert (scaled["attack"]["base"], scaled["attack"]["crit"]) == (38, 60)
+        assert scaled["item"] == DATA["warrior"]["item"]
+        assert DATA["warrior"]["health"] == 200
+
+    def test_damage_keyed_gains_follow_the_tiers(self):
+        """The warrior gains extra rage on a crit, keyed by the crit's damage"""
+        scaled = scale_class(DATA["warrior"], math.log(1.5))
+        assert scaled["attack"]["gain_on_damage"] == {"60": 25}
+        compile_class("warrior", scaled)
+
+    def test_costs_scale_inversely(self):
+        scaled = scale_class(DATA["wizard"], math.log(2), knobs=("cost",))
+        assert scaled["special"]["cost"] == round(DATA["wizard"]["special"]["cost"] / 2)
+        assert scaled["health"] == DATA["wizard"]["health"]
+
+    def test_unknown_knob(self):
+        with pytest.raises(ValueError):
+            scale_class(DATA["rogue"], 0.1, knobs=("luck",))
+
+    def test_balanced_classes_play_the_tuned_data(self):
+        classes = balanced_classes(balanced_data(DATA, {"warrior": math.log(3)}))
+        assert issubclass(classes["warrior"], Warrior)
+        assert classes["warrior"].stats.max_health == 600
+        assert classes["warrior"]().health == 600
+        strong = simulate_batch(60, classes["warrior"], classes["wizard"], seed=2)
+        shipped = simulate_batch(60, Warrior, classes["wizard"], seed=2)
+        assert strong.player_wins >= shipped.player_wins
+
+
+class TestTuner:
+    """Test targets and tuning runs"""
+
+    def test_mirror_and_doubled_targets_rejected(self):
+        with pytest.raises(ValueError):
+            BalanceTuner({("rogue", "rogue"): 0.5})
+        with pytest.raises(ValueError):
+            BalanceTuner({("rogue", "wizard"): 0.5, ("wizard", "rogue"): 0.5})
+
+    def test_seats_are_alternated(self):
+        """A pair's record counts both seatings from the first class's point of view"""
+        tuner = BalanceTuner({("warrior", "wizard"): 0.5}, battles=20, workers=1)
+        cell = tuner.simulate(DATA, 20)[("warrior", "wizard")]
+        as_player = simulate_batch(20, Warrior, balanced_classes(DATA)["wizard"], seed=0)
+        assert cell.battles == 40
+        assert cell.player_wins >= as_player.player_wins
+
+    def test_errors_push_winners_down(self):
+        tuner = BalanceTuner({("warrior", "rogue"): 0.5, ("warrior", "wizard"): 0.5})
+        cells = {pair: MatchupStats(*pair) for pair in tuner.targets}
+        cells[("warrior", "rogue")].merge({"player": 70, "enemy": 30, "draw": 0, "rounds": 0})
+        cells[("warrior", "wizard")].merge({"player": 50, "enemy": 50, "draw": 0, "rounds": 0})
+        errors = tuner.errors(cells)
+        assert errors["warrior"] == pytest.approx(0.1)
+        assert errors["rogue"] == pytest.approx(-0.2)
+        assert errors["wizard"] == pytest.approx(0.0)
+
+    def test_object_engine_reproducible_across_workers(self):
+        settings = dict(battles=16, max_battles=16, tolerance=0.2, seed=3)
+        serial = BalanceTuner(workers=1, **settings).run(2)
+        pooled = BalanceTuner(workers=2, **settings).run(2)
+        assert serial.strengths == pooled.strengths
+        assert [step.action for step in serial.steps] == [step.action for step in pooled.steps]
+
+    def test_vector_run_confirms_and_saves(self, tmp_path):
+        pytest.importorskip("numpy")
+        result = BalanceTuner(engine="vector", tolerance=0.05, seed=1).run()
+        assert result.confirmed
+        assert result.steps[-1].action == "confirmed"
+        # the warrior wins the shipped matchups, so it comes out weakened
+        assert result.factors()["warrior"] < 1 < result.factors()["wizard"]
+        path = tmp_path / "class_data.json"
+        result.save(str(path))
+        saved = json.loads(path.read_text())
+        assert saved == result.data
+        for name, entry in saved.items():
+            compile_class(name, entry)
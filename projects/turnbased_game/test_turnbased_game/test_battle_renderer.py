@@ -0,0 +1,133 @@
+"""
+Test suite for the pygame battle renderer
+Tests dirty-rect tracking, filling the screen from game server replies,
+button hit-testing and the event-driven window loop, on SDL's dummy driver
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+import pytest
+from turnbased_game.main_gameloop.battle_renderer import BattleRenderer, FrameStats, run_window
+from turnbased_game.main_gameloop.battle_loop import PLAYER, ENEMY
+from turnbased_game.main_gameloop.game_server import BattleSession
+
+
+@pytest.fixture
+def renderer():
+    renderer = BattleRenderer()
+    yield renderer
+    pygame.display.quit()
+
+
+@pytest.fixture
+def prompt():
+    return BattleSession().start("warrior", "rogue", seed=4)
+
+
+class TestDirtyRects:
+    """Test that only changed widgets are redrawn"""
+
+    def test_first_draw_repaints_then_nothing_changes(self, renderer, prompt):
+        renderer.show(prompt)
+        assert renderer.draw() == [renderer.screen.get_rect()]
+        assert renderer.draw() == []
+
+    def test_health_change_redraws_only_its_bar(self, renderer, prompt):
+        renderer.show(prompt)
+        renderer.draw()
+        renderer.show(prompt)
+        assert renderer.draw() == []
+        renderer.set_health(ENEMY, 100, 160)
+        assert renderer.draw() == [renderer.health[ENEMY].rect]
+
+    def test_sub_pixel_changes_are_not_drawn(self, renderer):
+        renderer.set_health(PLAYER, 200, 200)
+        renderer.draw()
+        renderer.set_health(PLAYER, 199.9, 200)
+        assert renderer.draw() == []
+
+    def test_replaced_buttons_are_erased(self, renderer, prompt):
+        renderer.show(prompt)
+        renderer.draw()
+        old = [button.rect for button in renderer.buttons]
+        renderer.set_actions(prompt["actions"][:2])
+        rects = renderer.draw()
+        assert all(rect in rects for rect in old)
+        assert len(renderer.buttons) == 2
+
+    def test_invalidate_repaints_everything(self, renderer, prompt):
+        renderer.show(prompt)
+        renderer.draw()
+        renderer.invalidate()
+        assert renderer.draw() == [renderer.screen.get_rect()]
+
+
+class TestButtons:
+    """Test the action buttons"""
+
+    def test_buttons_follow_the_prompt(self, renderer, prompt):
+        renderer.show(prompt)
+        assert [button.action for button in renderer.buttons] == [entry["action"] for entry in prompt["actions"]]
+        attack = renderer.buttons[0]
+        assert renderer.button_at(attack.rect.center) == "attack"
+        assert renderer.action_for_key("A") == "attack"
+        assert renderer.button_at((5, 5)) is None
+
+    def test_unavailable_actions_cannot_be_picked(self, renderer, prompt):
+        renderer.show(prompt)
+        blocked = next(entry for entry in prompt["actions"] if not entry["available"])
+        button = next(button for button in renderer.buttons if button.action == blocked["action"])
+        assert renderer.button_at(button.rect.center) is None
+        renderer.disable_actions()
+        assert renderer.action_for_key("a") is None
+
+    def test_hover_redraws_the_buttons_it_leaves_and_enters(self, renderer, prompt):
+        renderer.show(prompt)
+        renderer.draw()
+        first, second = renderer.buttons[:2]
+        renderer.hover(first.rect.center)
+        assert renderer.draw() == [first.rect]
+        renderer.hover(second.rect.center)
+        assert renderer.draw() == [first.rect, second.rect]
+
+
+class TestWindowLoop:
+    """Test the event-driven loop"""
+
+    def test_idle_window_draws_once(self, renderer, prompt):
+        renderer.show(prompt)
+        stats = FrameStats()
+        run_window(renderer, seconds=0.2, stats=stats)
+        assert stats.report()["frames"] == 1
+
+    def test_naive_loop_redraws_every_frame(self, renderer, prompt):
+        renderer.show(prompt)
+        stats = FrameStats()
+        run_window(renderer, seconds=0.2, naive=True, stats=stats)
+        report = stats.report()
+        assert report["frames"] > 3
+        assert report["rects_per_frame"] == 1
+
+    def test_typed_key_plays_the_action(self, renderer, prompt):
+        renderer.show(prompt)
+        chosen = []
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_a, unicode="a", mod=0, scancode=0))
+        pygame.event.post(pygame.event.Event(pygame.QUIT))
+        run_window(renderer, on_action=chosen.append)
+        assert chosen == ["attack"]
+
+    def test_animation_keeps_frames_coming(self, renderer, prompt):
+        renderer.show(prompt)
+        frames = iter(range(200, 150, -10))
+
+        def on_frame():
+            health = next(frames, None)
+            if health is None:
+                pygame.event.post(pygame.event.Event(pygame.QUIT))
+                return False
+            renderer.set_health(PLAYER, health, 200)
+            return True
+
+        stats = FrameStats()
+        run_window(renderer, on_frame=on_frame, fps=200, stats=stats)
+        assert stats.report()["frames"] == 5
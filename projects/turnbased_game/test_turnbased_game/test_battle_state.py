@@ -0,0 +1,168 @@
+"""
+Test suite for the immutable battle state
+Tests round-trips with live characters, hashing and transitions
+"""
+import random
+import pytest
+from turnbased_game.character_classes import Warrior, Rogue, Wizard, EnemyAI
+from turnbased_game.main_gameloop.battle_loop import PLAYER, ENEMY
+from turnbased_game.simulation import BattleState, quiet
+from turnbased_game.simulation.battle_rules import ATTACK, EFFECT, ITEM, SPECIAL, ai_actions, rules_for
+
+
+class TestConversion:
+    """Test round-trips with live character objects"""
+
+    @pytest.fixture(params=[Warrior, Rogue, Wizard])
+    def character_class(self, request):
+        return request.param
+
+    def test_start_matches_fresh_characters(self, character_class):
+        """start() should agree with the class constructors"""
+        state = BattleState.start(character_class, Warrior)
+        assert state == BattleState.from_characters(character_class(), Warrior())
+
+    def test_round_trip_keeps_stats_and_effects(self):
+        """to_characters() rebuilds resources and the active effect"""
+        wizard = Wizard()
+        wizard.health = 77
+        wizard.cast_magic_bubble()
+        wizard.item_count = 1
+        rogue = Rogue()
+        rogue.stamina = 140
+
+        player, enemy = BattleState.from_characters(wizard, rogue, to_move=ENEMY).to_characters()
+        assert (player.health, player.mana, player.item_count) == (77, wizard.mana, 1)
+        bubble, = player.status_effects.active_effects
+        assert bubble.to_dict() == wizard.status_effects.active_effects[0].to_dict()
+        assert enemy.stamina == 140
+        assert enemy.status_effects.active_effects == []
+
+    def test_rebuilt_characters_snapshot_identically(self, character_class):
+        """from_characters(to_characters()) is the identity"""
+        state = BattleState(character_class, Rogue, (90, 55, 1, 2), (120, 35, 2, 0), ENEMY)
+        player, enemy = state.to_characters()
+        assert BattleState.from_characters(player, enemy, ENEMY) == state
+
+    def test_subclasses_with_their_own_tables(self, character_class):
+        """Subclasses (e.g. balanced_classes()) play by the rules of their own stats"""
+        tuned = type(character_class.__name__, (character_class,),
+                     {"stats": character_class.stats._replace(max_health=character_class.stats.max_health + 40)})
+        state = BattleState(tuned, Rogue, (90, 55, 1, 2), (120, 35, 2, 0))
+        player, enemy = state.to_characters()
+        assert BattleState.from_characters(player, enemy) == state
+        assert BattleState.start(tuned, Rogue).player[0] == tuned.stats.max_health
+        original = BattleState(character_class, Rogue, state.player, state.enemy)
+        for action in original.legal_actions():
+            assert [p for p, _ in state.transitions(action)] == [p for p, _ in original.transitions(action)]
+
+    def test_wizard_subclass_runs_dry(self):
+        """A wizard subclass without mana or potions dies like a Wizard"""
+        state = BattleState(type("Wizard", (Wizard,), {}), Rogue, (50, 0, 0, 0), (120, 35, 2, 0))
+        (p, after), = state.transitions(ATTACK)
+        assert after.winner == ENEMY
+
+
+class TestValueSemantics:
+    """Test immutability and hashing"""
+
+    def test_equal_states_hash_equal(self):
+        """States compare and hash by value"""
+        first = BattleState.start(Warrior, Rogue)
+        second = BattleState.start(Warrior, Rogue)
+        assert first == second
+        assert len({first, second}) == 1
+        assert first.key == second.key
+
+    def test_state_is_immutable(self):
+        """Fields cannot be reassigned"""
+        state = BattleState.start(Warrior, Rogue)
+        with pytest.raises(AttributeError):
+            state.player = (1, 0, 0, 0)
+
+    def test_side_to_move_changes_key(self):
+        """The packed key distinguishes whose turn it is"""
+        state = BattleState.start(Warrior, Rogue)
+        assert state.key != state._replace(to_move=ENEMY).key
+
+    def test_overkill_keeps_the_key_apart(self):
+        """An enemy below zero health packs as dead without clobbering the player's fields"""
+        state = BattleState.start(Warrior, Rogue)
+        first = state._replace(player=(10, 5, 1, 0), enemy=(-5, 10, 1, 0))
+        second = state._replace(player=(99, 80, 3, 2), enemy=(-5, 10, 1, 0))
+        assert first.key != second.key
+        assert first.key == first._replace(enemy=(0, 10, 1, 0)).key
+
+
+class TestTransitions:
+    """Test apply() and transitions()"""
+
+    def test_probabilities_sum_to_one(self):
+        """Every action's successors form a distribution"""
+        state = BattleState.start(Rogue, Warrior)
+        for action in state.legal_actions():
+            assert sum(p for p, _ in state.transitions(action)) == pytest.approx(1.0)
+
+    def test_apply_returns_new_state(self):
+        """The original state is left untouched"""
+        state = BattleState.start(Warrior, Wizard)
+        after = state.apply(ATTACK, random.Random(1))
+        assert state == BattleState.start(Warrior, Wizard)
+        assert after.to_move == ENEMY
+        assert after.enemy[0] < state.enemy[0]
+        assert after.player[1] > 0    # rage gained
+
+    def test_apply_leaves_global_random_alone(self):
+        """Without an rng, apply() rolls on its own stream, not the random module's"""
+        state = BattleState.start(Warrior, Wizard)
+        random.seed(5)
+        expected = random.random()
+        random.seed(5)
+        state.apply(ATTACK)
+        assert random.random() == expected
+
+    def test_enemy_turn_starts_next_round(self):
+        """Effects tick once the enemy has acted"""
+        state = BattleState(Warrior, Wizard, (200, 0, 2, 0), (120, 180, 3, 0), ENEMY)
+        bubbled = state.apply(EFFECT, random.Random(1))
+        assert bubbled.to_move == PLAYER
+        assert bubbled.enemy == (120, 180 - 35 - 15, 3, 2)
+
+    def test_status_alias_accepted(self):
+        """EnemyAI action names work too"""
+        state = BattleState(Warrior, Wizard, (200, 0, 2, 0), (120, 180, 3, 0), ENEMY)
+        assert state.transitions("cast_magic_bubble") == state.transitions(EFFECT)
+
+    def test_ai_follows_enemy_ai_thresholds(self, monkeypatch):
+        """ai_actions reads the EnemyAI brackets and kill range rather than copies of them"""
+        rules = rules_for(Rogue)
+        me = (rules.max_health, rules.special_cost, 0, 0)
+        assert ai_actions(rules, me, 70) == ((1.0, ATTACK),)
+        monkeypatch.setattr(EnemyAI, "KILL_RANGE", 80)
+        assert ai_actions(rules, me, 70) == ((1.0, SPECIAL),)
+        monkeypatch.setattr(EnemyAI, "DESPERATE_HEALTH", 1.1)
+        assert ai_actions(rules, (rules.max_health, rules.special_cost, 1, 0), 70) == ((1.0, ITEM),)
+
+    def test_winner(self):
+        """A lethal hit ends the battle"""
+        state = BattleState(Warrior, Rogue, (200, 0, 2, 0), (20, 100, 3, 0))
+        assert all(after.winner == PLAYER for _, after in state.transitions(ATTACK))
+
+    def test_matches_live_characters(self):
+        """Every outcome of a live ability call is one of the state's successors"""
+        state = BattleState(Rogue, Warrior, (160, 100, 3, 0), (150, 40, 1, 3))
+        successors = {after for _, after in state.transitions(SPECIAL)}
+        rng_state = random.getstate()
+        random.seed(5)
+        with quiet():
+            for _ in range(200):
+                player, enemy = state.to_characters()
+                player.special(enemy)
+                assert BattleState.from_characters(player, enemy, ENEMY) in successors
+        random.setstate(rng_state)
+
+    def test_ran_dry_wizard_dies(self):
+        """A wizard with no mana and no potions loses on their turn"""
+        state = BattleState(Wizard, Warrior, (100, 5, 0, 0), (200, 0, 2, 0))
+        (p, after), = state.transitions(ITEM)
+        assert after.winner == ENEMY
@@ -0,0 +1,148 @@
+"""
+Test suite for the data-driven class tables
+Tests that class_data.json compiles into the tables every consumer reads,
+and that rolls and gains match the original get_attack_dmg behaviour
+"""
+import json
+import random
+import pytest
+from turnbased_game.character_classes import (Warrior, Rogue, Wizard, CLASS_TABLES, NullSink, output_to,
+                                              load_class_tables)
+from turnbased_game.character_classes.class_tables import CLASS_DATA_PATH, compile_class
+from turnbased_game.character_classes.status_effects import EffectType, EffectCategory
+from turnbased_game.simulation.battle_rules import rules_for
+from turnbased_game.simulation.damage_distribution import damage_pmf
+
+
+CLASSES = [Warrior, Rogue, Wizard]
+
+
+class TestCompiledTables:
+    """Test the compiled tables against the data file"""
+
+    def test_every_class_has_a_table(self):
+        assert (Warrior.stats, Rogue.stats, Wizard.stats) == tuple(CLASS_TABLES[name] for name in
+                                                                   ("warrior", "rogue", "wizard"))
+
+    @pytest.mark.parametrize("character_class", CLASSES)
+    def test_characters_start_from_table(self, character_class):
+        """A new character's health, resource and items come from its table"""
+        character = character_class()
+        stats = character_class.stats
+        assert character.max_health == character.health == stats.max_health
+        assert character.resource == getattr(character, stats.resource) == stats.start_resource
+        assert character.item_count == stats.items
+
+    def test_tiers_checked_super_crit_first(self):
+        """Rogue attack checks the super crit before the crit, like get_attack_dmg"""
+        assert Rogue.stats.attack.tiers == ((0.33, 40), (0.4, 25))
+        assert Warrior.stats.attack.tiers == ((0.33, 40),)
+
+    def test_effects_from_table(self):
+        effect = Wizard.stats.effect.make("mana")
+        assert (effect.effect_type, effect.duration, effect.magnitude, effect.maintenance_cost) == \
+               (EffectType.MAGIC_BUBBLE, 3, 0.40, 15)
+        assert effect.categories == EffectCategory.DAMAGE_REDUCTION | EffectCategory.MANA_DRAIN
+
+    def test_tables_are_hashable(self):
+        """Tables key the solver caches, so they must hash"""
+        assert len({Warrior.stats, Rogue.stats, Wizard.stats}) == 3
+
+
+class TestRolls:
+    """Test damage rolls and resource gains"""
+
+    @pytest.mark.parametrize("character_class", CLASSES)
+    @pytest.mark.parametrize("ability", ["attack", "special"])
+    def test_roll_matches_get_attack_dmg(self, character_class, ability):
+        """Same seed, same damage as the keyword-argument roll it replaces"""
+        table = getattr(character_class.stats, ability)
+        kwargs = dict(base=table.base, crit=table.crit, super_crit=table.super_crit,
+                      crit_chance=table.crit_chance, super_crit_chance=table.super_crit_chance)
+        character = character_class()
+        random.seed(11)
+        expected = [character.get_attack_dmg(**kwargs) for _ in range(500)]
+        random.seed(11)
+        assert [table.roll() for _ in range(500)] == expected
+
+    @pytest.mark.parametrize("character_class", CLASSES)
+    def test_roll_distribution(self, character_class):
+        """Rolls only produce table damages, at the exact PMF's rates"""
+        table = character_class.stats.special
+        rng = random.Random(3)
+        draws = [table.roll(rng) for _ in range(20000)]
+        pmf = damage_pmf(table.base, table.crit, table.super_crit, table.crit_chance, table.super_crit_chance)
+        assert set(draws) <= set(pmf)
+        for damage, p in pmf.items():
+            assert draws.count(damage) / len(draws) == pytest.approx(p, abs=0.02)
+
+    def test_gain_for(self):
+        """Gains are keyed on the final damage, falling back to the flat gain"""
+        assert Warrior.stats.attack.gain_for(40) == 25
+        assert Warrior.stats.attack.gain_for(50) == 15   # amplified crit no longer matches
+        assert Rogue.stats.attack.gain_for(20) == 0
+        assert Rogue.stats.special.gain_for(70) == 40
+        assert Wizard.stats.attack.gain_for(35) == 50
+
+    def test_attack_gains_resource(self):
+        """Warrior's attack adds the table gain for the damage it dealt"""
+        random.seed(2)
+        warrior = Warrior()
+        target = Wizard()
+        with output_to(NullSink()):
+            warrior.attack(target)
+        dealt = target.max_health - target.health
+        assert warrior.rage == Warrior.stats.attack.gain_for(dealt)
+
+
+class TestConsumers:
+    """Test that menus and simulation rules read the same numbers"""
+
+    @pytest.mark.parametrize("character_class", CLASSES)
+    def test_action_info_matches_table(self, character_class):
+        """Displayed damage ranges come from the tables the abilities roll"""
+        info = character_class().get_action_info()
+        stats = character_class.stats
+        assert info["attack"]["name"] == stats.attack.name
+        assert info["attack"]["damage"] == stats.attack.damage_range
+        assert info["special"]["damage"] == stats.special.damage_range
+
+    def test_rogue_text_shows_crit_gains(self):
+        assert "25-40 stamina" in Rogue().get_action_info()["attack"]["effect"]
+
+    @pytest.mark.parametrize("character_class", CLASSES)
+    def test_rules_read_tables(self, character_class):
+        rules = rules_for(character_class)
+        stats = character_class.stats
+        assert rules.start() == (stats.max_health, stats.start_resource, stats.items, 0)
+        assert (rules.special_cost, rules.effect_cost, rules.effect_duration) == \
+               (stats.special.cost, stats.effect.cost, stats.effect.duration)
+        assert rules.max_spend_per_turn == {Warrior: 30, Rogue: 60, Wizard: 90}[character_class]
+
+
+class TestCustomData:
+    """Test loading tuned class data from another file"""
+
+    def test_load_modified_file(self, tmp_path, monkeypatch):
+        """A balance change is a data edit: the characters pick it up"""
+        with open(CLASS_DATA_PATH, encoding="utf-8") as handle:
+            data = json.load(handle)
+        data["warrior"]["health"] = 250
+        data["warrior"]["special"]["cost"] = 20
+        path = tmp_path / "classes.json"
+        path.write_text(json.dumps(data))
+        tables = load_class_tables(str(path))
+        monkeypatch.setattr(Warrior, "stats", tables["warrior"])
+        warrior = Warrior()
+        assert warrior.max_health == 250
+        warrior.rage = 20
+        assert warrior.can_use_special()
+
+    def test_invalid_data(self):
+        with pytest.raises(ValueError, match="warrior"):
+            compile_class("warrior", {"health": 200})
+        with open(CLASS_DATA_PATH, encoding="utf-8") as handle:
+            data = json.load(handle)["rogue"]
+        data["effect"]["categories"] = ["NOT_A_CATEGORY"]
+        with pytest.raises(ValueError, match="rogue"):
+            compile_class("rogue", data)
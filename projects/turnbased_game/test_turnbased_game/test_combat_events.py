@@ -0,0 +1,142 @@
+"""
+Test suite for typed combat events
+Tests that abilities and status effects emit the right records, and nothing without subscribers
+"""
+import logging
+import pytest
+from turnbased_game.character_classes import (Warrior, Rogue, Wizard, CombatEventBus, EventRecorder,
+                                              log_event, DamageDealt, Dodged, Crit, ResourceChanged,
+                                              EffectApplied, EffectExpired, ItemUsed)
+from turnbased_game.character_classes.status_effects import EffectType
+
+
+@pytest.fixture
+def recorder():
+    return EventRecorder()
+
+
+def _listen(recorder, *characters):
+    bus = CombatEventBus()
+    bus.subscribe(recorder)
+    for character in characters:
+        character.events = bus
+    return bus
+
+
+class TestEventBus:
+    """Test subscription bookkeeping"""
+
+    def test_inactive_without_subscribers(self):
+        """A fresh bus tells emitters to skip building events"""
+        bus = CombatEventBus()
+        assert not bus.active
+        callback = bus.subscribe(lambda event: None)
+        assert bus.active
+        bus.unsubscribe(callback)
+        assert not bus.active
+
+    def test_typed_subscription(self, recorder):
+        """Subscribers for one type only see that type"""
+        bus = CombatEventBus()
+        bus.subscribe(recorder, Dodged)
+        bus.emit(ItemUsed(None, 1))
+        bus.emit(Dodged(None, None, "attack"))
+        assert recorder.events == [Dodged(None, None, "attack")]
+
+    def test_no_events_built_without_subscribers(self, monkeypatch):
+        """Abilities must not construct events nobody listens to"""
+        def fail(*args, **kwargs):
+            raise AssertionError("event built with no subscribers")
+        for name in ("DamageDealt", "Crit", "ResourceChanged"):
+            monkeypatch.setattr(f"turnbased_game.character_classes.warrior.{name}", fail)
+        warrior, enemy = Warrior(), Rogue()
+        warrior.events = CombatEventBus()
+        for _ in range(10):
+            warrior.attack(enemy)
+        warrior.special(enemy)
+
+
+class TestAbilityEvents:
+    """Test events emitted by the class abilities"""
+
+    def test_attack_reports_damage_and_rage(self, recorder):
+        """DamageDealt matches the health lost, rage gain is reported"""
+        warrior, enemy = Warrior(), Wizard()
+        _listen(recorder, warrior, enemy)
+        warrior.attack(enemy)
+        damage, = recorder.of_type(DamageDealt)
+        assert damage.attacker is warrior and damage.target is enemy
+        assert damage.amount == enemy.max_health - enemy.health
+        rage, = recorder.of_type(ResourceChanged)
+        assert (rage.resource, rage.amount) == ("rage", warrior.rage)
+
+    def test_crit_reported(self, recorder, monkeypatch):
+        """A crit roll produces a Crit event"""
+        monkeypatch.setattr("random.random", lambda: 0.0)
+        rogue, enemy = Rogue(), Warrior()
+        _listen(recorder, rogue)
+        rogue.attack(enemy)
+        crit, = recorder.of_type(Crit)
+        assert crit.rolled == 40 and crit.super_crit
+
+    def test_dodge_reported(self, recorder, monkeypatch):
+        """A dodged attack emits Dodged and no damage"""
+        wizard, rogue = Wizard(), Rogue()
+        rogue.activate_shadow_step()
+        monkeypatch.setattr(rogue.status_effects, "apply_dodge_check", lambda character: True)
+        _listen(recorder, wizard)
+        wizard.attack(rogue)
+        assert recorder.of_type(Dodged) == [Dodged(wizard, rogue, "attack")]
+        assert recorder.of_type(DamageDealt) == []
+
+    def test_item_and_heal(self, recorder):
+        """Potions and healing spells report what they restored"""
+        wizard = Wizard()
+        wizard.health, wizard.mana = 100, 100
+        _listen(recorder, wizard)
+        wizard.item()
+        wizard.spell_heal()
+        assert recorder.of_type(ItemUsed) == [ItemUsed(wizard, 2)]
+        assert ResourceChanged(wizard, "mana", 50, "item") in recorder.events
+        assert ResourceChanged(wizard, "health", 20, "heal") in recorder.events
+
+    def test_berserker_rage_conversion(self, recorder):
+        """Extra damage taken in berserker rage is reported as rage"""
+        warrior, wizard = Warrior(), Wizard()
+        warrior.enter_berserker_rage()
+        _listen(recorder, warrior, wizard)
+        wizard.special(warrior)
+        conversion = [event for event in recorder.of_type(ResourceChanged) if event.reason == "berserker_rage"]
+        assert conversion and conversion[0].amount == warrior.rage
+
+
+class TestEffectEvents:
+    """Test status effect lifecycle events"""
+
+    def test_effect_applied_upkeep_and_expiry(self, recorder):
+        """Magic Bubble: applied, drains mana each turn, then expires"""
+        wizard = Wizard()
+        _listen(recorder, wizard)
+        wizard.cast_magic_bubble()
+        for _ in range(3):
+            wizard.process_turn_start()
+        assert recorder.of_type(EffectApplied) == [EffectApplied(wizard, EffectType.MAGIC_BUBBLE, 3)]
+        upkeep = [event for event in recorder.of_type(ResourceChanged) if event.reason == "upkeep"]
+        assert len(upkeep) == 3 and all(event.amount == -15 for event in upkeep)
+        assert recorder.of_type(EffectExpired) == [EffectExpired(wizard, EffectType.MAGIC_BUBBLE, "expired")]
+
+    def test_maintenance_failure(self, recorder):
+        """An effect that cannot be paid for is reported as a maintenance expiry"""
+        wizard = Wizard()
+        wizard.cast_magic_bubble()
+        wizard.mana = 0
+        _listen(recorder, wizard)
+        wizard.process_turn_start()
+        assert recorder.of_type(EffectExpired) == [EffectExpired(wizard, EffectType.MAGIC_BUBBLE, "maintenance")]
+
+
+def test_log_event(caplog):
+    """The logging subscriber writes one DEBUG line per event"""
+    with caplog.at_level(logging.DEBUG, logger="turnbased_game.combat"):
+        log_event(ItemUsed(Warrior(), 1))
+    assert "ItemUsed character=Warrior, items_left=1" in caplog.text
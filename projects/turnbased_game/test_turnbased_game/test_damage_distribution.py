@@ -0,0 +1,112 @@
+"""
+Test suite for exact damage distributions and time-to-kill
+Tests PMFs against the ability code and the status effect modifiers
+"""
+import random
+import pytest
+from turnbased_game.character_classes import Warrior, Rogue, Wizard
+from turnbased_game.simulation import (ability_distribution, damage_pmf, defender_profile,
+                                       time_to_kill)
+from turnbased_game.simulation.damage_distribution import ABILITY_DAMAGE
+
+
+class TestDamagePMF:
+    """Test per-ability damage distributions"""
+
+    @pytest.fixture(params=sorted(ABILITY_DAMAGE, key=lambda key: (key[0].__name__, key[1])))
+    def ability(self, request):
+        return request.param
+
+    def test_pmf_sums_to_one(self, ability):
+        """Every ability's distribution should be a proper PMF"""
+        distribution = ability_distribution(*ability)
+        assert sum(p for _, p in distribution.outcomes) == pytest.approx(1.0)
+
+    def test_pmf_matches_get_attack_dmg(self, ability):
+        """Sampled get_attack_dmg frequencies should match the exact PMF"""
+        character_class, name = ability
+        kwargs = ABILITY_DAMAGE[ability]
+        character = character_class()
+        rng_state = random.getstate()
+        random.seed(1234)
+        samples = [character.get_attack_dmg(**kwargs) for _ in range(20000)]
+        random.setstate(rng_state)
+        for damage, p in damage_pmf(**kwargs).items():
+            assert samples.count(damage) / len(samples) == pytest.approx(p, abs=0.015)
+
+    def test_rogue_attack_tiers(self):
+        """Super crit is checked before crit, so the crit tier only gets 7%"""
+        assert damage_pmf(**ABILITY_DAMAGE[(Rogue, "attack")]) == pytest.approx({40: 0.33, 25: 0.07, 20: 0.6})
+
+    def test_magic_bubble_reduces_damage(self):
+        """40% reduction truncated like apply_damage_modification"""
+        wizard = Wizard()
+        wizard.cast_magic_bubble()
+        distribution = ability_distribution(Warrior, "attack", defender_profile(wizard))
+        assert distribution.as_dict() == pytest.approx({15: 0.67, 24: 0.33})
+
+    def test_berserker_rage_amplifies_damage(self):
+        """Berserker takes 25% extra, truncated"""
+        warrior = Warrior()
+        warrior.enter_berserker_rage()
+        distribution = ability_distribution(Wizard, "attack", defender_profile(warrior))
+        assert distribution.as_dict() == pytest.approx({12: 0.6, 43: 0.4})
+
+    def test_shadow_step_adds_dodge_mass(self):
+        """Dodged attacks show up as zero damage"""
+        rogue = Rogue()
+        rogue.activate_shadow_step()
+        distribution = ability_distribution(Warrior, "attack", defender_profile(rogue))
+        assert distribution.probability(0) == pytest.approx(0.35)
+        assert distribution.mean == pytest.approx(0.65 * (0.67 * 25 + 0.33 * 40))
+
+
+class TestTimeToKill:
+    """Test time-to-kill convolution"""
+
+    def test_deterministic_damage(self):
+        """A fixed-damage sequence kills on a known turn"""
+        wizard_bolt = ability_distribution(Wizard, "attack")
+        result = time_to_kill(10, [wizard_bolt])
+        assert result.turns == ((1, 1.0),)
+        assert result.survival == pytest.approx(0.0)
+
+    def test_survival_when_sequence_is_too_short(self):
+        """Two warrior attacks can never kill 200 health"""
+        attack = ability_distribution(Warrior, "attack")
+        result = time_to_kill(200, [attack, attack])
+        assert result.survival == pytest.approx(1.0)
+        assert result.expected_turns is None
+
+    def test_distribution_sums_to_one(self):
+        """Kill probabilities plus survival account for all outcomes"""
+        attack = ability_distribution(Rogue, "attack")
+        result = time_to_kill(120, [attack], repeat_until=10)
+        assert sum(p for _, p in result.turns) + result.survival == pytest.approx(1.0)
+        assert result.cdf(10) == pytest.approx(1.0 - result.survival)
+
+    def test_matches_monte_carlo(self):
+        """Exact mean kill turn should agree with sampling the same rolls"""
+        attack = ABILITY_DAMAGE[(Rogue, "attack")]
+        exact = time_to_kill(120, [ability_distribution(Rogue, "attack")], repeat_until=20)
+
+        rogue = Rogue()
+        rng_state = random.getstate()
+        random.seed(99)
+        total_turns = 0
+        trials = 5000
+        for _ in range(trials):
+            health, turns = 120, 0
+            while health > 0:
+                health -= rogue.get_attack_dmg(**attack)
+                turns += 1
+            total_turns += turns
+        random.setstate(rng_state)
+        assert total_turns / trials == pytest.approx(exact.expected_turns, abs=0.05)
+
+    def test_quantile(self):
+        """Quantile returns the first turn reaching the requested probability"""
+        attack = ability_distribution(Warrior, "special")
+        result = time_to_kill(100, [attack], repeat_until=5)
+        assert result.quantile(1.0) == 2
+        assert result.quantile(0.05) == 2
@@ -0,0 +1,101 @@
+"""
+Test suite for the game clock
+Tests each pacing mode and that interactive turns pause through the current clock
+"""
+import random
+import threading
+import time
+import pytest
+from turnbased_game.character_classes import (Warrior, Rogue, Wizard, EnemyAI, NullSink, output_to,
+                                              RealClock, ScaledClock, InstantClock, VirtualClock,
+                                              get_game_clock, use_clock, pause)
+from turnbased_game.main_gameloop.battle_loop import run_battle
+
+
+class TestClocks:
+    """Test the pacing modes on their own"""
+
+    def test_default_is_real(self):
+        """Without a chosen clock the game pauses in real time"""
+        assert isinstance(get_game_clock(), RealClock)
+
+    def test_instant_never_sleeps(self):
+        """InstantClock returns from long pauses immediately"""
+        start = time.perf_counter()
+        with use_clock(InstantClock()):
+            pause(60)
+        assert time.perf_counter() - start < 1
+
+    def test_scaled_sleeps_a_fraction(self, monkeypatch):
+        """ScaledClock hands time.sleep the scaled pause"""
+        slept = []
+        monkeypatch.setattr(time, "sleep", slept.append)
+        ScaledClock(0.25).sleep(2)
+        ScaledClock(0).sleep(2)
+        assert slept == [0.5]
+
+    def test_pacing_scales_follow_the_clocks(self):
+        """The server's --pacing scales are the CLI clocks' own"""
+        from turnbased_game.main_gameloop.main_game_loop import PACING_SCALES
+        assert PACING_SCALES == {"real": 1.0, "fast": 0.25, "instant": 0.0}
+
+    def test_scale_must_not_be_negative(self):
+        with pytest.raises(ValueError):
+            ScaledClock(-1)
+
+    def test_virtual_time(self):
+        """VirtualClock moves only when paused or advanced"""
+        clock = VirtualClock()
+        with use_clock(clock):
+            pause(1)
+            pause(0.5)
+        clock.advance(10)
+        assert clock.now() == 11.5
+        assert clock.pauses == [1, 0.5]
+
+    def test_use_clock_restores(self):
+        """use_clock puts the previous clock back, even on errors"""
+        before = get_game_clock()
+        with pytest.raises(RuntimeError):
+            with use_clock(VirtualClock()):
+                raise RuntimeError
+        assert get_game_clock() is before
+
+    def test_use_clock_stays_in_its_thread(self):
+        """A thread pacing itself with a virtual clock leaves other threads on theirs"""
+        clock, seen = VirtualClock(), []
+
+        def worker():
+            with use_clock(clock):
+                pause(3)
+                seen.append(get_game_clock())
+
+        with use_clock(InstantClock()) as mine:
+            thread = threading.Thread(target=worker)
+            thread.start()
+            thread.join(5)
+            assert get_game_clock() is mine
+        assert seen == [clock] and clock.pauses == [3]
+
+
+class TestInteractivePacing:
+    """Test full interactive turns under a virtual clock"""
+
+    @pytest.mark.parametrize("player_class", [Warrior, Rogue, Wizard])
+    def test_interactive_battle_at_cpu_speed(self, player_class, monkeypatch):
+        """take_turn flows that used to sleep seconds per round finish instantly and deterministically"""
+        monkeypatch.setattr("builtins.input", lambda prompt="": "a")
+        clock = VirtualClock()
+        random.seed(5)
+        player = player_class()
+        enemy = EnemyAI(Warrior)
+        start = time.perf_counter()
+        with use_clock(clock), output_to(NullSink()):
+            result = run_battle(player, enemy.character,
+                                player_turn=lambda character, opponent: character.take_turn(opponent),
+                                enemy_turn=lambda character, opponent: enemy.take_turn(opponent))
+        assert time.perf_counter() - start < 5
+        assert result.rounds > 0
+        # every round pauses at least once per side
+        assert clock.now() >= 2 * result.rounds - 3
+        assert all(seconds == 1 for seconds in clock.pauses)
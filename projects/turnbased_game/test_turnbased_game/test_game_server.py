@@ -0,0 +1,189 @@
+"""
+Test suite for the asyncio game server
+Tests single sessions against the protocol, then many concurrent clients
+over TCP and a Unix socket
+"""
+import asyncio
+import json
+import random
+import socket
+import pytest
+from turnbased_game.character_classes import EnemyAI, Warrior, get_output_sink, get_game_clock
+from turnbased_game.main_gameloop.game_server import (BattleSession, GameServer, ProtocolError,
+                                                      parse_address)
+
+
+def play_out(session, reply):
+    """Picks the first available action until the battle ends"""
+    while reply["type"] == "prompt":
+        action = next(entry["action"] for entry in reply["actions"] if entry["available"])
+        reply = session.act(action)
+    return reply
+
+
+class TestSession:
+    """Test one BattleSession without the network"""
+
+    def test_start_prompts_with_actions(self):
+        random.seed(1)
+        session = BattleSession()
+        reply = session.start("wizard", "warrior")
+        assert reply["type"] == "prompt"
+        assert reply["round"] == 1
+        assert [entry["key"] for entry in reply["actions"]] == ["a", "b", "c", "d", "e"]
+        assert reply["you"]["resource"] == "mana"
+        assert reply["enemy"]["class"] == "warrior"
+
+    @pytest.mark.parametrize("class_name", ["warrior", "rogue", "wizard"])
+    def test_battle_finishes(self, class_name):
+        random.seed(2)
+        session = BattleSession()
+        reply = play_out(session, session.start(class_name, "rogue"))
+        assert reply["type"] == "result"
+        assert reply["winner"] in ("player", "enemy", "draw")
+        assert not session.in_battle
+
+    def test_rounds_counted(self):
+        """Every prompt is one round of battle_steps"""
+        random.seed(3)
+        session = BattleSession(ai_class=EnemyAI)
+        reply = session.start("warrior", "warrior")
+        rounds = 0
+        while reply["type"] == "prompt":
+            rounds += 1
+            assert reply["round"] == rounds
+            reply = session.act(key="a")
+        assert reply["rounds"] == rounds
+
+    def test_seeded_battles_repeat(self):
+        """A seed picks the enemy and fixes every roll, whatever the global random state"""
+        replies = []
+        for global_seed in (4, 5):
+            random.seed(global_seed)
+            session = BattleSession(ai_class=EnemyAI)
+            replies.append(play_out(session, session.start("rogue", seed=12)))
+        assert replies[0] == replies[1]
+        with pytest.raises(ProtocolError):
+            BattleSession().start("rogue", seed="twelve")
+
+    def test_narration_and_pauses_stay_in_session(self):
+        """The game's sink and clock are untouched and the session collects its own log"""
+        sink, clock = get_output_sink(), get_game_clock()
+        session = BattleSession(pacing=0.5)
+        session.start("rogue", "wizard")
+        session.act("attack")
+        assert get_output_sink() is sink and get_game_clock() is clock
+        assert session.drain_log()
+        assert session.drain_log() == []
+        assert session.take_pause() >= 0
+        assert session.take_pause() == 0
+
+    def test_invalid_messages(self):
+        session = BattleSession()
+        with pytest.raises(ProtocolError):
+            session.act("attack")
+        with pytest.raises(ProtocolError):
+            session.start("paladin")
+        with pytest.raises(ProtocolError):
+            session.handle({"type": "start", "class": ["warrior"]})
+        with pytest.raises(ProtocolError):
+            session.handle({"type": "start", "class": "warrior", "enemy": {"name": "rogue"}})
+        session.start("warrior", "wizard")
+        with pytest.raises(ProtocolError):
+            session.act("heal")          # not a warrior action
+        with pytest.raises(ProtocolError):
+            session.start("rogue")       # already fighting
+        with pytest.raises(ProtocolError):
+            session.handle({"type": "dance"})
+        assert session.handle({"type": "quit"}) is None
+
+    def test_parse_address(self):
+        assert parse_address("unix:/tmp/rpg.sock") == {"path": "/tmp/rpg.sock"}
+        assert parse_address("0.0.0.0:7000") == {"host": "0.0.0.0", "port": 7000}
+        assert parse_address("7000") == {"host": "127.0.0.1", "port": 7000}
+
+
+async def client_battle(open_connection, class_name, enemy_name):
+    reader, writer = await open_connection()
+    hello = json.loads(await reader.readline())
+    assert hello["type"] == "hello"
+    writer.write(json.dumps({"type": "start", "class": class_name, "enemy": enemy_name}).encode() + b"\n")
+    while True:
+        reply = json.loads(await reader.readline())
+        if reply["type"] != "prompt":
+            break
+        key = next(entry["key"] for entry in reply["actions"] if entry["available"])
+        writer.write(json.dumps({"type": "action", "key": key}).encode() + b"\n")
+    writer.write(b'{"type": "quit"}\n')
+    writer.close()
+    return reply
+
+
+class TestServer:
+    """Test the server with real socket clients"""
+
+    def test_concurrent_tcp_battles(self):
+        async def main():
+            server = GameServer()
+            await server.start("127.0.0.1", 0)
+            host, port = server.address[:2]
+            classes = ["warrior", "rogue", "wizard"]
+            results = await asyncio.gather(*(
+                client_battle(lambda: asyncio.open_connection(host, port), classes[i % 3], classes[(i + 1) % 3])
+                for i in range(60)))
+            await server.close()
+            return server, results
+        server, results = asyncio.run(main())
+        assert all(reply["type"] == "result" for reply in results)
+        assert server.battles_finished == 60
+
+    @pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix sockets")
+    def test_unix_socket(self, tmp_path):
+        path = str(tmp_path / "rpg.sock")
+
+        async def main():
+            server = GameServer()
+            await server.start(path=path)
+            reply = await client_battle(lambda: asyncio.open_unix_connection(path), "rogue", "warrior")
+            await server.close()
+            return reply
+        assert asyncio.run(main())["type"] == "result"
+
+    def test_errors_keep_connection(self):
+        async def main():
+            server = GameServer()
+            await server.start("127.0.0.1", 0)
+            reader, writer = await asyncio.open_connection(*server.address[:2])
+            await reader.readline()
+            writer.write(b"not json\n")
+            bad_json = json.loads(await reader.readline())
+            writer.write(b'{"type": "action", "action": "attack"}\n')
+            no_battle = json.loads(await reader.readline())
+            writer.write(b'{"type": "start", "class": "warrior"}\n')
+            started = json.loads(await reader.readline())
+            writer.close()
+            await server.close()
+            return bad_json, no_battle, started
+        bad_json, no_battle, started = asyncio.run(main())
+        assert bad_json["type"] == no_battle["type"] == "error"
+        assert started["type"] == "prompt"
+        assert started["log"]
+
+    def test_idle_and_full(self):
+        """Idle clients are dropped and connections past max_sessions are refused"""
+        async def main():
+            server = GameServer(max_sessions=1, idle_timeout=0.2)
+            await server.start("127.0.0.1", 0)
+            first_reader, first_writer = await asyncio.open_connection(*server.address[:2])
+            await first_reader.readline()
+            reader, writer = await asyncio.open_connection(*server.address[:2])
+            refused = json.loads(await reader.readline())
+            timed_out = json.loads(await first_reader.readline())
+            closed = await first_reader.readline()
+            await server.close()
+            return refused, timed_out, closed, server.sessions
+        refused, timed_out, closed, sessions = asyncio.run(main())
+        assert refused == {"type": "error", "message": "server full"}
+        assert timed_out == {"type": "error", "message": "idle timeout"}
+        assert closed == b""
+        assert sessions == 0
@@ -0,0 +1,81 @@
+"""
+Test suite for the headless battle engine
+Tests that AI-vs-AI battles run silently, finish, and replay from a seed
+"""
+import random
+import pytest
+from turnbased_game.character_classes import Warrior, Rogue, Wizard, CaptureSink
+from turnbased_game.main_gameloop.battle_loop import PLAYER, ENEMY, DRAW
+from turnbased_game.simulation import simulate_battle, simulate_batch, quiet
+
+
+class TestHeadlessEngine:
+    """Test headless battle simulation"""
+
+    @pytest.fixture(params=[Warrior, Rogue, Wizard])
+    def player_class(self, request):
+        return request.param
+
+    @pytest.fixture(params=[Warrior, Rogue, Wizard])
+    def enemy_class(self, request):
+        return request.param
+
+    def test_battle_finishes_with_a_winner(self, player_class, enemy_class):
+        """Every matchup should end with one side at zero health"""
+        with quiet():
+            result = simulate_battle(player_class, enemy_class, seed=7)
+        assert result.winner in (PLAYER, ENEMY)
+        assert result.rounds > 0
+        if result.winner == PLAYER:
+            assert result.enemy_health <= 0
+        else:
+            assert result.player_health <= 0
+
+    def test_battle_is_silent(self, player_class, enemy_class, capsys):
+        """Batch runs should not print any ability narration"""
+        simulate_batch(5, player_class, enemy_class, seed=1)
+        captured = capsys.readouterr()
+        assert captured.out == ""
+
+    def test_single_battle_is_silent_unless_asked(self, capsys):
+        """simulate_battle narrates only to a sink the caller hands it"""
+        first = simulate_battle(Warrior, Rogue, seed=5)
+        assert capsys.readouterr().out == ""
+        sink = CaptureSink()
+        assert simulate_battle(Warrior, Rogue, seed=5, sink=sink) == first
+        assert sink.lines and capsys.readouterr().out == ""
+
+    def test_same_seed_same_battle(self, player_class, enemy_class):
+        """A seeded battle should replay identically"""
+        with quiet():
+            first = simulate_battle(player_class, enemy_class, seed=42)
+            second = simulate_battle(player_class, enemy_class, seed=42)
+        assert first == second
+
+    def test_max_rounds_is_a_draw(self):
+        """Hitting the round cap should be reported as a draw"""
+        with quiet():
+            result = simulate_battle(Warrior, Warrior, seed=3, max_rounds=1)
+        assert result.winner == DRAW
+        assert result.rounds == 1
+
+
+def test_batch_counts_add_up():
+    """Wins and draws should account for every battle"""
+    summary = simulate_batch(50, seed=11)
+    assert summary.player_wins + summary.enemy_wins + summary.draws == 50
+    assert summary.battles_per_second > 0
+
+
+def test_batch_is_reproducible():
+    """Same seed gives the same tallies; the caller's random state is left untouched"""
+    random.seed(99)
+    expected_next = random.random()
+    random.seed(99)
+
+    first = simulate_batch(30, seed=5)
+    assert random.random() == expected_next
+
+    second = simulate_batch(30, seed=5)
+    assert (first.player_wins, first.enemy_wins, first.total_rounds) == \
+           (second.player_wins, second.enemy_wins, second.total_rounds)
@@ -0,0 +1,60 @@
+"""
+Test suite for the multiprocess matchup matrix
+Tests sharding, worker-count independence and confidence intervals
+"""
+import pytest
+from turnbased_game.simulation import (CHARACTER_CLASSES, MatchupStats,
+                                       run_matchup_matrix, simulate_batch)
+
+
+def _tallies(matrix):
+    return {key: (cell.player_wins, cell.enemy_wins, cell.draws, cell.total_rounds)
+            for key, cell in matrix.cells.items()}
+
+
+class TestMatchupMatrix:
+    """Test matchup matrix results"""
+
+    def test_matrix_covers_every_pairing(self):
+        """3 classes should give a 3x3 matrix with every battle counted"""
+        matrix = run_matchup_matrix(4, seed=1, workers=1)
+        assert len(matrix.cells) == 9
+        assert all(cell.battles == 4 for cell in matrix.cells.values())
+        assert matrix.total_battles == 36
+
+    def test_results_do_not_depend_on_shard_size(self):
+        """Splitting the same battles differently must not change the totals"""
+        whole = run_matchup_matrix(12, seed=3, workers=1, shard_size=12)
+        pieces = run_matchup_matrix(12, seed=3, workers=1, shard_size=5)
+        assert _tallies(whole) == _tallies(pieces)
+
+    def test_results_do_not_depend_on_worker_count(self):
+        """Same seed gives identical results on one process or a pool"""
+        serial = run_matchup_matrix(10, seed=8, workers=1)
+        pooled = run_matchup_matrix(10, seed=8, workers=2)
+        assert _tallies(serial) == _tallies(pooled)
+
+    def test_cell_matches_single_batch(self):
+        """Each cell replays the same battles as simulate_batch for that pairing"""
+        matrix = run_matchup_matrix(15, seed=6, workers=1, classes=["rogue", "wizard"])
+        summary = simulate_batch(15, CHARACTER_CLASSES["rogue"], CHARACTER_CLASSES["wizard"], seed=6)
+        cell = matrix[("rogue", "wizard")]
+        assert (cell.player_wins, cell.enemy_wins, cell.total_rounds) == \
+               (summary.player_wins, summary.enemy_wins, summary.total_rounds)
+
+
+@pytest.mark.parametrize("wins, battles", [(0, 100), (50, 100), (100, 100), (123, 1000)])
+def test_confidence_interval_contains_win_rate(wins, battles):
+    """Wilson interval should stay inside [0, 1] and bracket the observed rate"""
+    stats = MatchupStats("warrior", "rogue", battles=battles, player_wins=wins)
+    low, high = stats.confidence_interval()
+    assert 0.0 <= low <= stats.win_rate <= high <= 1.0
+
+
+def test_confidence_interval_narrows_with_more_battles():
+    """More battles should tighten the interval"""
+    small = MatchupStats("warrior", "rogue", battles=100, player_wins=50)
+    large = MatchupStats("warrior", "rogue", battles=10000, player_wins=5000)
+    small_low, small_high = small.confidence_interval()
+    large_low, large_high = large.confidence_interval()
+    assert (large_high - large_low) < (small_high - small_low)
@@ -0,0 +1,170 @@
+"""
+Test suite for output sinks
+Tests that narration reaches the current sink, and is only formatted when a sink consumes it
+"""
+import asyncio
+import io
+import threading
+import pytest
+from turnbased_game.character_classes import (Warrior, Rogue, Wizard, ConsoleSink, NullSink, BufferedSink,
+                                              CaptureSink, get_output_sink, set_output_sink, output_to,
+                                              narrate, narration_enabled)
+from turnbased_game.character_classes.status_effects import StatusEffect, EffectType, EffectCategory
+
+
+class Exploding:
+    """Argument that fails the test if anything formats it"""
+    def __format__(self, spec):
+        raise AssertionError("message was formatted")
+
+
+def threading_sink():
+    """The sink a freshly started thread narrates to"""
+    seen = []
+    thread = threading.Thread(target=lambda: seen.append(get_output_sink()))
+    thread.start()
+    thread.join(5)
+    return seen[0]
+
+
+class TestSinks:
+    """Test each sink on its own"""
+
+    def test_console_writes_lines(self, capsys):
+        """ConsoleSink prints like print(), formatting the template"""
+        with output_to(ConsoleSink()):
+            narrate("{} takes {} damage.", "Enemy", 25)
+            narrate("plain {braces} kept without arguments")
+        assert capsys.readouterr().out == "Enemy takes 25 damage.\nplain {braces} kept without arguments\n"
+
+    def test_console_stream(self):
+        """ConsoleSink can write to any stream"""
+        stream = io.StringIO()
+        with output_to(ConsoleSink(stream)):
+            narrate("{:.1%}", 0.5)
+        assert stream.getvalue() == "50.0%\n"
+
+    def test_null_never_formats(self):
+        """NullSink drops messages without formatting and reports narration disabled"""
+        with output_to(NullSink()):
+            assert not narration_enabled()
+            narrate("{}", Exploding())
+
+    def test_capture_formats_on_read(self):
+        """CaptureSink keeps templates and formats when lines are read"""
+        sink = CaptureSink()
+        with output_to(sink):
+            narrate("{}", Exploding())
+        assert len(sink.messages) == 1
+        sink.clear()
+        with output_to(sink):
+            narrate("a {}", 1)
+            narrate("b")
+        assert sink.lines == ["a 1", "b"]
+        assert sink.text == "a 1\nb\n"
+
+    def test_buffered_writes_on_flush(self):
+        """BufferedSink holds messages until flushed or full"""
+        stream = io.StringIO()
+        sink = BufferedSink(stream, capacity=3)
+        previous = set_output_sink(sink)
+        try:
+            narrate("one")
+            narrate("two {}", 2)
+            assert stream.getvalue() == ""
+            narrate("three")
+            assert stream.getvalue() == "one\ntwo 2\nthree\n"
+            narrate("four")
+        finally:
+            set_output_sink(previous)
+        sink.flush()
+        assert stream.getvalue().endswith("four\n")
+
+    def test_output_to_restores(self):
+        """output_to puts the previous sink back, even on errors"""
+        before = get_output_sink()
+        with pytest.raises(RuntimeError):
+            with output_to(CaptureSink()):
+                raise RuntimeError
+        assert get_output_sink() is before
+
+    def test_output_to_stays_in_its_thread(self):
+        """Another thread's output_to block never redirects this thread's narration"""
+        inside, entered, leave = CaptureSink(), threading.Event(), threading.Event()
+
+        def worker():
+            with output_to(inside):
+                entered.set()
+                leave.wait(5)
+                narrate("worker")
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        entered.wait(5)
+        mine = CaptureSink()
+        with output_to(mine):
+            narrate("main")
+            leave.set()
+            thread.join(5)
+        assert (mine.lines, inside.lines) == (["main"], ["worker"])
+        assert isinstance(threading_sink(), ConsoleSink)
+
+    def test_overlapping_tasks_restore_their_own_sinks(self):
+        """Interleaved output_to blocks in asyncio tasks each see and restore their own sink"""
+        before = get_output_sink()
+
+        async def battle(name, first):
+            sink = CaptureSink()
+            with output_to(sink):
+                await first.wait()
+                narrate(name)
+            return sink.lines, get_output_sink()
+
+        async def both():
+            gate = asyncio.Event()
+            first = asyncio.ensure_future(battle("first", gate))
+            second = asyncio.ensure_future(battle("second", gate))
+            await asyncio.sleep(0)
+            gate.set()
+            return await first, await second
+
+        (first, first_after), (second, second_after) = asyncio.run(both())
+        assert (first, second) == (["first"], ["second"])
+        assert first_after is before and second_after is before
+        assert get_output_sink() is before
+
+
+class TestCharacterNarration:
+    """Test that ability narration goes through the sink"""
+
+    @pytest.mark.parametrize("character_class", [Warrior, Rogue, Wizard])
+    def test_abilities_narrate(self, character_class, capsys):
+        """Attack narration reaches the sink and nothing else is printed"""
+        sink = CaptureSink()
+        with output_to(sink):
+            character_class().attack(Warrior())
+            character_class().print_status()
+        assert capsys.readouterr().out == ""
+        assert len(sink.lines) >= 2
+
+    def test_effect_narration_skipped_when_silent(self):
+        """Damage modification builds no messages for a NullSink"""
+        wizard = Wizard()
+        wizard.cast_magic_bubble()
+        with output_to(NullSink()):
+            damage, messages = wizard.status_effects.apply_damage_modification(wizard, 40)
+        assert messages == []
+        with output_to(CaptureSink()):
+            same_damage, messages = wizard.status_effects.apply_damage_modification(wizard, 40)
+        assert same_damage == damage
+        assert messages
+
+    def test_berserker_rage_still_converts(self):
+        """Silencing narration does not change the rage gained from berserker rage"""
+        warrior = Warrior()
+        warrior.status_effects.add_effect(StatusEffect(
+            effect_type=EffectType.BERSERKER_RAGE, duration=5, magnitude=0.25, maintenance_cost=0,
+            resource_type="rage", categories=EffectCategory.DAMAGE_AMPLIFICATION | EffectCategory.RAGE_CONVERSION))
+        with output_to(NullSink()):
+            damage, _ = warrior.status_effects.apply_damage_modification(warrior, 40)
+        assert (damage, warrior.rage) == (50, 10)
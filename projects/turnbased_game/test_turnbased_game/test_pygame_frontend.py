@@ -0,0 +1,177 @@
+"""
+Test suite for the threaded pygame front-end
+Tests the logic thread's records, the fixed-timestep animation scheduler
+sliding bars independently of the frame rate, cues and sounds, and a whole
+battle played through the window on SDL's dummy driver
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import queue
+import pygame
+import pytest
+from turnbased_game.character_classes import Rogue, Warrior, Wizard
+from turnbased_game.main_gameloop.battle_loop import PLAYER, ENEMY
+from turnbased_game.main_gameloop.battle_renderer import BattleRenderer, run_window
+from turnbased_game.main_gameloop.game_server import character_status
+from turnbased_game.main_gameloop.pygame_frontend import ANIMATION_SECONDS, AnimationScheduler, BattleWorker
+
+
+class _Clock:
+    """Stands in for time.perf_counter"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class _Sound:
+    def __init__(self):
+        self.plays = 0
+
+    def play(self):
+        self.plays += 1
+
+
+@pytest.fixture
+def renderer():
+    renderer = BattleRenderer()
+    yield renderer
+    pygame.display.quit()
+
+
+def _worker(seed=5):
+    return BattleWorker(Warrior, Rogue, seed=seed, notify=lambda: None)
+
+
+def _play(worker):
+    """Answers every prompt with the first available action; returns the records"""
+    worker.start()
+    records = []
+    while True:
+        record = worker.records.get(timeout=5)
+        records.append(record)
+        if record["type"] == "result":
+            break
+        if record["type"] == "prompt":
+            worker.choose(next(entry["action"] for entry in record["actions"] if entry["available"]))
+    worker.join(timeout=5)
+    return records
+
+
+def _record(kind="effects", player_health=200, enemy_health=160, **fields):
+    you, enemy = character_status(Warrior()), character_status(Rogue())
+    you["health"], enemy["health"] = player_health, enemy_health
+    return {"type": kind, "you": you, "enemy": enemy, "log": [], **fields}
+
+
+class TestWorker:
+    """Test the logic thread"""
+
+    def test_battle_plays_to_a_result(self):
+        records = _play(_worker())
+        assert records[0]["type"] == "prompt"
+        assert records[0]["log"] == ["A wild Rogue appears!"]
+        assert records[-1]["winner"] in (PLAYER, ENEMY)
+        assert {record["type"] for record in records} >= {"prompt", "action", "result"}
+
+    def test_records_carry_the_numbers_after_each_action(self):
+        for record in _play(_worker(seed=8)):
+            if record["type"] == "action":
+                result = record["result"]
+                target = "enemy" if result["attacker"] == PLAYER else "you"
+                assert record[target]["health"] == result["target_health_after"]
+
+    def test_same_seed_same_records(self):
+        first, second = _play(_worker(seed=2)), _play(_worker(seed=2))
+        assert first == second
+
+    def test_stop_while_waiting_for_the_player(self):
+        worker = _worker()
+        worker.start()
+        assert worker.records.get(timeout=5)["type"] == "prompt"
+        worker.stop()
+        worker.join(timeout=5)
+        assert not worker.is_alive()
+
+
+class TestScheduler:
+    """Test the fixed-timestep animations"""
+
+    def _scheduler(self, renderer, *records, **options):
+        pending = queue.Queue()
+        for record in records:
+            pending.put(record)
+        clock = _Clock()
+        return AnimationScheduler(renderer, pending, clock=clock, **options), clock
+
+    def _run(self, scheduler, clock, seconds, frame):
+        for _ in range(round(seconds / frame)):
+            clock.now += frame
+            scheduler.advance()
+
+    def test_bars_slide_the_same_at_any_frame_rate(self, renderer):
+        shown = []
+        for frame in (1 / 30, 1 / 144):
+            scheduler, clock = self._scheduler(renderer, _record(), _record(enemy_health=100))
+            scheduler.advance()
+            self._run(scheduler, clock, ANIMATION_SECONDS / 2, frame)
+            shown.append(scheduler.shown[(ENEMY, "health")])
+        assert 100 < shown[0] < 160
+        assert shown[0] == pytest.approx(shown[1], abs=2)
+
+    def test_animation_ends_on_the_new_numbers(self, renderer):
+        scheduler, clock = self._scheduler(renderer, _record(), _record(enemy_health=100))
+        assert scheduler.advance()
+        self._run(scheduler, clock, ANIMATION_SECONDS + 0.1, 1 / 60)
+        assert not scheduler.busy
+        assert scheduler.shown[(ENEMY, "health")] == 100
+        assert renderer.health[ENEMY].value[1] == "Health: 100/160"
+
+    def test_a_stall_does_not_skip_the_animation(self, renderer):
+        scheduler, clock = self._scheduler(renderer, _record(), _record(enemy_health=100))
+        scheduler.advance()
+        clock.now += 5.0   # e.g. the window was dragged
+        scheduler.advance()
+        assert scheduler.busy
+
+    def test_prompt_waits_for_earlier_animations(self, renderer):
+        prompt = _record("prompt", round=1, actions=[{"key": "a", "action": "attack", "name": "Strike",
+                                                      "available": True}])
+        scheduler, clock = self._scheduler(renderer, _record(), _record(player_health=150), prompt)
+        scheduler.advance()
+        assert scheduler.prompt is None
+        self._run(scheduler, clock, ANIMATION_SECONDS + 0.1, 1 / 60)
+        assert scheduler.prompt is prompt
+        assert renderer.action_for_key("a") == "attack"
+
+    def test_cues_show_and_sounds_play(self, renderer):
+        result = {"attacker": PLAYER, "animation_triggers": ["sword_swing"], "sound_effects": ["sword_hit"]}
+        sound = _Sound()
+        scheduler, clock = self._scheduler(renderer, _record("action", enemy_health=120, result=result),
+                                           sounds={"sword_hit": sound})
+        scheduler.advance()
+        assert renderer.cues[PLAYER].value == ("sword swing",)
+        assert sound.plays == 1
+        self._run(scheduler, clock, ANIMATION_SECONDS + 0.1, 1 / 60)
+        assert renderer.cues[PLAYER].value == ()
+
+
+def test_battle_plays_through_the_window(renderer):
+    worker = BattleWorker(Wizard, Warrior, seed=4)
+    scheduler = AnimationScheduler(renderer, worker.records, seconds=0.02)
+
+    def on_frame():
+        busy = scheduler.advance()
+        if scheduler.prompt is not None and not busy:
+            worker.choose(next(entry["action"] for entry in scheduler.prompt["actions"] if entry["available"]))
+            scheduler.prompt = None
+        elif scheduler.finished is not None and not busy:
+            pygame.event.post(pygame.event.Event(pygame.QUIT))
+        return busy
+
+    worker.start()
+    run_window(renderer, on_frame=on_frame, fps=500, seconds=30)
+    worker.stop()
+    assert scheduler.finished is not None
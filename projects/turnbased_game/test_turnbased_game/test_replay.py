@@ -0,0 +1,171 @@
+"""
+Test suite for binary battle replays
+Tests the record layout, append-only writing, mmap random access and recording through the turn loop
+"""
+import math
+import os
+import pytest
+from turnbased_game.character_classes import Warrior, Rogue, Wizard
+from turnbased_game.character_classes.combat_events import combat_events
+from turnbased_game.main_gameloop.battle_loop import run_battle
+from turnbased_game.simulation import simulate_batch, ReplayHooks, ReplayReader, ReplayWriter
+from turnbased_game.simulation.balance_tuner import balanced_classes, balanced_data, load_class_data
+from turnbased_game.simulation.replay import (FILE_HEADER, RECORD_SIZE, BATTLE, TURN, END,
+                                              BattleRecord, TurnRecord, EndRecord, rules_hash)
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "battles.replay")
+
+
+def _record(path, battles=20, player=Warrior, enemy=Rogue, seed=3, max_rounds=200):
+    with ReplayWriter(path) as writer:
+        return simulate_batch(battles, player, enemy, seed=seed, max_rounds=max_rounds, replay=writer)
+
+
+class TestLayout:
+    """Test the fixed-width file layout"""
+
+    def test_records_are_fixed_width(self, path):
+        """File size is the header plus a whole number of records"""
+        _record(path, battles=5)
+        size = os.path.getsize(path)
+        assert (size - FILE_HEADER.size) % RECORD_SIZE == 0
+        with ReplayReader(path) as replay:
+            assert len(replay) == (size - FILE_HEADER.size) // RECORD_SIZE
+            assert replay.rules_hash == rules_hash()
+
+    def test_battle_framing(self, path):
+        """Every battle is a BATTLE header, its TURNs, then an END"""
+        _record(path, battles=5)
+        with ReplayReader(path) as replay:
+            kinds = [replay.kind(index) for index in range(len(replay))]
+            assert kinds[0] == BATTLE and kinds[-1] == END
+            assert kinds.count(BATTLE) == kinds.count(END) == 5
+            assert isinstance(replay[0], BattleRecord)
+            assert isinstance(replay[1], TurnRecord)
+            assert isinstance(replay[-1], EndRecord)
+
+    def test_rejects_other_files(self, tmp_path):
+        """Files without the replay header are refused"""
+        bogus = tmp_path / "bogus.replay"
+        bogus.write_bytes(b"not a replay file at all")
+        with pytest.raises(ValueError):
+            ReplayReader(str(bogus))
+        empty = tmp_path / "empty.replay"
+        empty.write_bytes(b"")
+        with pytest.raises(ValueError):
+            ReplayReader(str(empty))
+
+
+class TestRecording:
+    """Test that recorded battles match what the turn loop played"""
+
+    def test_outcomes_match_summary(self, path):
+        """END records agree with the batch summary"""
+        summary = _record(path, battles=30)
+        with ReplayReader(path) as replay:
+            battles = list(replay.battles())
+        assert len(battles) == 30
+        assert sum(battle.end.winner == "player" for battle in battles) == summary.player_wins
+        assert sum(battle.end.winner == "enemy" for battle in battles) == summary.enemy_wins
+        assert sum(battle.end.rounds for battle in battles) == summary.total_rounds
+
+    def test_headers(self, path):
+        """Headers carry the classes, per-battle seed and round limit"""
+        _record(path, battles=3, player=Wizard, enemy=Warrior, max_rounds=50)
+        with ReplayReader(path) as replay:
+            headers = [battle.header for battle in replay.battles()]
+        assert all(header.player_class is Wizard and header.enemy_class is Warrior for header in headers)
+        assert all(header.max_rounds == 50 for header in headers)
+        assert len({header.seed for header in headers}) == 3
+
+    def test_tuned_classes(self, path):
+        """Tuned subclasses record under their table names with a hash of the stats they played"""
+        tuned = balanced_classes(balanced_data(load_class_data(), {"warrior": math.log(3)}))
+        _record(path, battles=2, player=tuned["warrior"], enemy=tuned["rogue"])
+        _record(path, battles=1)
+        with ReplayReader(path) as replay:
+            first, _, shipped = [battle.header for battle in replay.battles()]
+        assert first.player_class is Warrior and first.enemy_class is Rogue
+        assert first.rules_hash == rules_hash((tuned["warrior"], tuned["rogue"]))
+        assert shipped.rules_hash == rules_hash((Warrior, Rogue)) != first.rules_hash
+
+    def test_turn_records(self, path):
+        """Battles open on the player's first turn, dodges deal nothing, and the last turn matches the END"""
+        _record(path, battles=10)
+        with ReplayReader(path) as replay:
+            for battle in replay.battles():
+                turns = replay.turns(battle)
+                assert turns[0].side == "player" and turns[0].round == 1
+                last = turns[-1]
+                assert (last.player[0], last.enemy[0]) == (battle.end.player_health, battle.end.enemy_health)
+                for turn in turns:
+                    if turn.dodged:
+                        assert turn.damage == 0
+
+    def test_failed_battle_leaves_shared_bus_alone(self, path):
+        """A battle that raises mid-way leaves no subscriber on the shared event bus"""
+        def broken_turn(actor, target):
+            raise RuntimeError("controller crashed")
+
+        with ReplayWriter(path) as writer, pytest.raises(RuntimeError):
+            run_battle(Warrior(), Rogue(), broken_turn, broken_turn, hooks=ReplayHooks(writer))
+        assert not combat_events.active
+
+    def test_seeded_runs_are_identical(self, tmp_path):
+        """The same seed records byte-identical replays"""
+        first, second = str(tmp_path / "a.replay"), str(tmp_path / "b.replay")
+        _record(first, battles=10, seed=11)
+        _record(second, battles=10, seed=11)
+        with open(first, "rb") as a, open(second, "rb") as b:
+            assert a.read() == b.read()
+
+
+class TestAppendAndRead:
+    """Test appending and random access"""
+
+    def test_append_adds_battles(self, path):
+        """Reopening a file appends after the existing records and keeps one header"""
+        _record(path, battles=4)
+        with ReplayReader(path) as replay:
+            before = len(replay)
+        _record(path, battles=6, seed=99)
+        with ReplayReader(path) as replay:
+            assert len(replay) > before
+            assert len(list(replay.battles())) == 10
+            assert isinstance(replay[before], BattleRecord)
+
+    def test_negative_and_out_of_range_index(self, path):
+        """Negative indexes count from the end; out of range raises IndexError"""
+        _record(path, battles=2)
+        with ReplayReader(path) as replay:
+            assert replay[-1] == replay[len(replay) - 1]
+            with pytest.raises(IndexError):
+                replay[len(replay)]
+
+    def test_partial_tail_ignored(self, path):
+        """A record cut off mid-write is not read"""
+        _record(path, battles=2)
+        with ReplayReader(path) as replay:
+            count = len(replay)
+        with open(path, "ab") as handle:
+            handle.write(bytes([TURN, 0, 1]))
+        with ReplayReader(path) as replay:
+            assert len(replay) == count
+            assert len(list(replay.battles())) == 2
+
+    def test_numpy_view(self, path):
+        """as_array exposes every record without copying"""
+        np = pytest.importorskip("numpy")
+        _record(path, battles=5)
+        with ReplayReader(path) as replay:
+            records = replay.as_array()
+            assert len(records) == len(replay)
+            turns = records[records["kind"] == TURN]
+            assert np.all(turns["damage"] >= 0)
+            first_turn = replay[1]
+            assert records[1]["damage"] == first_turn.damage
+            assert records[1]["enemy_health"] == first_turn.enemy[0]
+            del records, turns
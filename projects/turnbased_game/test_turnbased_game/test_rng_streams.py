@@ -0,0 +1,108 @@
+"""
+Test suite for per-battle RNG streams
+Tests stream derivation, reproducible battles across threads, isolation
+from the global random module and NumPy block mode
+"""
+import random
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from turnbased_game.character_classes import Rogue, Warrior, Wizard, EnemyAI
+from turnbased_game.character_classes.rng_streams import BattleRNG, BlockStream, RollBank, stream_seed
+from turnbased_game.simulation import battle_seed, quiet, simulate_battle, tally_battles
+
+
+def _outcome(result):
+    return result.winner, result.rounds, result.player_health, result.enemy_health
+
+
+class TestStreams:
+    """Test BattleRNG streams"""
+
+    def test_stream_seeds_are_stable_and_distinct(self):
+        assert stream_seed(7, "player") == stream_seed(7, "player")
+        assert len({stream_seed(7, name) for name in ("player", "enemy", "player_ai", "enemy_ai")}) == 4
+        assert stream_seed(7, "player") != stream_seed(8, "player")
+
+    def test_same_seed_same_streams(self):
+        first, second = BattleRNG(3), BattleRNG(3)
+        assert [first.stream("enemy").random() for _ in range(5)] == \
+               [second.stream("enemy").random() for _ in range(5)]
+
+    def test_equip_covers_character_manager_and_ai(self):
+        rng = BattleRNG(1)
+        controller = rng.equip_controller(EnemyAI(Rogue), "enemy")
+        assert controller.character.rng is rng.stream("enemy")
+        assert controller.character.status_effects.rng is rng.stream("enemy")
+        expected = random.Random(stream_seed(1, "enemy_ai")).choice(("heal", "attack"))
+        assert controller.rng.choice(("heal", "attack")) == expected
+
+    def test_sides_roll_independently(self):
+        """One side drawing more often doesn't change the other side's dice"""
+        quiet_rng, busy_rng = BattleRNG(5), BattleRNG(5)
+        for _ in range(10):
+            busy_rng.stream("enemy").random()
+        assert [quiet_rng.stream("player").random() for _ in range(3)] == \
+               [busy_rng.stream("player").random() for _ in range(3)]
+
+    def test_characters_default_to_global_random(self):
+        assert Warrior().rng is random
+        assert Warrior().status_effects.rng is random
+
+
+class TestSeededBattles:
+    """Test reproducibility of whole battles"""
+
+    def test_seeded_battle_leaves_global_random_alone(self):
+        random.seed(42)
+        expected = random.random()
+        random.seed(42)
+        with quiet():
+            first = simulate_battle(Rogue, Wizard, seed=9)
+        assert random.random() == expected
+        with quiet():
+            second = simulate_battle(Rogue, Wizard, seed=9)
+        assert _outcome(first) == _outcome(second)
+
+    def test_threads_play_the_same_battles(self):
+        """Battles sharing a process no longer share dice"""
+        seeds = [battle_seed(3, index) for index in range(40)]
+
+        def play(seed):
+            with quiet():   # the sink is per thread
+                return _outcome(simulate_battle(Warrior, Rogue, seed=seed))
+
+        serial = [play(seed) for seed in seeds]
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            threaded = list(pool.map(play, seeds))
+        assert threaded == serial
+
+
+class TestBlockMode:
+    """Test NumPy pre-drawn rolls"""
+
+    @pytest.fixture(autouse=True)
+    def _numpy(self):
+        pytest.importorskip("numpy")
+
+    def test_block_stream_overflows_deterministically(self):
+        first, second = BlockStream([0.25], 11, "player"), BlockStream([0.25], 11, "player")
+        assert first.random() == 0.25
+        assert [first.random() for _ in range(3)] == [second.random() for _ in range(4)][1:]
+
+    def test_block_stream_choices(self):
+        stream = BlockStream([0.1, 0.9, 0.6], 0, "enemy_ai")
+        assert stream.choice("ab") == "a"
+        assert stream.choices("ab", [3, 1]) == ["b"]
+        assert stream.choices("ab", [3, 1]) == ["a"]
+
+    def test_bank_rows_depend_only_on_the_index(self):
+        whole, fresh = RollBank(4, battles=8), RollBank(4, battles=8)
+        for index in range(12):
+            whole.battle(index, index)
+        assert whole.battle(13, 0).stream("player").random() == fresh.battle(13, 0).stream("player").random()
+
+    def test_any_split_adds_up(self):
+        whole = tally_battles(Rogue, Warrior, 6, 0, 30, block_rng=True)
+        first = tally_battles(Rogue, Warrior, 6, 0, 13, block_rng=True)
+        rest = tally_battles(Rogue, Warrior, 6, 13, 30, block_rng=True)
+        assert whole == {key: first[key] + rest[key] for key in whole}
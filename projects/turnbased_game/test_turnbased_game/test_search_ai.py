@@ -0,0 +1,99 @@
+"""
+Test suite for the search-based enemy AI
+Tests move legality, the time budget, the transposition table and drop-in play
+"""
+import time
+import pytest
+from turnbased_game.character_classes import Warrior, Rogue, Wizard, EnemyAI
+from turnbased_game.main_gameloop.battle_loop import PLAYER, ENEMY
+from turnbased_game.simulation import simulate_battle, quiet
+from turnbased_game.simulation.battle_rules import combatant
+from turnbased_game.simulation.search_ai import SearchEnemyAI
+
+ENEMY_ACTIONS = {"attack", "special", "item", "heal",
+                 "cast_magic_bubble", "activate_shadow_step", "enter_berserker_rage"}
+
+
+class TestSearchEnemyAI:
+    """Test search-based action selection"""
+
+    @pytest.fixture(params=[Warrior, Rogue, Wizard])
+    def enemy_class(self, request):
+        return request.param
+
+    def test_is_an_enemy_ai(self):
+        """Should work anywhere an EnemyAI does"""
+        ai = SearchEnemyAI(Rogue)
+        assert isinstance(ai, EnemyAI)
+        assert isinstance(ai.character, Rogue)
+
+    def test_chooses_executable_actions(self, enemy_class):
+        """Chosen actions should be names execute_action understands"""
+        ai = SearchEnemyAI(enemy_class)
+        player = Warrior()
+        with quiet():
+            for _ in range(5):
+                action = ai.choose_action(player)
+                assert action in ENEMY_ACTIONS
+                ai.execute_action(action, player)
+
+    def test_takes_the_killing_blow(self):
+        """A guaranteed kill should be found"""
+        ai = SearchEnemyAI(Warrior, time_budget=0.05)
+        player = Rogue()
+        player.health = 20
+        assert ai.choose_action(player) == "attack"
+
+    def test_respects_time_budget(self):
+        """Deepening stops close to the per-move budget"""
+        ai = SearchEnemyAI(Wizard, time_budget=0.005, max_depth=40)
+        start = time.perf_counter()
+        ai.choose_action(Rogue())
+        assert time.perf_counter() - start < 0.1
+        assert 1 <= ai.last_depth < 40
+
+    def test_reaches_max_depth_with_enough_time(self):
+        """A generous budget finishes every pass up to max_depth"""
+        ai = SearchEnemyAI(Warrior, time_budget=5.0, max_depth=3)
+        ai.choose_action(Warrior())
+        assert ai.last_depth == 3
+
+    def test_no_budget_searches_to_max_depth(self):
+        """Without a time budget every move is searched to max_depth"""
+        ai = SearchEnemyAI(Rogue, time_budget=None, max_depth=4)
+        ai.choose_action(Wizard())
+        assert ai.last_depth == 4
+
+    def test_transposition_table_reused(self):
+        """Repeating a search should be answered mostly from the table"""
+        ai = SearchEnemyAI(Rogue, time_budget=5.0, max_depth=4)
+        player = Wizard()
+        first = ai.choose_action(player)
+        first_nodes = ai.nodes
+        assert ai.tables[Wizard]
+        assert ai.choose_action(player) == first
+        assert ai.nodes < first_nodes
+
+    def test_unknown_policy_rejected(self):
+        """Only optimal and ai opponent models exist"""
+        with pytest.raises(ValueError):
+            SearchEnemyAI(Warrior, opponent_policy="random")
+
+
+class TestCombatantConversion:
+    """Test reading live characters into search states"""
+
+    def test_reads_resource_and_effect_turns(self):
+        """Resource and the class effect's remaining duration are captured"""
+        wizard = Wizard()
+        wizard.cast_magic_bubble()
+        assert combatant(wizard) == (wizard.health, wizard.mana, wizard.item_count, 3)
+        assert combatant(Warrior()) == (200, 0, 2, 0)
+
+
+@pytest.mark.parametrize("enemy_class", [Warrior, Rogue, Wizard])
+def test_drop_in_battle(enemy_class):
+    """A full headless battle runs with the search AI as enemy"""
+    with quiet():
+        result = simulate_battle(Warrior, enemy_class, seed=3, enemy_ai=SearchEnemyAI)
+    assert result.winner in (PLAYER, ENEMY)
@@ -0,0 +1,152 @@
+"""
+Test suite for battle snapshots
+Tests full and delta encoding round-trips, restored battles playing on
+identically, resuming battle_steps mid-round and checkpoint files
+"""
+import math
+import pytest
+from turnbased_game.character_classes import Rogue, Warrior, Wizard, CompiledEnemyAI
+from turnbased_game.character_classes.rng_streams import BattleRNG
+from turnbased_game.character_classes.status_effects import StackRule
+from turnbased_game.main_gameloop.battle_loop import battle_steps, PLAYER, ENEMY
+from turnbased_game.main_gameloop.game_server import BattleSession
+from turnbased_game.simulation.balance_tuner import balanced_classes, balanced_data, load_class_data
+from turnbased_game.simulation.snapshot import SnapshotLog, capture, decode, encode, restore
+
+
+def play_out(session, reply, turns=None):
+    """Picks the first available action until the battle ends (or for `turns` turns)"""
+    while reply["type"] == "prompt" and turns != 0:
+        action = next(entry["action"] for entry in reply["actions"] if entry["available"])
+        reply = session.act(action)
+        turns = None if turns is None else turns - 1
+    return reply
+
+
+def _session(seed=9, turns=2):
+    session = BattleSession()
+    reply = play_out(session, session.start("wizard", "rogue", seed=seed), turns)
+    assert reply["type"] == "prompt"
+    return session
+
+
+class TestEncoding:
+    """Test the binary forms"""
+
+    def test_full_round_trip(self):
+        snapshot = _session().snapshot()
+        assert decode(encode(snapshot)) == snapshot
+
+    def test_delta_round_trip(self):
+        session = _session()
+        before = session.snapshot()
+        play_out(session, session.act("attack"), turns=0)
+        after = session.snapshot()
+        assert decode(encode(after, before), before) == after
+
+    def test_delta_holds_only_changes(self):
+        """Between Mersenne Twister twists a stream's delta is just its position"""
+        session = _session()
+        before = session.snapshot()
+        session.player.health -= 5
+        session.rng.stream(PLAYER).random()
+        after = session.snapshot()
+        delta = encode(after, before)
+        assert decode(delta, before) == after
+        assert len(delta) < 40 < 1000 < len(encode(after))
+        assert len(encode(after, after)) < 20
+
+    def test_delta_needs_its_base(self):
+        session = _session()
+        snapshot = session.snapshot()
+        with pytest.raises(ValueError):
+            decode(encode(snapshot, snapshot))
+        with pytest.raises(ValueError):
+            decode(b"NOTSNAP" + encode(snapshot)[7:])
+
+    def test_tuned_classes_need_their_table(self):
+        """Snapshots of tuned classes only decode against the classes they were played with"""
+        tuned = balanced_classes(balanced_data(load_class_data(), {"warrior": math.log(3)}))
+        rng = BattleRNG(5)
+        snapshot = capture(rng.equip(tuned["warrior"](), PLAYER), rng.equip(tuned["rogue"](), ENEMY), rng)
+        assert decode(encode(snapshot), classes=tuned) == snapshot
+        with pytest.raises(ValueError):
+            decode(encode(snapshot))
+
+    def test_effects_and_turns_survive(self):
+        rng = BattleRNG(3)
+        wizard = rng.equip(Wizard(), PLAYER)
+        warrior = rng.equip(Warrior(), ENEMY)
+        bubble = Wizard.stats.effect.make("mana")
+        wizard.status_effects.add_effect(bubble)
+        wizard.status_effects.process_turn_effects(wizard)
+        snapshot = decode(encode(capture(wizard, warrior, rng, 2, ENEMY)))
+        player, enemy, restored_rng = restore(snapshot)
+        effect, = player.status_effects.active_effects
+        assert effect.definition is bubble.definition
+        assert effect.duration == bubble.duration
+        assert player.status_effects.turn == 1 and player.mana == wizard.mana
+        assert restored_rng.stream(PLAYER).random() == rng.stream(PLAYER).random()
+
+    def test_stacks_keep_their_order(self):
+        warrior = Warrior()
+        stack = Warrior.stats.effect._replace(stack_rule=StackRule.ADD, definition=None, duration=4)
+        for _ in range(3):
+            warrior.status_effects.add_effect(stack.make("rage"))
+            warrior.status_effects.process_turn_effects(warrior)
+        player, _, _ = restore(decode(encode(capture(warrior, Rogue()))))
+        assert [effect.duration for effect in player.status_effects.active_effects] == [1, 2, 3]
+        assert [len(player.status_effects.process_turn_effects(player)["effects_expired"])
+                for _ in range(4)] == [1, 1, 1, 0]
+
+
+class TestResume:
+    """Test battles picking up where they stopped"""
+
+    def test_resumed_session_plays_the_same_battle(self):
+        original = _session(seed=11)
+        resumed = BattleSession()
+        prompt = resumed.resume(decode(encode(original.snapshot())))
+        assert prompt["round"] == original.round
+        assert play_out(resumed, prompt) == play_out(original, original._prompt())
+
+    def test_battle_steps_resume_on_the_enemy_turn(self):
+        steps = battle_steps(Warrior(), Rogue(), round_number=4, to_move=ENEMY)
+        assert next(steps) == ENEMY
+        assert steps.send("attack") == PLAYER
+
+    def test_controller_is_restored(self):
+        snapshot = _session().snapshot()
+        _, enemy, rng = restore(snapshot, CompiledEnemyAI)
+        assert isinstance(enemy, CompiledEnemyAI)
+        assert enemy.character.rng is rng.stream(ENEMY)
+        assert enemy.character.health == snapshot.enemy.health
+
+
+class TestSnapshotLog:
+    """Test checkpoint files"""
+
+    def test_latest_snapshot_loads(self, tmp_path):
+        path = str(tmp_path / "battle.snap")
+        session = _session(turns=1)
+        snapshots = []
+        with SnapshotLog(path, full_every=3) as log:
+            reply = session._prompt()
+            while reply["type"] == "prompt":
+                snapshots.append(session.snapshot())
+                log.append(snapshots[-1])
+                reply = play_out(session, reply, turns=1)
+        assert len(snapshots) > 3
+        assert SnapshotLog.load(path) == snapshots[-1]
+
+    def test_torn_tail_is_ignored(self, tmp_path):
+        path = tmp_path / "battle.snap"
+        session = _session()
+        with SnapshotLog(str(path)) as log:
+            first = session.snapshot()
+            log.append(first)
+            play_out(session, session.act("attack"), turns=0)
+            log.append(session.snapshot())
+        path.write_bytes(path.read_bytes()[:-3])
+        assert SnapshotLog.load(str(path)) == first
+        assert SnapshotLog.load(str(tmp_path / "missing.snap")) is None
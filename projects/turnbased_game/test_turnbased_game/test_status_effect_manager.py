@@ -0,0 +1,245 @@
+"""
+Test suite for the indexed StatusEffectManager
+Tests effect ordering and replacement, the category index, cached modifiers
+invalidated on add/remove/expire, the combined dodge roll, stack rules,
+the expiry timeline and shared effect definitions
+"""
+import copy
+import pickle
+import pytest
+from turnbased_game.character_classes import Warrior, Wizard
+from turnbased_game.character_classes.class_tables import CLASS_TABLES, compile_class
+from turnbased_game.simulation.balance_tuner import load_class_data
+from turnbased_game.character_classes.status_effects import (StatusEffect, EffectType, EffectCategory, StackRule,
+                                                            define_effect)
+from turnbased_game.character_classes.status_effect_manager import StatusEffectManager, effect_turns_per_second
+from turnbased_game.simulation.damage_distribution import defender_profile, dodge_chance, modified_damage
+
+
+def _effect(effect_type, magnitude, categories, duration=3, stack_rule=StackRule.REPLACE, max_stacks=1):
+    return StatusEffect(effect_type, duration, magnitude, 0, "mana", categories, stack_rule, max_stacks)
+
+
+def _poison(duration=3, stack_rule=StackRule.ADD, max_stacks=1, magnitude=5):
+    return _effect(EffectType.POISON, magnitude, EffectCategory.DAMAGE_OVER_TIME, duration, stack_rule, max_stacks)
+
+
+def _bubble(magnitude=0.5, duration=3):
+    return _effect(EffectType.MAGIC_BUBBLE, magnitude, EffectCategory.DAMAGE_REDUCTION, duration)
+
+
+def _rage(magnitude=0.25, duration=3):
+    return _effect(EffectType.BERSERKER_RAGE, magnitude,
+                   EffectCategory.DAMAGE_AMPLIFICATION | EffectCategory.RAGE_CONVERSION, duration)
+
+
+def _step(magnitude=0.5, duration=3):
+    return _effect(EffectType.SHADOW_STEP, magnitude, EffectCategory.DODGE, duration)
+
+
+class _Rolls:
+    """Stands in for an rng and counts the draws"""
+
+    def __init__(self, value):
+        self.value = value
+        self.draws = 0
+
+    def random(self):
+        self.draws += 1
+        return self.value
+
+
+class TestIndex:
+    """Test storage, ordering and the category index"""
+
+    def test_replacing_moves_the_effect_to_the_back(self):
+        manager = StatusEffectManager()
+        first = _bubble()
+        manager.add_effect(first)
+        manager.add_effect(_step())
+        replacement = _bubble(0.3)
+        manager.add_effect(replacement)
+        assert manager.active_effects == [manager.effects_in(EffectCategory.DODGE)[0], replacement]
+        assert manager.has_effect(EffectType.MAGIC_BUBBLE)
+
+    def test_active_effects_is_a_copy(self):
+        manager = StatusEffectManager()
+        manager.active_effects.append(_bubble())
+        assert manager.active_effects == []
+        assert not manager.has_effect(EffectType.MAGIC_BUBBLE)
+
+    def test_effects_in_category(self):
+        manager = StatusEffectManager()
+        rage = _rage()
+        manager.add_effect(rage)
+        manager.add_effect(_bubble())
+        assert manager.effects_in(EffectCategory.RAGE_CONVERSION) == (rage,)
+        assert manager.effects_in(EffectCategory.MANA_DRAIN) == ()
+        manager.remove_effect_by_type(EffectType.BERSERKER_RAGE)
+        assert manager.effects_in(EffectCategory.DAMAGE_AMPLIFICATION) == ()
+
+
+class TestCachedModifiers:
+    """Test the cached damage and dodge aggregates"""
+
+    def test_stacked_modifiers_match_the_sequential_arithmetic(self):
+        manager = StatusEffectManager()
+        effects = [_bubble(0.5), _rage(0.25), _step(0.4)]
+        for effect in effects:
+            manager.add_effect(effect)
+        profile = defender_profile(effects)
+        for damage in (0, 7, 15, 40, 40):
+            assert manager.apply_damage_modification(Wizard(), damage)[0] == modified_damage(damage, profile)
+        assert manager.dodge_chance == pytest.approx(dodge_chance(profile))
+
+    def test_rage_conversion_applied_on_cached_hits(self):
+        warrior = Warrior()
+        warrior.rage = 0
+        warrior.status_effects.add_effect(_rage(0.5))
+        for _ in range(2):
+            assert warrior.status_effects.apply_damage_modification(warrior, 20)[0] == 30
+        assert warrior.rage == 20
+
+    def test_cache_follows_add_and_remove(self):
+        manager = StatusEffectManager()
+        wizard = Wizard()
+        assert manager.apply_damage_modification(wizard, 20)[0] == 20
+        manager.add_effect(_bubble(0.5))
+        assert manager.apply_damage_modification(wizard, 20)[0] == 10
+        manager.add_effect(_bubble(0.25))
+        assert manager.apply_damage_modification(wizard, 20)[0] == 15
+        manager.remove_effect_by_type(EffectType.MAGIC_BUBBLE)
+        assert manager.apply_damage_modification(wizard, 20)[0] == 20
+
+    def test_cache_follows_expiry(self):
+        wizard = Wizard()
+        wizard.status_effects.add_effect(_bubble(0.5, duration=1))
+        assert wizard.status_effects.apply_damage_modification(wizard, 20)[0] == 10
+        result = wizard.status_effects.process_turn_effects(wizard)
+        assert result["effects_expired"] == ["magic_bubble"]
+        assert wizard.status_effects.apply_damage_modification(wizard, 20)[0] == 20
+
+    def test_dodge_rolls_once_against_the_combined_chance(self):
+        manager = StatusEffectManager()
+        manager.rng = _Rolls(0.7)
+        assert not manager.apply_dodge_check(None)
+        assert manager.rng.draws == 0
+        manager.add_effect(_step(0.5))
+        manager.add_effect(_effect(EffectType.MAGIC_BUBBLE, 0.5, EffectCategory.DODGE))
+        assert manager.dodge_chance == pytest.approx(0.75)
+        assert manager.apply_dodge_check(None)
+        assert manager.rng.draws == 1
+
+
+class TestStacking:
+    """Test the stack rules"""
+
+    def test_add_keeps_every_stack(self):
+        manager = StatusEffectManager()
+        for _ in range(3):
+            manager.add_effect(_effect(EffectType.MAGIC_BUBBLE, 0.1, EffectCategory.DAMAGE_REDUCTION,
+                                       stack_rule=StackRule.ADD))
+        assert manager.stack_count(EffectType.MAGIC_BUBBLE) == 3
+        assert manager.apply_damage_modification(Wizard(), 20)[0] == 14
+        manager.remove_effect_by_type(EffectType.MAGIC_BUBBLE)
+        assert manager.active_effects == []
+
+    def test_cap_drops_the_oldest_stack(self):
+        manager = StatusEffectManager()
+        stacks = [_poison(duration, StackRule.CAP, max_stacks=2) for duration in (1, 5, 7)]
+        for stack in stacks:
+            manager.add_effect(stack)
+        assert manager.active_effects == stacks[1:]
+
+    def test_refresh_restarts_the_running_effect(self):
+        manager = StatusEffectManager()
+        first = _poison(duration=2, stack_rule=StackRule.REFRESH)
+        manager.add_effect(first)
+        manager.process_turn_effects(Wizard())
+        manager.add_effect(_poison(duration=4, stack_rule=StackRule.REFRESH, magnitude=50))
+        assert manager.active_effects == [first]
+        assert first.duration == 4 and first.magnitude == 5
+
+    def test_class_data_can_opt_in(self):
+        data = dict(load_class_data()["wizard"])
+        data["effect"] = dict(data["effect"], stack="cap", max_stacks=3)
+        effect = compile_class("wizard", data).effect.make("mana")
+        assert (effect.stack_rule, effect.max_stacks) == (StackRule.CAP, 3)
+
+
+class TestTimeline:
+    """Test turn processing on the expiry timeline"""
+
+    def test_stacks_expire_on_their_own_turns(self):
+        wizard = Wizard()
+        manager = wizard.status_effects
+        for duration in (3, 1, 2):
+            manager.add_effect(_poison(duration))
+        expired = [len(manager.process_turn_effects(wizard)["effects_expired"]) for _ in range(4)]
+        assert expired == [1, 1, 1, 0]
+        assert not manager.has_effect(EffectType.POISON)
+
+    def test_durations_count_down_when_read(self):
+        wizard = Wizard()
+        wizard.status_effects.add_effect(_bubble(duration=4))
+        wizard.status_effects.process_turn_effects(wizard)
+        wizard.status_effects.process_turn_effects(wizard)
+        assert [effect.duration for effect in wizard.status_effects.active_effects] == [2]
+
+    def test_damage_over_time_and_regeneration_tick(self):
+        wizard = Wizard()
+        wizard.health -= 20
+        wizard.status_effects.add_effect(_poison(magnitude=8))
+        wizard.status_effects.add_effect(_effect(EffectType.REGENERATION, 30, EffectCategory.REGENERATION))
+        result = wizard.process_turn_start()
+        # poison first, then regeneration up to full health
+        assert result["health_change"] == 20
+        assert wizard.health == wizard.max_health
+        assert result["effects_processed"] == ["poison", "regeneration"]
+
+    def test_passive_effects_are_only_reported_when_they_expire(self):
+        wizard = Wizard()
+        wizard.status_effects.add_effect(_bubble(duration=2))
+        assert wizard.process_turn_start()["effects_processed"] == []
+        result = wizard.process_turn_start()
+        assert result["effects_processed"] == result["effects_expired"] == ["magic_bubble"]
+
+    def test_benchmark_reports_rate(self):
+        assert effect_turns_per_second(120, turns=200) > 0
+        assert effect_turns_per_second(120, turns=200, ticking=True) > 0
+
+
+class TestDefinitions:
+    """Test flyweight effect definitions"""
+
+    def test_casts_share_the_interned_definition(self):
+        first, second = (CLASS_TABLES["wizard"].effect.make("mana") for _ in range(2))
+        assert first is not second
+        assert first.definition is second.definition is CLASS_TABLES["wizard"].effect.definition
+
+    def test_constructor_interns_equal_numbers(self):
+        effect = _bubble(0.35)
+        assert effect.definition is _bubble(0.35, duration=9).definition
+        assert effect.definition is define_effect(EffectType.MAGIC_BUBBLE, 0.35, 0, "mana",
+                                                  EffectCategory.DAMAGE_REDUCTION)
+        assert effect.definition is not _bubble(0.4).definition
+
+    def test_instances_hold_only_duration(self):
+        effect = CLASS_TABLES["rogue"].effect.make("stamina")
+        assert not hasattr(effect, "__dict__")
+        with pytest.raises(AttributeError):
+            effect.magnitude = 1.0
+
+    def test_copies_resolve_to_the_interned_definition(self):
+        effect = CLASS_TABLES["warrior"].effect.make("rage")
+        for clone in (copy.deepcopy(effect), pickle.loads(pickle.dumps(effect))):
+            assert clone.definition is effect.definition
+            assert clone == effect
+
+    def test_to_dict_resolves_through_the_definition(self):
+        effect = _rage(0.25, duration=4)
+        assert effect.to_dict() == {"effect_type": "berserker_rage", "duration": 4, "magnitude": 0.25,
+                                    "maintenance_cost": 0, "resource_type": "mana",
+                                    "categories": effect.categories.value}
+        assert effect == _rage(0.25, duration=4)
+        assert effect != _rage(0.25, duration=3)
@@ -0,0 +1,126 @@
+"""
+Test suite for the policy tournament
+Tests pairings, rating updates, worker-count independence and resuming
+an interrupted tournament from its checkpoint
+"""
+import pytest
+from turnbased_game.simulation.tournament import (EloRatings, GlickoRatings, MatchResult, Tournament,
+                                                  entrants_for, play_match, round_robin_rounds,
+                                                  swiss_pairings, EntrantRecord)
+
+ENTRANTS = entrants_for(["random", "rules"])
+
+
+class TestPairings:
+    """Test round-robin and Swiss scheduling"""
+
+    @pytest.mark.parametrize("size", [4, 5])
+    def test_round_robin_meets_everyone_once(self, size):
+        names = [f"e{i}" for i in range(size)]
+        rounds = round_robin_rounds(names)
+        met = [frozenset(pair) for pairs in rounds for pair in pairs if pair[1] is not None]
+        assert len(met) == len(set(met)) == size * (size - 1) // 2
+        for pairs in rounds:
+            playing = [name for pair in pairs for name in pair if name is not None]
+            assert sorted(playing) == names
+
+    def test_second_cycle_swaps_sides(self):
+        first, second = round_robin_rounds(["a", "b"], cycles=2)
+        assert first == [("a", "b")] and second == [("b", "a")]
+
+    def test_swiss_avoids_rematches_and_repeat_byes(self):
+        records = {name: EntrantRecord(name) for name in "abcde"}
+        records["a"].opponents.append("b")
+        records["b"].opponents.append("a")
+        records["e"].byes = 1
+        records["a"].match_points = records["b"].match_points = 1
+        pairs = swiss_pairings(records, EloRatings())
+        assert ("a", "b") not in pairs
+        assert pairs[-1] == ("d", None)
+
+
+class TestRatings:
+    """Test Elo and Glicko updates"""
+
+    def test_elo_zero_sum(self):
+        ratings = EloRatings()
+        ratings.update("a", "b", MatchResult(15, 5, 0, 0))
+        assert ratings.rating("a") > 1500 > ratings.rating("b")
+        assert ratings.rating("a") + ratings.rating("b") == pytest.approx(3000)
+        assert ratings.expected("a", "b") > 0.5
+
+    def test_even_match_keeps_elo(self):
+        ratings = EloRatings()
+        ratings.update("a", "b", MatchResult(5, 5, 2, 0))
+        assert ratings.rating("a") == ratings.rating("b") == 1500
+
+    def test_glicko_deviation_shrinks_then_drifts(self):
+        ratings = GlickoRatings()
+        ratings.update("a", "b", MatchResult(12, 8, 0, 0))
+        assert ratings.rating("a") > 1500 > ratings.rating("b")
+        settled = ratings.deviation("a")
+        assert settled < 350
+        ratings.new_period()
+        assert settled < ratings.deviation("a") <= 350
+
+
+class TestMatches:
+    """Test playing matches"""
+
+    def test_side_swapped_pairs(self):
+        """Identical entrants split every seed-sharing pair, unless a battle is drawn"""
+        result = play_match("rules:rogue", "rules:rogue", seed=3, battles=20)
+        assert result.battles == 20
+        assert result.wins == result.losses
+
+    def test_match_reproducible(self):
+        assert play_match("random:wizard", "rules:warrior", 1, 6) == play_match("random:wizard", "rules:warrior", 1, 6)
+
+    def test_search_match_reproducible(self):
+        """Search entrants play to a fixed depth, so reruns match whatever the clock does"""
+        assert play_match("search:wizard", "rules:warrior", 11, 6) == play_match("search:wizard", "rules:warrior", 11, 6)
+
+    def test_unknown_entrant(self):
+        with pytest.raises(ValueError):
+            Tournament(["rules:rogue", "psychic:rogue"])
+
+
+class TestTournament:
+    """Test whole tournaments"""
+
+    def test_round_robin_plays_everything(self):
+        tournament = Tournament(ENTRANTS, battles_per_match=4, seed=1)
+        standings = tournament.run(workers=1)
+        assert tournament.finished
+        assert len(tournament.matches) == 15
+        assert all(record.matches == 5 for record in standings)
+        assert sum(record.match_points for record in standings) == 15
+
+    def test_results_do_not_depend_on_worker_count(self):
+        serial = Tournament(ENTRANTS, format="swiss", rating="glicko", battles_per_match=6, seed=2)
+        pooled = Tournament(ENTRANTS, format="swiss", rating="glicko", battles_per_match=6, seed=2)
+        serial.run(workers=1)
+        pooled.run(workers=2)
+        assert serial.schedule == pooled.schedule
+        assert serial.format_table() == pooled.format_table()
+
+    def test_resume_after_interruption(self, tmp_path):
+        """A tournament stopped halfway finishes exactly like an uninterrupted one"""
+        path = str(tmp_path / "tournament.json")
+        settings = dict(format="swiss", rounds=4, rating="glicko", battles_per_match=6, seed=5)
+        whole = Tournament(ENTRANTS, **settings)
+        whole.run(workers=1)
+
+        class Interrupted(Exception):
+            pass
+
+        def interrupt(tournament, number):
+            if number == 7:
+                raise Interrupted
+        with pytest.raises(Interrupted):
+            Tournament(ENTRANTS, checkpoint=path, **settings).run(workers=1, on_result=interrupt)
+        resumed = Tournament.resume(path)
+        assert resumed.applied == 8 and not resumed.finished
+        resumed.run(workers=1)
+        assert resumed.schedule == whole.schedule
+        assert resumed.format_table() == whole.format_table()
@@ -0,0 +1,111 @@
+"""
+Test suite for the NumPy vectorized battle kernel
+Tests batch mechanics and statistical equivalence with the object engine
+"""
+import math
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from turnbased_game.character_classes import Warrior, Rogue, Wizard, EnemyAI
+from turnbased_game.simulation import simulate_batch
+from turnbased_game.simulation.vector_kernel import (VectorBattleBatch, SideArrays, choose_actions,
+                                                     simulate_vectorized, ONGOING, PLAYER_WON, ENEMY_WON, DRAWN,
+                                                     ATTACK, SPECIAL, ITEM)
+
+OBJECT_BATTLES = 800
+VECTOR_BATTLES = 40000
+# short cap so rare stalemates cannot dominate the mean battle length
+MAX_ROUNDS = 40
+
+
+class TestVectorKernel:
+    """Test vectorized batch mechanics"""
+
+    @pytest.fixture(params=[Warrior, Rogue, Wizard])
+    def player_class(self, request):
+        return request.param
+
+    @pytest.fixture(params=[Warrior, Rogue, Wizard])
+    def enemy_class(self, request):
+        return request.param
+
+    def test_batch_starts_from_class_stats(self):
+        """Arrays should be initialised from the character constructors"""
+        batch = VectorBattleBatch(Rogue, Wizard, 8)
+        assert (batch.player.health == Rogue().health).all()
+        assert (batch.player.resource == Rogue().stamina).all()
+        assert (batch.enemy.resource == Wizard().mana).all()
+        assert (batch.enemy.item_count == Wizard().item_count).all()
+        assert (batch.winner == ONGOING).all()
+
+    def test_every_battle_finishes(self, player_class, enemy_class):
+        """After run() no battle should still be ongoing"""
+        batch = VectorBattleBatch(player_class, enemy_class, 500, seed=2)
+        batch.run()
+        assert not (batch.winner == ONGOING).any()
+        assert (batch.rounds > 0).all()
+
+    def test_winner_matches_final_health(self, player_class, enemy_class):
+        """The losing side of a decided battle should be at zero health"""
+        batch = VectorBattleBatch(player_class, enemy_class, 500, seed=4)
+        batch.run()
+        assert (batch.enemy.health[batch.winner == PLAYER_WON] <= 0).all()
+        assert (batch.player.health[batch.winner == ENEMY_WON] <= 0).all()
+
+    def test_finished_battles_are_frozen(self):
+        """Battles that ended must not change on later rounds"""
+        batch = VectorBattleBatch(Warrior, Wizard, 300, seed=1)
+        while batch.active.all():
+            batch.step()
+        done = ~batch.active
+        health_before = batch.player.health[done].copy()
+        rounds_before = batch.rounds[done].copy()
+        batch.step()
+        assert (batch.player.health[done] == health_before).all()
+        assert (batch.rounds[done] == rounds_before).all()
+
+    def test_same_seed_same_results(self):
+        """A seeded batch should be reproducible"""
+        first = simulate_vectorized(2000, Rogue, Warrior, seed=9)
+        second = simulate_vectorized(2000, Rogue, Warrior, seed=9)
+        assert (first.player_wins, first.total_rounds) == (second.player_wins, second.total_rounds)
+
+    def test_round_cap_is_a_draw(self):
+        """Battles still running at max_rounds count as draws"""
+        summary = simulate_vectorized(100, Warrior, Warrior, max_rounds=1)
+        assert summary.draws == 100
+
+    def test_policy_follows_enemy_ai_thresholds(self, monkeypatch):
+        """choose_actions reads the EnemyAI brackets and kill range rather than copies of them"""
+        rogue, wizard = SideArrays(Rogue, 1), SideArrays(Wizard, 1)
+        rogue.resource[:] = Rogue.stats.special.cost
+        rogue.item_count[:] = 1
+        wizard.health[:] = 70
+        coin = np.ones(1)
+        assert choose_actions(rogue, wizard, coin)[0] == ATTACK
+        monkeypatch.setattr(EnemyAI, "KILL_RANGE", 80)
+        assert choose_actions(rogue, wizard, coin)[0] == SPECIAL
+        monkeypatch.setattr(EnemyAI, "DESPERATE_HEALTH", 1.1)
+        assert choose_actions(rogue, wizard, coin)[0] == ITEM
+
+
+def _assert_same_proportion(p1, n1, p2, n2, label):
+    # two-proportion z-test
+    pooled = (p1 * n1 + p2 * n2) / (n1 + n2)
+    standard_error = math.sqrt(max(pooled * (1 - pooled), 1e-3) * (1 / n1 + 1 / n2))
+    assert abs(p1 - p2) < 4.5 * standard_error, f"{label} {p1:.3f} (object) vs {p2:.3f} (vectorized)"
+
+
+@pytest.mark.parametrize("player_class", [Warrior, Rogue, Wizard])
+@pytest.mark.parametrize("enemy_class", [Warrior, Rogue, Wizard])
+def test_statistically_equivalent_to_object_engine(player_class, enemy_class):
+    """Win rate, draw rate and battle length should agree with the object engine"""
+    reference = simulate_batch(OBJECT_BATTLES, player_class, enemy_class, seed=21, max_rounds=MAX_ROUNDS)
+    vectorized = simulate_vectorized(VECTOR_BATTLES, player_class, enemy_class, seed=21, max_rounds=MAX_ROUNDS)
+
+    _assert_same_proportion(reference.player_win_rate, reference.battles,
+                            vectorized.player_win_rate, vectorized.battles, "win rate")
+    _assert_same_proportion(reference.draws / reference.battles, reference.battles,
+                            vectorized.draws / vectorized.battles, vectorized.battles, "draw rate")
+    assert vectorized.average_rounds == pytest.approx(reference.average_rounds, rel=0.08)
@@ -0,0 +1,110 @@
+"""
+Test suite for the exact win-probability solver
+Tests the state encoding, the solved values against the headless engine, and caching
+"""
+import math
+import pytest
+from turnbased_game.character_classes import Warrior, Rogue, Wizard
+from turnbased_game.simulation import WinProbabilitySolver, simulate_batch, solver_for, win_probability
+from turnbased_game.simulation.battle_rules import ATTACK, ITEM, rules_for
+from turnbased_game.simulation.win_solver import AI, OPTIMAL, decode_state, encode_state
+
+
+class TestStateEncoding:
+    """Test the packed memo keys"""
+
+    def test_round_trip(self):
+        """decode_state should invert encode_state"""
+        player, enemy = (200, 65, 2, 5), (1, 180, 0, 3)
+        assert decode_state(encode_state(player, enemy, 17)) == (player, enemy, 17)
+
+    def test_distinct_states_distinct_keys(self):
+        """Changing any field should change the key"""
+        base = encode_state((100, 50, 1, 0), (80, 40, 2, 0), 5)
+        assert encode_state((100, 50, 1, 1), (80, 40, 2, 0), 5) != base
+        assert encode_state((100, 50, 1, 0), (80, 41, 2, 0), 5) != base
+        assert encode_state((100, 50, 1, 0), (80, 40, 2, 0), 6) != base
+
+    def test_tuned_class_numbers_fit(self):
+        """Health, items and effect turns well beyond the shipped tables keep their own fields"""
+        player, enemy = (600, 1, 8, 9), (1200, 0, 30, 12)
+        assert decode_state(encode_state(player, enemy, 3)) == (player, enemy, 3)
+        assert encode_state((100, 0, 8, 0), enemy, 3) != encode_state((100, 1, 0, 0), enemy, 3)
+
+    @pytest.mark.parametrize("player", [(1 << 16, 0, 0, 0), (100, 1 << 16, 0, 0), (100, -1, 0, 0),
+                                        (100, 0, 256, 0), (100, 0, 0, 256)])
+    def test_values_that_dont_fit_are_rejected(self, player):
+        with pytest.raises(ValueError):
+            encode_state(player, (80, 40, 2, 0), 5)
+
+
+class TestWinProbabilitySolver:
+    """Test solved win probabilities"""
+
+    def test_matches_headless_engine(self):
+        """AI against AI should agree with simulated battles at the same round cap"""
+        exact = WinProbabilitySolver(Warrior, Warrior, AI, AI).win_probability(max_rounds=25)
+        summary = simulate_batch(3000, Warrior, Warrior, seed=8, max_rounds=25)
+        standard_error = math.sqrt(exact * (1 - exact) / summary.battles)
+        assert abs(summary.player_win_rate - exact) < 4.5 * standard_error
+
+    def test_optimal_play_bounds_ai_play(self):
+        """An optimal player does at least as well as EnemyAI, an optimal enemy at most as well"""
+        ai_vs_ai = WinProbabilitySolver(Warrior, Warrior, AI, AI).win_probability(max_rounds=6)
+        optimal_vs_ai = WinProbabilitySolver(Warrior, Warrior, OPTIMAL, AI).win_probability(max_rounds=6)
+        ai_vs_optimal = WinProbabilitySolver(Warrior, Warrior, AI, OPTIMAL).win_probability(max_rounds=6)
+        assert ai_vs_optimal <= ai_vs_ai <= optimal_vs_ai
+
+    def test_longer_horizon_never_lowers_win_chance(self):
+        """Extra rounds can only turn draws into wins"""
+        solver = WinProbabilitySolver(Wizard, Rogue, AI, AI)
+        values = [solver.win_probability(max_rounds=rounds) for rounds in (0, 2, 5, 8)]
+        assert values[0] == 0.0
+        assert values == sorted(values)
+
+    @pytest.mark.parametrize("player_class, enemy_class", [(Warrior, Wizard), (Rogue, Wizard), (Wizard, Rogue)])
+    def test_pruning_keeps_the_values(self, player_class, enemy_class):
+        """Cutting off enemies out of reach gives the same answers as searching them"""
+        pruned = WinProbabilitySolver(player_class, enemy_class, OPTIMAL, AI)
+        full = WinProbabilitySolver(player_class, enemy_class, OPTIMAL, AI)
+        full.player_reach = 10 ** 6
+        assert pruned.win_probability(max_rounds=5) == pytest.approx(full.win_probability(max_rounds=5))
+        assert len(pruned.memo) < len(full.memo)
+
+    def test_certain_kill(self):
+        """Attacking an enemy below the lowest hit is a guaranteed win"""
+        solver = WinProbabilitySolver(Warrior, Rogue)
+        enemy = rules_for(Rogue).start()[1:]
+        values = solver.action_values((200, 0, 2, 0), (20,) + enemy, max_rounds=3)
+        assert values[ATTACK] == pytest.approx(1.0)
+        assert ITEM not in values      # full health, potion would be refused
+        assert solver.best_action((200, 0, 2, 0), (20,) + enemy, max_rounds=3) == ATTACK
+
+    def test_unknown_policy_rejected(self):
+        """Only optimal and ai policies exist"""
+        with pytest.raises(ValueError):
+            WinProbabilitySolver(Warrior, Rogue, player_policy="greedy")
+
+
+class TestSolverCaching:
+    """Test the in-memory and on-disk caches"""
+
+    def test_solver_for_is_shared(self):
+        """Repeated lookups return the same solver and its memo"""
+        assert solver_for(Rogue, Warrior, AI, AI) is solver_for(Rogue, Warrior, AI, AI)
+
+    def test_disk_cache_round_trip(self, tmp_path):
+        """A saved memo should be loaded by a fresh solver"""
+        first = WinProbabilitySolver(Warrior, Wizard, AI, AI, cache_dir=str(tmp_path))
+        value = first.win_probability(max_rounds=6)
+        first.save()
+
+        second = WinProbabilitySolver(Warrior, Wizard, AI, AI, cache_dir=str(tmp_path))
+        assert len(second.memo) == len(first.memo)
+        assert second.win_probability(max_rounds=6) == value
+
+    def test_win_probability_saves_new_solutions(self, tmp_path):
+        """win_probability with a cache_dir writes what it solved for the next process"""
+        value = win_probability(Wizard, Rogue, AI, AI, max_rounds=5, cache_dir=str(tmp_path))
+        fresh = WinProbabilitySolver(Wizard, Rogue, AI, AI, cache_dir=str(tmp_path))
+        assert fresh.memo and fresh.win_probability(max_rounds=5) == value
@@ -3,10 +3,11 @@
 Turn-Based RPG Game Launcher
 Run this script to start the game from the qa-portfolio-template directory.
 """
+import sys
 
 if __name__ == "__main__":
-    from projects.turnbased_game.main_gameloop.main_game_loop import *
-    
+    from projects.turnbased_game.main_gameloop.main_game_loop import main
+
     # The game logic is in the main_game_loop.py file
-    # This launcher just imports and runs it
-    pass
+    # This launcher just forwards command line arguments to it
+    sys.exit(main())
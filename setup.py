@@ -11,10 +11,18 @@ setup(
     description="A turn-based RPG game with strategic AI enemies",
     author="Brian Apostol",
     packages=find_packages(),
+    package_data={
+        # class stats and ability numbers (character_classes/class_tables.py)
+        "projects.turnbased_game.character_classes": ["class_data.json"],
+    },
     python_requires=">=3.8",
     install_requires=[
         "pygame>=2.0.0",
     ],
+    extras_require={
+        # NumPy batch kernel for large simulation runs
+        "simulation": ["numpy>=1.22"],
+    },
     entry_points={
         "console_scripts": [
             "turnbased-game=projects.turnbased_game.main_gameloop.main_game_loop:main",